@@ -74,6 +74,25 @@ CREATE INDEX IF NOT EXISTS idx_transcripts_sequence ON meeting_mgmt.transcripts(
 
 COMMENT ON TABLE meeting_mgmt.transcripts IS '转写片段表';
 
+-- 转写片段（按片段编辑 / 分页，替代 meetings.transcript_segments JSON 列，
+-- 应用启动时 init_db 自动建表并迁移旧数据）
+CREATE TABLE IF NOT EXISTS meeting_mgmt.transcript_segments (
+    id SERIAL PRIMARY KEY,
+    session_id VARCHAR(50) NOT NULL,
+    segment_id VARCHAR(32) NOT NULL,
+    start_ms INTEGER NOT NULL DEFAULT 0,
+    end_ms INTEGER NOT NULL DEFAULT 0,
+    speaker VARCHAR(100) DEFAULT '',
+    text TEXT NOT NULL DEFAULT ''
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_transcript_segments_session_segment
+    ON meeting_mgmt.transcript_segments(session_id, segment_id);
+CREATE INDEX IF NOT EXISTS idx_transcript_segments_session_start
+    ON meeting_mgmt.transcript_segments(session_id, start_ms, id);
+
+COMMENT ON TABLE meeting_mgmt.transcript_segments IS '转写片段明细表';
+
 -- ============================================
 -- 4. 创建行动项表
 -- ============================================
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebSocket 并发压测：N 个模拟客户端按实时码率向 /api/v1/ws/meeting/{id} 推送音频块，
+测量单节点容量
+
+测量指标（JSON 输出，便于跨 commit 对比）：
+- ack 延迟：发送音频块到收到 ack 的耗时（p50 / p95 / p99）
+- 转写推送延迟：transcript 消息携带的序号对应音频块发出到收到该消息的耗时
+- 丢块：被拒绝（backpressure rejected）以及会议结束时仍未 ack 的块数
+- 结束会议耗时：发送 end 到收到 completed
+- 服务端 RSS / CPU（含转写工作进程，仅限本脚本启动的服务或 --pid 指定的进程）
+
+默认在临时目录中启动本地服务（MOCK_TRANSCRIPTION=true，不加载 Whisper，不调用大模型），
+--whisper-model tiny 改用真实模型（需配合 --audio 提供可解码的 webm 录音）
+
+Usage:
+    python scripts/bench_ws_load.py --clients 20 --duration 60 --output bench.json
+    python scripts/bench_ws_load.py --whisper-model tiny --audio meeting.webm --clients 4
+    python scripts/bench_ws_load.py --url http://10.0.0.5:8765 --clients 50
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Windows 控制台 UTF-8 编码设置
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+    sys.stderr.reconfigure(encoding='utf-8')
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+import httpx  # noqa: E402
+import websockets  # noqa: E402
+
+from services.audio_frame import pack_audio_frame  # noqa: E402
+
+
+# ========== 统计 ==========
+
+def summarize(values: List[float]) -> Dict[str, Any]:
+    """耗时分布（毫秒，最近秩百分位）"""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def pct(p: float) -> float:
+        return round(ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)] * 1000, 2)
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 2),
+        "p50": pct(50),
+        "p95": pct(95),
+        "p99": pct(99),
+        "max": round(ordered[-1] * 1000, 2),
+    }
+
+
+class ClientStats:
+    """单个模拟客户端的测量结果"""
+
+    def __init__(self):
+        self.sent = 0
+        self.acked = 0
+        self.rejected = 0
+        self.pauses = 0
+        self.ack_latency: List[float] = []
+        self.transcript_lag: List[float] = []
+        self.transcripts = 0
+        self.finalize: Optional[float] = None
+        self.errors: List[str] = []
+
+
+# ========== 音频 ==========
+
+def load_chunks(audio: Optional[str], duration: float, chunk_ms: int, bitrate: int) -> List[bytes]:
+    """
+    按 MediaRecorder timeslice 切分音频块
+
+    真实录音：按码率切成等长字节片段（MediaRecorder 的分块本来就是容器字节流的任意切分），
+    最多发送 duration 秒；未提供时生成随机字节（只能配合模拟转写）
+    """
+    chunk_size = max(1, bitrate // 8 * chunk_ms // 1000)
+    count = max(1, int(duration * 1000 // chunk_ms))
+    if audio:
+        data = Path(audio).read_bytes()
+        return [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)][:count]
+    return [os.urandom(chunk_size) for _ in range(count)]
+
+
+# ========== 资源采样 ==========
+
+class ResourceSampler:
+    """
+    定期采样进程树的 RSS 和 CPU（psutil 可用时使用，否则读取 Linux /proc）
+    """
+
+    def __init__(self, pid: int, interval: float = 1.0):
+        self.pid = pid
+        self.interval = interval
+        self.rss_mb: List[float] = []
+        self.cpu_percent: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+        try:
+            import psutil
+            self._psutil = psutil
+        except ImportError:
+            self._psutil = None
+
+    @property
+    def available(self) -> bool:
+        return self._psutil is not None or Path(f"/proc/{self.pid}/stat").exists()
+
+    def _tree(self) -> List[int]:
+        if self._psutil is not None:
+            root = self._psutil.Process(self.pid)
+            return [self.pid] + [p.pid for p in root.children(recursive=True)]
+        pids, stack = [], [self.pid]
+        while stack:
+            pid = stack.pop()
+            pids.append(pid)
+            for task in Path(f"/proc/{pid}/task").glob("*/children"):
+                stack.extend(int(child) for child in task.read_text().split())
+        return pids
+
+    def _read(self) -> tuple:
+        """(进程树 RSS 字节数, 累计 CPU 秒数)"""
+        rss, cpu = 0, 0.0
+        for pid in self._tree():
+            try:
+                if self._psutil is not None:
+                    proc = self._psutil.Process(pid)
+                    rss += proc.memory_info().rss
+                    times = proc.cpu_times()
+                    cpu += times.user + times.system
+                    continue
+                fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+                cpu += (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+                rss += int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+            except Exception:
+                continue  # 采样期间退出的进程
+        return rss, cpu
+
+    async def _loop(self):
+        last_cpu, last_time = self._read()[1], time.monotonic()
+        while True:
+            await asyncio.sleep(self.interval)
+            rss, cpu = self._read()
+            now = time.monotonic()
+            self.rss_mb.append(rss / 1024 / 1024)
+            self.cpu_percent.append((cpu - last_cpu) / (now - last_time) * 100)
+            last_cpu, last_time = cpu, now
+
+    def start(self):
+        if self.available:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> Dict[str, Any]:
+        if self._task is None:
+            return {"available": False}
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+        def stats(values):
+            if not values:
+                return {}
+            return {"mean": round(sum(values) / len(values), 1), "max": round(max(values), 1)}
+
+        return {"available": True, "samples": len(self.rss_mb),
+                "rss_mb": stats(self.rss_mb), "cpu_percent": stats(self.cpu_percent)}
+
+
+# ========== 本地服务 ==========
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(args, workdir: str) -> subprocess.Popen:
+    """在临时目录中启动服务（output/ 写到临时目录，不影响开发数据）"""
+    env = dict(os.environ)
+    env.update({
+        "MOCK_TRANSCRIPTION": "false" if args.whisper_model else "true",
+        "MOCK_LATENCY_MS": str(args.mock_latency_ms),
+        "WHISPER_MODEL": args.whisper_model or env.get("WHISPER_MODEL", "tiny"),
+        "TRANSCRIBE_WORKER_WARMUP": "true" if args.whisper_model else "false",
+        "LIVE_TRANSCRIBE_INTERVAL": str(args.transcribe_interval),
+        "LIVE_DRAFT_INTERVAL": "0",
+        "DEEPSEEK_API_KEY": env.get("DEEPSEEK_API_KEY", "") if args.with_ai else "",
+        "LOG_LEVEL": "WARNING",
+    })
+    cmd = [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--app-dir", str(SRC_DIR),
+        "--host", "127.0.0.1", "--port", str(args.port),
+        "--log-level", "warning",
+    ]
+    log = open(Path(workdir) / "server.log", "wb")
+    return subprocess.Popen(cmd, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+async def wait_ready(base_url: str, timeout: float):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(timeout=2.0) as client:
+        while time.monotonic() < deadline:
+            try:
+                response = await client.get(f"{base_url}/api/v1/health")
+                if response.status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"服务启动超时 ({timeout:.0f}s)")
+
+
+# ========== 模拟客户端 ==========
+
+async def run_client(index: int, ws_base: str, run_id: str, chunks: List[bytes],
+                     args, stats: ClientStats):
+    """一个会议：start → 按实时节奏推送二进制音频帧 → end，等待 completed"""
+    session_id = f"bench-{run_id}-{index}"
+    uri = f"{ws_base}/api/v1/ws/meeting/{session_id}?user_id=bench"
+    sent_at: Dict[int, float] = {}
+    started = asyncio.Event()
+    resumed = asyncio.Event()
+    resumed.set()
+    completed = asyncio.Event()
+
+    async def receive(ws):
+        async for raw in ws:
+            now = time.perf_counter()
+            message = json.loads(raw)
+            kind = message.get("type")
+            if kind == "started":
+                started.set()
+            elif kind == "ack":
+                sent = sent_at.get(message.get("sequence"))
+                if sent is not None:
+                    stats.acked += 1
+                    stats.ack_latency.append(now - sent)
+            elif kind == "backpressure":
+                state = message.get("state")
+                if state == "rejected":
+                    stats.rejected += 1
+                elif state == "pause":
+                    stats.pauses += 1
+                    resumed.clear()
+                elif state == "resume":
+                    resumed.set()
+            elif kind == "transcript":
+                stats.transcripts += 1
+                sent = sent_at.get(message.get("sequence"))
+                if sent is not None:
+                    stats.transcript_lag.append(now - sent)
+            elif kind == "completed":
+                completed.set()
+            elif kind == "error":
+                stats.errors.append(f"{message.get('code')}: {message.get('message')}")
+                if not started.is_set():
+                    started.set()
+
+    try:
+        async with websockets.connect(uri, max_size=None, open_timeout=30) as ws:
+            receiver = asyncio.create_task(receive(ws))
+            await ws.send(json.dumps({"type": "start", "title": f"压测会议 {index}"}))
+            await asyncio.wait_for(started.wait(), timeout=30)
+
+            t0 = time.perf_counter()
+            for seq, chunk in enumerate(chunks, 1):
+                delay = t0 + (seq - 1) * args.chunk_ms / 1000 - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await resumed.wait()  # 与 SDK 一致：收到 pause 后暂停发送
+                sent_at[seq] = time.perf_counter()
+                await ws.send(pack_audio_frame(chunk, seq, int(time.time() * 1000)))
+                stats.sent += 1
+
+            end_at = time.perf_counter()
+            await ws.send(json.dumps({"type": "end"}))
+            try:
+                await asyncio.wait_for(completed.wait(), timeout=args.finalize_timeout)
+                stats.finalize = time.perf_counter() - end_at
+            except asyncio.TimeoutError:
+                stats.errors.append("finalize timeout")
+            receiver.cancel()
+    except Exception as e:
+        stats.errors.append(f"{type(e).__name__}: {e}")
+
+
+# ========== 主流程 ==========
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SRC_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> Dict[str, Any]:
+    chunks = load_chunks(args.audio, args.duration, args.chunk_ms, args.bitrate)
+    run_id = uuid.uuid4().hex[:6]
+    server = None
+    workdir = None
+
+    if args.url:
+        base_url = args.url.rstrip("/")
+        pid = args.pid
+    else:
+        args.port = args.port or _free_port()
+        workdir = tempfile.mkdtemp(prefix="bench_ws_")
+        server = start_server(args, workdir)
+        base_url = f"http://127.0.0.1:{args.port}"
+        pid = server.pid
+
+    try:
+        await wait_ready(base_url, args.startup_timeout)
+        ws_base = "ws" + base_url[len("http"):]
+
+        sampler = ResourceSampler(pid) if pid else None
+        if sampler:
+            sampler.start()
+
+        stats = [ClientStats() for _ in range(args.clients)]
+        started = time.perf_counter()
+
+        async def delayed(i):
+            await asyncio.sleep(args.ramp * i / max(1, args.clients))
+            await run_client(i, ws_base, run_id, chunks, args, stats[i])
+
+        await asyncio.gather(*(delayed(i) for i in range(args.clients)))
+        wall = time.perf_counter() - started
+        resources = await sampler.stop() if sampler else {"available": False}
+    finally:
+        if server is not None:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    sent = sum(s.sent for s in stats)
+    acked = sum(s.acked for s in stats)
+    errors = [f"client {i}: {e}" for i, s in enumerate(stats) for e in s.errors]
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "clients": args.clients,
+            "duration_s": args.duration,
+            "chunk_ms": args.chunk_ms,
+            "chunks_per_client": len(chunks),
+            "chunk_bytes": len(chunks[0]) if chunks else 0,
+            "audio": args.audio or "synthetic",
+            "transcription": args.whisper_model or ("external" if args.url else "mock"),
+            "transcribe_interval_s": args.transcribe_interval,
+            "target": base_url,
+        },
+        "results": {
+            "wall_seconds": round(wall, 2),
+            "chunks_sent": sent,
+            "chunks_acked": acked,
+            "chunks_rejected": sum(s.rejected for s in stats),
+            "chunks_dropped": sent - acked,
+            "backpressure_pauses": sum(s.pauses for s in stats),
+            "ack_latency_ms": summarize([v for s in stats for v in s.ack_latency]),
+            "transcripts": sum(s.transcripts for s in stats),
+            "transcript_lag_ms": summarize([v for s in stats for v in s.transcript_lag]),
+            "finalize_ms": summarize([s.finalize for s in stats if s.finalize is not None]),
+            "failed_clients": sum(1 for s in stats if s.errors),
+            "errors": errors[:50],
+            "server": resources,
+        },
+        "server_log": str(Path(workdir) / "server.log") if workdir else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket 并发压测")
+    parser.add_argument("--clients", type=int, default=10, help="并发会议数")
+    parser.add_argument("--duration", type=float, default=60, help="每个会议推送的音频时长（秒）")
+    parser.add_argument("--chunk-ms", type=int, default=1000, help="音频块间隔（MediaRecorder timeslice，毫秒）")
+    parser.add_argument("--bitrate", type=int, default=32000, help="音频码率（bit/s），决定每块字节数")
+    parser.add_argument("--audio", help="真实录音（webm），不提供则发送随机字节")
+    parser.add_argument("--ramp", type=float, default=5, help="所有客户端在这么多秒内依次接入")
+    parser.add_argument("--url", help="压测已运行的服务（如 http://host:8765），不提供则启动本地服务")
+    parser.add_argument("--pid", type=int, help="配合 --url：采样该进程的 RSS / CPU")
+    parser.add_argument("--port", type=int, default=0, help="本地服务端口，0 为自动选择")
+    parser.add_argument("--whisper-model", help="本地服务使用真实 Whisper 模型（如 tiny），默认模拟转写")
+    parser.add_argument("--mock-latency-ms", type=int, default=200, help="模拟转写每轮延迟（毫秒）")
+    parser.add_argument("--transcribe-interval", type=float, default=10, help="本地服务实时转写间隔（秒）")
+    parser.add_argument("--with-ai", action="store_true", help="本地服务结束会议时调用大模型（默认关闭）")
+    parser.add_argument("--startup-timeout", type=float, default=120, help="等待服务就绪（秒）")
+    parser.add_argument("--finalize-timeout", type=float, default=300, help="等待 completed（秒）")
+    parser.add_argument("--output", help="结果 JSON 写入文件（同时打印到标准输出）")
+    args = parser.parse_args()
+
+    if args.whisper_model and not args.audio:
+        print("[WARN] 随机字节无法被 Whisper 解码，真实模型请配合 --audio 使用", file=sys.stderr)
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
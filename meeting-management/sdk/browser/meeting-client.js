@@ -7,8 +7,13 @@
  * - 实时转写接收
  * - 会议纪要获取
  * 
- * 版本: v1.1
+ * 版本: v1.3
  * 协议: WebSocket + REST API
+ * 
+ * v1.2: 音频块默认以二进制帧发送（16 字节头 + 原始音频），
+ *       设置 binaryFrames: false 可回退到 Base64 JSON 格式
+ * v1.3: 支持服务端背压（backpressure pause/resume/rejected），暂停期间音频块在本地排队，
+ *       被拒绝的音频块在恢复后重发
  */
 
 class MeetingClient {
@@ -18,24 +23,33 @@ class MeetingClient {
    * @param {string} options.baseUrl - 服务器地址，如 'http://172.20.3.70:8765'
    * @param {string} options.userId - 用户ID，如 'user_001'
    * @param {Function} options.onTranscript - 实时转写回调 (text) => void
+   * @param {Function} options.onMinutesDraft - 会议进行中的纪要草稿回调 (draft, revision) => void
    * @param {Function} options.onCompleted - 会议完成回调 (data) => void
    * @param {Function} options.onError - 错误回调 (error) => void
    * @param {number} options.chunkInterval - 音频块发送间隔（毫秒），默认 1000
+   * @param {boolean} options.binaryFrames - 是否用二进制帧发送音频，默认 true
    */
   constructor(options = {}) {
     this.baseUrl = options.baseUrl || 'http://localhost:8765';
     this.userId = options.userId || 'anonymous';
     this.onTranscript = options.onTranscript || null;
+    this.onMinutesDraft = options.onMinutesDraft || null;
     this.onCompleted = options.onCompleted || null;
     this.onError = options.onError || null;
     this.onProgress = options.onProgress || null;  // 进度回调
     this.chunkInterval = options.chunkInterval || 1000;
+    this.binaryFrames = options.binaryFrames !== false;
 
     this.ws = null;
     this.mediaRecorder = null;
     this.sessionId = null;
     this.chunkSequence = 0;
     this.isRecording = false;
+    this._sendChain = Promise.resolve();  // 保证音频块按序发送
+    this._paused = false;                 // 服务端背压暂停中
+    this._pending = [];                   // 暂停期间排队的音频块 {blob, sequence, timestamp}
+    this._unacked = new Map();            // 已发送未确认的音频块（被拒绝时重发）
+    this.lastAckedSequence = -1;
   }
 
   /**
@@ -107,6 +121,13 @@ class MeetingClient {
         }).catch(reject);
         break;
 
+      case 'redirect':
+        // 会话由其他节点处理（会话亲和），连接 data.url 重试
+        console.warn('[MeetingClient] 会话由其他节点处理:', data.worker_id, data.url);
+        if (this.onError) this.onError({ type: 'redirect', workerId: data.worker_id, url: data.url });
+        reject(new Error('会话由其他节点处理'));
+        break;
+
       case 'transcript':
         // 实时转写结果
         if (this.onTranscript && data.text) {
@@ -114,6 +135,13 @@ class MeetingClient {
         }
         break;
 
+      case 'minutes_draft':
+        // 纪要草稿（每次推送完整草稿，直接替换上一版）
+        if (this.onMinutesDraft && data.draft) {
+          this.onMinutesDraft(data.draft, data.revision);
+        }
+        break;
+
       case 'progress':
         // 生成进度更新
         if (this.onProgress) {
@@ -155,6 +183,16 @@ class MeetingClient {
         }
         break;
 
+      case 'ack':
+        // 音频块已被服务端接收
+        this._unacked.delete(data.sequence);
+        this.lastAckedSequence = Math.max(this.lastAckedSequence, data.sequence);
+        break;
+
+      case 'backpressure':
+        this._handleBackpressure(data);
+        break;
+
       case 'error':
         // 错误消息
         console.error('[MeetingClient] 服务器错误:', data);
@@ -233,21 +271,98 @@ class MeetingClient {
    * 发送音频块
    * @private
    */
-  async sendAudioChunk(blob) {
-    try {
+  sendAudioChunk(blob) {
+    const chunk = { blob, sequence: this.chunkSequence++, timestamp: Date.now() };
+    if (this._paused) {
+      this._pending.push(chunk);
+      return;
+    }
+    this._enqueueSend(chunk);
+  }
+
+  /**
+   * Blob 读取是异步的，串成链保证服务端按序收到
+   * @private
+   */
+  _enqueueSend(chunk) {
+    this._unacked.set(chunk.sequence, chunk);
+    this._sendChain = this._sendChain
+      .then(() => this.binaryFrames
+        ? this._sendBinaryChunk(chunk.blob, chunk.sequence, chunk.timestamp)
+        : this._sendBase64Chunk(chunk.blob, chunk.sequence))
+      .catch((error) => {
+        console.error('[MeetingClient] 发送音频块失败:', error);
+      });
+  }
+
+  /**
+   * 服务端背压：pause 暂停发送，resume 按序发送本地排队的音频块，rejected 的块放回队列
+   * @private
+   */
+  _handleBackpressure(data) {
+    console.warn('[MeetingClient] 服务端背压:', data.state, data.queued_bytes);
+    if (data.state === 'rejected') {
+      const chunk = this._unacked.get(data.sequence);
+      if (chunk) {
+        this._unacked.delete(data.sequence);
+        this._pending.push(chunk);
+        this._pending.sort((a, b) => a.sequence - b.sequence);
+      }
+      this._paused = true;
+      // 队列已满但可能错过了 pause 消息：稍后自动重试
+      setTimeout(() => this._handleBackpressure({ state: 'resume' }), 1000);
+    } else if (data.state === 'pause') {
+      this._paused = true;
+    } else if (data.state === 'resume' && this._paused) {
+      this._paused = false;
+      const pending = this._pending;
+      this._pending = [];
+      pending.forEach((chunk) => this._enqueueSend(chunk));
+    }
+  }
+
+  /**
+   * 二进制帧：16 字节头 + 原始音频
+   * 头部（大端）：version(1) codec(1) reserved(2) sequence(4) timestamp_ms(8)
+   * @private
+   */
+  async _sendBinaryChunk(blob, sequence, timestamp) {
+    const payload = new Uint8Array(await blob.arrayBuffer());
+    const frame = new Uint8Array(MeetingClient.FRAME_HEADER_SIZE + payload.length);
+    const view = new DataView(frame.buffer);
+    view.setUint8(0, MeetingClient.FRAME_VERSION);
+    view.setUint8(1, MeetingClient.CODEC_WEBM_OPUS);
+    view.setUint16(2, 0);
+    view.setUint32(4, sequence);
+    view.setBigUint64(8, BigInt(timestamp));
+    frame.set(payload, MeetingClient.FRAME_HEADER_SIZE);
+
+    if (this.ws?.readyState === WebSocket.OPEN) {
+      this.ws.send(frame.buffer);
+    } else {
+      console.warn('[MeetingClient] WebSocket 未连接');
+    }
+  }
+
+  /**
+   * Base64 JSON（兼容旧服务端）
+   * @private
+   */
+  _sendBase64Chunk(blob, sequence) {
+    return new Promise((resolve, reject) => {
       const reader = new FileReader();
       reader.onloadend = () => {
         const base64 = reader.result.split(',')[1];
         this.send({
           type: 'chunk',
-          sequence: this.chunkSequence++,
+          sequence: sequence,
           data: base64
         });
+        resolve();
       };
+      reader.onerror = () => reject(reader.error);
       reader.readAsDataURL(blob);
-    } catch (error) {
-      console.error('[MeetingClient] 发送音频块失败:', error);
-    }
+    });
   }
 
   /**
@@ -259,10 +374,16 @@ class MeetingClient {
     // 停止录音
     this.stopRecording();
 
-    // 发送 end 消息
-    if (this.ws?.readyState === WebSocket.OPEN) {
-      this.send({ type: 'end' });
-    }
+    // 本地排队的音频块先发出，再发送 end 消息（经发送链保证顺序）
+    this._paused = false;
+    const pending = this._pending;
+    this._pending = [];
+    pending.forEach((chunk) => this._enqueueSend(chunk));
+    this._sendChain = this._sendChain.then(() => {
+      if (this.ws?.readyState === WebSocket.OPEN) {
+        this.send({ type: 'end' });
+      }
+    });
   }
 
   /**
@@ -310,11 +431,19 @@ class MeetingClient {
       connected: this.ws?.readyState === WebSocket.OPEN,
       recording: this.isRecording,
       sessionId: this.sessionId,
-      chunkSequence: this.chunkSequence
+      chunkSequence: this.chunkSequence,
+      lastAckedSequence: this.lastAckedSequence,
+      pendingChunks: this._pending.length,
+      paused: this._paused
     };
   }
 }
 
+// 二进制音频帧常量（与 src/services/audio_frame.py 保持一致）
+MeetingClient.FRAME_VERSION = 1;
+MeetingClient.FRAME_HEADER_SIZE = 16;
+MeetingClient.CODEC_WEBM_OPUS = 1;
+
 // 导出
 if (typeof module !== 'undefined' && module.exports) {
   module.exports = MeetingClient;
@@ -7,18 +7,28 @@ AI 会议纪要生成器
 更新记录:
 - 2026-02-25: 添加重试机制、超时配置、详细日志
 - 2026-02-26: 添加多模板支持，AI提供商抽象层
+- 2026-10-16: 改用异步 llm_client（连接池、流式响应、按提供商限流、非阻塞退避）
+- 2026-10-16: 长会议按发言分段 map-reduce 生成纪要，替代首尾截断
+- 2026-10-16: 纪要结果缓存（转写文本 + 模板 + 模型），重复生成不再调用大模型
+- 2026-10-16: 会议进行中滚动更新纪要草稿，结束时只合并草稿和尾部转写
 """
 
+import asyncio
 import json
 import os
 import logging
+import re
 import time
 from typing import Dict, List, Optional
 from datetime import datetime
 
-import requests
-
-from prompts import get_system_prompt, TEMPLATE_DESCRIPTIONS
+from prompts import (
+    get_system_prompt, get_reduce_prompt, get_draft_final_prompt,
+    MAP_TEMPLATE, MERGE_TEMPLATE, DRAFT_TEMPLATE, TEMPLATE_DESCRIPTIONS
+)
+from services.llm_client import LLMAuthError, LLMClient, LLMRequestError, backoff_delay, llm_client
+from services.minutes_cache import MinutesCache, minutes_cache
+from services.text_postprocess import NOISE_WORDS, get_noise_filter
 
 # 配置日志
 logger = logging.getLogger(__name__)
@@ -40,12 +50,17 @@ COMPANY_MODEL = os.getenv("COMPANY_MODEL", "company-chat")
 REQUEST_TIMEOUT = int(os.getenv("AI_REQUEST_TIMEOUT", "60"))  # 默认60秒
 MAX_RETRIES = int(os.getenv("AI_MAX_RETRIES", "3"))  # 默认重试3次
 RETRY_DELAY = float(os.getenv("AI_RETRY_DELAY", "1.0"))  # 重试间隔秒数
-MAX_TEXT_LENGTH = int(os.getenv("AI_MAX_TEXT_LENGTH", "15000"))  # 最大文本长度
+MAX_TEXT_LENGTH = int(os.getenv("AI_MAX_TEXT_LENGTH", "15000"))  # 单次请求最大文本长度，超过则分段生成
+
+# 长会议分段配置（map-reduce）
+MAP_CHUNK_CHARS = int(os.getenv("AI_MAP_CHUNK_CHARS", "6000"))  # 每段字符数
+MAP_CONCURRENCY = int(os.getenv("AI_MAP_CONCURRENCY", "4"))  # 分段并发请求数
 
-# 噪声词过滤配置（从环境变量读取，逗号分隔）
-DEFAULT_NOISE_WORDS = "字幕by索兰娅,字幕,索兰娅,suolan,字幕制作"
-NOISE_WORDS = os.getenv("AI_NOISE_WORDS", DEFAULT_NOISE_WORDS).split(",")
-NOISE_WORDS = [w.strip() for w in NOISE_WORDS if w.strip()]
+# 发言时间戳（[00:01:23] / [01:23]）与句末标点，用作分段边界
+_UTTERANCE_RE = re.compile(r"\[\d{1,2}:\d{2}(?::\d{2})?\]")
+_SENTENCE_RE = re.compile(r"[^。！？!?；;]*[。！？!?；;]?")
+
+# 噪声词过滤配置（AI_NOISE_WORDS，逗号分隔，见 services/text_postprocess.py）
 
 
 def get_ai_config() -> Dict:
@@ -133,18 +148,8 @@ def filter_noise_words(transcription: str, noise_words: Optional[List[str]] = No
     if not words:
         return transcription
     
-    filtered_text = transcription
-    removed_count = 0
-    
-    for word in words:
-        if word and word in filtered_text:
-            count = filtered_text.count(word)
-            filtered_text = filtered_text.replace(word, "")
-            removed_count += count
-            logger.debug(f"过滤噪声词 '{word}': 出现 {count} 次")
-    
-    # 清理多余空格
-    filtered_text = " ".join(filtered_text.split())
+    # 编译后的过滤器按词表缓存，一次扫描删除全部噪声词并清理多余空格
+    filtered_text, removed_count = get_noise_filter(words).filter_count(transcription)
     
     if removed_count > 0:
         logger.info(f"共过滤 {removed_count} 个噪声词，文本长度: {len(transcription)} -> {len(filtered_text)}")
@@ -152,16 +157,230 @@ def filter_noise_words(transcription: str, noise_words: Optional[List[str]] = No
     return filtered_text
 
 
-def generate_minutes_with_ai(
+def split_transcription(transcription: str, max_chars: Optional[int] = None) -> List[str]:
+    """
+    按发言边界切分长转写文本，每段不超过 max_chars
+    
+    优先在时间戳（"[00:12:30] 张三: ..."，每条发言的开头）处切分；
+    单条发言超长时在句末标点处切分，仍超长则硬切
+    
+    Returns:
+        按时间顺序的文本段
+    """
+    max_chars = max_chars or MAP_CHUNK_CHARS
+    starts = [m.start() for m in _UTTERANCE_RE.finditer(transcription)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    utterances = [transcription[a:b] for a, b in zip(starts, starts[1:] + [len(transcription)])]
+    
+    # 超长发言拆成句子，仍超长则硬切
+    pieces: List[str] = []
+    for utterance in utterances:
+        if len(utterance) <= max_chars:
+            pieces.append(utterance)
+            continue
+        for sentence in _SENTENCE_RE.findall(utterance):
+            pieces.extend(sentence[k:k + max_chars] for k in range(0, len(sentence), max_chars))
+    
+    # 贪心合并到 max_chars
+    chunks: List[str] = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) > max_chars:
+            chunks.append(current.strip())
+            current = ""
+        current += piece
+    if current.strip():
+        chunks.append(current.strip())
+    return chunks
+
+
+def _build_messages(system_prompt: str, user_content: str, title_hint: str = "") -> List[Dict[str, str]]:
+    """构建对话消息"""
+    if title_hint:
+        user_content = f"会议标题：{title_hint}\n\n{user_content}"
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_content}
+    ]
+
+
+async def _complete_json(
+    client: LLMClient,
+    messages: List[Dict[str, str]],
+    config: Dict,
+    max_retries: int,
+    timeout: int,
+    kind: str = "minutes",
+    cache: Optional[MinutesCache] = None,
+    refresh: bool = False,
+    stats: Optional[Dict[str, int]] = None
+) -> Optional[Dict]:
+    """
+    请求并解析 JSON 结果（先查结果缓存）
+    
+    HTTP 层的重试（429/5xx/超时）在 llm_client 中完成，这里只重试内容无法解析的情况
+    
+    Args:
+        kind: 缓存条目类型 minutes/map/merge/reduce
+        cache: 结果缓存，None 不使用
+        refresh: 跳过缓存读取，结果仍写入缓存
+        stats: 累计 llm_requests / cache_hits
+    
+    Returns:
+        解析后的字典，多次解析失败返回 None
+    """
+    stats = stats if stats is not None else {}
+    cache_key = None
+    if cache is not None and cache.enabled:
+        cache_key = cache.make_key(config, messages)
+        if not refresh:
+            cached = await asyncio.to_thread(cache.get, cache_key)
+            if cached is not None:
+                stats["cache_hits"] = stats.get("cache_hits", 0) + 1
+                logger.info(f"纪要缓存命中 ({kind}): {cache_key[:12]}")
+                return cached
+    
+    stats["llm_requests"] = stats.get("llm_requests", 0) + 1
+    for attempt in range(max_retries):
+        logger.info(f"AI 生成请求: 第 {attempt + 1}/{max_retries} 次尝试, "
+                    f"文本长度: {len(messages[-1]['content'])} 字符")
+        start_time = time.time()
+        
+        content = await client.chat_completion(
+            messages,
+            config=config,
+            timeout=timeout,
+            max_retries=max_retries,
+            temperature=0.3,
+            max_tokens=4000,
+            response_format={"type": "json_object"}
+        )
+        
+        logger.info(f"AI 响应时间: {time.time() - start_time:.2f} 秒")
+        
+        try:
+            result = json.loads(content)
+            if isinstance(result, dict):
+                if cache_key is not None:
+                    await asyncio.to_thread(cache.put, cache_key, result, kind, config["model"])
+                return result
+            logger.error(f"AI 返回的 JSON 不是对象: {content[:200]}...")
+        except json.JSONDecodeError as e:
+            logger.error(f"AI 返回的 JSON 解析失败: {e}, 内容: {content[:200]}...")
+        
+        if attempt < max_retries - 1:
+            await asyncio.sleep(backoff_delay(attempt))
+    return None
+
+
+async def _map_reduce_minutes(
+    text: str,
+    title_hint: str,
+    template_style: str,
+    client: LLMClient,
+    config: Dict,
+    max_retries: int,
+    timeout: int,
+    cache: Optional[MinutesCache] = None,
+    refresh: bool = False,
+    stats: Optional[Dict[str, int]] = None
+) -> Optional[Dict]:
+    """
+    长会议分层 map-reduce 生成纪要
+    
+    1. map: 按发言边界切分，各段并发提取纪要要点（在途请求数受 MAP_CONCURRENCY 限制）
+    2. merge: 要点总长超过 MAX_TEXT_LENGTH 时按相邻分组合并，逐层缩减
+    3. reduce: 按模板风格合并为完整纪要
+    
+    map / merge 的提示词与模板风格无关，换模板重新生成时命中缓存，只需重新 reduce
+    
+    Returns:
+        未标准化的纪要字典；全部分段失败返回 None
+    """
+    chunks = split_transcription(text)
+    semaphore = asyncio.Semaphore(MAP_CONCURRENCY)
+    logger.info(f"长会议分段生成纪要: {len(text)} 字符, {len(chunks)} 段, 并发 {MAP_CONCURRENCY}")
+    
+    async def run(kind: str, system_prompt: str, user_content: str) -> Optional[Dict]:
+        async with semaphore:
+            return await _complete_json(
+                client, _build_messages(system_prompt, user_content, title_hint),
+                config, max_retries, timeout,
+                kind=kind, cache=cache, refresh=refresh, stats=stats
+            )
+    
+    # map
+    results = await asyncio.gather(*[
+        run("map", MAP_TEMPLATE, f"会议转写片段（第 {i + 1}/{len(chunks)} 段）：\n\n{chunk}\n\n请提取本段的纪要要点 JSON：")
+        for i, chunk in enumerate(chunks)
+    ], return_exceptions=True)
+    for result in results:
+        if isinstance(result, LLMAuthError):
+            raise result
+    partials = [r for r in results if isinstance(r, dict)]
+    if len(partials) < len(results):
+        logger.warning(f"{len(results) - len(partials)}/{len(results)} 段纪要要点提取失败，使用其余分段合并")
+    if not partials:
+        return None
+    
+    # merge：逐层把相邻分组合并，直到总长放得进一次请求
+    while len(partials) > 1 and len(json.dumps(partials, ensure_ascii=False)) > MAX_TEXT_LENGTH:
+        groups: List[List[Dict]] = [[]]
+        for partial in partials:
+            if groups[-1] and len(json.dumps(groups[-1] + [partial], ensure_ascii=False)) > MAX_TEXT_LENGTH:
+                groups.append([])
+            groups[-1].append(partial)
+        if len(groups) == len(partials):
+            # 每组只有一段，无法继续缩减
+            break
+        logger.info(f"分段要点合并: {len(partials)} -> {len(groups)}")
+        merged = await asyncio.gather(*[
+            run("merge", MERGE_TEMPLATE, f"相邻分段的纪要要点：\n\n{json.dumps(group, ensure_ascii=False)}\n\n请合并为一份要点 JSON：")
+            if len(group) > 1 else _identity(group[0])
+            for group in groups
+        ])
+        partials = [m if m is not None else _concat_partials(g) for m, g in zip(merged, groups)]
+    
+    # reduce
+    return await run(
+        "reduce", get_reduce_prompt(template_style),
+        f"以下是按时间顺序排列的 {len(partials)} 段纪要要点（JSON）：\n\n"
+        f"{json.dumps(partials, ensure_ascii=False)}\n\n请合并生成完整会议纪要 JSON："
+    )
+
+
+async def _identity(value):
+    return value
+
+
+def _concat_partials(partials: List[Dict]) -> Dict:
+    """合并请求失败时直接拼接各段要点"""
+    merged: Dict[str, List] = {"participants": [], "topics": [], "risks": [], "pending_confirmations": []}
+    for partial in partials:
+        for key in merged:
+            merged[key].extend(partial.get(key) or [])
+    merged["participants"] = list(dict.fromkeys(merged["participants"]))
+    return merged
+
+
+async def generate_minutes_with_ai_async(
     transcription: str,
     title_hint: str = "",
     template_style: str = "detailed",
     max_retries: int = MAX_RETRIES,
     timeout: int = REQUEST_TIMEOUT,
+    client: Optional[LLMClient] = None,
+    use_cache: bool = True,
+    draft: Optional[Dict] = None,
+    draft_tail: str = "",
     **kwargs
 ) -> Optional[Dict]:
     """
-    使用 AI 生成会议纪要（带重试机制）
+    使用 AI 生成会议纪要（异步，带重试机制）
+    
+    请求经共享的 llm_client 发出：连接池复用、按提供商限制并发、重试等待不占线程；
+    转写文本、模板、模型都未变化时直接返回缓存结果（minutes_cache）
     
     Args:
         transcription: 会议转写文本
@@ -169,24 +388,27 @@ def generate_minutes_with_ai(
         template_style: 模板风格，"detailed"/"concise"/"action"/"executive"
         max_retries: 最大重试次数
         timeout: 请求超时时间（秒）
+        client: 大模型客户端，默认全局 llm_client
+        use_cache: False 时跳过缓存读取，强制调用大模型（结果仍写入缓存）
+        draft: 会议进行中整理的滚动草稿（update_minutes_draft），有草稿时只需合并草稿和尾部转写
+        draft_tail: 草稿之后的尾部转写文本
         
     Returns:
         会议纪要字典，失败返回 None
     """
-    # 选择提示词
-    system_prompt = get_system_prompt(template_style)
+    client = client or llm_client
+    stats: Dict[str, int] = {"llm_requests": 0, "cache_hits": 0}
+    cache_opts = {"cache": minutes_cache, "refresh": not use_cache, "stats": stats}
     
     # 获取AI配置
     config = get_ai_config()
-    api_key = config["api_key"]
-    base_url = config["base_url"]
-    model = config["model"]
     provider = config["provider"]
+    model = config["model"]
     
     logger.info(f"使用AI提供商: {provider}, 模板: {template_style}")
     
     # 验证 API Key
-    if not api_key:
+    if not config["api_key"]:
         logger.error("DeepSeek API Key 未配置，请设置 DEEPSEEK_API_KEY 环境变量")
         raise ValueError("DeepSeek API Key 未配置，请设置 DEEPSEEK_API_KEY 环境变量")
     
@@ -198,122 +420,149 @@ def generate_minutes_with_ai(
     
     # 过滤噪声词（字幕、背景音等）
     filtered_text = filter_noise_words(transcription)
+    long_meeting = len(filtered_text) > MAX_TEXT_LENGTH
+    mode = "map_reduce" if long_meeting else "single"
     
-    # 截断过长文本
-    processed_text = truncate_transcription(filtered_text)
+    try:
+        minutes = None
+        if draft:
+            # 会议进行中已有草稿：只合并草稿 + 尾部转写，结束会议时不必再处理全文
+            tail_text = filter_noise_words(draft_tail) if draft_tail else ""
+            if len(tail_text) <= MAX_TEXT_LENGTH:
+                messages = _build_messages(
+                    get_draft_final_prompt(template_style),
+                    f"纪要草稿（JSON）：\n\n{json.dumps(draft, ensure_ascii=False)}\n\n"
+                    f"草稿之后的尾部转写：\n\n{tail_text or '（无）'}\n\n请生成最终会议纪要 JSON：",
+                    title_hint
+                )
+                minutes = await _complete_json(
+                    client, messages, config, max_retries, timeout, kind="draft_final", **cache_opts
+                )
+                if minutes is None:
+                    logger.warning("草稿合并失败，改为全文生成")
+                else:
+                    mode = "draft_merge"
+        
+        if minutes is None and long_meeting:
+            # 长会议分段 map-reduce，不再截断丢弃中间部分
+            minutes = await _map_reduce_minutes(
+                filtered_text, title_hint, template_style, client, config, max_retries, timeout,
+                **cache_opts
+            )
+        elif minutes is None:
+            messages = _build_messages(
+                get_system_prompt(template_style),
+                f"会议转写文本：\n\n{filtered_text}\n\n请生成会议纪要 JSON：",
+                title_hint
+            )
+            minutes = await _complete_json(client, messages, config, max_retries, timeout, **cache_opts)
     
-    # 构建提示词
-    user_prompt = f"会议转写文本：\n\n{processed_text}\n\n请生成会议纪要 JSON："
-    if title_hint:
-        user_prompt = f"会议标题：{title_hint}\n\n{user_prompt}"
+    except LLMAuthError:
+        logger.error("API 认证失败 (401)，请检查 DEEPSEEK_API_KEY 是否正确")
+        raise
     
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
+    except LLMRequestError as e:
+        if not e.retryable:
+            # 这些错误通常重试无用，直接抛出
+            logger.error(f"请求异常: {e}")
+            raise
+        # 瞬时错误已在客户端内耗尽重试
+        logger.error(f"AI 生成失败，已重试 {max_retries} 次，最后错误: {e}")
+        return None
     
-    payload = {
+    if minutes is None:
+        logger.error(f"AI 生成失败，已重试 {max_retries} 次，返回内容无法解析")
+        return None
+    
+    # 标准化字段
+    minutes = normalize_minutes(minutes, title_hint)
+    
+    # 添加生成元数据
+    minutes["_meta"] = {
+        "generated_at": datetime.now().isoformat(),
+        "provider": provider,
         "model": model,
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-        "temperature": 0.3,
-        "max_tokens": 4000,
-        "response_format": {"type": "json_object"}
+        "template": template_style,
+        "mode": mode,
+        "llm_requests": stats["llm_requests"],
+        "cache_hits": stats["cache_hits"],
+        "cached": stats["llm_requests"] == 0,
     }
+    if mode == "map_reduce":
+        minutes["_meta"]["chunks"] = len(split_transcription(filtered_text))
     
-    # 带重试的请求
-    last_error = None
-    for attempt in range(max_retries):
+    logger.info(f"AI 纪要生成成功: {len(minutes.get('topics', []))} 个议题, "
+               f"{sum(len(t.get('action_items', [])) for t in minutes.get('topics', []))} 个行动项")
+    
+    return minutes
+
+
+async def update_minutes_draft(
+    draft: Optional[Dict],
+    new_text: str,
+    title_hint: str = "",
+    client: Optional[LLMClient] = None,
+    max_retries: int = MAX_RETRIES,
+    timeout: int = REQUEST_TIMEOUT
+) -> Optional[Dict]:
+    """
+    用新增转写更新会议进行中的滚动草稿（议题、行动项等，分段要点格式）
+    
+    只发送新增文本 + 上一版草稿，请求大小与会议总时长无关
+    
+    Args:
+        draft: 上一版草稿，首次为 None
+        new_text: 上一版草稿之后新增的转写文本
+        
+    Returns:
+        更新后的草稿；未配置 API Key 或生成失败返回 None（保留上一版草稿）
+    """
+    client = client or llm_client
+    config = get_ai_config()
+    if not config["api_key"]:
+        return None
+    
+    filtered_text = filter_noise_words(new_text)
+    current = draft or {}
+    for chunk in split_transcription(filtered_text, MAX_TEXT_LENGTH):
+        messages = _build_messages(
+            DRAFT_TEMPLATE,
+            f"当前草稿（JSON）：\n\n{json.dumps(current, ensure_ascii=False)}\n\n"
+            f"新增转写：\n\n{chunk}\n\n请输出更新后的草稿 JSON：",
+            title_hint
+        )
         try:
-            logger.info(f"AI 生成请求: 第 {attempt + 1}/{max_retries} 次尝试, 文本长度: {len(processed_text)} 字符")
-            start_time = time.time()
-            
-            response = requests.post(
-                f"{base_url}/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=timeout
+            result = await _complete_json(
+                client, messages, config, max_retries, timeout, kind="draft", cache=minutes_cache
             )
-            
-            elapsed = time.time() - start_time
-            logger.info(f"AI 响应时间: {elapsed:.2f} 秒")
-            
-            # 处理 HTTP 错误
-            if response.status_code == 401:
-                logger.error("API 认证失败 (401)，请检查 DEEPSEEK_API_KEY 是否正确")
-                raise ValueError("API Key 无效或已过期")
-            
-            if response.status_code == 429:
-                logger.warning("API 速率限制 (429)，等待后重试...")
-                if attempt < max_retries - 1:
-                    time.sleep(RETRY_DELAY * (attempt + 1))  # 指数退避
-                    continue
-                raise requests.exceptions.RequestException("API 速率限制，已耗尽重试次数")
-            
-            if response.status_code == 503:
-                logger.warning("API 服务暂时不可用 (503)，等待后重试...")
-                if attempt < max_retries - 1:
-                    time.sleep(RETRY_DELAY * (attempt + 1))
-                    continue
-            
-            response.raise_for_status()
-            
-            # 解析响应
-            result = response.json()
-            content = result["choices"][0]["message"]["content"]
-            
-            # 解析 JSON
-            try:
-                minutes = json.loads(content)
-            except json.JSONDecodeError as e:
-                logger.error(f"AI 返回的 JSON 解析失败: {e}, 内容: {content[:200]}...")
-                raise
-            
-            # 标准化字段
-            minutes = normalize_minutes(minutes, title_hint)
-            
-            # 添加生成元数据
-            minutes["_meta"] = {
-                "generated_at": datetime.now().isoformat(),
-                "provider": provider,
-                "model": model,
-                "template": template_style,
-            }
-            
-            logger.info(f"AI 纪要生成成功: {len(minutes.get('topics', []))} 个议题, "
-                       f"{sum(len(t.get('action_items', [])) for t in minutes.get('topics', []))} 个行动项")
-            
-            return minutes
-            
-        except requests.exceptions.Timeout:
-            last_error = "请求超时"
-            logger.warning(f"第 {attempt + 1} 次尝试超时 (>{timeout}秒)")
-            if attempt < max_retries - 1:
-                time.sleep(RETRY_DELAY)
-                
-        except requests.exceptions.ConnectionError as e:
-            last_error = f"连接错误: {e}"
-            logger.warning(f"第 {attempt + 1} 次尝试连接失败: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(RETRY_DELAY * (attempt + 1))
-                
-        except (requests.exceptions.RequestException, ValueError) as e:
-            last_error = str(e)
-            logger.error(f"请求异常: {e}")
-            # 这些错误通常重试无用，直接抛出
-            raise
-            
-        except Exception as e:
-            last_error = str(e)
-            logger.error(f"第 {attempt + 1} 次尝试异常: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(RETRY_DELAY)
+        except LLMRequestError as e:
+            logger.warning(f"纪要草稿更新失败: {e}")
+            return None
+        if result is None:
+            return None
+        current = result
+    return current
+
+
+def generate_minutes_with_ai(
+    transcription: str,
+    title_hint: str = "",
+    template_style: str = "detailed",
+    max_retries: int = MAX_RETRIES,
+    timeout: int = REQUEST_TIMEOUT,
+    **kwargs
+) -> Optional[Dict]:
+    """
+    使用 AI 生成会议纪要（同步入口，供线程池 / 命令行调用）
     
-    # 所有重试都失败了
-    logger.error(f"AI 生成失败，已重试 {max_retries} 次，最后错误: {last_error}")
-    return None
+    服务运行中投递到应用事件循环，与异步调用共享连接池和并发限制
+    
+    Args/Returns: 同 generate_minutes_with_ai_async
+    """
+    return llm_client.run_sync(lambda client: generate_minutes_with_ai_async(
+        transcription, title_hint, template_style,
+        max_retries=max_retries, timeout=timeout, client=client, **kwargs
+    ))
 
 
 def normalize_minutes(minutes: Dict, title_hint: str = "") -> Dict:
@@ -393,26 +642,26 @@ def fallback_to_rule_engine(transcription: str, reason: str = "") -> Dict:
     }
 
 
-def generate_minutes_with_fallback(
+async def generate_minutes_with_fallback_async(
     transcription: str,
     title_hint: str = "",
     **kwargs
 ) -> Dict:
     """
-    生成会议纪要，带自动降级
+    生成会议纪要，带自动降级（异步）
     
     优先使用 AI 生成，失败时自动降级到基础结构
     
     Args:
         transcription: 会议转写文本
         title_hint: 会议标题提示
-        **kwargs: 传递给 generate_minutes_with_ai 的其他参数
+        **kwargs: 传递给 generate_minutes_with_ai_async 的其他参数
         
     Returns:
         会议纪要字典（AI生成或降级结构）
     """
     try:
-        result = generate_minutes_with_ai(transcription, title_hint, **kwargs)
+        result = await generate_minutes_with_ai_async(transcription, title_hint, **kwargs)
         if result is not None:
             return result
     except Exception as e:
@@ -422,6 +671,21 @@ def generate_minutes_with_fallback(
     return fallback_to_rule_engine(transcription, "AI 生成返回空结果或抛出异常")
 
 
+def generate_minutes_with_fallback(
+    transcription: str,
+    title_hint: str = "",
+    **kwargs
+) -> Dict:
+    """
+    生成会议纪要，带自动降级（同步入口）
+    
+    Args/Returns: 同 generate_minutes_with_fallback_async
+    """
+    return llm_client.run_sync(lambda client: generate_minutes_with_fallback_async(
+        transcription, title_hint, client=client, **kwargs
+    ))
+
+
 if __name__ == "__main__":
     # 配置测试日志
     logging.basicConfig(
@@ -16,17 +16,23 @@ from typing import Optional, List
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import FileResponse, JSONResponse
 from pydantic import BaseModel
-from sqlalchemy import select, desc, func, or_
+from sqlalchemy import select, desc, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm.attributes import flag_modified
 
 from database.connection import get_db, AsyncSessionLocal
 from models.meeting import (
     MeetingModel, MeetingCreate, MeetingStatus
 )
 from services.websocket_manager import websocket_manager
+from services.transcription_scheduler import transcription_scheduler, JobPriority
+from services.search_index import search_subquery, make_snippet
+from services.tracing import load_trace
+from services.transcript_store import (
+    count_segments, list_segments, mark_full_text_stale, refresh_full_text, replace_segments,
+    update_segment_texts
+)
 from meeting_skill import transcribe
-from ai_minutes_generator import generate_minutes_with_ai, generate_minutes_with_fallback
+from ai_minutes_generator import generate_minutes_with_ai_async, generate_minutes_with_fallback_async
 from prompts import list_templates, validate_template
 
 logger = logging.getLogger(__name__)
@@ -50,6 +56,12 @@ def format_duration_ms(start: Optional[datetime], end: Optional[datetime]) -> in
     return int((end - start).total_seconds() * 1000)
 
 
+async def _refresh_full_text(db: AsyncSession, meeting: MeetingModel):
+    """片段编辑后 full_text 延迟重建：读取完整文本前按需重建并保存"""
+    if await refresh_full_text(db, meeting):
+        await db.commit()
+
+
 @router.post("/meetings")
 async def create_meeting(
     data: MeetingCreate,
@@ -118,7 +130,7 @@ async def get_meeting(
             "status": meeting.status,
             "duration_ms": duration_ms,
             "start_time": meeting.start_time.isoformat() if meeting.start_time else None,  # type: ignore
-            "transcript_count": len(meeting.transcript_segments or []),  # type: ignore
+            "transcript_count": await count_segments(db, session_id),
             "has_recording": meeting.audio_path is not None,  # type: ignore
             "created_at": meeting.created_at.isoformat(),  # type: ignore
             "updated_at": meeting.updated_at.isoformat() if meeting.updated_at else None  # type: ignore
@@ -284,33 +296,23 @@ async def end_meeting(
                 audio_path = meeting_local.audio_path  # type: ignore
                 
                 if audio_path and os.path.exists(str(audio_path)):  # type: ignore
-                    # 执行转写
-                    transcript_result = await asyncio.get_event_loop().run_in_executor(
-                        None, transcribe, str(audio_path)  # type: ignore
+                    # 执行转写（经转写调度器排队，结束会议优先于批量上传）
+                    transcript_result = await transcription_scheduler.run(
+                        transcribe, str(audio_path),  # type: ignore
+                        priority=JobPriority.FINALIZE,
+                        job_id=session_id
                     )
                     
                     # 保存转写结果
                     meeting_local.full_text = transcript_result.get("full_text", "")  # type: ignore
-                    meeting_local.transcript_segments = [  # type: ignore
-                        {
-                            "id": f"seg-{i:04d}",
-                            "text": seg.get("text", ""),
-                            "start_time_ms": int(seg.get("start", 0) * 1000),
-                            "end_time_ms": int(seg.get("end", 0) * 1000),
-                            "speaker": seg.get("speaker", "")
-                        }
-                        for i, seg in enumerate(transcript_result.get("segments", []))
-                    ]
+                    await replace_segments(session, session_id, transcript_result.get("segments", []))
                     
                     # AI生成纪要
                     if meeting_local.full_text:
-                        minutes = await asyncio.get_event_loop().run_in_executor(
-                            None,
-                            lambda: generate_minutes_with_ai(
-                                meeting_local.full_text,  # type: ignore
-                                title_hint=meeting_local.title,  # type: ignore
-                                template_style=template_style or "detailed"
-                            )
+                        minutes = await generate_minutes_with_ai_async(
+                            meeting_local.full_text,  # type: ignore
+                            title_hint=meeting_local.title,  # type: ignore
+                            template_style=template_style or "detailed"
                         )
                         
                         if minutes:
@@ -402,6 +404,8 @@ async def get_meeting_result(
     if not meeting:
         raise HTTPException(status_code=404, detail="会议不存在")
     
+    await _refresh_full_text(db, meeting)
+    
     # 构造 minutes 数据（从现有字段）
     minutes_data = {
         "action_items": meeting.action_items or [],
@@ -416,12 +420,32 @@ async def get_meeting_result(
             "status": meeting.status,
             "full_text": meeting.full_text or "",
             "minutes": minutes_data,
-            "transcript_segments": meeting.transcript_segments or [],
+            "transcript_segments": (await list_segments(db, session_id))[0],
             "generated_at": meeting.updated_at.isoformat() if meeting.updated_at else None  # type: ignore
         }
     }
 
 
+@router.get("/meetings/{session_id}/trace")
+async def get_meeting_trace(session_id: str):
+    """
+    获取会议处理链路（结束会议 / 上传处理的 span 树，见 services/tracing.py）
+    
+    每条链路含根 span 及嵌套的 children，span 字段与 OpenTelemetry 一致（纳秒时间戳、attributes、status）
+    """
+    traces = await asyncio.to_thread(load_trace, session_id)
+    if not traces:
+        raise HTTPException(status_code=404, detail="未找到该会议的链路记录")
+    
+    return {
+        "code": 0,
+        "data": {
+            "session_id": session_id,
+            "traces": traces
+        }
+    }
+
+
 @router.get("/meetings/{session_id}/download")
 async def download_meeting(
     session_id: str,
@@ -455,6 +479,9 @@ async def download_meeting(
             detail=f"无效的格式: {format}，支持的格式: {', '.join(valid_formats)}"
         )
     
+    if format in ("json", "txt"):
+        await _refresh_full_text(db, meeting)
+    
     if format == "json":
         # 返回JSON格式 - 从现有字段组装 minutes（B-003修复）
         # 解析 summary 中的 _meta 信息
@@ -505,12 +532,17 @@ async def download_meeting(
 @router.get("/meetings/{session_id}/transcript")
 async def get_meeting_transcript(
     session_id: str,
+    cursor: Optional[str] = Query(default=None, description="上一页返回的 next_cursor"),
+    limit: Optional[int] = Query(default=None, ge=1, le=1000, description="每页片段数，不传返回全部"),
     db: AsyncSession = Depends(get_db)
 ):
     """
     获取会议完整转写文本（带时间戳）
     
     用于前端展示时间轴和全文搜索
+    
+    分页：传 limit 按时间顺序分页，用返回的 next_cursor 请求下一页，
+    next_cursor 为 null 表示已到末尾
     """
     result = await db.execute(
         select(MeetingModel).where(MeetingModel.session_id == session_id)
@@ -520,25 +552,22 @@ async def get_meeting_transcript(
     if not meeting:
         raise HTTPException(status_code=404, detail="会议不存在")
     
-    segments = meeting.transcript_segments or []
+    await _refresh_full_text(db, meeting)
+    
+    try:
+        segments, next_cursor = await list_segments(db, session_id, cursor=cursor, limit=limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="cursor格式错误")
     
     return {
         "code": 0,
         "data": {
             "session_id": meeting.session_id,
             "full_text": meeting.full_text or "",
-            "segments": [
-                {
-                    "id": seg.get("id", f"seg-{i:04d}"),
-                    "text": seg.get("text", ""),
-                    "start_time_ms": seg.get("start_time_ms", 0),
-                    "end_time_ms": seg.get("end_time_ms", 0),
-                    "speaker": seg.get("speaker", "")
-                }
-                for i, seg in enumerate(segments)  # type: ignore
-            ],
+            "segments": segments,
+            "next_cursor": next_cursor,
             "language": "zh",
-            "total_segments": len(segments)  # type: ignore
+            "total_segments": await count_segments(db, session_id)
         }
     }
 
@@ -561,10 +590,10 @@ async def list_meetings(
     - user_id: 指定用户的会议
     - status: 会议状态
     - start_date/end_date: 日期范围 (YYYY-MM-DD)
-    - keyword: 关键词搜索（标题、转写内容）
+    - keyword: 全文检索（标题、转写、纪要），按相关度排序并返回高亮片段
     """
     # 构建查询
-    query = select(MeetingModel).order_by(desc(MeetingModel.created_at))
+    query = select(MeetingModel)
     
     # 应用过滤条件
     if user_id:
@@ -592,13 +621,17 @@ async def list_meetings(
         except ValueError:
             raise HTTPException(status_code=400, detail="end_date格式错误，应为YYYY-MM-DD")
     
-    if keyword:
-        keyword_filter = or_(
-            MeetingModel.title.ilike(f"%{keyword}%"),
-            MeetingModel.full_text.ilike(f"%{keyword}%"),
-            MeetingModel.summary.ilike(f"%{keyword}%")
-        )
-        query = query.where(keyword_filter)
+    search = search_subquery(keyword) if keyword else None
+    if search is not None:
+        # 全文索引命中，按相关度排序
+        query = query.join(search, MeetingModel.session_id == search.c.session_id)
+        query = query.order_by(search.c.rank, desc(MeetingModel.created_at))
+    elif keyword:
+        # 关键词没有可检索的字符（纯标点等），直接匹配标题
+        query = query.where(MeetingModel.title.ilike(f"%{keyword}%"))
+        query = query.order_by(desc(MeetingModel.created_at))
+    else:
+        query = query.order_by(desc(MeetingModel.created_at))
     
     # 获取总数
     count_query = select(func.count()).select_from(query.subquery())
@@ -625,7 +658,8 @@ async def list_meetings(
                 "duration_ms": format_duration_ms(m.start_time, m.end_time),  # type: ignore
                 "status": m.status,
                 "action_item_count": len(m.action_items) if m.action_items else 0,  # type: ignore
-                "has_download": bool(m.minutes_docx_path and Path(str(m.minutes_docx_path)).exists())  # type: ignore
+                "has_download": bool(m.minutes_docx_path and Path(str(m.minutes_docx_path)).exists()),  # type: ignore
+                **({"snippet": make_snippet(keyword, [m.title, m.full_text, m.topics, m.summary])} if keyword else {})
             }
             for m in meetings
         ]
@@ -668,28 +702,13 @@ async def update_transcript_segment(
     if not meeting:
         raise HTTPException(status_code=404, detail="会议不存在")
     
-    segments = meeting.transcript_segments or []
-    
-    for seg in segments:  # type: ignore
-        if seg.get("id") == segment_id:
-            seg["text"] = data.text  # type: ignore
-            break
-    else:
+    # 单行更新
+    if not await update_segment_texts(db, session_id, {segment_id: data.text}):
         raise HTTPException(status_code=404, detail="片段不存在")
     
-    # 更新完整文本
-    full_text_parts = []
-    for seg in sorted(segments, key=lambda x: x.get("start_time_ms", 0)):  # type: ignore
-        start_ms = seg.get("start_time_ms", 0)  # type: ignore
-        minutes = start_ms // 60000
-        seconds = (start_ms // 1000) % 60
-        time_str = f"{minutes:02d}:{seconds:02d}"
-        full_text_parts.append(f"[{time_str}] {seg['text']}")
-    
-    meeting.full_text = "\n".join(full_text_parts)  # type: ignore
+    # 完整文本读取时再重建（连续编辑不重复拼接全文、不重复更新全文索引）
+    await mark_full_text_stale(db, session_id)
     meeting.updated_at = datetime.utcnow()  # type: ignore
-    # 标记transcript_segments已修改（SQLAlchemy JSON字段嵌套修改追踪）
-    flag_modified(meeting, "transcript_segments")
     await db.commit()
     
     # 同步更新WebSocket会话
@@ -726,26 +745,13 @@ async def batch_update_transcript(
     if not meeting:
         raise HTTPException(status_code=404, detail="会议不存在")
     
-    segments = meeting.transcript_segments or []
-    updated_count = 0
-    
-    for update in data.updates:
-        for seg in segments:  # type: ignore
-            if seg.get("id") == update.segment_id:
-                seg["text"] = update.text  # type: ignore
-                updated_count += 1
-                break
-    
-    # 更新完整文本
-    full_text_parts = []
-    for seg in sorted(segments, key=lambda x: x.get("start_time_ms", 0)):  # type: ignore
-        start_ms = seg.get("start_time_ms", 0)  # type: ignore
-        minutes = start_ms // 60000
-        seconds = (start_ms // 1000) % 60
-        time_str = f"{minutes:02d}:{seconds:02d}"
-        full_text_parts.append(f"[{time_str}] {seg['text']}")
-    
-    meeting.full_text = "\n".join(full_text_parts)  # type: ignore
+    updated_count = await update_segment_texts(
+        db, session_id, {update.segment_id: update.text for update in data.updates}
+    )
+    
+    # 完整文本读取时再重建（连续编辑不重复拼接全文、不重复更新全文索引）
+    if updated_count:
+        await mark_full_text_stale(db, session_id)
     meeting.updated_at = datetime.utcnow()  # type: ignore
     await db.commit()
     
@@ -783,6 +789,7 @@ async def list_meeting_templates():
 class RegenerateMinutesRequest(BaseModel):
     """重新生成纪要请求"""
     template_style: str = "detailed"  # detailed/concise/action/executive
+    force: bool = False  # 跳过纪要缓存，强制调用大模型
 
 
 @router.post("/meetings/{session_id}/regenerate")
@@ -804,6 +811,7 @@ async def regenerate_meeting_minutes(
             - concise: 简洁版（快速阅读）
             - action: 行动项版（任务导向）
             - executive: 高管摘要版（决策导向）
+        force: 跳过纪要缓存（转写文本、模板、模型未变时默认复用上次结果）
     """
     result = await db.execute(
         select(MeetingModel).where(MeetingModel.session_id == session_id)
@@ -813,6 +821,7 @@ async def regenerate_meeting_minutes(
     if not meeting:
         raise HTTPException(status_code=404, detail="会议不存在")
     
+    await _refresh_full_text(db, meeting)
     if not meeting.full_text:  # type: ignore
         raise HTTPException(status_code=400, detail="会议转写文本为空，无法生成纪要")
     
@@ -825,13 +834,11 @@ async def regenerate_meeting_minutes(
     
     try:
         # 重新生成纪要（使用带降级的版本，避免AI服务不可用时500错误）
-        minutes = await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: generate_minutes_with_fallback(
-                meeting.full_text,  # type: ignore
-                title_hint=meeting.title,  # type: ignore
-                template_style=request.template_style
-            )
+        minutes = await generate_minutes_with_fallback_async(
+            meeting.full_text,  # type: ignore
+            title_hint=meeting.title,  # type: ignore
+            template_style=request.template_style,
+            use_cache=not request.force
         )
         
         # 保存旧版本到历史（如果有现有纪要数据）
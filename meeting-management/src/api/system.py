@@ -12,6 +12,8 @@ from typing import Dict, Any
 from fastapi import APIRouter, Request
 
 from logger_config import get_logger
+from services.minutes_cache import minutes_cache
+from services.session_state import session_store
 
 logger = get_logger(__name__)
 
@@ -105,6 +107,9 @@ async def health_check(request: Request):
     - model: 转写模型状态（Whisper/Mock）
     - disk: 磁盘空间状态
     - websocket: WebSocket 连接状态
+    - scheduler: 转写调度器状态（队列深度、等待时间）
+    - minutes_cache: 纪要结果缓存（命中 / 未命中、条目数、占用）
+    - session_state: 实时会话状态后端（后端类型、本 worker 标识、会话数）
     """
     app = request.app
     
@@ -117,6 +122,7 @@ async def health_check(request: Request):
     # 获取服务实例
     transcription_svc = getattr(app.state, "transcription_service", None)
     ws_manager = getattr(app.state, "websocket_manager", None)
+    scheduler = getattr(app.state, "transcription_scheduler", None)
     
     # 1. API 状态（自身状态，始终 ok）
     api_status = {"status": "ok"}
@@ -153,13 +159,30 @@ async def health_check(request: Request):
     if ws_manager:
         websocket_status["active_sessions"] = ws_manager.get_active_sessions_count()
     
+    # 6. 转写调度器状态（队列满时 degraded）
+    scheduler_status = {"status": "stopped"}
+    if scheduler:
+        scheduler_status = scheduler.get_status()
+    
+    # 7. 纪要结果缓存
+    minutes_cache_status = {"status": "ok", **minutes_cache.get_status()}
+    
+    # 8. 实时会话状态后端（共享后端不可用时多 worker 无法协调）
+    try:
+        session_state_status = {"status": "ok", **session_store.get_status()}
+    except Exception as e:
+        session_state_status = {"status": "error", "message": str(e)}
+    
     # 组装组件状态
     components = {
         "api": api_status,
         "database": database_status,
         "model": model_status,
         "disk": disk_status,
-        "websocket": websocket_status
+        "websocket": websocket_status,
+        "scheduler": scheduler_status,
+        "minutes_cache": minutes_cache_status,
+        "session_state": session_state_status
     }
     
     # 确定整体状态
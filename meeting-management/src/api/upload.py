@@ -5,22 +5,39 @@
 """
 
 import asyncio
+import os
+import time
 import uuid
 from datetime import datetime
 from pathlib import Path
 
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Query
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Query, Request
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from logger_config import get_logger
 from database.connection import get_db, AsyncSessionLocal
 from models.meeting import MeetingModel, MeetingStatus
 from meeting_skill import transcribe, generate_minutes, save_meeting
+from services.transcription_scheduler import transcription_scheduler, JobPriority, JobCancelledError
+from services.long_audio import should_use_long_mode, transcribe_long_audio
+from services.audio_decoder import probe_duration
+from services.metrics import TRANSCRIBE_RTF
+from services.tracing import span, traced
+from services.transcript_store import refresh_full_text, replace_segments, list_segments
+from services.upload_store import (
+    ResumableUploadStore, UploadOffsetError, UploadTooLargeError, file_sha256, read_chunks, save_stream
+)
+from services.audio_dedup import (
+    UPLOAD_DEDUP_ENABLED, find_duplicate, forget_audio, has_candidates, link_duplicate, quick_hash, register_audio
+)
 
 router = APIRouter()
+logger = get_logger(__name__)
 
 # 上传文件存储目录
 UPLOAD_DIR = Path(__file__).parent.parent.parent / "data" / "uploads"
@@ -32,7 +49,16 @@ OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 # 允许的文件格式
 ALLOWED_EXTENSIONS = {'.mp3', '.wav', '.m4a', '.webm', '.ogg', '.flac'}
-MAX_FILE_SIZE = 100 * 1024 * 1024  # 100MB
+MAX_FILE_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", "100")) * 1024 * 1024  # 默认100MB
+
+# 断点续传临时存储
+resumable_uploads = ResumableUploadStore(UPLOAD_DIR, MAX_FILE_SIZE)
+
+# 处理进度（内存）：session_id -> {"progress": 0-100, "stage": "..."}
+_upload_progress: dict = {}
+
+# 长录音分块进度写库最小间隔（秒）；内存进度每块都更新
+_PROGRESS_DB_INTERVAL = 5.0
 
 
 def get_file_extension(filename: str | None) -> str:
@@ -54,10 +80,25 @@ async def _update_meeting_status(
     session_id: str, 
     status: MeetingStatus, 
     error_msg: str | None = None,
+    progress: int | None = None,
+    stage: str | None = None,
     **kwargs
 ):
-    """更新会议状态（后台任务使用）"""
-    async with AsyncSessionLocal() as db:
+    """
+    更新会议状态（后台任务使用）
+    
+    progress/stage 记录在内存中，供 /upload/{session_id}/status 查询
+    """
+    if progress is not None or stage is not None:
+        entry = _upload_progress.setdefault(session_id, {"progress": 0, "stage": "queued"})
+        if progress is not None:
+            entry["progress"] = progress
+        if stage is not None:
+            entry["stage"] = stage
+    if status in (MeetingStatus.COMPLETED, MeetingStatus.FAILED):
+        _upload_progress.pop(session_id, None)
+    
+    async with AsyncSessionLocal() as db, span("db.commit", meeting_id=session_id, status=getattr(status, "value", str(status))):
         try:
             result = await db.execute(
                 select(MeetingModel).where(MeetingModel.session_id == session_id)
@@ -68,68 +109,206 @@ async def _update_meeting_status(
                 meeting.status = status  # type: ignore
                 meeting.updated_at = datetime.utcnow()  # type: ignore
                 
+                # 转写片段写入片段表
+                segments = kwargs.pop("transcript_segments", None)
+                if segments is not None:
+                    await replace_segments(db, session_id, segments)
+                
                 # 更新其他字段
                 for key, value in kwargs.items():
                     if hasattr(meeting, key):
                         setattr(meeting, key, value)
                 
                 await db.commit()
-                print(f"[INFO] 会议 {session_id} 状态更新为: {status}")
+                logger.info(f"会议 {session_id} 状态更新为: {status}")
         except Exception as e:
             await db.rollback()
-            print(f"[ERROR] 更新会议状态失败: {e}")
+            logger.error(f"更新会议状态失败: {e}")
         finally:
             await db.close()
 
 
-async def transcribe_file_task(session_id: str, file_path: Path, title: str, user_id: str):
+async def _find_reusable_transcript(session_id: str, file_path: Path, sha256: str | None) -> tuple:
+    """
+    查找内容相同、已转写完成的录音（services/audio_dedup.py）
+
+    命中时把 file_path 替换为指向已有文件的硬链接
+
+    Returns:
+        (转写结果 | None, sha256, quick_hash)；未知 sha256 且快速哈希无候选时 sha256 为 None
+    """
+    quick = await asyncio.to_thread(quick_hash, file_path)
+    async with AsyncSessionLocal() as db:
+        if not sha256:
+            if not await has_candidates(db, quick):
+                return None, None, quick
+            sha256 = await asyncio.to_thread(file_sha256, file_path)
+
+        source = await find_duplicate(db, sha256)
+        if source is None or source["session_id"] == session_id:
+            return None, sha256, quick
+
+        result = await db.execute(
+            select(MeetingModel).where(MeetingModel.session_id == source["session_id"])
+        )
+        origin = result.scalar_one_or_none()
+        if origin is None or origin.status != MeetingStatus.COMPLETED:
+            # 来源会议已删除 / 重新处理中，重新转写并登记为新来源
+            await forget_audio(db, sha256)
+            return None, sha256, quick
+
+        if await refresh_full_text(db, origin):
+            await db.commit()
+        segments, _ = await list_segments(db, source["session_id"])
+        reused = {
+            "full_text": origin.full_text or "",
+            "participants": list(origin.participants or []),
+            "duration": (origin.audio_duration_ms or 0) / 1000,
+            "segments": segments,
+        }
+
+    linked = await asyncio.to_thread(link_duplicate, Path(source["file_path"]), file_path)
+    logger.info(f"录音与会议 {source['session_id']} 相同，复用转写结果（硬链接: {linked}）")
+    return reused, sha256, quick
+
+
+async def _transcribe_audio(session_id: str, file_path: Path) -> dict:
+    """
+    转写音频（经转写调度器排队，批量优先级）
+    
+    长录音按静音切块，多进程并行转写（services/long_audio.py）
+    """
+    logger.info(f"开始音频转写: {file_path}")
+    loop = asyncio.get_event_loop()
+    try:
+        audio_duration = await loop.run_in_executor(None, probe_duration, str(file_path))
+    except Exception as e:
+        logger.warning(f"读取音频时长失败: {e}")
+        audio_duration = 0
+    
+    start = time.perf_counter()
+    if should_use_long_mode(audio_duration):
+        logger.info(f"长录音 ({audio_duration:.0f}s)，切块并行转写")
+        
+        last_write = time.monotonic()
+        
+        async def on_progress(percent: int):
+            # 转写占总进度的 0~80%；百分比不变不处理，写库限流
+            nonlocal last_write
+            progress = percent * 80 // 100
+            entry = _upload_progress.setdefault(session_id, {"progress": 0, "stage": "transcribing"})
+            if entry["progress"] == progress:
+                return
+            if time.monotonic() - last_write < _PROGRESS_DB_INTERVAL:
+                entry["progress"] = progress
+                return
+            last_write = time.monotonic()
+            await _update_meeting_status(
+                session_id, MeetingStatus.PROCESSING, progress=progress, stage="transcribing"
+            )
+        
+        result = await transcribe_long_audio(
+            str(file_path), job_id=session_id, progress_callback=on_progress
+        )
+    else:
+        result = await transcription_scheduler.run(
+            transcribe, str(file_path),
+            priority=JobPriority.BATCH,
+            job_id=session_id
+        )
+    
+    # 端到端实时率（含排队，排队时间另见 meeting_queue_wait_seconds）
+    duration = result.get("duration") or audio_duration
+    if duration:
+        TRANSCRIBE_RTF.observe(
+            (time.perf_counter() - start) / duration, model=result.get("model_used", "unknown"), mode="upload"
+        )
+    return result
+
+
+async def _register_fingerprint(session_id: str, file_path: Path, sha256: str | None, quick: str | None):
+    """转写成功后登记录音指纹（失败不影响任务结果）"""
+    try:
+        if quick is None:
+            quick = await asyncio.to_thread(quick_hash, file_path)
+        if not sha256:
+            sha256 = await asyncio.to_thread(file_sha256, file_path)
+        async with AsyncSessionLocal() as db:
+            await register_audio(db, sha256, quick, session_id, file_path, file_path.stat().st_size)
+    except Exception as e:
+        logger.warning(f"登记录音指纹失败: {e}")
+
+
+@traced("upload.process", meeting_arg="session_id")
+async def transcribe_file_task(
+    session_id: str, file_path: Path, title: str, user_id: str, sha256: str | None = None
+):
     """
     异步转写任务
     
     流程：
-    1. 调用 meeting_skill.transcribe() 转写音频
+    0. 按内容哈希查找相同录音，已转写过则复用转写片段，跳过 Whisper（services/audio_dedup.py）
+    1. 调用 meeting_skill.transcribe() 转写音频（经转写调度器排队，批量优先级）
+       长录音按静音切块，多进程并行转写（services/long_audio.py）
     2. 调用 meeting_skill.generate_minutes() 生成会议纪要
     3. 调用 meeting_skill.save_meeting() 保存会议纪要到文件
     4. 更新数据库状态为 COMPLETED 并保存结果
     """
-    print(f"[INFO] 开始转写任务: session_id={session_id}, file={file_path}")
+    logger.info(f"开始转写任务: session_id={session_id}, file={file_path}")
     
     try:
         # 更新状态为处理中
-        await _update_meeting_status(session_id, MeetingStatus.PROCESSING)
+        await _update_meeting_status(session_id, MeetingStatus.PROCESSING, progress=0, stage="transcribing")
+        
+        # Step 0: 相同录音复用转写
+        transcribe_result, quick = None, None
+        if UPLOAD_DEDUP_ENABLED:
+            try:
+                with span("dedup.lookup"):
+                    transcribe_result, sha256, quick = await _find_reusable_transcript(session_id, file_path, sha256)
+            except Exception as e:
+                logger.warning(f"查找相同录音失败，正常转写: {e}")
         
         # Step 1: 音频转写
-        print(f"[INFO] 开始音频转写: {file_path}")
-        transcribe_result = transcribe(str(file_path))
+        if transcribe_result is None:
+            transcribe_result = await _transcribe_audio(session_id, file_path)
         
         full_text = transcribe_result.get("full_text", "")
         participants = transcribe_result.get("participants", [])
         duration = transcribe_result.get("duration", 0)
         segments = transcribe_result.get("segments", [])
         
-        print(f"[INFO] 转写完成: 时长={duration}s, 片段数={len(segments)}, 参会人={participants}")
+        logger.info(f"转写完成: 时长={duration}s, 片段数={len(segments)}, 参会人={participants}")
         
         # Step 2: 生成会议纪要
-        print(f"[INFO] 开始生成会议纪要...")
-        meeting = generate_minutes(
-            transcription=full_text,
-            meeting_id=session_id,
-            title=title,
-            date=datetime.now().strftime("%Y-%m-%d"),
-            participants=participants,
-            audio_path=str(file_path)
-        )
+        logger.info("开始生成会议纪要...")
+        await _update_meeting_status(session_id, MeetingStatus.PROCESSING, progress=80, stage="generating")
+        # to_thread 沿用当前上下文，纪要生成中的大模型请求挂在本次处理的链路下
+        with span("generate_minutes", chars=len(full_text)):
+            meeting = await asyncio.to_thread(
+                generate_minutes,
+                transcription=full_text,
+                meeting_id=session_id,
+                title=title,
+                date=datetime.now().strftime("%Y-%m-%d"),
+                participants=participants,
+                audio_path=str(file_path)
+            )
         
-        print(f"[INFO] 会议纪要生成完成: 议题数={len(meeting.topics)}")
+        logger.info(f"会议纪要生成完成: 议题数={len(meeting.topics)}")
         
         # Step 3: 保存会议纪要到文件
-        print(f"[INFO] 保存会议纪要...")
-        files = save_meeting(meeting, output_dir=str(OUTPUT_DIR), create_version=True)
+        logger.info("保存会议纪要...")
+        await _update_meeting_status(session_id, MeetingStatus.PROCESSING, progress=95, stage="saving")
+        with span("save_meeting"):
+            files = await asyncio.to_thread(
+                save_meeting, meeting, output_dir=str(OUTPUT_DIR), create_version=True
+            )
         
         minutes_docx_path = files.get("docx", "")
         minutes_json_path = files.get("json", "")
         
-        print(f"[INFO] 会议纪要保存完成: DOCX={minutes_docx_path}, JSON={minutes_json_path}")
+        logger.info(f"会议纪要保存完成: DOCX={minutes_docx_path}, JSON={minutes_json_path}")
         
         # Step 4: 更新数据库为完成状态
         topics_data = []
@@ -144,11 +323,7 @@ async def transcribe_file_task(session_id: str, file_path: Path, title: str, use
             session_id,
             MeetingStatus.COMPLETED,
             full_text=full_text,
-            transcript_segments=[{
-                "timestamp": s.get("timestamp", ""),
-                "speaker": s.get("speaker", ""),
-                "text": s.get("text", "")
-            } for s in segments],
+            transcript_segments=segments,
             participants=participants,
             audio_duration_ms=duration * 1000,
             summary=meeting.topics[0].conclusion if meeting.topics else "",
@@ -158,13 +333,19 @@ async def transcribe_file_task(session_id: str, file_path: Path, title: str, use
             minutes_docx_path=minutes_docx_path
         )
         
-        print(f"[INFO] 转写任务完成: session_id={session_id}")
+        # 登记录音指纹，之后相同录音直接复用本次转写
+        if UPLOAD_DEDUP_ENABLED:
+            await _register_fingerprint(session_id, file_path, sha256, quick)
+        
+        logger.info(f"转写任务完成: session_id={session_id}")
+        
+    except JobCancelledError:
+        logger.info(f"转写任务已取消: session_id={session_id}")
+        await _update_meeting_status(session_id, MeetingStatus.FAILED, error_msg="转写任务已取消")
         
     except Exception as e:
         error_msg = str(e)
-        print(f"[ERROR] 转写任务失败: {error_msg}")
-        import traceback
-        traceback.print_exc()
+        logger.error(f"转写任务失败: {error_msg}", exc_info=True)
         
         # 更新数据库为失败状态
         await _update_meeting_status(session_id, MeetingStatus.FAILED, error_msg=error_msg)
@@ -181,16 +362,14 @@ async def upload_audio(
     上传录音文件
     
     - 支持格式: mp3, wav, m4a, webm, ogg, flac
-    - 大小限制: 100MB
-    - 上传后异步转写生成纪要
+    - 大小限制: MAX_UPLOAD_SIZE（默认100MB）
+    - 按块流式写盘并计算 sha256，超过上限立即中止
+    - 上传后异步转写生成纪要；与已转写录音内容相同时复用转写结果
+    
+    网络不稳定时使用断点续传接口 /upload/resumable
     """
     # 检查文件格式
-    ext = get_file_extension(file.filename)  # type: ignore
-    if ext not in ALLOWED_EXTENSIONS:
-        raise HTTPException(
-            status_code=400,
-            detail=f"不支持的文件格式: {ext}，支持: {', '.join(ALLOWED_EXTENSIONS)}"
-        )
+    ext = _check_extension(file.filename)
     
     # 生成session_id
     session_id = generate_session_id()
@@ -200,26 +379,42 @@ async def upload_audio(
     file_path = UPLOAD_DIR / safe_filename
     
     try:
-        content = await file.read()
-        
-        # 检查文件大小
-        if len(content) > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=400,
-                detail=f"文件大小超过限制: {MAX_FILE_SIZE / 1024 / 1024}MB"
-            )
-        
-        with open(file_path, "wb") as f:
-            f.write(content)
-        
-        file_size = len(content)
-        
+        file_size, sha256 = await save_stream(read_chunks(file), file_path, MAX_FILE_SIZE)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        # 清理已保存的文件
-        if file_path.exists():
-            file_path.unlink()
         raise HTTPException(status_code=500, detail=f"文件保存失败: {str(e)}")
     
+    await _start_processing(db, session_id, file_path, title, user_id, sha256)
+    
+    return {
+        "code": 0,
+        "data": {
+            "session_id": session_id,
+            "file_name": file.filename,
+            "file_size": file_size,
+            "sha256": sha256,
+            "status": "uploaded",
+            "message": "文件上传成功，正在处理..."
+        }
+    }
+
+
+def _check_extension(filename: str | None) -> str:
+    """检查文件格式，返回扩展名"""
+    ext = get_file_extension(filename)
+    if ext not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"不支持的文件格式: {ext}，支持: {', '.join(ALLOWED_EXTENSIONS)}"
+        )
+    return ext
+
+
+async def _start_processing(
+    db: AsyncSession, session_id: str, file_path: Path, title: str, user_id: str, sha256: str | None = None
+):
+    """创建会议记录并触发异步转写任务"""
     # 创建会议记录
     meeting = MeetingModel(
         session_id=session_id,
@@ -236,20 +431,141 @@ async def upload_audio(
     await db.commit()
     
     # Phase 3 - 触发异步转写任务
-    asyncio.create_task(transcribe_file_task(session_id, file_path, title, user_id))
+    asyncio.create_task(transcribe_file_task(session_id, file_path, title, user_id, sha256))
+
+
+# ========== 断点续传 ==========
+
+class ResumableUploadRequest(BaseModel):
+    """创建断点续传请求"""
+    file_name: str
+    title: str
+    user_id: str
+    file_size: int | None = None  # 声明总大小时，complete 校验是否传完
+
+
+class CompleteUploadRequest(BaseModel):
+    """完成断点续传请求"""
+    sha256: str | None = None  # 客户端计算的 sha256，提供时校验
+
+
+@router.post("/upload/resumable")
+async def create_resumable_upload(request: ResumableUploadRequest):
+    """
+    创建断点续传
+    
+    之后按 offset 分段 PUT 原始字节，全部传完后调用 complete
+    """
+    _check_extension(request.file_name)
+    if not request.title.strip() or not request.user_id.strip():
+        raise HTTPException(status_code=400, detail="title 和 user_id 不能为空")
+    try:
+        upload = resumable_uploads.create(
+            request.file_name, request.title, request.user_id, request.file_size
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "code": 0,
+        "data": {
+            "upload_id": upload.upload_id,
+            "offset": 0,
+            "max_size": MAX_FILE_SIZE
+        }
+    }
+
+
+@router.get("/upload/resumable/{upload_id}")
+async def get_resumable_upload(upload_id: str):
+    """查询已接收的字节数（断线后从 offset 继续上传）"""
+    found = resumable_uploads.get(upload_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="上传不存在或已过期")
+    upload, offset = found
+    return {
+        "code": 0,
+        "data": {
+            "upload_id": upload_id,
+            "offset": offset,
+            "file_size": upload.total_size
+        }
+    }
+
+
+@router.put("/upload/resumable/{upload_id}")
+async def put_resumable_chunk(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0, description="本段数据在文件中的起始位置")
+):
+    """
+    追加一段原始字节（请求体），offset 必须等于服务端已接收的字节数
+    
+    offset 不一致返回 409，响应中带服务端的 offset，客户端从该位置重传
+    """
+    try:
+        new_offset = await resumable_uploads.append(upload_id, offset, request.stream())
+    except KeyError:
+        raise HTTPException(status_code=404, detail="上传不存在或已过期")
+    except UploadOffsetError as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "offset": e.expected})
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "code": 0,
+        "data": {
+            "upload_id": upload_id,
+            "offset": new_offset
+        }
+    }
+
+
+@router.post("/upload/resumable/{upload_id}/complete")
+async def complete_resumable_upload(
+    upload_id: str,
+    request: CompleteUploadRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """完成断点续传：校验大小和 sha256，创建会议并开始转写"""
+    found = resumable_uploads.get(upload_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="上传不存在或已过期")
+    upload, _ = found
+    
+    session_id = generate_session_id()
+    file_path = UPLOAD_DIR / f"{session_id}{get_file_extension(upload.filename)}"
+    try:
+        file_size, sha256 = await resumable_uploads.complete(upload_id, file_path, request.sha256)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="上传不存在或已过期")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    await _start_processing(db, session_id, file_path, upload.title, upload.user_id, sha256)
     
     return {
         "code": 0,
         "data": {
             "session_id": session_id,
-            "file_name": file.filename,
+            "file_name": upload.filename,
             "file_size": file_size,
+            "sha256": sha256,
             "status": "uploaded",
             "message": "文件上传成功，正在处理..."
         }
     }
 
 
+@router.delete("/upload/resumable/{upload_id}")
+async def abort_resumable_upload(upload_id: str):
+    """放弃断点续传，删除已接收的数据"""
+    if not resumable_uploads.abort(upload_id):
+        raise HTTPException(status_code=404, detail="上传不存在或已过期")
+    return {"code": 0, "data": {"upload_id": upload_id, "aborted": True}}
+
+
 @router.get("/upload/{session_id}/status")
 async def get_upload_status(
     session_id: str,
@@ -270,9 +586,10 @@ async def get_upload_status(
     stage = meeting.status
     
     if meeting.status == MeetingStatus.PROCESSING:  # type: ignore
-        # 可以根据实际处理阶段计算进度
-        progress = 50
-        stage = "transcribing"
+        # 后台任务通过 _update_meeting_status 上报的实际进度
+        entry = _upload_progress.get(session_id, {})
+        progress = entry.get("progress", 0)
+        stage = entry.get("stage", "queued")
     elif meeting.status == MeetingStatus.COMPLETED:  # type: ignore
         progress = 100
         stage = "completed"
@@ -291,6 +608,26 @@ async def get_upload_status(
     }
 
 
+@router.post("/upload/{session_id}/cancel")
+async def cancel_upload(session_id: str):
+    """
+    取消排队中的转写任务
+    
+    已开始执行的转写无法中断，结果会被丢弃
+    """
+    cancelled = transcription_scheduler.cancel(session_id)
+    if not cancelled:
+        raise HTTPException(status_code=404, detail="没有可取消的转写任务")
+    
+    return {
+        "code": 0,
+        "data": {
+            "session_id": session_id,
+            "cancelled": cancelled
+        }
+    }
+
+
 @router.get("/meetings/{session_id}/download")
 async def download_meeting(
     session_id: str,
@@ -324,7 +661,7 @@ async def download_meeting(
                 "risks": meeting.risks,
                 "summary": meeting.summary,
                 "participants": meeting.participants,
-                "transcript_segments": meeting.transcript_segments
+                "transcript_segments": (await list_segments(db, session_id))[0]
             }
         }
     else:
@@ -12,6 +12,15 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 
 from logger_config import get_logger
 from services.websocket_manager import websocket_manager
+from services.transcription_scheduler import transcription_scheduler, JobPriority
+from services.audio_frame import (
+    AudioCodec, AudioCodecMismatchError, AudioFrameError, parse_audio_frame, parse_codec_name
+)
+from services.audio_ingest import AudioIngestPipeline
+from services.minutes_drafter import MinutesDrafter
+from services.session_state import SessionOwnership, lifecycle_lock, session_owner, WORKER_ID
+from services.metrics import BUFFERED_BYTES
+from services.tracing import traced
 
 logger = get_logger(__name__)
 router = APIRouter()
@@ -19,42 +28,105 @@ router = APIRouter()
 # WebSocket 消息大小限制 (1MB)
 MAX_MESSAGE_SIZE = 1024 * 1024
 
-# 会话处理锁，确保每个会话的消息串行处理
-_session_locks = {}
+# 音频接收管道（接收、落盘与实时转写解耦）
+_ingest_pipelines = {}
 
-# 会话生命周期锁，防止 init/finalize 并发冲突
-_lifecycle_locks = {}
+BUFFERED_BYTES.set_function(lambda: sum(p.queued_bytes for p in list(_ingest_pipelines.values())))
 
+# 会议进行中的纪要草稿
+_minutes_drafters = {}
 
-async def handle_start_message(websocket: WebSocket, session_id: str, data: dict):
+# 本 worker 持有的会话归属（会话亲和，见 services/session_state.py）
+_session_owners = {}
+
+# 会议开始时协商的音频编码（二进制帧按此校验）
+_session_codecs = {}
+
+# 实时会议可接收的编码：音频按到达顺序追加到 audio.webm，增量转写按 WebM Cluster 切分
+LIVE_CODECS = (AudioCodec.WEBM_OPUS,)
+
+
+async def handle_start_message(websocket: WebSocket, session_id: str, data: dict) -> bool:
     """
     处理开始会议消息
     
-    创建会议会话，初始化音频文件
-    """
-    # 获取生命周期锁，确保与 end 互斥
-    lock = _get_lifecycle_lock(session_id)
+    创建会议会话，初始化音频文件；带 resume 时从共享会话状态恢复（worker 重启 / 崩溃后重连）
     
-    async with lock:
+    Returns:
+        False 表示会话属于其他存活的 worker（已下发 redirect）或未能获取归属（已下发错误），
+        调用方应关闭连接
+    """
+    # 获取生命周期锁（跨 worker），确保与 end 互斥
+    async with lifecycle_lock(session_id):
+        # 会话亲和：会议进行中的会话只由归属 worker 处理
+        owner = await session_owner(session_id)
+        if owner is not None:
+            await _send_redirect(websocket, session_id, owner)
+            return False
+        
         try:
             title = data.get("title", "未命名会议")
             user_id = data.get("user_id", "anonymous")
+            codec = parse_codec_name(data.get("codec", "webm_opus"))
+            if codec not in LIVE_CODECS:
+                raise AudioFrameError(f"实时会议不支持音频编码 {codec.name}")
+            
+            ownership = _session_owners.get(session_id) or SessionOwnership(session_id)
+            if not await ownership.claim():
+                # 检查归属之后被其他 worker 抢先获取（该 worker 未走生命周期锁，或锁租约已过期）
+                owner = await session_owner(session_id)
+                if owner is not None:
+                    await _send_redirect(websocket, session_id, owner)
+                else:
+                    logger.warning(f"[{session_id}] 获取会话归属失败，拒绝启动")
+                    await websocket.send_json({
+                        "type": "error",
+                        "code": "START_FAILED",
+                        "message": "会话正由其他 worker 处理，请稍后重试"
+                    })
+                return False
+            _session_owners[session_id] = ownership
+            _session_codecs[session_id] = codec
             
             # 导入并调用 meeting_skill 初始化
-            from meeting_skill import init_meeting_session
-            audio_path = init_meeting_session(session_id, title=title, user_id=user_id)
+            from meeting_skill import init_meeting_session, restore_meeting_session
+            audio_path = restore_meeting_session(session_id) if data.get("resume") else None
+            resumed = audio_path is not None
+            if not resumed:
+                audio_path = init_meeting_session(session_id, title=title, user_id=user_id)
             
             # 建立 WebSocket 连接
             await websocket_manager.connect(session_id, user_id, websocket)
             
-            # 发送 started 消息
-            await websocket_manager.send_custom_message(session_id, {
+            # 启动音频接收管道
+            if session_id not in _ingest_pipelines:
+                pipeline = _create_ingest_pipeline(session_id)
+                pipeline.start()
+                _ingest_pipelines[session_id] = pipeline
+            
+            # 启动纪要草稿定时更新
+            if session_id not in _minutes_drafters:
+                drafter = _create_minutes_drafter(session_id)
+                drafter.start()
+                _minutes_drafters[session_id] = drafter
+            
+            # 发送 started 消息（恢复时带服务端已落盘的最后序号，客户端重发之后的音频块）
+            message = {
                 "type": "started",
                 "meeting_id": session_id,
-                "audio_path": audio_path
-            })
+                "audio_path": audio_path,
+                "resumed": resumed
+            }
+            if resumed:
+                from meeting_skill import get_meeting_session
+                message["last_sequence"] = get_meeting_session(session_id)["last_sequence"]
+                logger.info(
+                    f"[{session_id}] 会议已恢复: 服务端最后序号 {message['last_sequence']}, "
+                    f"客户端最后序号 {data.get('last_sequence')}"
+                )
+            await websocket_manager.send_custom_message(session_id, message)
             
-            logger.info(f"[{session_id}] 会议已启动: {title}")
+            logger.info(f"[{session_id}] 会议已{'恢复' if resumed else '启动'}: {title}")
             
         except Exception as e:
             logger.error(f"[{session_id}] 启动会议失败: {e}", exc_info=True)
@@ -63,168 +135,245 @@ async def handle_start_message(websocket: WebSocket, session_id: str, data: dict
                 "code": "START_FAILED",
                 "message": f"启动会议失败: {str(e)}"
             })
+        return True
+
+
+async def _send_redirect(websocket: WebSocket, session_id: str, owner: dict):
+    """会话属于其他 worker：下发 redirect（调用方随后关闭连接）"""
+    logger.info(f"[{session_id}] 会话属于 {owner['worker_id']}，下发 redirect")
+    await websocket.send_json({
+        "type": "redirect",
+        "meeting_id": session_id,
+        "worker_id": owner["worker_id"],
+        "url": owner["node_url"]
+    })
+
+
+def _create_ingest_pipeline(session_id: str) -> AudioIngestPipeline:
+    """创建会话的音频接收管道：写入走线程，实时转写经转写调度器线程通道（实时优先级最高）"""
+    from meeting_skill import write_audio_chunks, transcribe_audio_session
+    
+    async def transcribe():
+        return await transcription_scheduler.run(
+            transcribe_audio_session, session_id,
+            priority=JobPriority.LIVE,
+            in_process=True,
+            job_id=session_id
+        )
+    
+    async def send(message: dict):
+        await websocket_manager.send_custom_message(session_id, message)
+    
+    return AudioIngestPipeline(
+        session_id,
+        write_fn=lambda chunks, last_sequence: write_audio_chunks(session_id, chunks, last_sequence),
+        transcribe_fn=transcribe,
+        send_fn=send
+    )
+
+
+def _create_minutes_drafter(session_id: str) -> MinutesDrafter:
+    """创建会话的纪要草稿：读取实时转写片段，草稿保存在会话状态中供 finalize_meeting 合并"""
+    from meeting_skill import read_live_transcript, store_minutes_draft
+    
+    async def send(message: dict):
+        await websocket_manager.send_custom_message(session_id, message)
+    
+    return MinutesDrafter(
+        session_id,
+        fetch_fn=lambda start: read_live_transcript(session_id, start),
+        store_fn=lambda draft, cursor: store_minutes_draft(session_id, draft, cursor),
+        send_fn=send
+    )
 
 
-def _get_session_lock(session_id: str) -> asyncio.Lock:
-    """获取会话的锁，不存在则创建"""
-    if session_id not in _session_locks:
-        _session_locks[session_id] = asyncio.Lock()
-    return _session_locks[session_id]
+async def _close_ingest_pipeline(session_id: str):
+    """写完队列中的音频并等待进行中的实时转写结束，停止纪要草稿更新"""
+    pipeline = _ingest_pipelines.pop(session_id, None)
+    if pipeline:
+        await pipeline.close()
+        logger.info(f"[{session_id}] 音频接收管道已关闭: {pipeline.get_status()}")
+    
+    drafter = _minutes_drafters.pop(session_id, None)
+    if drafter:
+        await drafter.close()
+        logger.info(f"[{session_id}] 纪要草稿已停止: {drafter.get_status()}")
 
 
-def _get_lifecycle_lock(session_id: str) -> asyncio.Lock:
-    """获取会话生命周期锁，确保 init/finalize 互斥"""
-    if session_id not in _lifecycle_locks:
-        _lifecycle_locks[session_id] = asyncio.Lock()
-    return _lifecycle_locks[session_id]
+async def _release_session_owner(session_id: str):
+    """释放会话归属（连接结束）"""
+    ownership = _session_owners.pop(session_id, None)
+    if ownership:
+        await ownership.release()
 
 
 async def handle_chunk_message(session_id: str, data: dict):
     """
-    处理音频块消息
+    处理音频块消息（JSON + Base64，兼容旧客户端）
     
     解码音频数据，追加到文件，触发转写
     """
-    # 获取会话锁，确保与 end 消息互斥
-    lock = _get_session_lock(session_id)
+    seq = data.get("sequence", 0)
+    audio_b64 = data.get("data", "")
+    
+    if not audio_b64:
+        logger.warning(f"[{session_id}] 收到空音频数据")
+        return
+    
+    # Base64 解码
+    try:
+        chunk_bytes = base64.b64decode(audio_b64)
+    except Exception as e:
+        logger.error(f"[{session_id}] 音频 Base64 解码失败: {e}")
+        await websocket_manager.send_error(
+            session_id,
+            "DECODE_ERROR",
+            "音频解码失败",
+            recoverable=True
+        )
+        return
+    
+    await _ingest_chunk(session_id, chunk_bytes, seq)
+
+
+async def handle_binary_chunk(session_id: str, raw: bytes):
+    """
+    处理二进制音频帧（16 字节头 + 原始载荷，见 services/audio_frame.py）
+    
+    载荷以 memoryview 直接写入会话音频文件，不做 Base64/JSON 处理和额外拷贝
+    """
+    try:
+        frame = parse_audio_frame(raw, expected_codec=_session_codecs.get(session_id))
+    except AudioCodecMismatchError as e:
+        logger.error(f"[{session_id}] 音频块 {e.sequence} 编码不一致: {e}")
+        await websocket_manager.send_error(
+            session_id,
+            "CHUNK_ERROR",
+            f"音频块 {e.sequence} {e}",
+            recoverable=True
+        )
+        return
+    except AudioFrameError as e:
+        logger.error(f"[{session_id}] 二进制音频帧格式错误: {e}")
+        await websocket_manager.send_error(
+            session_id,
+            "DECODE_ERROR",
+            f"音频帧格式错误: {e}",
+            recoverable=True
+        )
+        return
     
-    # 如果锁被占用（正在处理 end），则跳过此 chunk
-    if lock.locked():
-        logger.debug(f"[{session_id}] 会话正在结束，跳过 chunk")
+    await _ingest_chunk(session_id, frame.payload, frame.sequence)
+
+
+async def _ingest_chunk(session_id: str, chunk, seq: int):
+    """
+    音频块放入会话接收管道并立即确认（JSON / 二进制两条路径共用）
+    
+    落盘和实时转写由管道的后台任务完成，转写期间继续接收，不丢弃音频块
+    """
+    pipeline = _ingest_pipelines.get(session_id)
+    if pipeline is None:
+        logger.warning(f"[{session_id}] 会议未启动或已结束，忽略音频块 {seq}")
+        await websocket_manager.send_error(
+            session_id,
+            "CHUNK_ERROR",
+            "会议未启动或已结束",
+            recoverable=True
+        )
         return
     
-    async with lock:
+    await pipeline.ingest(seq, chunk)
+
+
+@traced("meeting.end", meeting_arg="session_id")
+async def handle_end_message(session_id: str):
+    """
+    处理结束会议消息
+    
+    关闭文件，全量转写，生成纪要（带实时进度推送）
+    """
+    # 获取生命周期锁（跨 worker），确保与 start 互斥
+    async with lifecycle_lock(session_id):
+        # 写完已接收的音频，等待实时转写结束，再做全量转写
+        await _close_ingest_pipeline(session_id)
+        
         try:
-            seq = data.get("sequence", 0)
-            audio_b64 = data.get("data", "")
-            
-            if not audio_b64:
-                logger.warning(f"[{session_id}] 收到空音频数据")
-                return
+            logger.info(f"[{session_id}] 结束会议...")
             
-            # Base64 解码
-            try:
-                chunk_bytes = base64.b64decode(audio_b64)
-            except Exception as e:
-                logger.error(f"[{session_id}] 音频 Base64 解码失败: {e}")
-                await websocket_manager.send_error(
-                    session_id,
-                    "DECODE_ERROR",
-                    "音频解码失败",
-                    recoverable=True
+            # 定义进度回调函数（在同步代码中触发异步发送）
+            loop = asyncio.get_event_loop()
+            def progress_callback(step: str, message: str):
+                # 使用 run_coroutine_threadsafe 在同步回调中发送消息
+                asyncio.run_coroutine_threadsafe(
+                    websocket_manager.send_custom_message(session_id, {
+                        "type": "progress",
+                        "step": step,
+                        "message": message,
+                        "timestamp": datetime.utcnow().isoformat()
+                    }),
+                    loop
                 )
-                return
             
-            # 调用 meeting_skill 追加音频块（同步函数用 run_in_executor）
-            from meeting_skill import append_audio_chunk
-            transcript_text = await asyncio.get_event_loop().run_in_executor(
-                None, append_audio_chunk, session_id, chunk_bytes, seq
+            # 发送开始处理消息
+            await websocket_manager.send_custom_message(session_id, {
+                "type": "processing",
+                "status": "started",
+                "message": "开始生成会议纪要..."
+            })
+            
+            # 调用 meeting_skill 结束会议（依赖进程内会话状态，走调度器线程通道）
+            from meeting_skill import finalize_meeting
+            logger.info(f"[{session_id}] 调用 finalize_meeting...")
+            result = await transcription_scheduler.run(
+                finalize_meeting, session_id, None, progress_callback,
+                priority=JobPriority.FINALIZE,
+                in_process=True,
+                job_id=session_id
             )
+            logger.info(f"[{session_id}] finalize_meeting 完成")
+            
+            # 发送 completed 消息
+            # 检查结果是否使用了降级方案
+            is_fallback = result.get("_ai_failed", False) if isinstance(result, dict) else False
+            fallback_reason = result.get("_fail_reason", "") if isinstance(result, dict) else ""
+            
+            await websocket_manager.send_custom_message(session_id, {
+                "type": "completed",
+                "meeting_id": session_id,
+                "full_text": result["full_text"],
+                "minutes_path": result["minutes_path"],
+                "chunk_count": result["chunk_count"],
+                "ai_success": not is_fallback,
+                "fallback_reason": fallback_reason if is_fallback else None
+            })
             
-            # 如果有转写结果，推送客户端
-            if transcript_text:
+            # 如果使用了降级方案，额外发送一个警告
+            if is_fallback:
                 await websocket_manager.send_custom_message(session_id, {
-                    "type": "transcript",
-                    "text": transcript_text,
-                    "sequence": seq,
-                    "is_final": False
+                    "type": "warning",
+                    "code": "AI_FALLBACK",
+                    "message": f"AI生成失败，使用基础模板: {fallback_reason}",
+                    "suggestion": "请检查：1.录音是否有声音 2.麦克风权限 3.网络连接"
                 })
             
+            # 关闭 WebSocket 连接
+            await websocket_manager.close_session(session_id, reason="会议正常结束")
+            
+            logger.info(f"[{session_id}] 会议已结束，纪要: {result['minutes_path']}")
+            
         except Exception as e:
-            logger.error(f"[{session_id}] 处理音频块失败: {e}", exc_info=True)
+            logger.error(f"[{session_id}] 结束会议失败: {e}", exc_info=True)
             await websocket_manager.send_error(
                 session_id,
-                "CHUNK_ERROR",
-                f"处理音频块失败: {str(e)}",
-                recoverable=True
+                "END_FAILED",
+                f"结束会议失败: {str(e)}",
+                recoverable=False
             )
-
-
-async def handle_end_message(session_id: str):
-    """
-    处理结束会议消息
-    
-    关闭文件，全量转写，生成纪要（带实时进度推送）
-    """
-    # 获取生命周期锁，确保与 start 互斥
-    lifecycle_lock = _get_lifecycle_lock(session_id)
-    
-    # 获取会话锁，确保与 chunk 消息互斥
-    chunk_lock = _get_session_lock(session_id)
-    
-    async with lifecycle_lock:
-        async with chunk_lock:
-            try:
-                logger.info(f"[{session_id}] 结束会议...")
-                
-                # 定义进度回调函数（在同步代码中触发异步发送）
-                loop = asyncio.get_event_loop()
-                def progress_callback(step: str, message: str):
-                    # 使用 run_coroutine_threadsafe 在同步回调中发送消息
-                    asyncio.run_coroutine_threadsafe(
-                        websocket_manager.send_custom_message(session_id, {
-                            "type": "progress",
-                            "step": step,
-                            "message": message,
-                            "timestamp": datetime.utcnow().isoformat()
-                        }),
-                        loop
-                    )
-                
-                # 发送开始处理消息
-                await websocket_manager.send_custom_message(session_id, {
-                    "type": "processing",
-                    "status": "started",
-                    "message": "开始生成会议纪要..."
-                })
-                
-                # 调用 meeting_skill 结束会议（同步函数用 run_in_executor）
-                from meeting_skill import finalize_meeting
-                logger.info(f"[{session_id}] 调用 finalize_meeting...")
-                result = await asyncio.get_event_loop().run_in_executor(
-                    None, finalize_meeting, session_id, None, progress_callback
-                )
-                logger.info(f"[{session_id}] finalize_meeting 完成")
-                
-                # 发送 completed 消息
-                # 检查结果是否使用了降级方案
-                is_fallback = result.get("_ai_failed", False) if isinstance(result, dict) else False
-                fallback_reason = result.get("_fail_reason", "") if isinstance(result, dict) else ""
-                
-                await websocket_manager.send_custom_message(session_id, {
-                    "type": "completed",
-                    "meeting_id": session_id,
-                    "full_text": result["full_text"],
-                    "minutes_path": result["minutes_path"],
-                    "chunk_count": result["chunk_count"],
-                    "ai_success": not is_fallback,
-                    "fallback_reason": fallback_reason if is_fallback else None
-                })
-                
-                # 如果使用了降级方案，额外发送一个警告
-                if is_fallback:
-                    await websocket_manager.send_custom_message(session_id, {
-                        "type": "warning",
-                        "code": "AI_FALLBACK",
-                        "message": f"AI生成失败，使用基础模板: {fallback_reason}",
-                        "suggestion": "请检查：1.录音是否有声音 2.麦克风权限 3.网络连接"
-                    })
-                
-                # 关闭 WebSocket 连接
-                await websocket_manager.close_session(session_id, reason="会议正常结束")
-                
-                logger.info(f"[{session_id}] 会议已结束，纪要: {result['minutes_path']}")
-                
-            except Exception as e:
-                logger.error(f"[{session_id}] 结束会议失败: {e}", exc_info=True)
-                await websocket_manager.send_error(
-                    session_id,
-                    "END_FAILED",
-                    f"结束会议失败: {str(e)}",
-                    recoverable=False
-                )
-                # 即使失败也关闭会话
-                await websocket_manager.close_session(session_id, reason=f"结束失败: {e}")
+            # 即使失败也关闭会话
+            await websocket_manager.close_session(session_id, reason=f"结束失败: {e}")
+            from meeting_skill import discard_meeting_session
+            discard_meeting_session(session_id)
 
 
 async def handle_control_message(session_id: str, data: dict):
@@ -244,8 +393,11 @@ async def handle_control_message(session_id: str, data: dict):
             await websocket_manager.send_json(session_id, {
                 "type": "status",
                 "status": "recording" if session.is_active else "inactive",
-                "transcript_count": len(session.transcript_segments),
-                "audio_buffer_size": session.audio_buffer_size
+                "transcript_count": session.transcript_count,
+                "audio_buffer_size": session.audio_buffer_size,
+                "worker_id": WORKER_ID,
+                "ingest": _ingest_pipelines[session_id].get_status() if session_id in _ingest_pipelines else None,
+                "minutes_draft": _minutes_drafters[session_id].get_status() if session_id in _minutes_drafters else None
             })
     
     elif msg_type == "select_minutes_style":
@@ -289,13 +441,21 @@ async def websocket_endpoint(
     
     消息协议:
     - 上行:
-      - {"type": "start", "title": "会议标题"} - 开始会议
-      - {"type": "chunk", "sequence": 1, "data": "base64..."} - 音频块
+      - {"type": "start", "title": "会议标题", "codec": "webm_opus"} - 开始会议（codec 可省略，
+        二进制帧的编码必须与之一致，否则返回 CHUNK_ERROR）
+      - {"type": "resume", "last_sequence": N} - 服务重启 / 崩溃后恢复会议（等同 start + resume: true），
+        started 消息返回服务端已落盘的最后序号，客户端重发之后的音频块
+      - {"type": "chunk", "sequence": 1, "data": "base64..."} - 音频块（兼容格式）
+      - 二进制帧: 16 字节头(version, codec, sequence, timestamp_ms) + 原始音频 - 音频块（推荐）
       - {"type": "end"} - 结束会议
       - {"type": "ping"} - 心跳
     - 下行:
-      - {"type": "started", "meeting_id": "..."} - 会议已启动
+      - {"type": "started", "meeting_id": "...", "resumed": false, "last_sequence": N} - 会议已启动 / 已恢复
+      - {"type": "redirect", "worker_id": "...", "url": "..."} - 会话由其他节点处理，连接该节点重试
+      - {"type": "ack", "sequence": 1} - 音频块已接收（落盘和转写在后台进行）
+      - {"type": "backpressure", "state": "pause|resume|rejected"} - 接收队列背压
       - {"type": "transcript", "text": "...", "sequence": 1} - 转写结果
+      - {"type": "minutes_draft", "revision": 1, "draft": {...}} - 会议进行中的纪要草稿（议题、行动项）
       - {"type": "completed", "full_text": "...", "minutes_path": "..."} - 会议完成
       - {"type": "error", "code": "...", "message": "..."} - 错误
     
@@ -334,8 +494,12 @@ async def websocket_endpoint(
                     msg_type = data.get("type")
                     
                     # 新消息路由
-                    if msg_type == "start":
-                        await handle_start_message(websocket, session_id, data)
+                    if msg_type in ("start", "resume"):
+                        if msg_type == "resume":
+                            data = {**data, "resume": True}
+                        if not await handle_start_message(websocket, session_id, data):
+                            await websocket.close(code=4009)
+                            break
                         connection_accepted = True
                     elif msg_type == "chunk":
                         await handle_chunk_message(session_id, data)
@@ -345,7 +509,7 @@ async def websocket_endpoint(
                     else:
                         await handle_control_message(session_id, data)
                 
-                # 处理二进制消息（暂不支持）
+                # 处理二进制消息（音频帧）
                 elif "bytes" in message:
                     msg_size = len(message["bytes"])
                     if msg_size > MAX_MESSAGE_SIZE:
@@ -357,12 +521,7 @@ async def websocket_endpoint(
                         })
                         continue
                     
-                    logger.warning(f"[{session_id}] 二进制音频数据暂未支持")
-                    await websocket.send_json({
-                        "type": "error",
-                        "code": "UNSUPPORTED_FORMAT",
-                        "message": "二进制音频格式暂未支持，请使用 Base64 JSON 格式"
-                    })
+                    await handle_binary_chunk(session_id, message["bytes"])
                 
             except json.JSONDecodeError as e:
                 logger.error(f"[{session_id}] JSON 解析失败: {e}")
@@ -384,21 +543,12 @@ async def websocket_endpoint(
         logger.info(f"[{session_id}] 客户端断开连接")
         # 清理 WebSocketManager 中的会话（重要：避免 CLOSE_WAIT）
         await websocket_manager.close_session(session_id, reason="客户端断开")
+        # 写完已接收的音频
+        await _close_ingest_pipeline(session_id)
         # 如果会议还在进行中（有音频数据），自动结束会议
-        from meeting_skill import _audio_sessions
-        if session_id in _audio_sessions:
-            session = _audio_sessions[session_id]
-            # 【关键】先关闭文件句柄，避免 WinError 32
-            fh = session.get("file_handle")
-            if fh and not fh.closed:
-                try:
-                    fh.flush()
-                    fh.close()
-                    logger.info(f"[{session_id}] 断开连接时关闭音频文件句柄")
-                except Exception as e:
-                    logger.warning(f"[{session_id}] 关闭文件句柄失败: {e}")
-            session["file_handle"] = None
-            
+        from meeting_skill import get_meeting_session, discard_meeting_session
+        session = get_meeting_session(session_id)
+        if session is not None:
             if session.get("chunk_count", 0) > 0:
                 logger.warning(f"[{session_id}] 会议进行中客户端断开，自动结束会议")
                 try:
@@ -406,11 +556,10 @@ async def websocket_endpoint(
                 except Exception as e:
                     logger.error(f"[{session_id}] 自动结束会议失败: {e}")
                     # 清理会话避免内存泄漏
-                    if session_id in _audio_sessions:
-                        del _audio_sessions[session_id]
+                    discard_meeting_session(session_id)
             else:
-                # 没有音频数据，直接清理
-                del _audio_sessions[session_id]
+                # 没有音频数据，直接清理（关闭文件句柄，避免 WinError 32）
+                discard_meeting_session(session_id)
     
     except Exception as e:
         logger.error(f"[{session_id}] WebSocket 异常: {e}", exc_info=True)
@@ -425,10 +574,8 @@ async def websocket_endpoint(
                 pass  # 连接可能已关闭
     
     finally:
-        # 清理会话锁，避免内存泄漏
-        if session_id in _session_locks:
-            del _session_locks[session_id]
-            logger.debug(f"[{session_id}] 会话锁已清理")
-        if session_id in _lifecycle_locks:
-            del _lifecycle_locks[session_id]
-            logger.debug(f"[{session_id}] 生命周期锁已清理")
+        # 清理接收管道，释放会话归属，避免内存泄漏
+        if session_id in _ingest_pipelines or session_id in _minutes_drafters:
+            await _close_ingest_pipeline(session_id)
+        await _release_session_owner(session_id)
+        _session_codecs.pop(session_id, None)
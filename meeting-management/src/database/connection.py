@@ -86,8 +86,17 @@ AsyncSessionLocal = async_sessionmaker(
 async def init_db():
     """初始化数据库表"""
     from models.meeting import Base
+    from services.audio_dedup import init_audio_dedup
+    from services.search_index import init_search_index
+    from services.transcript_store import init_transcript_store
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        # 转写片段表（含旧 JSON 列迁移）
+        await init_transcript_store(conn)
+        # 全文检索索引（导入即注册 ORM flush 监听）
+        await init_search_index(conn)
+        # 上传录音指纹（相同录音复用转写）
+        await init_audio_dedup(conn)
 
 
 async def get_db():
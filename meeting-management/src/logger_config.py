@@ -4,6 +4,10 @@
 日志配置模块
 提供统一的日志配置和结构化日志支持
 
+调用方只把日志记录放入内存队列（QueueHandler，不阻塞，队列满时丢弃并计数），
+控制台 / 文件的格式化和写入都在后台线程（QueueListener）完成，磁盘慢不会卡住事件循环；
+高频调试日志可按模块抽样（LOG_SAMPLE_RATES），在入队前丢弃
+
 Usage:
     from logger_config import setup_logging, get_logger
     
@@ -12,20 +16,40 @@ Usage:
     logger.info("Application started")
 """
 
+import atexit
+import copy
 import json
 import logging
 import logging.handlers
 import os
+import queue
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 
 # 日志格式
 CONSOLE_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
 FILE_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s'
 
 
+# ========== 配置读取 ==========
+
+# 日志级别 / 文件目录
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_DIR = os.getenv("LOG_DIR", "./output/logs")
+# 控制台格式: text | json
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+# 是否额外写 JSON 结构化日志文件
+LOG_JSON_FILE = os.getenv("LOG_JSON_FILE", "false").lower() == "true"
+# 日志文件按天轮转，保留天数
+LOG_BACKUP_DAYS = int(os.getenv("LOG_BACKUP_DAYS", "30"))
+# 内存队列上限（条），写入线程跟不上时丢弃新日志而不是阻塞调用方
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# 按模块抽样 DEBUG 日志，如 "services.audio_ingest=0.01,api.websocket=0.1"（按 logger 名称前缀匹配，0 表示全部丢弃）
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+
+
 class JSONFormatter(logging.Formatter):
     """JSON 格式的日志格式化器，用于结构化日志"""
     
@@ -48,13 +72,128 @@ class JSONFormatter(logging.Formatter):
         if hasattr(record, "extra_data"):
             log_data.update(record.extra_data)
         
-        # 异常信息
+        # 异常信息（经队列传递的记录已在入队时转成文本）
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_data["exception"] = record.exc_text
         
         return json.dumps(log_data, ensure_ascii=False, default=str)
 
 
+class SamplingFilter(logging.Filter):
+    """
+    按模块抽样高频日志（默认只作用于 DEBUG）
+
+    logger 名称按最长前缀匹配抽样率，每个 logger 每 round(1/rate) 条保留 1 条；
+    计数不加锁，多线程下偶尔多留或少留一条无妨
+    """
+
+    def __init__(self, rates: Dict[str, float], max_level: int = logging.DEBUG):
+        super().__init__()
+        self.max_level = max_level
+        # 前缀 -> 保留间隔（0 表示全部丢弃）
+        self._every = {name: (max(1, round(1 / rate)) if rate > 0 else 0) for name, rate in rates.items()}
+        self._matched: Dict[str, Optional[str]] = {}  # logger 名称 -> 匹配到的前缀
+        self._counts: Dict[str, int] = {}
+
+    def _match(self, name: str) -> Optional[str]:
+        try:
+            return self._matched[name]
+        except KeyError:
+            candidates = [p for p in self._every if name == p or name.startswith(p + ".")]
+            prefix = max(candidates, key=len) if candidates else None
+            self._matched[name] = prefix
+            return prefix
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+        prefix = self._match(record.name)
+        if prefix is None:
+            return True
+        every = self._every[prefix]
+        if every == 0:
+            return False
+        count = self._counts.get(record.name, 0)
+        self._counts[record.name] = count + 1
+        return count % every == 0
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """解析 "module=rate,module=rate"，格式错误的项忽略"""
+    rates = {}
+    for item in spec.split(","):
+        name, sep, rate = item.partition("=")
+        if not sep or not name.strip():
+            continue
+        try:
+            rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+        except ValueError:
+            continue
+    return rates
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """只入队、不阻塞：队列满时丢弃并计数，由写入线程补记一条警告"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 在调用线程把参数代入消息（参数对象之后可能变化），异常栈转成文本（不持有栈帧）；
+        # 其余格式化留给写入线程，各处理器仍按自己的格式输出
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _EXC_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_EXC_FORMATTER = logging.Formatter()
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    """后台写入线程；发现入队丢弃时先补记一条警告"""
+
+    def __init__(self, log_queue: queue.Queue, handlers: List[logging.Handler], source: NonBlockingQueueHandler):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self._source = source
+        self._reported = 0
+
+    def handle(self, record: logging.LogRecord):
+        dropped = self._source.dropped
+        if dropped != self._reported:
+            lost, self._reported = dropped - self._reported, dropped
+            super().handle(logging.LogRecord(
+                __name__, logging.WARNING, __file__, 0,
+                f"日志队列已满，丢弃 {lost} 条日志", None, None,
+            ))
+        super().handle(record)
+
+
+_listener: Optional[_QueueListener] = None
+
+
+def shutdown_logging():
+    """停止后台写入线程（先写完队列中剩余的日志）"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
 class SessionAdapter(logging.LoggerAdapter):
     """带会话上下文信息的日志适配器"""
     
@@ -75,7 +214,10 @@ def setup_logging(
     enable_console: bool = True,
     enable_file: bool = True,
     enable_json: bool = False,
-    app_name: str = "meeting-server"
+    app_name: str = "meeting-server",
+    json_console: bool = False,
+    sample_rates: Optional[Dict[str, float]] = None,
+    queued: bool = True,
 ) -> Path:
     """
     配置日志系统
@@ -87,10 +229,15 @@ def setup_logging(
         enable_file: 是否启用文件输出
         enable_json: 是否启用 JSON 格式（用于结构化日志）
         app_name: 应用名称（用于日志文件名）
+        json_console: 控制台是否输出 JSON（每行一条，便于容器日志采集）
+        sample_rates: 按模块抽样 DEBUG 日志 {logger 名称前缀: 保留比例}
+        queued: 是否经队列由后台线程写入（命令行工具可关闭）
         
     Returns:
         日志目录路径
     """
+    shutdown_logging()
+
     # 根日志记录器
     root_logger = logging.getLogger()
     root_logger.setLevel(getattr(logging, log_level.upper()))
@@ -110,7 +257,7 @@ def setup_logging(
         else:
             console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(getattr(logging, log_level.upper()))
-        console_formatter = logging.Formatter(CONSOLE_FORMAT, datefmt='%H:%M:%S')
+        console_formatter = JSONFormatter() if json_console else logging.Formatter(CONSOLE_FORMAT, datefmt='%H:%M:%S')
         console_handler.setFormatter(console_formatter)
         handlers.append(console_handler)
     
@@ -125,7 +272,7 @@ def setup_logging(
             log_file,
             when='midnight',  # 每天午夜切换
             interval=1,       # 每天
-            backupCount=30,   # 保留最近30天
+            backupCount=LOG_BACKUP_DAYS,  # 保留天数
             encoding='utf-8',
             delay=False
         )
@@ -142,7 +289,7 @@ def setup_logging(
             error_file,
             when='midnight',
             interval=1,
-            backupCount=30,
+            backupCount=LOG_BACKUP_DAYS,
             encoding='utf-8',
             delay=False
         )
@@ -158,7 +305,7 @@ def setup_logging(
                 json_file,
                 when='midnight',
                 interval=1,
-                backupCount=30,
+                backupCount=LOG_BACKUP_DAYS,
                 encoding='utf-8',
                 delay=False
             )
@@ -168,19 +315,40 @@ def setup_logging(
             json_handler.setFormatter(json_formatter)
             handlers.append(json_handler)
     
-    # 添加处理器
-    for handler in handlers:
-        root_logger.addHandler(handler)
+    # 添加处理器：根记录器只挂一个入队处理器，真正的写入在后台线程
+    global _listener
+    if queued:
+        log_queue: queue.Queue = queue.Queue(LOG_QUEUE_SIZE)
+        queue_handler = NonBlockingQueueHandler(log_queue)
+        if sample_rates:
+            queue_handler.addFilter(SamplingFilter(sample_rates))
+        root_logger.addHandler(queue_handler)
+        _listener = _QueueListener(log_queue, handlers, queue_handler)
+        _listener.start()
+    else:
+        for handler in handlers:
+            if sample_rates:
+                handler.addFilter(SamplingFilter(sample_rates))
+            root_logger.addHandler(handler)
     
     # 设置第三方库的日志级别
     logging.getLogger("websockets").setLevel(logging.WARNING)
     logging.getLogger("urllib3").setLevel(logging.WARNING)
     
+    # uvicorn 自带的处理器直接写控制台，改为交给根记录器（同样经队列写入）
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+    
     logging.info(f"Logging configured: level={log_level}, log_dir={log_dir}")
     
     return Path(log_dir) if log_dir else None  # type: ignore
 
 
+atexit.register(shutdown_logging)
+
+
 def get_logger(name: str, session_id: str = None, user_id: str = None) -> logging.Logger:
     """
     获取日志记录器
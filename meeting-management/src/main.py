@@ -14,6 +14,7 @@ FastAPI + WebSocket + SQLite/瀚高HighGoDB
   HIGHGO_PASSWORD=xxx    # 瀚高密码
 """
 
+import asyncio
 import os
 import sys
 import time
@@ -40,8 +41,24 @@ load_dotenv(Path(__file__).parent.parent / ".env")
 # 添加src到路径
 sys.path.insert(0, str(Path(__file__).parent))
 
+# 日志经队列由后台线程写入（在导入其他模块前配置，模块级日志同样生效）
+from logger_config import (
+    setup_logging, get_logger, parse_sample_rates,
+    LOG_DIR, LOG_LEVEL, LOG_FORMAT, LOG_JSON_FILE, LOG_SAMPLE_RATES,
+)
+
+setup_logging(
+    log_dir=LOG_DIR,
+    log_level=LOG_LEVEL,
+    enable_json=LOG_JSON_FILE,
+    json_console=LOG_FORMAT == "json",
+    sample_rates=parse_sample_rates(LOG_SAMPLE_RATES),
+)
+logger = get_logger(__name__)
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from contextlib import asynccontextmanager
 
 from api.meetings import router as meetings_router
@@ -52,6 +69,11 @@ from api.docs import router as docs_router
 from database.connection import init_db
 from services.websocket_manager import websocket_manager
 from services.transcription_service import transcription_service
+from services.model_registry import model_registry
+from services.transcription_scheduler import transcription_scheduler
+from services.llm_client import llm_client
+from services.metrics import metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from services.tracing import shutdown_tracing
 from middleware import HTTPLoggerMiddleware, ErrorHandlerMiddleware
 
 
@@ -64,28 +86,51 @@ async def lifespan(app: FastAPI):
     # 存储服务实例到 app.state，供健康检查使用
     app.state.transcription_service = transcription_service
     app.state.websocket_manager = websocket_manager
+    app.state.transcription_scheduler = transcription_scheduler
     
     # 启动时初始化数据库
     await init_db()
-    print("[OK] Database initialized")
+    logger.info("Database initialized")
+    
+    # 从音频块日志恢复上次未结束的实时会议（客户端 resume 后接着录）
+    from meeting_skill import recover_meeting_sessions
+    try:
+        recovered = await asyncio.to_thread(recover_meeting_sessions)
+        if recovered:
+            logger.info(f"恢复未结束的会议: {recovered} 个")
+    except Exception as e:
+        logger.warning(f"恢复未结束的会议失败: {e}")
     
     # 启动 WebSocket 管理器
     websocket_manager.start()
     
-    # 预加载 Whisper 模型（避免第一次请求时加载）
+    # 启动模型池空闲回收
+    model_registry.start()
+    
+    # 启动转写调度器（上传转写 / 结束会议统一排队，工作进程各自预热模型）
+    transcription_scheduler.start()
+    
+    # 大模型客户端绑定事件循环（线程池中的同步纪要生成也共享连接池和并发限制）
+    llm_client.start()
+    
+    # 预热共享 Whisper 模型池（上传/实时/结束会议共用，避免第一次请求时加载）
     if transcription_service.use_whisper and transcription_service.whisper_service:
         try:
-            print("[INFO] 预加载 Whisper 模型...")
+            logger.info("预加载 Whisper 模型...")
             await transcription_service.whisper_service._load_model()
-            print("[OK] Whisper 模型加载完成")
+            logger.info("Whisper 模型加载完成")
         except Exception as e:
-            print(f"[WARN] Whisper 模型加载失败: {e}")
+            logger.warning(f"Whisper 模型加载失败: {e}")
     
     yield
     
     # 关闭时清理
     websocket_manager.stop()
-    print("[BYE] Server shutting down")
+    model_registry.stop()
+    await transcription_scheduler.stop()
+    await llm_client.stop()
+    await asyncio.to_thread(shutdown_tracing)
+    logger.info("Server shutting down")
 
 
 # Swagger 文档开关（生产环境建议关闭，防止暴露API结构）
@@ -133,10 +178,17 @@ async def root():
         "name": "Meeting Management API",
         "version": "1.0.0",
         "docs": "/docs",
-        "health": "/api/v1/health"
+        "health": "/api/v1/health",
+        "metrics": "/metrics"
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """运行指标（Prometheus 文本格式，见 services/metrics.py）"""
+    return Response(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 @app.get("/api/v1")
 async def api_root():
     """API v1 根路径 - 可用端点列表"""
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+会议文件索引
+save_meeting 写入的 output/meetings/YYYY/MM/{id}/ 目录在 SQLite 中建立索引，
+query_meetings / _find_meeting_dir 不再遍历全部目录、逐个读取 JSON
+
+索引文件: {output_dir}/meetings/index.sqlite3
+- meetings: meeting_id 主键，date 索引，记录目录和 minutes_latest.json 路径
+- meeting_participants: (participant, meeting_id) 主键，按参会人查找
+
+查询只读取命中会议的 minutes_latest.json，复杂度 O(log n + 结果数)
+
+Usage:
+    from meeting_index import get_meeting_index
+
+    index = get_meeting_index("./output")
+    index.upsert(meeting.to_dict(), meeting_dir)
+    meeting_dir = index.find_dir("M20260101_...")
+    paths = index.query(date_range=("2026-01-01", "2026-01-31"), participants=["张三"])
+
+    python meeting_index.py --reindex [output_dir]   # 重建索引
+
+更新记录:
+- 2026-10-16: 初始版本
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from logger_config import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_FILENAME = "index.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    meeting_id   TEXT PRIMARY KEY,
+    date         TEXT NOT NULL,
+    title        TEXT,
+    version      INTEGER,
+    meeting_dir  TEXT NOT NULL,
+    latest_json  TEXT NOT NULL,
+    search_text  TEXT,
+    updated_at   REAL
+);
+CREATE INDEX IF NOT EXISTS idx_meetings_date ON meetings(date);
+
+CREATE TABLE IF NOT EXISTS meeting_participants (
+    participant  TEXT NOT NULL,
+    meeting_id   TEXT NOT NULL,
+    PRIMARY KEY (participant, meeting_id)
+);
+CREATE INDEX IF NOT EXISTS idx_participants_meeting ON meeting_participants(meeting_id);
+"""
+
+
+class MeetingIndex:
+    """
+    单个输出目录的会议索引
+
+    每次操作独立连接（WAL 模式），可在多线程 / 多进程中同时使用
+    """
+
+    def __init__(self, output_dir: str):
+        self.meetings_dir = Path(output_dir) / "meetings"
+        self.db_path = self.meetings_dir / INDEX_FILENAME
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    # ---------- 连接 ----------
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self._ensure_schema()
+        conn = sqlite3.connect(str(self.db_path), timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _ensure_schema(self):
+        """首次使用时建表；索引文件不存在而已有会议目录时自动重建"""
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            self.meetings_dir.mkdir(parents=True, exist_ok=True)
+            needs_rebuild = not self.db_path.exists()
+            conn = sqlite3.connect(str(self.db_path), timeout=10)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                conn.commit()
+            finally:
+                conn.close()
+            self._initialized = True
+
+        if needs_rebuild and any(p.is_dir() for p in self.meetings_dir.iterdir()):
+            count = self.reindex()
+            logger.info(f"会议索引不存在，已从目录重建: {count} 个会议")
+
+    # ---------- 写入 ----------
+
+    def upsert(self, data: Dict, meeting_dir: Path, conn: Optional[sqlite3.Connection] = None):
+        """
+        写入/更新一个会议的索引
+
+        Args:
+            data: 会议字典（Meeting.to_dict() / minutes_latest.json 内容）
+            meeting_dir: 会议目录
+        """
+        meeting_dir = Path(meeting_dir)
+        row = (
+            data["id"],
+            data.get("date", ""),
+            data.get("title", ""),
+            data.get("version", 1),
+            str(meeting_dir),
+            str(meeting_dir / "minutes_latest.json"),
+            json.dumps(data, ensure_ascii=False),  # 关键词过滤与原实现语义一致
+            time.time(),
+        )
+        participants = [(p, data["id"]) for p in set(data.get("participants") or []) if p]
+
+        def _write(c: sqlite3.Connection):
+            c.execute(
+                "INSERT OR REPLACE INTO meetings "
+                "(meeting_id, date, title, version, meeting_dir, latest_json, search_text, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                row,
+            )
+            c.execute("DELETE FROM meeting_participants WHERE meeting_id = ?", (data["id"],))
+            c.executemany(
+                "INSERT OR IGNORE INTO meeting_participants (participant, meeting_id) VALUES (?, ?)",
+                participants,
+            )
+
+        if conn is not None:
+            _write(conn)
+        else:
+            with self._connect() as c:
+                _write(c)
+
+    def remove(self, meeting_id: str):
+        """删除一个会议的索引"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM meetings WHERE meeting_id = ?", (meeting_id,))
+            conn.execute("DELETE FROM meeting_participants WHERE meeting_id = ?", (meeting_id,))
+
+    def reindex(self) -> int:
+        """
+        遍历目录重建索引（索引丢失或手工拷入会议目录后使用）
+
+        Returns:
+            索引的会议数
+        """
+        count = 0
+        with self._connect() as conn:
+            conn.execute("DELETE FROM meetings")
+            conn.execute("DELETE FROM meeting_participants")
+            for latest_json in self.meetings_dir.glob("*/*/*/minutes_latest.json"):
+                try:
+                    with open(latest_json, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    data.setdefault("id", latest_json.parent.name)
+                    self.upsert(data, latest_json.parent, conn=conn)
+                    count += 1
+                except Exception as e:
+                    logger.warning(f"跳过无法索引的会议 {latest_json.parent.name}: {e}")
+        return count
+
+    # ---------- 查询 ----------
+
+    def find_dir(self, meeting_id: str) -> Optional[Path]:
+        """按会议 ID 查找目录（主键查找）"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT meeting_dir FROM meetings WHERE meeting_id = ?", (meeting_id,)
+            ).fetchone()
+        return Path(row[0]) if row else None
+
+    def query(
+        self,
+        date_range: Optional[Tuple[str, str]] = None,
+        participants: Optional[List[str]] = None,
+        keywords: Optional[List[str]] = None
+    ) -> List[Tuple[str, Path]]:
+        """
+        按条件查询，按日期倒序
+
+        Returns:
+            [(meeting_id, minutes_latest.json 路径)]
+        """
+        sql = "SELECT m.meeting_id, m.latest_json FROM meetings m"
+        where = []
+        params: list = []
+
+        if date_range:
+            where.append("m.date BETWEEN ? AND ?")
+            params.extend(date_range)
+
+        if participants:
+            placeholders = ",".join("?" * len(participants))
+            where.append(
+                "m.meeting_id IN (SELECT meeting_id FROM meeting_participants "
+                f"WHERE participant IN ({placeholders}))"
+            )
+            params.extend(participants)
+
+        if keywords:
+            where.append("(" + " OR ".join("instr(m.search_text, ?) > 0" for _ in keywords) + ")")
+            params.extend(keywords)
+
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY m.date DESC"
+
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [(meeting_id, Path(path)) for meeting_id, path in rows]
+
+
+_indexes: Dict[str, MeetingIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_meeting_index(output_dir: str = "./output") -> MeetingIndex:
+    """获取输出目录对应的索引（按绝对路径缓存）"""
+    key = str(Path(output_dir).resolve())
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = MeetingIndex(output_dir)
+        return _indexes[key]
+
+
+def reindex_meetings(output_dir: str = "./output") -> int:
+    """重建输出目录的会议索引"""
+    return get_meeting_index(output_dir).reindex()
+
+
+if __name__ == "__main__":
+    import sys
+    from logger_config import setup_logging
+
+    setup_logging(log_dir=None, queued=False)
+
+    if len(sys.argv) < 2 or sys.argv[1] != "--reindex":
+        print("Usage:")
+        print("  python meeting_index.py --reindex [output_dir]")
+        sys.exit(1)
+
+    target = sys.argv[2] if len(sys.argv) > 2 else "./output"
+    print(f"Reindexed {reindex_meetings(target)} meetings in {target}")
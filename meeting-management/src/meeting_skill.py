@@ -38,13 +38,25 @@ import hashlib
 import os
 from pathlib import Path
 from datetime import datetime
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, Union, BinaryIO
 from dataclasses import dataclass, field
 
-from ai_minutes_generator import filter_noise_words, NOISE_WORDS
+from meeting_index import get_meeting_index, reindex_meetings
+from services.incremental_transcriber import IncrementalTranscriber
+from services.audio_decoder import decode_pcm
+from services.model_registry import model_registry
+from services.text_postprocess import postprocess_segments, to_simplified
+from services.session_state import session_store, owner_key, NODE_URL, WORKER_ID
+from services.chunk_journal import ChunkJournal, JOURNAL_NAME, find_unfinished_journals, replay_journal
+from services.metrics import DOCX_RENDER_SECONDS, TRANSCRIBE_RTF
+from services.tracing import span, traced
+from services.meeting_export import atomic_write, link_or_copy, run_parallel
+from logger_config import get_logger
 
 warnings.filterwarnings("ignore")
 
+logger = get_logger(__name__)
+
 # ============ 配置读取 ============
 
 # Whisper 模型配置（从环境变量读取，提供默认值）
@@ -53,40 +65,16 @@ WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "auto")  # cpu/cuda/auto
 WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8")  # int8/float16/float32
 WHISPER_LANGUAGE = os.getenv("WHISPER_LANGUAGE", "zh")  # zh/en/auto
 
-# 繁简转换配置
-ENABLE_SIMPLIFIED_CHINESE = os.getenv("ENABLE_SIMPLIFIED_CHINESE", "true").lower() == "true"
-
-# 繁简转换器（延迟初始化）
-_opencc_converter = None
-
-def _get_opencc_converter():
-    """获取opencc繁简转换器（延迟加载）"""
-    global _opencc_converter
-    if _opencc_converter is None and ENABLE_SIMPLIFIED_CHINESE:
-        try:
-            import opencc
-            _opencc_converter = opencc.OpenCC('t2s')  # 繁体转简体
-            print("[Info] 繁简转换已启用")
-        except ImportError:
-            print("[Warning] opencc-python未安装，繁简转换未启用。安装: pip install opencc-python-reimplemented")
-            return None
-    return _opencc_converter
+# 模拟转写（压测 / 联调）：实时转写不加载 Whisper，每轮按新增音频生成一条模拟片段
+MOCK_TRANSCRIPTION = os.getenv("MOCK_TRANSCRIPTION", "false").lower() == "true"
+MOCK_LATENCY_MS = int(os.getenv("MOCK_LATENCY_MS", "500"))  # 模拟转写延迟
+_MOCK_BYTES_PER_SECOND = 4000  # 按 MediaRecorder opus 约 32kbps 估算音频时长
 
+# 繁简转换（ENABLE_SIMPLIFIED_CHINESE，转换器进程内共享，见 services/text_postprocess.py）
 
 def convert_to_simplified(text: str) -> str:
     """将繁体中文转换为简体中文"""
-    if not ENABLE_SIMPLIFIED_CHINESE or not text:
-        return text
-    
-    converter = _get_opencc_converter()
-    if converter is None:
-        return text
-    
-    try:
-        return converter.convert(text)
-    except Exception as e:
-        print(f"[Warning] 繁简转换失败: {e}")
-        return text
+    return to_simplified(text)
 
 
 def _detect_device() -> str:
@@ -287,31 +275,47 @@ def transcribe(audio_path: str, model: str = "auto", language: str = "zh") -> Di
             "model_used": "small"  # 实际使用的模型
         }
     """
-    from faster_whisper import WhisperModel
-    
     # 自动选择模型：优先使用环境变量配置
     if model == "auto":
         model = WHISPER_MODEL  # 使用环境变量配置
-        print(f"[Info] 使用Whisper模型: {model} (设备: {_detect_device()})")
+        logger.info(f"使用Whisper模型: {model} (设备: {_detect_device()})")
     
     if not Path(audio_path).exists():
         raise FileNotFoundError(f"Audio file not found: {audio_path}")
     
-    # 使用环境变量配置的设备
-    device = _detect_device()
-    compute_type = _get_compute_type(device)
-    model_obj = WhisperModel(model, device=device, compute_type=compute_type)
     # 语言设置优先使用环境变量
     effective_language = WHISPER_LANGUAGE if WHISPER_LANGUAGE != "auto" else language
-    segments, info = model_obj.transcribe(audio_path, beam_size=5, language=effective_language)
+    # 从共享模型池借出（生成器需在借出期间消费完）
+    with _whisper_model(model) as model_obj:
+        segments, info = model_obj.transcribe(audio_path, beam_size=5, language=effective_language)
+        segments = [{"start": s.start, "end": s.end, "text": s.text} for s in segments]
+    
+    return build_transcript(
+        segments,
+        duration=info.duration or 0,
+        language=info.language,
+        model_used=model
+    )
+
+
+def build_transcript(segments: List[Dict[str, Any]], duration: float, language: str,
+                     model_used: str) -> Dict[str, Any]:
+    """
+    将 Whisper 片段整理为 transcribe() 的返回结构
     
+    Args:
+        segments: [{"start": 秒, "end": 秒, "text": "..."}]，按时间升序
+        duration: 音频时长（秒）
+        language: 识别语言
+        model_used: 使用的模型
+    """
     result_segments = []
     speakers = set()
     full_text_parts = []
     
     for i, segment in enumerate(segments):
-        start_time = segment.start
-        text = segment.text.strip()
+        start_time = segment["start"]
+        text = segment["text"].strip()
         
         hours = int(start_time // 3600)
         minutes = int((start_time % 3600) // 60)
@@ -330,6 +334,8 @@ def transcribe(audio_path: str, model: str = "auto", language: str = "zh") -> Di
         
         result_segments.append({
             "timestamp": time_str,
+            "start": segment["start"],
+            "end": segment["end"],
             "speaker": speaker,
             "text": text
         })
@@ -340,9 +346,9 @@ def transcribe(audio_path: str, model: str = "auto", language: str = "zh") -> Di
         "segments": result_segments,
         "full_text": "\n".join(full_text_parts),
         "participants": list(speakers),
-        "duration": int(info.duration) if info.duration else 0,
-        "language": info.language,
-        "model_used": model  # 返回实际使用的模型
+        "duration": int(duration) if duration else 0,
+        "language": language,
+        "model_used": model_used  # 返回实际使用的模型
     }
 
 
@@ -445,7 +451,9 @@ def generate_minutes(
     audio_path: Optional[str] = None,
     version: int = 1,
     use_ai: bool = True,
-    detail_level: str = "detailed"
+    detail_level: str = "detailed",
+    draft: Optional[Dict[str, Any]] = None,
+    draft_tail: str = ""
 ) -> Meeting:
     """
     生成会议纪要（现在使用 DeepSeek AI）
@@ -455,6 +463,8 @@ def generate_minutes(
         title: 会议标题
         use_ai: 是否使用 AI 生成（默认 True）
         detail_level: 纪要详细程度，"detailed"(详细) 或 "concise"(简洁)
+        draft: 会议进行中的纪要草稿，提供时只合并草稿和 draft_tail
+        draft_tail: 草稿之后的尾部转写
         ... 其他参数
         
     Returns:
@@ -476,7 +486,10 @@ def generate_minutes(
         try:
             from ai_minutes_generator import generate_minutes_with_ai
             
-            ai_result = generate_minutes_with_ai(transcription, title_hint=title, detail_level=detail_level)
+            ai_result = generate_minutes_with_ai(
+                transcription, title_hint=title, detail_level=detail_level,
+                draft=draft, draft_tail=draft_tail
+            )
             
             if ai_result:
                 # 使用 AI 生成的标题（如果未提供）
@@ -526,7 +539,7 @@ def generate_minutes(
                 return meeting
                 
         except Exception as e:
-            print(f"[generate_minutes] AI 生成失败，降级到骨架模式: {e}")
+            logger.warning(f"AI 生成纪要失败，降级到骨架模式: {e}")
     
     # 降级：返回骨架（AI 失败或 use_ai=False）
     return create_meeting_skeleton(
@@ -570,48 +583,48 @@ def save_meeting(
     
     meeting_dir.mkdir(parents=True, exist_ok=True)
     
-    # 保存 JSON（含版本号）
     json_path = meeting_dir / f"minutes_v{meeting.version}.json"
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(meeting.to_dict(), f, ensure_ascii=False, indent=2)
-    
-    # 保存 Word
     docx_path = meeting_dir / f"minutes_v{meeting.version}.docx"
-    _create_word_document(meeting, docx_path)
+    # 更新最新版本链接
+    latest_json = meeting_dir / "minutes_latest.json"
+    latest_docx = meeting_dir / "minutes_latest.docx"
     
-    # Windows 不支持 symlink，直接复制（带重试解决 WinError 32）
-    import shutil
-    import time
+    def export_json():
+        data = json.dumps(meeting.to_dict(), ensure_ascii=False, indent=2).encode("utf-8")
+        atomic_write(json_path, lambda f: f.write(data))
+        link_or_copy(json_path, latest_json)
     
-    def copy_with_retry(src, dst, max_retries=5):
-        for attempt in range(max_retries):
-            try:
-                shutil.copy2(src, dst)
-                return True
-            except PermissionError:
-                if attempt < max_retries - 1:
-                    print(f"[WARN] 复制文件被占用 {src.name}，{attempt+1}/{max_retries} 重试...")
-                    time.sleep(0.5)
-                else:
-                    raise
-    
-    # 备份录音（带重试）
+    def export_docx():
+        with span("docx.render", meeting_id=meeting.id), DOCX_RENDER_SECONDS.time():
+            atomic_write(docx_path, lambda f: _create_word_document(meeting, f))
+        link_or_copy(docx_path, latest_docx)
+    
+    # 备份录音（硬链接 / reflink，不支持时复制）
     audio_backup_path = None
     if meeting.audio_path and Path(meeting.audio_path).exists():
-        audio_name = Path(meeting.audio_path).name
-        audio_backup_path = meeting_dir / f"audio_{audio_name}"
-        try:
-            copy_with_retry(Path(meeting.audio_path), audio_backup_path)
-        except PermissionError:
-            print(f"[WARN] 音频文件备份失败，跳过")
-            audio_backup_path = None
+        audio_backup_path = meeting_dir / f"audio_{Path(meeting.audio_path).name}"
     
-    # 更新最新版本链接
-    latest_json = meeting_dir / "minutes_latest.json"
-    latest_docx = meeting_dir / "minutes_latest.docx"
+    def backup_audio():
+        with span("audio.backup", meeting_id=meeting.id) as backup_span:
+            try:
+                backup_span.set_attribute("method", link_or_copy(Path(meeting.audio_path), audio_backup_path))
+                return True
+            except OSError as e:
+                logger.warning(f"音频文件备份失败，跳过: {e}")
+                return False
     
-    copy_with_retry(json_path, latest_json)
-    copy_with_retry(docx_path, latest_docx)
+    # JSON / Word / 录音备份并行，各文件原子替换
+    jobs = {"json": export_json, "docx": export_docx}
+    if audio_backup_path:
+        jobs["audio"] = backup_audio
+    if not run_parallel(jobs).get("audio"):
+        audio_backup_path = None
+    
+    # 更新会议索引（query_meetings / update_meeting 查找用）
+    # 实时会议结束时直接写入会议目录（create_version=False），索引根目录从目录结构推出
+    index_root = output_dir if create_version else _index_root_of(meeting_dir)
+    if index_root is not None:
+        get_meeting_index(str(index_root)).upsert(meeting.to_dict(), meeting_dir)
     
     # 保存到全局台账
     _append_to_action_registry(meeting, output_dir)
@@ -628,6 +641,14 @@ def save_meeting(
     return result
 
 
+def _index_root_of(meeting_dir: Path) -> Optional[Path]:
+    """{root}/meetings/YYYY/MM/{meeting_id} -> root；不在会议目录树中时返回 None"""
+    parents = Path(meeting_dir).parents
+    if len(parents) > 3 and parents[2].name == "meetings":
+        return parents[3]
+    return None
+
+
 def update_meeting(
     meeting_id: str,
     output_dir: str = "./output",
@@ -731,51 +752,22 @@ def query_meetings(
     Returns:
         Meeting 列表
     """
-    meetings_dir = Path(output_dir) / "meetings"
     results = []
-    
-    if not meetings_dir.exists():
+    if not (Path(output_dir) / "meetings").exists():
         return results
     
-    # 遍历所有会议目录
-    for year_dir in meetings_dir.iterdir():
-        if not year_dir.is_dir():
+    # 走索引过滤（日期/参会人/关键词），只读取命中会议的 JSON，结果已按日期倒序
+    index = get_meeting_index(output_dir)
+    for meeting_id, latest_json in index.query(date_range, participants, keywords):
+        try:
+            with open(latest_json, "r", encoding="utf-8") as f:
+                results.append(json.load(f))
+        except FileNotFoundError:
+            # 目录已被手工删除，清理索引
+            index.remove(meeting_id)
+        except Exception:
             continue
-        for month_dir in year_dir.iterdir():
-            if not month_dir.is_dir():
-                continue
-            for meeting_dir in month_dir.iterdir():
-                if not meeting_dir.is_dir():
-                    continue
-                
-                latest_json = meeting_dir / "minutes_latest.json"
-                if not latest_json.exists():
-                    continue
-                
-                try:
-                    with open(latest_json, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                    
-                    # 过滤条件
-                    if date_range:
-                        if not (date_range[0] <= data.get("date", "") <= date_range[1]):
-                            continue
-                    
-                    if participants:
-                        if not any(p in data.get("participants", []) for p in participants):
-                            continue
-                    
-                    if keywords:
-                        text = json.dumps(data, ensure_ascii=False)
-                        if not any(kw in text for kw in keywords):
-                            continue
-                    
-                    results.append(data)
-                except Exception:
-                    continue
     
-    # 按日期排序
-    results.sort(key=lambda x: x.get("date", ""), reverse=True)
     return results
 
 
@@ -839,8 +831,8 @@ def _extract_participants_basic(segments: List[Dict]) -> List[str]:
     return first_text[:20] if len(first_text) <= 20 else first_text[:20] + "..."
 
 
-def _create_word_document(meeting: Meeting, docx_path: Path):
-    """创建 Word 文档"""
+def _create_word_document(meeting: Meeting, docx_path: Union[Path, BinaryIO]):
+    """创建 Word 文档（docx_path 可以是路径或已打开的二进制文件）"""
     from docx import Document
     from docx.enum.text import WD_ALIGN_PARAGRAPH
     from docx.shared import Pt
@@ -929,22 +921,33 @@ def _create_word_document(meeting: Meeting, docx_path: Path):
         doc.add_heading("五、附件", level=1)
         doc.add_paragraph(f"录音文件：{Path(meeting.audio_path).name}")
     
-    doc.save(str(docx_path))
+    doc.save(str(docx_path) if isinstance(docx_path, Path) else docx_path)
 
 
 def _find_meeting_dir(meeting_id: str, output_dir: str) -> Optional[Path]:
-    """查找会议目录"""
+    """查找会议目录（索引主键查找，未命中时回退目录扫描并补录索引）"""
     meetings_dir = Path(output_dir) / "meetings"
     
     if not meetings_dir.exists():
         return None
     
-    # 遍历查找
-    for year_dir in meetings_dir.iterdir():
-        for month_dir in year_dir.iterdir():
-            for meeting_dir in month_dir.iterdir():
-                if meeting_dir.name == meeting_id:
-                    return meeting_dir
+    index = get_meeting_index(output_dir)
+    meeting_dir = index.find_dir(meeting_id)
+    if meeting_dir is not None and meeting_dir.exists():
+        return meeting_dir
+    
+    # 索引未收录（手工拷入的目录等），回退扫描 YYYY/MM/{id}
+    for candidate in meetings_dir.glob(f"*/*/{meeting_id}"):
+        latest_json = candidate / "minutes_latest.json"
+        if latest_json.exists():
+            try:
+                with open(latest_json, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                data.setdefault("id", meeting_id)
+                index.upsert(data, candidate)
+            except Exception as e:
+                logger.warning(f"补录会议索引失败: {e}")
+        return candidate
     
     return None
 
@@ -984,30 +987,212 @@ def _append_to_action_registry(meeting: Meeting, output_dir: str):
 
 # ============ 音频流处理（新增） ============
 
-import tempfile
 import time
 from typing import BinaryIO
 
-# 全局会话管理器：meeting_id -> session数据
+# 进程内会话句柄：meeting_id -> session数据（文件句柄、增量转写器等无法序列化的部分）
+# 游标和元数据同步到共享会话状态（services/session_state.py），其他 worker / 重启后可 resume
+# 每个会话同时写音频块日志（services/chunk_journal.py），进程崩溃后启动时从日志恢复；
+# 已确认的转写片段和纪要草稿只记在日志里（随会议增长），resume 时从会议目录下的日志重放
 _audio_sessions: Dict[str, dict] = {}
 
-# Whisper模型缓存（延迟加载）
-_whisper_model = None
+# 实时会议的输出根目录
+LIVE_MEETINGS_DIR = Path("./output/meetings")
 
+# 音频写入后同步会话快照的最小间隔（秒），转写 / 草稿更新后立即同步
+SESSION_SYNC_INTERVAL = float(os.getenv("SESSION_SYNC_INTERVAL", "5"))
 
-def _get_whisper_model():
-    """获取Whisper模型（延迟加载）"""
-    global _whisper_model
-    if _whisper_model is None:
-        from faster_whisper import WhisperModel
-        
-        device = _detect_device()
-        compute_type = _get_compute_type(device)
-        model = WHISPER_MODEL
-        
-        print(f"[Info] 加载Whisper模型: {model}, 设备: {device}, 精度: {compute_type}")
-        _whisper_model = WhisperModel(model, device=device, compute_type=compute_type)
-    return _whisper_model
+
+# 只记在音频块日志里的字段（大小随会议时长增长，不进会话快照）
+_JOURNAL_ONLY_FIELDS = ("transcript_parts", "minutes_draft")
+
+
+def _session_snapshot(session: dict) -> Dict[str, Any]:
+    """会话快照：元数据和游标（大小固定，转写片段和纪要草稿见音频块日志）"""
+    return {
+        "audio_path": session["audio_path"],
+        "meeting_dir": session["meeting_dir"],
+        "title": session["title"],
+        "user_id": session["user_id"],
+        "start_time": session["start_time"].isoformat(),
+        "chunk_count": session["chunk_count"],
+        "last_sequence": session["last_sequence"],
+        "transcript_count": len(session["transcript_parts"]),
+        "transcript_cursor": session["transcriber"].cursor,
+        "draft_cursor": session["draft_cursor"],
+        "worker_id": WORKER_ID,
+        "node_url": NODE_URL,
+    }
+
+
+def _journal_state(meeting_dir: str) -> Optional[Dict[str, Any]]:
+    """重放会议目录下的音频块日志（没有或读取失败时返回 None）"""
+    path = Path(meeting_dir) / JOURNAL_NAME
+    if not path.exists():
+        return None
+    try:
+        return replay_journal(path)
+    except OSError as e:
+        logger.warning(f"读取音频块日志失败: {e}")
+        return None
+
+
+def _sync_session(meeting_id: str, force: bool = True):
+    """把会话快照写入共享会话状态（失败只记录，不影响录音）"""
+    session = _audio_sessions.get(meeting_id)
+    if session is None:
+        return
+    now = time.time()
+    if not force and now - session.get("synced_at", 0) < SESSION_SYNC_INTERVAL:
+        return
+    session["synced_at"] = now
+    try:
+        session_store.save_state(meeting_id, _session_snapshot(session))
+    except Exception as e:
+        logger.warning(f"同步会话状态失败: {e}")
+
+
+def _close_file_handle(session: dict):
+    fh = session.get("file_handle")
+    if fh and not fh.closed:
+        try:
+            fh.flush()
+            fh.close()
+        except Exception as e:
+            logger.warning(f"关闭会话文件句柄失败: {e}")
+    session["file_handle"] = None
+
+
+def _close_journal(journal: Optional[ChunkJournal], finished: bool = False):
+    if journal is not None:
+        try:
+            journal.close(finished=finished)
+        except Exception as e:
+            logger.warning(f"关闭音频块日志失败: {e}")
+
+
+def _journal_call(session: dict, method: str, *args):
+    """写音频块日志（失败只记录，不影响录音）"""
+    journal = session.get("journal")
+    if journal is None:
+        return
+    try:
+        getattr(journal, method)(*args)
+    except Exception as e:
+        logger.warning(f"写音频块日志失败: {e}")
+
+
+def recover_meeting_sessions(root: Path = LIVE_MEETINGS_DIR) -> int:
+    """
+    启动时从音频块日志恢复未结束的会议（进程崩溃 / 重启）
+
+    音频文件截断到日志记录的最后偏移（之后的块由客户端 resume 后重发），
+    恢复的状态写入共享会话状态，客户端 resume 时由 restore_meeting_session 接管；
+    属于其他存活 worker 的会话跳过
+
+    Returns:
+        恢复的会议数
+    """
+    recovered = 0
+    for path, state in find_unfinished_journals(root):
+        meeting_id = state.get("meeting_id")
+        if not meeting_id or meeting_id in _audio_sessions:
+            continue
+        holder = session_store.holder(owner_key(meeting_id))
+        if holder is not None and holder != WORKER_ID:
+            continue
+
+        audio_path = Path(state["audio_path"])
+        if not audio_path.exists():
+            continue
+        size = audio_path.stat().st_size
+        if size > state["audio_offset"]:
+            with open(audio_path, "r+b") as f:
+                f.truncate(state["audio_offset"])
+        state["audio_offset"] = min(size, state["audio_offset"])
+        state.pop("closed", None)
+        session_store.save_state(
+            meeting_id, {k: v for k, v in state.items() if k not in _JOURNAL_ONLY_FIELDS}
+        )
+        recovered += 1
+        logger.info(f"从日志恢复会议 {meeting_id}: 音频 {state['audio_offset']} bytes, "
+              f"最后序号 {state['last_sequence']}, 片段 {len(state['transcript_parts'])}")
+    return recovered
+
+
+def restore_meeting_session(meeting_id: str) -> Optional[str]:
+    """
+    从共享会话状态恢复会话（worker 重启 / 崩溃后客户端 resume 重连）
+
+    音频文件继续追加写入，增量转写从保存的游标继续（只转写尾部）；
+    已确认的片段和纪要草稿从音频块日志重放（连同各自的游标，保证与片段一致）
+
+    Returns:
+        audio文件路径；没有可恢复的会话或音频文件已不存在时返回 None
+    """
+    state = session_store.load_state(meeting_id)
+    if state is None or not Path(state["audio_path"]).exists():
+        return None
+    replayed = _journal_state(state["meeting_dir"])
+    if replayed is not None:
+        for key in (*_JOURNAL_ONLY_FIELDS, "transcript_cursor", "draft_cursor"):
+            state[key] = replayed[key]
+
+    old_session = _audio_sessions.pop(meeting_id, None)
+    if old_session is not None:
+        _close_file_handle(old_session)
+        _close_journal(old_session.get("journal"))
+
+    transcriber = IncrementalTranscriber(state["audio_path"])
+    transcriber.cursor = state.get("transcript_cursor", 0.0)
+    _audio_sessions[meeting_id] = {
+        "audio_path": state["audio_path"],
+        "meeting_dir": state["meeting_dir"],
+        "title": state["title"],
+        "user_id": state["user_id"],
+        "start_time": datetime.fromisoformat(state["start_time"]),
+        "last_chunk_time": 0,
+        "chunk_count": state.get("chunk_count", 0),
+        "last_sequence": state.get("last_sequence"),
+        "file_handle": None,
+        "transcript_parts": state.get("transcript_parts", []),
+        "transcriber": transcriber,
+        "minutes_draft": state.get("minutes_draft"),
+        "draft_cursor": state.get("draft_cursor", 0),
+        # 继续追加到原日志
+        "journal": ChunkJournal(Path(state["meeting_dir"]) / JOURNAL_NAME),
+    }
+    _sync_session(meeting_id)
+    logger.info(f"会话 {meeting_id} 已恢复: 片段 {len(state.get('transcript_parts', []))}, "
+          f"转写游标 {transcriber.cursor:.1f}s")
+    return state["audio_path"]
+
+
+def get_meeting_session(meeting_id: str) -> Optional[dict]:
+    """进程内会话（没有时返回 None）"""
+    return _audio_sessions.get(meeting_id)
+
+
+def discard_meeting_session(meeting_id: str):
+    """丢弃会话（关闭文件句柄和日志，删除共享会话状态），用于没有录到音频就断开的会议"""
+    session = _audio_sessions.pop(meeting_id, None)
+    if session is not None:
+        _close_file_handle(session)
+        _close_journal(session.get("journal"), finished=True)
+    try:
+        session_store.delete_state(meeting_id)
+    except Exception as e:
+        logger.warning(f"删除会话状态失败: {e}")
+
+
+def _whisper_model(model: Optional[str] = None):
+    """
+    从共享模型池借出 Whisper 模型（上下文管理器）
+    
+    按 (模型大小, 设备, 精度) 复用已加载实例，启动时已预热，请求不承担加载开销
+    """
+    device = _detect_device()
+    return model_registry.checkout(model or WHISPER_MODEL, device, _get_compute_type(device))
 
 
 def init_meeting_session(meeting_id: str, title: str = "", user_id: str = "anonymous", db_session=None) -> str:
@@ -1027,16 +1212,17 @@ def init_meeting_session(meeting_id: str, title: str = "", user_id: str = "anony
     
     # 【关键】如果同名会话已存在，强制关闭旧文件句柄（防止WinError 32）
     if meeting_id in _audio_sessions:
-        print(f"[WARN] 会话 {meeting_id} 已存在，强制清理旧会话...")
+        logger.warning(f"会话 {meeting_id} 已存在，强制清理旧会话...")
         old_session = _audio_sessions[meeting_id]
         fh = old_session.get("file_handle")
         if fh and not fh.closed:
             try:
                 fh.flush()
                 fh.close()
-                print(f"[INFO] 旧会话文件句柄已关闭")
+                logger.info("旧会话文件句柄已关闭")
             except Exception as e:
-                print(f"[WARN] 关闭旧会话文件句柄失败: {e}")
+                logger.warning(f"关闭旧会话文件句柄失败: {e}")
+        _close_journal(old_session.get("journal"))
         # 等待Windows释放文件锁
         import time
         time.sleep(0.5)
@@ -1047,7 +1233,7 @@ def init_meeting_session(meeting_id: str, title: str = "", user_id: str = "anony
     
     # 创建目录 output/meetings/YYYY/MM/{meeting_id}/
     now = datetime.now()
-    meeting_dir = Path("./output/meetings") / now.strftime("%Y") / now.strftime("%m") / meeting_id
+    meeting_dir = LIVE_MEETINGS_DIR / now.strftime("%Y") / now.strftime("%m") / meeting_id
     meeting_dir.mkdir(parents=True, exist_ok=True)
     
     audio_path = meeting_dir / "audio.webm"
@@ -1055,6 +1241,17 @@ def init_meeting_session(meeting_id: str, title: str = "", user_id: str = "anony
     # 初始化音频文件（空文件，追加模式后续写入）
     audio_path.touch()
     
+    # 音频块日志（崩溃恢复）
+    journal = ChunkJournal(meeting_dir / JOURNAL_NAME)
+    journal.open_session({
+        "meeting_id": meeting_id,
+        "title": title,
+        "user_id": user_id,
+        "start_time": now.isoformat(),
+        "audio_path": str(audio_path),
+        "offset": audio_path.stat().st_size,
+    })
+    
     # 内存会话记录
     _audio_sessions[meeting_id] = {
         "audio_path": str(audio_path),
@@ -1064,9 +1261,15 @@ def init_meeting_session(meeting_id: str, title: str = "", user_id: str = "anony
         "start_time": now,
         "last_chunk_time": 0,  # 上次转写时间戳
         "chunk_count": 0,
+        "last_sequence": None,  # 最后写入的音频块序号（resume 时返回给客户端）
         "file_handle": None,  # 懒加载
-        "transcript_parts": [],  # 转写结果片段，用于最终拼接
+        "transcript_parts": [],  # 已确认的转写片段 [{start, end, text}]，互不重叠
+        "transcriber": IncrementalTranscriber(str(audio_path)),  # 增量转写游标
+        "minutes_draft": None,  # 会议进行中的纪要草稿（MinutesDrafter 更新）
+        "draft_cursor": 0,  # 草稿已覆盖的 transcript_parts 数量
+        "journal": journal,
     }
+    _sync_session(meeting_id)
     
     # 数据库插入记录（如果提供了db_session）
     if db_session is not None:
@@ -1091,127 +1294,226 @@ def _get_file_handle(meeting_id: str) -> BinaryIO:
 
 def transcribe_bytes(audio_bytes: bytes, mime_type: str = "audio/webm") -> Dict[str, Any]:
     """
-    直接转写音频bytes（不落盘临时文件）
+    直接转写音频bytes（内存解码，不落盘临时文件）
     
     Args:
         audio_bytes: 音频数据
-        mime_type: 音频格式
+        mime_type: 音频格式（仅作记录，容器格式由 PyAV 自动探测）
     
     Returns:
         {"segments": [...], "full_text": "...", "language": "zh"}
     """
-    model = _get_whisper_model()
+    # 内存解码为 16kHz float32 数组，直接交给 faster-whisper
+    _, pcm = decode_pcm(audio_bytes)
+    if len(pcm) == 0:
+        logger.warning(f"音频解码为空 ({mime_type}, {len(audio_bytes)} bytes)")
+        return {"segments": [], "full_text": "", "language": "zh"}
+    
+    with _whisper_model() as model:
+        segments, info = model.transcribe(pcm, beam_size=5, language="zh")
+        segments = list(segments)
+    # 过滤噪声词 + 繁简转换（全部片段一次处理）
+    texts = postprocess_segments([seg.text.strip() for seg in segments])
+    results = [
+        {"start": seg.start, "end": seg.end, "text": text}
+        for seg, text in zip(segments, texts)
+    ]
+    full_text = " ".join(text for text in texts if text)
     
-    # faster-whisper需要文件路径，用临时文件
-    suffix = ".webm" if "webm" in mime_type else ".wav"
-    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
-        f.write(audio_bytes)
-        temp_path = f.name
+    return {
+        "segments": results,
+        "full_text": full_text,
+        "language": info.language
+    }
+
+
+def _transcribe_new_segments(session: dict, final: bool = False) -> List[Dict[str, Any]]:
+    """
+    增量转写会话中新到达的音频
+    
+    Args:
+        session: _audio_sessions 中的会话数据
+        final: 是否最后一轮（会议结束，确认全部剩余内容）
     
+    Returns:
+        新确认的片段 [{"start": 秒, "end": 秒, "text": "..."}]（已过滤噪声词、繁简转换）
+    """
+    if MOCK_TRANSCRIPTION:
+        return _mock_new_segments(session)
+    
+    transcriber: IncrementalTranscriber = session["transcriber"]
+    with _whisper_model() as model:
+        start = time.perf_counter()
+        committed = transcriber.step(model, final=final)
+        if transcriber.last_window > 0:
+            TRANSCRIBE_RTF.observe(
+                (time.perf_counter() - start) / transcriber.last_window, model=WHISPER_MODEL, mode="live"
+            )
+    
+    with span("postprocess", segments=len(committed)):
+        texts = postprocess_segments([seg["text"] for seg in committed])
+    return [
+        {"start": seg["start"], "end": seg["end"], "text": text}
+        for seg, text in zip(committed, texts)
+        if text
+    ]
+
+
+def _mock_new_segments(session: dict) -> List[Dict[str, Any]]:
+    """MOCK_TRANSCRIPTION：按新增音频字节估算时长，生成一条模拟片段（不解码、不加载模型）"""
+    transcriber: IncrementalTranscriber = session["transcriber"]
+    size = transcriber.audio_path.stat().st_size if transcriber.audio_path.exists() else 0
+    end = size / _MOCK_BYTES_PER_SECOND
+    if end <= transcriber.cursor:
+        return []
+    
+    time.sleep(MOCK_LATENCY_MS / 1000)
+    segment = {
+        "start": transcriber.cursor,
+        "end": end,
+        "text": f"模拟转写片段 {len(transcriber.segments) + 1}"
+    }
+    transcriber.segments.append(segment)
+    transcriber.cursor = end
+    return [segment]
+
+
+def write_audio_chunks(meeting_id: str, chunks: List[Union[bytes, memoryview]],
+                       last_sequence: Optional[int] = None) -> int:
+    """
+    只追加写入音频块，不触发转写（WebSocket 接收管道的写入任务调用）
+    
+    写入后记录音频块日志（序号、字节偏移），按批 fsync
+    
+    Args:
+        meeting_id: 会议ID
+        chunks: 按序的音频块（二进制帧路径为 memoryview，直接写入不复制）
+        last_sequence: 本批最后一个块的序号
+    
+    Returns:
+        累计接收的块数
+    """
+    session = _audio_sessions.get(meeting_id)
+    if session is None:
+        raise ValueError(f"Meeting session not found: {meeting_id}")
+    
+    f = _get_file_handle(meeting_id)
+    start = f.tell()
     try:
-        segments, info = model.transcribe(temp_path, beam_size=5, language="zh")
-        results = []
-        full_text_parts = []
-        
-        for seg in segments:
-            text = seg.text.strip()
-            results.append({
-                "start": seg.start,
-                "end": seg.end,
-                "text": text
-            })
-            full_text_parts.append(text)
-        
-        full_text = " ".join(full_text_parts)
-        # 过滤噪声词
-        full_text = filter_noise_words(full_text)
-        # 繁简转换
-        full_text = convert_to_simplified(full_text)
-        for r in results:
-            r["text"] = convert_to_simplified(r["text"])
-        
-        return {
-            "segments": results,
-            "full_text": full_text,
-            "language": info.language
-        }
+        for chunk in chunks:
+            f.write(chunk)
+        f.flush()
+    except Exception:
+        # 截掉写了一半的数据，接收管道重试时不会重复追加
+        _rollback_audio(session, start)
+        raise
+    
+    session["chunk_count"] += len(chunks)
+    if last_sequence is not None:
+        session["last_sequence"] = last_sequence
+    _journal_call(session, "record_chunks", last_sequence, len(chunks), f.tell(), f)
+    _sync_session(meeting_id, force=False)
+    return session["chunk_count"]
+
+
+def _rollback_audio(session: Dict[str, Any], offset: int):
+    """丢弃文件句柄中未落盘的缓冲，音频文件截断到 offset（下次写入时重新打开句柄）"""
+    f = session.get("file_handle")
+    session["file_handle"] = None
+    if f is not None:
+        try:
+            f.close()
+        except OSError:
+            pass
+    try:
+        os.truncate(session["audio_path"], offset)
+    except OSError as e:
+        logger.warning(f"截断音频文件失败: {e}")
+
+
+def transcribe_audio_session(meeting_id: str) -> Optional[str]:
+    """
+    对会话中已落盘的新音频做一次增量转写（与写入并发安全：只读取调用时已写入的部分）
+    
+    Returns:
+        新转写文本，没有新内容时返回 None
+    """
+    session = _audio_sessions.get(meeting_id)
+    if session is None:
+        raise ValueError(f"Meeting session not found: {meeting_id}")
+    
+    try:
+        # 增量转写：只处理游标之后的新音频 + 重叠窗口
+        with span("transcribe.window", meeting_id=meeting_id) as window:
+            new_segments = _transcribe_new_segments(session)
+            window.set_attribute("segments", len(new_segments))
+        session["transcript_parts"].extend(new_segments)
+        if new_segments:
+            _journal_call(session, "record_transcript", new_segments, session["transcriber"].cursor)
+            _sync_session(meeting_id)
+        return " ".join(seg["text"] for seg in new_segments) or None
+    except Exception as e:
+        logger.warning(f"转写失败: {e}")
+        return None
     finally:
-        Path(temp_path).unlink(missing_ok=True)
+        # 记录转写时间（无论成功与否，避免重复触发）
+        session["last_chunk_time"] = time.time()
 
 
-def append_audio_chunk(meeting_id: str, chunk_bytes: bytes, sequence: int, 
+def read_live_transcript(meeting_id: str, start: int = 0) -> Tuple[str, int]:
+    """
+    读取第 start 个片段之后的实时转写
+    
+    Returns:
+        (拼接文本, 当前片段数)，片段数作为下次读取的游标
+    """
+    session = _audio_sessions.get(meeting_id)
+    if session is None:
+        return "", start
+    parts = session["transcript_parts"][start:]
+    return " ".join(part["text"] for part in parts), start + len(parts)
+
+
+def store_minutes_draft(meeting_id: str, draft: Dict[str, Any], cursor: int):
+    """保存会议进行中的纪要草稿及其覆盖到的片段游标，finalize_meeting 只需合并尾部"""
+    session = _audio_sessions.get(meeting_id)
+    if session is not None:
+        session["minutes_draft"] = draft
+        session["draft_cursor"] = cursor
+        _journal_call(session, "record_draft", draft, cursor)
+        _sync_session(meeting_id)
+
+
+def append_audio_chunk(meeting_id: str, chunk_bytes: Union[bytes, memoryview], sequence: int, 
                        db_session=None) -> Optional[str]:
     """
     追加音频块并触发转写（每30秒触发一次）
     
+    WebSocket 路径已改用 write_audio_chunks + transcribe_audio_session（接收与转写解耦），
+    本函数保留给命令行和测试脚本按块顺序调用
+    
     Args:
         meeting_id: 会议ID
-        chunk_bytes: 音频块数据
+        chunk_bytes: 音频块数据（二进制帧路径传入 memoryview，直接写入不复制）
         sequence: 块序号
         db_session: 数据库会话
     
     Returns:
         转写文本（如触发转写），否则None
     """
-    from models.meeting import TranscriptModel
-    
-    session = _audio_sessions.get(meeting_id)
-    if session is None:
-        raise ValueError(f"Meeting session not found: {meeting_id}")
-    
-    # 追加写入音频文件
-    f = _get_file_handle(meeting_id)
-    f.write(chunk_bytes)
-    f.flush()
-    
-    session["chunk_count"] += 1
-    current_time = time.time()
+    write_audio_chunks(meeting_id, [chunk_bytes], sequence)
+    session = _audio_sessions[meeting_id]
     
     # 检查是否触发转写（每30秒一次）
-    time_since_last = current_time - session["last_chunk_time"]
+    time_since_last = time.time() - session["last_chunk_time"]
     should_transcribe = (session["last_chunk_time"] == 0) or (time_since_last >= 30)
     
-    transcript_text = None
-    
     if should_transcribe:
-        # 读取音频文件内容
-        f.flush()
-        f.close()
-        session["file_handle"] = None
-        
-        try:
-            with open(session["audio_path"], "rb") as rf:
-                audio_data = rf.read()
-            
-            if len(audio_data) > 0:
-                try:
-                    # 转写
-                    result = transcribe_bytes(audio_data)
-                    transcript_text = result.get("full_text", "")
-                    # 过滤噪声词
-                    transcript_text = filter_noise_words(transcript_text)
-                    
-                    # 记录转写结果
-                    if transcript_text:
-                        session["transcript_parts"].append(transcript_text)
-                except Exception as e:
-                    # 转写失败也要更新时间，避免短时间内重复触发
-                    print(f"[WARN] 转写失败: {e}")
-                
-                # 记录转写时间（无论成功与否，避免重复触发）
-                session["last_chunk_time"] = current_time
-                
-                # 保存到数据库（如果提供了db_session）
-                if db_session is not None:
-                    # 异步操作需要await，这里返回数据给调用方处理
-                    pass
-        finally:
-            # 重新打开文件追加（确保句柄不会泄漏）
-            session["file_handle"] = open(session["audio_path"], "ab")
-    
-    return transcript_text
+        return transcribe_audio_session(meeting_id)
+    return None
 
 
+@traced("finalize_meeting")
 def finalize_meeting(meeting_id: str, db_session=None, progress_callback=None) -> dict:
     """
     结束会议，全量转写剩余内容，生成纪要，导出Word
@@ -1228,19 +1530,19 @@ def finalize_meeting(meeting_id: str, db_session=None, progress_callback=None) -
     
     def notify(step: str, message: str):
         """发送进度通知"""
-        print(f"[Progress] {step}: {message}")
+        logger.info(f"[Progress] {step}: {message}")
         if progress_callback:
             try:
                 progress_callback(step, message)
             except Exception as e:
-                print(f"[WARN] 进度回调失败: {e}")
+                logger.warning(f"进度回调失败: {e}")
     
-    print(f"[DEBUG] finalize_meeting 开始: meeting_id={meeting_id}")
+    logger.debug(f"finalize_meeting 开始: meeting_id={meeting_id}")
     notify("start", "开始处理会议结束流程")
     
     session = _audio_sessions.get(meeting_id)
     if session is None:
-        print(f"[ERROR] finalize_meeting 失败: 会议会话不存在 {meeting_id}")
+        logger.error(f"finalize_meeting 失败: 会议会话不存在 {meeting_id}")
         raise ValueError(f"Meeting session not found: {meeting_id}")
     
     notify("closing", "正在关闭音频文件...")
@@ -1250,9 +1552,10 @@ def finalize_meeting(meeting_id: str, db_session=None, progress_callback=None) -
     # 关闭文件句柄
     fh = session.get("file_handle")
     if fh and not fh.closed:
-        print(f"[DEBUG] 关闭文件句柄...")
-        fh.flush()
-        fh.close()
+        logger.debug("关闭文件句柄...")
+        with span("file.close"):
+            fh.flush()
+            fh.close()
     session["file_handle"] = None
     
     # 复制所有需要的数据到局部变量
@@ -1260,11 +1563,14 @@ def finalize_meeting(meeting_id: str, db_session=None, progress_callback=None) -
     meeting_dir = session["meeting_dir"]
     chunk_count = session["chunk_count"]
     transcript_parts = list(session["transcript_parts"])  # 复制一份
+    minutes_draft = session.get("minutes_draft")
+    draft_cursor = session.get("draft_cursor", 0)
+    journal = session.get("journal")
     title = session["title"]
     start_time = session["start_time"]
     
     # 从session字典中删除，彻底断开引用
-    print(f"[DEBUG] 删除会话，彻底释放资源...")
+    logger.debug("删除会话，彻底释放资源...")
     del _audio_sessions[meeting_id]
     
     # Windows需要这个
@@ -1277,93 +1583,109 @@ def finalize_meeting(meeting_id: str, db_session=None, progress_callback=None) -
         time.sleep(0.3)
     
     # 读音频到内存
-    print(f"[DEBUG] 读取音频文件...")
+    logger.debug("读取音频文件...")
     audio_data = b""
-    try:
-        with open(audio_path, "rb") as f:
-            audio_data = f.read()
-        print(f"[DEBUG] 音频文件读取成功: {len(audio_data)} bytes")
-    except PermissionError:
-        print(f"[WARN] 读取被占用，等待1秒重试...")
-        time.sleep(1)
-        with open(audio_path, "rb") as f:
-            audio_data = f.read()
-        print(f"[DEBUG] 音频文件重试读取成功: {len(audio_data)} bytes")
+    with span("file.read") as read_span:
+        try:
+            with open(audio_path, "rb") as f:
+                audio_data = f.read()
+            logger.debug(f"音频文件读取成功: {len(audio_data)} bytes")
+        except PermissionError:
+            logger.warning("读取被占用，等待1秒重试...")
+            time.sleep(1)
+            with open(audio_path, "rb") as f:
+                audio_data = f.read()
+            logger.debug(f"音频文件重试读取成功: {len(audio_data)} bytes")
+        read_span.set_attribute("bytes", len(audio_data))
     
     notify("reading", "正在读取音频数据...")
     
     # ========== 第二步：用内存数据处理，不再碰文件句柄 ==========
     
+    # 转写游标之后的剩余音频（只有尾部，不重转已确认部分）
+    if len(audio_data) > 0:
+        try:
+            with span("transcribe.window", final=True):
+                tail_segments = _transcribe_new_segments(session, final=True)
+            transcript_parts.extend(tail_segments)
+            logger.debug(f"尾部增量转写: {len(tail_segments)} 段")
+        except Exception as e:
+            logger.warning(f"尾部增量转写失败: {e}")
+    
     # 拼接历史转写结果
-    full_transcript = " ".join(transcript_parts)
-    print(f"[DEBUG] 历史转写拼接: {len(full_transcript)} 字符")
-    print(f"[DEBUG] chunk_count={chunk_count}, transcript_parts={len(transcript_parts)}")
+    full_transcript = " ".join(part["text"] for part in transcript_parts)
+    logger.debug(f"历史转写拼接: {len(full_transcript)} 字符")
+    logger.debug(f"chunk_count={chunk_count}, transcript_parts={len(transcript_parts)}")
     notify("transcribe_check", f"已缓存转写: {len(full_transcript)} 字符, 音频块: {chunk_count}")
     
     # 检查音频数据
     if len(audio_data) == 0:
-        print(f"[ERROR] 音频文件为空！")
+        logger.error("音频文件为空！")
         notify("error", "音频文件为空，请检查麦克风权限")
     elif chunk_count == 0:
-        print(f"[ERROR] 未收到音频块！")
+        logger.error("未收到音频块！")
         notify("error", "未收到音频数据，请检查录音是否正常")
     
     # 没转写过就全量转一次
     if not full_transcript and len(audio_data) > 0:
         notify("transcribing", "正在转写音频内容...")
-        print(f"[DEBUG] 无历史转写，执行全量转写...")
+        logger.debug("无历史转写，执行全量转写...")
         try:
-            result = transcribe_bytes(audio_data)
+            with span("transcribe.full", bytes=len(audio_data)):
+                result = transcribe_bytes(audio_data)
             full_transcript = result.get("full_text", "")
-            print(f"[DEBUG] 全量转写完成: {len(full_transcript)} 字符")
+            logger.debug(f"全量转写完成: {len(full_transcript)} 字符")
             notify("transcribed", f"转写完成: {len(full_transcript)} 字符")
         except Exception as e:
-            print(f"[ERROR] 全量转写失败: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error(f"全量转写失败: {e}", exc_info=True)
             full_transcript = ""
             notify("error", "转写失败")
     
     # 生成纪要
     minutes_path = Path(meeting_dir) / "minutes.docx"
-    print(f"[DEBUG] 开始生成纪要，目标路径: {minutes_path}")
+    logger.debug(f"开始生成纪要，目标路径: {minutes_path}")
     notify("generating", "正在生成会议纪要（AI处理中）...")
     
+    # 会议进行中已有草稿：只需合并草稿和草稿之后的尾部转写
+    draft_tail = " ".join(part["text"] for part in transcript_parts[draft_cursor:])
+    if minutes_draft:
+        logger.debug(f"使用纪要草稿，尾部转写: {len(draft_tail)} 字符")
+    
     try:
-        meeting_data = generate_minutes(
-            transcription=full_transcript,
-            meeting_id=meeting_id,
-            title=title,
-            date=start_time.strftime("%Y-%m-%d"),
-            audio_path=str(audio_path),
-            detail_level="detailed"  # 使用详细版模板生成纪要
-        )
-        print(f"[DEBUG] generate_minutes 完成: title={meeting_data.title}, topics={len(meeting_data.topics)}")
+        with span("generate_minutes", chars=len(full_transcript), draft=bool(minutes_draft)):
+            meeting_data = generate_minutes(
+                transcription=full_transcript,
+                meeting_id=meeting_id,
+                title=title,
+                date=start_time.strftime("%Y-%m-%d"),
+                audio_path=str(audio_path),
+                detail_level="detailed",  # 使用详细版模板生成纪要
+                draft=minutes_draft,
+                draft_tail=draft_tail
+            )
+        logger.debug(f"generate_minutes 完成: title={meeting_data.title}, topics={len(meeting_data.topics)}")
         notify("generated", f"纪要生成完成: {meeting_data.title}")
     except Exception as e:
-        print(f"[ERROR] generate_minutes 失败: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.error(f"generate_minutes 失败: {e}", exc_info=True)
         notify("error", "纪要生成失败")
         raise
     
     # 保存Word
     notify("saving", "正在导出Word文档...")
-    print(f"[DEBUG] 开始保存会议纪要...")
+    logger.debug("开始保存会议纪要...")
     try:
-        files = save_meeting(meeting_data, output_dir=meeting_dir, create_version=False)
-        print(f"[DEBUG] save_meeting 完成: files={files}")
+        with span("save_meeting"):
+            files = save_meeting(meeting_data, output_dir=meeting_dir, create_version=False)
+        logger.debug(f"save_meeting 完成: files={files}")
         notify("saved", "文档导出完成")
     except Exception as e:
-        print(f"[ERROR] save_meeting 失败: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.error(f"save_meeting 失败: {e}", exc_info=True)
         notify("error", "文档导出失败")
         raise
     
     # 直接使用 save_meeting 生成的文件路径（避免 shutil.move 触发 WinError 32）
     actual_minutes_path = files.get("docx", minutes_path)
-    print(f"[DEBUG] finalize_meeting 成功完成")
+    logger.debug("finalize_meeting 成功完成")
     
     # 检查是否使用了降级方案
     ai_success = meeting_data.status == "ai_generated"
@@ -1376,6 +1698,10 @@ def finalize_meeting(meeting_id: str, db_session=None, progress_callback=None) -
         else:
             fallback_reason = "AI生成失败，使用基础模板"
     
+    # 纪要已落盘，会话不再需要恢复
+    _close_journal(journal, finished=True)
+    discard_meeting_session(meeting_id)
+    
     return {
         "meeting_id": meeting_id,
         "audio_path": str(audio_path),
@@ -1391,6 +1717,9 @@ def finalize_meeting(meeting_id: str, db_session=None, progress_callback=None) -
 
 if __name__ == "__main__":
     import sys
+    from logger_config import setup_logging
+
+    setup_logging(log_dir=None, queued=False)
     
     if len(sys.argv) < 2:
         print("Usage:")
@@ -1398,6 +1727,7 @@ if __name__ == "__main__":
         print("  python meeting_skill.py --text <transcription_file>")
         print("  python meeting_skill.py --update <meeting_id> --title '新标题'")
         print("  python meeting_skill.py --query --date 2024-11-01")
+        print("  python meeting_skill.py --reindex [output_dir]")
         sys.exit(1)
     
     if sys.argv[1] == "--text":
@@ -1424,6 +1754,10 @@ if __name__ == "__main__":
         for r in results[:5]:
             print(f"  - {r['date']} {r['title']} (v{r['version']})")
     
+    elif sys.argv[1] == "--reindex":
+        target = sys.argv[2] if len(sys.argv) > 2 else "./output"
+        print(f"Reindexed {reindex_meetings(target)} meetings in {target}")
+    
     else:
         result = transcribe(sys.argv[1])
         meeting = generate_minutes(result["full_text"])
@@ -139,6 +139,76 @@ EXECUTIVE_TEMPLATE = """你是一个高级管理顾问。请根据会议转写
 3. 执行摘要控制在50字以内
 4. 突出需要管理层关注和支持的事项"""
 
+# ========== 长会议分段提取（map）/ 合并（reduce）==========
+# 分段要点格式（map 输出，也是中间层合并的输出）
+PARTIAL_FORMAT = """输出格式必须是 JSON：
+{
+    "participants": ["出现的发言人"],
+    "topics": [
+        {
+            "title": "议题标题（不超过20字）",
+            "discussion_points": ["讨论要点"],
+            "conclusion": "达成的结论，没有则留空",
+            "uncertain": ["不确定内容"],
+            "action_items": [
+                {"action": "具体行动", "owner": "负责人", "deadline": "截止日期", "deliverable": "交付物"}
+            ]
+        }
+    ],
+    "risks": ["风险点"],
+    "pending_confirmations": ["待确认事项"]
+}"""
+
+MAP_TEMPLATE = """你是一个专业的会议记录员。下面是一场长会议中按时间顺序截取的一段转写文本，请只提取本段中出现的纪要要点。
+
+""" + PARTIAL_FORMAT + """
+
+规则：
+1. 只记录本段实际出现的内容，绝不编造或推测其他段落
+2. 议题可能在段首/段尾被截断，照常提取，合并阶段会与相邻段落合并
+3. 保留负责人姓名、日期、数字等具体信息"""
+
+# 分段要点过多时先分组合并，输出仍为分段要点格式
+MERGE_TEMPLATE = """你是一个专业的会议记录员。下面是一场长会议中相邻若干段的纪要要点 JSON（按时间顺序），请合并为一份要点。
+
+""" + PARTIAL_FORMAT + """
+
+规则：
+1. 相同或相近的议题合并，讨论要点去重并按时间顺序排列
+2. 行动项、风险点、待确认事项去重，保留最具体的表述
+3. 只使用输入中的内容，绝不编造"""
+
+# 最终合并：模板风格提示词 + 以下规则
+REDUCE_RULES = """
+
+输入说明：会议较长，转写文本已按时间顺序分段提取，输入是各段的纪要要点 JSON（而不是原始转写）。
+合并规则：
+1. 相同或相近的议题合并为一个，讨论要点去重并按时间顺序排列
+2. 行动项、风险点、待确认事项去重，保留最具体的表述
+3. 后面段落的结论可以覆盖前面段落的临时结论
+4. 按上面的 JSON 格式输出完整会议纪要"""
+
+# ========== 会议进行中的滚动草稿 ==========
+# 每隔一段时间用新增转写更新草稿，输出仍为分段要点格式
+DRAFT_TEMPLATE = """你是一个专业的会议记录员，正在会议进行中实时整理纪要草稿。输入是当前草稿 JSON 和草稿之后新增的转写文本，请输出更新后的完整草稿。
+
+""" + PARTIAL_FORMAT + """
+
+规则：
+1. 保留草稿中已有的内容，把新增转写中的要点并入对应议题，或追加新议题
+2. 新增转写修正或推翻了草稿中的结论 / 行动项时，以新增内容为准
+3. 只使用草稿和新增转写中的内容，绝不编造"""
+
+# 会议结束：模板风格提示词 + 以下规则（草稿 + 尾部转写 -> 最终纪要）
+DRAFT_FINAL_RULES = """
+
+输入说明：会议进行中已整理出纪要草稿 JSON，另附草稿之后的尾部转写文本（可能为空）。
+合并规则：
+1. 把尾部转写中的要点并入草稿，尾部内容修正的结论 / 行动项以尾部为准
+2. 相同或相近的议题合并，行动项、风险点、待确认事项去重
+3. 按上面的 JSON 格式输出完整会议纪要"""
+
+
 # ========== 模板字典 ==========
 TEMPLATES = {
     "detailed": DETAILED_TEMPLATE,
@@ -177,6 +247,16 @@ def get_system_prompt(style: str) -> str:
     return TEMPLATES.get(style, TEMPLATES["detailed"])
 
 
+def get_reduce_prompt(style: str) -> str:
+    """长会议分段合并的系统提示词：模板风格 + 合并规则"""
+    return get_system_prompt(style) + REDUCE_RULES
+
+
+def get_draft_final_prompt(style: str) -> str:
+    """会议结束时合并滚动草稿的系统提示词：模板风格 + 合并规则"""
+    return get_system_prompt(style) + DRAFT_FINAL_RULES
+
+
 def list_templates() -> list:
     """列出所有可用模板"""
     return [
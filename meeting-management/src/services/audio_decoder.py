@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+内存音频解码
+webm/opus/mp3/wav 等字节直接用 PyAV 在内存中解码为 16kHz 单声道 float32 PCM，
+数组直接交给 faster-whisper，不再落盘临时文件
+
+- decode_pcm: 字节 -> (首帧绝对时间, PCM 数组)，容忍末尾不完整的帧
+- decode_range / iter_pcm_blocks: 按时间区间 / 分块解码文件，长录音不必整段载入内存
+- iter_pcm_ranges: 顺序解码一遍文件，依次切出多个区间（长录音分块，不逐块 seek）
+- PcmRingBuffer: 每个实时会话一个，缓存已解码的 PCM，下一轮只解码新到达的音频
+
+Usage:
+    from services.audio_decoder import decode_pcm
+
+    _, pcm = decode_pcm(audio_bytes)
+    segments, info = model.transcribe(pcm, language="zh")
+"""
+
+import io
+import os
+from typing import Any, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from logger_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# ========== 配置读取 ==========
+
+# 每个实时会话缓存的已解码 PCM 时长（秒），16kHz float32 约 64KB/秒
+LIVE_PCM_BUFFER_SECONDS = float(os.getenv("LIVE_PCM_BUFFER_SECONDS", "120"))
+
+# Whisper 输入采样率
+SAMPLE_RATE = 16000
+
+
+def decode_pcm(data: Union[bytes, memoryview]) -> Tuple[float, Any]:
+    """
+    解码音频字节为 16kHz 单声道 float32 PCM
+
+    容器格式由 PyAV 自动探测；容忍末尾不完整的帧（录音仍在写入）
+
+    Returns:
+        (首帧绝对时间（秒）, numpy 数组)
+    """
+    import av
+
+    resampler = av.audio.resampler.AudioResampler(format="s16", layout="mono", rate=SAMPLE_RATE)
+    start_time: Optional[float] = None
+    frames = []
+
+    with av.open(io.BytesIO(data), mode="r") as container:
+        stream = container.streams.audio[0]
+        try:
+            for frame in container.decode(stream):
+                if start_time is None and frame.time is not None:
+                    start_time = float(frame.time)
+                for resampled in resampler.resample(frame):
+                    frames.append(resampled.to_ndarray())
+        except (av.error.InvalidDataError, EOFError) as e:
+            logger.debug(f"解码到不完整的尾部数据，已截断: {e}")
+        for resampled in resampler.resample(None):
+            frames.append(resampled.to_ndarray())
+
+    return start_time or 0.0, _to_float32(frames)
+
+
+def _to_float32(frames: list) -> Any:
+    """拼接重采样后的 s16 帧为 float32 数组"""
+    if not frames:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(frames, axis=1).reshape(-1).astype(np.float32) / 32768.0
+
+
+def probe_duration(path: str) -> float:
+    """读取音频时长（秒），容器未记录时返回 0"""
+    import av
+
+    with av.open(path, mode="r") as container:
+        if container.duration:
+            return container.duration / av.time_base
+        stream = container.streams.audio[0]
+        if stream.duration and stream.time_base:
+            return float(stream.duration * stream.time_base)
+    return 0.0
+
+
+def iter_pcm_blocks(path: str, block_seconds: float) -> Iterator[Tuple[float, Any]]:
+    """
+    顺序解码文件，按固定时长分块产出
+
+    Yields:
+        (块起始时间（秒，相对文件开头）, numpy 数组)
+    """
+    import av
+
+    block_samples = int(block_seconds * SAMPLE_RATE)
+    resampler = av.audio.resampler.AudioResampler(format="s16", layout="mono", rate=SAMPLE_RATE)
+    pending = np.zeros(0, dtype=np.float32)
+    offset = 0
+
+    with av.open(path, mode="r") as container:
+        stream = container.streams.audio[0]
+        frames = []
+        buffered = 0
+        try:
+            for frame in container.decode(stream):
+                for resampled in resampler.resample(frame):
+                    frames.append(resampled.to_ndarray())
+                    buffered += resampled.samples
+                if buffered >= block_samples:
+                    pending = np.concatenate([pending, _to_float32(frames)])
+                    frames, buffered = [], 0
+                    while len(pending) >= block_samples:
+                        yield offset / SAMPLE_RATE, pending[:block_samples]
+                        pending = pending[block_samples:]
+                        offset += block_samples
+        except (av.error.InvalidDataError, EOFError) as e:
+            logger.debug(f"解码到不完整的尾部数据，已截断: {e}")
+        for resampled in resampler.resample(None):
+            frames.append(resampled.to_ndarray())
+
+    pending = np.concatenate([pending, _to_float32(frames)])
+    if len(pending):
+        yield offset / SAMPLE_RATE, pending
+
+
+def iter_pcm_ranges(
+    path: str, ranges: List[Tuple[float, float]], block_seconds: float = 10.0
+) -> Iterator[Tuple[float, float, Any]]:
+    """
+    顺序解码一遍文件，依次产出各区间的 PCM
+
+    区间须按起点升序且互不重叠；只缓存当前区间起点之后的已解码数据，
+    内存与区间长度 + block_seconds 相当。文件提前结束时末尾区间被截短（可能为空）
+
+    Yields:
+        (start, end, numpy 数组)
+    """
+    index = 0
+    pending = np.zeros(0, dtype=np.float32)
+    pending_start = 0  # pending[0] 对应的样本序号
+
+    def cut(start: float, end: float) -> Any:
+        lo = max(0, int(round(start * SAMPLE_RATE)) - pending_start)
+        hi = max(0, int(round(end * SAMPLE_RATE)) - pending_start)
+        return pending[lo:hi]
+
+    for _, pcm in iter_pcm_blocks(path, block_seconds):
+        pending = np.concatenate([pending, pcm]) if len(pending) else pcm
+        decoded_end = pending_start + len(pending)
+        while index < len(ranges) and int(round(ranges[index][1] * SAMPLE_RATE)) <= decoded_end:
+            start, end = ranges[index]
+            yield start, end, cut(start, end)
+            index += 1
+        if index == len(ranges):
+            return
+        # 丢弃下一个区间起点之前的数据
+        drop = min(len(pending), max(0, int(round(ranges[index][0] * SAMPLE_RATE)) - pending_start))
+        pending = pending[drop:]
+        pending_start += drop
+
+    for start, end in ranges[index:]:
+        yield start, end, cut(start, end)
+
+
+def decode_range(path: str, start: float, end: float) -> Any:
+    """
+    解码文件中 [start, end) 秒的音频
+
+    优先 seek 到起点附近；容器不支持 seek（如 MediaRecorder 产出的无索引 webm）时从头解码跳过
+    """
+    import av
+
+    resampler = av.audio.resampler.AudioResampler(format="s16", layout="mono", rate=SAMPLE_RATE)
+    first_time: Optional[float] = None
+    frames = []
+
+    with av.open(path, mode="r") as container:
+        stream = container.streams.audio[0]
+        if start > 0 and stream.time_base:
+            try:
+                container.seek(int(start / stream.time_base), stream=stream)
+            except av.error.FFmpegError as e:
+                logger.debug(f"seek 失败，从头解码: {e}")
+        try:
+            for frame in container.decode(stream):
+                if frame.time is not None:
+                    if frame.time >= end:
+                        break
+                    if frame.time + frame.samples / frame.sample_rate <= start:
+                        continue
+                    if first_time is None:
+                        first_time = float(frame.time)
+                for resampled in resampler.resample(frame):
+                    frames.append(resampled.to_ndarray())
+        except (av.error.InvalidDataError, EOFError) as e:
+            logger.debug(f"解码到不完整的尾部数据，已截断: {e}")
+        for resampled in resampler.resample(None):
+            frames.append(resampled.to_ndarray())
+
+    pcm = _to_float32(frames)
+    skip = max(0, int(round((start - (first_time or 0.0)) * SAMPLE_RATE)))
+    return pcm[skip:skip + int(round((end - start) * SAMPLE_RATE))]
+
+
+class PcmRingBuffer:
+    """
+    定长 PCM 环形缓冲（按绝对样本序号寻址）
+
+    追加的数据按时间对齐：与已有数据重叠的部分跳过，小间隙补静音，
+    超出容量时丢弃最早的样本
+    """
+
+    def __init__(self, capacity_seconds: float = LIVE_PCM_BUFFER_SECONDS, sample_rate: int = SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.capacity = max(1, int(capacity_seconds * sample_rate))
+        self._buf = np.zeros(self.capacity, dtype=np.float32)
+        self._start = 0  # 缓冲中最早样本的绝对序号
+        self._end = 0  # 下一个写入样本的绝对序号
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def start_time(self) -> float:
+        return self._start / self.sample_rate
+
+    @property
+    def end_time(self) -> float:
+        return self._end / self.sample_rate
+
+    def append(self, start_time: float, pcm: Any):
+        """追加从 start_time（秒）开始的 PCM，已缓存的部分自动跳过"""
+        first = int(round(start_time * self.sample_rate))
+        if len(self) == 0 or first - self._end > self.capacity:
+            # 空缓冲或间隙超过容量：从新位置重新开始
+            self._start = self._end = first
+
+        if first > self._end:
+            # 小间隙补静音，保持时间轴连续
+            pcm = np.concatenate([np.zeros(first - self._end, dtype=np.float32), pcm])
+        elif first < self._end:
+            pcm = pcm[self._end - first:]
+
+        n = len(pcm)
+        if n == 0:
+            return
+        if n > self.capacity:
+            self._end += n - self.capacity
+            pcm = pcm[-self.capacity:]
+            n = self.capacity
+
+        pos = self._end % self.capacity
+        head = min(n, self.capacity - pos)
+        self._buf[pos:pos + head] = pcm[:head]
+        if head < n:
+            self._buf[:n - head] = pcm[head:]
+        self._end += n
+        self._start = max(self._start, self._end - self.capacity)
+
+    def read_from(self, start_time: float) -> Tuple[float, Any]:
+        """
+        读取 start_time（秒）之后的全部样本（拷贝）
+
+        Returns:
+            (实际起始时间, numpy 数组)；start_time 早于缓冲起点时从缓冲起点开始
+        """
+        first = min(self._end, max(self._start, int(start_time * self.sample_rate)))
+        n = self._end - first
+        pos = first % self.capacity
+        head = min(n, self.capacity - pos)
+        out = np.empty(n, dtype=np.float32)
+        out[:head] = self._buf[pos:pos + head]
+        if head < n:
+            out[head:] = self._buf[:n - head]
+        return first / self.sample_rate, out
+
+    def discard_before(self, t: float):
+        """丢弃 t（秒）之前的样本"""
+        self._start = min(self._end, max(self._start, int(t * self.sample_rate)))
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+上传音频去重
+同一录音换个标题重新上传时，按内容哈希找到已转写的会议，直接复用其转写片段，跳过 Whisper
+
+表结构：
+- audio_fingerprints(sha256 主键, quick_hash, session_id, file_path, size, created_at)
+- 索引 quick_hash：大小 + 前 1MB 的哈希，未知 sha256 时先用它筛选，无候选则不必读完整个文件
+
+转写成功后登记指纹；新上传命中时：
+- 从来源会议复制转写片段 / 全文 / 参会人 / 时长（毫秒级）
+- uploads/ 中的新文件替换为指向已有文件的硬链接，相同录音只占一份磁盘空间
+
+Usage:
+    from services.audio_dedup import find_duplicate, register_audio, link_duplicate
+
+    source = await find_duplicate(db, sha256)
+    if source:
+        link_duplicate(Path(source["file_path"]), file_path)
+"""
+
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Column, Float, Index, Integer, MetaData, String, Table, delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from logger_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# ========== 配置读取 ==========
+
+# 是否启用上传去重
+UPLOAD_DEDUP_ENABLED = os.getenv("UPLOAD_DEDUP_ENABLED", "true").lower() == "true"
+
+# 快速哈希读取的字节数
+_QUICK_HASH_BYTES = 1024 * 1024
+
+
+metadata = MetaData()
+
+audio_fingerprints_table = Table(
+    "audio_fingerprints",
+    metadata,
+    Column("sha256", String(64), primary_key=True, comment="音频内容 sha256"),
+    Column("quick_hash", String(80), nullable=False, comment="大小:前1MB的sha256"),
+    Column("session_id", String(50), nullable=False, comment="首次转写该录音的会议ID"),
+    Column("file_path", String(500), nullable=False, comment="已存储的音频文件"),
+    Column("size", Integer, nullable=False, comment="文件大小（字节）"),
+    Column("created_at", Float, nullable=False),
+    Index("idx_audio_fingerprints_quick", "quick_hash"),
+)
+
+_t = audio_fingerprints_table
+
+
+# ========== 哈希 ==========
+
+def quick_hash(path: Path) -> str:
+    """大小 + 前 1MB 的 sha256（只读取文件头部）"""
+    with open(path, "rb") as f:
+        head = f.read(_QUICK_HASH_BYTES)
+    return f"{path.stat().st_size}:{hashlib.sha256(head).hexdigest()}"
+
+
+# ========== 建表 ==========
+
+async def init_audio_dedup(conn):
+    """建表（init_db 中调用）"""
+    await conn.run_sync(metadata.create_all)
+
+
+# ========== 查询 / 登记 ==========
+
+async def find_duplicate(db: AsyncSession, sha256: str) -> Optional[Dict[str, Any]]:
+    """
+    按 sha256 查找已转写的相同录音
+
+    Returns:
+        {"sha256", "session_id", "file_path", "size"}；未命中返回 None
+        已存储的文件被删除 / 改动时删除该登记（提交事务）并返回 None
+    """
+    if not UPLOAD_DEDUP_ENABLED or not sha256:
+        return None
+    row = (await db.execute(
+        select(_t.c.sha256, _t.c.session_id, _t.c.file_path, _t.c.size).where(_t.c.sha256 == sha256)
+    )).first()
+    if row is None:
+        return None
+    stored = Path(row.file_path)
+    if not stored.exists() or stored.stat().st_size != row.size:
+        await forget_audio(db, sha256)
+        return None
+    return dict(row._mapping)
+
+
+async def has_candidates(db: AsyncSession, quick: str) -> bool:
+    """是否存在快速哈希相同的录音（没有则不必计算完整 sha256）"""
+    if not UPLOAD_DEDUP_ENABLED:
+        return False
+    row = (await db.execute(select(_t.c.sha256).where(_t.c.quick_hash == quick).limit(1))).first()
+    return row is not None
+
+
+async def forget_audio(db: AsyncSession, sha256: str):
+    """删除失效的登记（来源会议已删除等，提交事务）"""
+    await db.execute(delete(_t).where(_t.c.sha256 == sha256))
+    await db.commit()
+
+
+async def register_audio(
+    db: AsyncSession, sha256: str, quick: str, session_id: str, file_path: Path, size: int
+) -> bool:
+    """
+    登记转写成功的录音（已登记的保留首次记录，提交事务）
+
+    Returns:
+        是否新登记
+    """
+    if not UPLOAD_DEDUP_ENABLED:
+        return False
+    try:
+        await db.execute(insert(_t).values(
+            sha256=sha256, quick_hash=quick, session_id=session_id,
+            file_path=str(file_path), size=size, created_at=time.time()
+        ))
+        await db.commit()
+        return True
+    except IntegrityError:
+        await db.rollback()
+        return False
+
+
+# ========== 存储去重 ==========
+
+def link_duplicate(existing: Path, dest: Path) -> bool:
+    """
+    用指向 existing 的硬链接替换 dest（内容相同，只保留一份数据）
+
+    不同文件系统 / 不支持硬链接时保持原文件
+
+    Returns:
+        是否已替换为硬链接
+    """
+    if existing.resolve() == dest.resolve():
+        return False
+    tmp = dest.with_name(dest.name + ".link")
+    try:
+        os.link(existing, tmp)
+        os.replace(tmp, dest)
+        return True
+    except OSError as e:
+        logger.debug(f"硬链接失败，保留原文件: {e}")
+        tmp.unlink(missing_ok=True)
+        return False
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+WebSocket 二进制音频帧协议
+替代 {"type": "chunk", "data": "base64..."}，省去 Base64 膨胀（+33%）、JSON 解析和解码拷贝
+
+帧格式（大端，固定 16 字节头 + 原始音频载荷）：
+
+    偏移  长度  字段
+    0     1     version       协议版本，当前为 1
+    1     1     codec         编码，见 AudioCodec
+    2     2     reserved      保留，填 0
+    4     4     sequence      块序号（uint32）
+    8     8     timestamp_ms  客户端采集时间戳（毫秒，uint64）
+    16    N     payload       音频数据（MediaRecorder 输出的原始字节）
+
+载荷以 memoryview 切片返回，不复制，直接写入会话音频文件
+
+Usage:
+    from services.audio_frame import parse_audio_frame
+
+    codec = parse_codec_name(start_message.get("codec", "webm_opus"))
+    frame = parse_audio_frame(message["bytes"], expected_codec=codec)
+    f.write(frame.payload)
+"""
+
+import struct
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Optional
+
+
+FRAME_VERSION = 1
+HEADER_FORMAT = ">BBHIQ"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)  # 16
+
+
+class AudioCodec(IntEnum):
+    """载荷编码"""
+    WEBM_OPUS = 1
+    OGG_OPUS = 2
+    PCM_S16LE = 3
+
+
+# start 消息中 codec 字段的取值
+CODEC_NAMES = {
+    "webm_opus": AudioCodec.WEBM_OPUS,
+    "ogg_opus": AudioCodec.OGG_OPUS,
+    "pcm_s16le": AudioCodec.PCM_S16LE,
+}
+
+
+class AudioFrameError(ValueError):
+    """二进制帧格式错误"""
+    pass
+
+
+class AudioCodecMismatchError(AudioFrameError):
+    """帧的编码与会议开始时协商的编码不一致"""
+
+    def __init__(self, message: str, sequence: int):
+        super().__init__(message)
+        self.sequence = sequence
+
+
+@dataclass
+class AudioFrame:
+    """解析后的二进制音频帧"""
+    sequence: int
+    timestamp_ms: int
+    codec: AudioCodec
+    payload: memoryview
+
+
+def pack_audio_frame(
+    payload: bytes,
+    sequence: int,
+    timestamp_ms: int,
+    codec: AudioCodec = AudioCodec.WEBM_OPUS
+) -> bytes:
+    """打包二进制音频帧（测试 / Python 客户端使用）"""
+    header = struct.pack(HEADER_FORMAT, FRAME_VERSION, int(codec), 0, sequence, timestamp_ms)
+    return header + payload
+
+
+def parse_codec_name(name: str) -> AudioCodec:
+    """
+    解析 start 消息中协商的编码名（见 CODEC_NAMES）
+
+    Raises:
+        AudioFrameError: 未知编码
+    """
+    try:
+        return CODEC_NAMES[str(name).lower()]
+    except KeyError:
+        raise AudioFrameError(f"不支持的音频编码: {name}")
+
+
+def parse_audio_frame(data: bytes, expected_codec: Optional[AudioCodec] = None) -> AudioFrame:
+    """
+    解析二进制音频帧
+
+    Args:
+        data: 整个二进制消息
+        expected_codec: 会议协商的编码，给出时帧编码必须一致
+
+    Raises:
+        AudioCodecMismatchError: 帧编码与 expected_codec 不一致
+        AudioFrameError: 长度不足、版本或编码不支持、载荷为空
+    """
+    if len(data) < HEADER_SIZE:
+        raise AudioFrameError(f"帧长度不足: {len(data)} < {HEADER_SIZE}")
+
+    version, codec, _, sequence, timestamp_ms = struct.unpack_from(HEADER_FORMAT, data)
+    if version != FRAME_VERSION:
+        raise AudioFrameError(f"不支持的协议版本: {version}")
+    try:
+        codec = AudioCodec(codec)
+    except ValueError:
+        raise AudioFrameError(f"不支持的音频编码: {codec}")
+    if expected_codec is not None and codec != expected_codec:
+        raise AudioCodecMismatchError(
+            f"音频编码 {codec.name} 与会议协商的 {expected_codec.name} 不一致", sequence
+        )
+
+    payload = memoryview(data)[HEADER_SIZE:]
+    if not payload.nbytes:
+        raise AudioFrameError("音频载荷为空")
+
+    return AudioFrame(sequence=sequence, timestamp_ms=timestamp_ms, codec=codec, payload=payload)
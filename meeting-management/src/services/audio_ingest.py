@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""
+WebSocket 音频接收管道
+音频块的接收、落盘与实时转写解耦，Whisper 转写期间不再阻塞或丢弃新到达的音频块
+
+每个会议一个 AudioIngestPipeline：
+- ingest(): 接收循环中调用，只把音频块放入内存队列（O(1)），立即返回
+- 写入任务: 批量取出队列中的音频块追加到会议音频文件（线程中执行，不阻塞事件循环）
+- 转写任务: 有新音频且距上次转写超过间隔时，对已落盘的新音频做一次增量转写并推送结果；
+  转写期间音频继续落盘，音频文件本身即转写的待处理队列
+
+背压：内存队列超过高水位时通知客户端暂停发送（backpressure: pause），
+回落到低水位后通知恢复（resume）；达到上限的音频块被拒绝（rejected）并带回序号，由客户端重发。
+拒绝序号 N 后，N 重新到达前序号更大的块一律拒绝（客户端已在发送途中的 N+1、N+2 即使放得下
+也不接收），音频块按序追加，WebM Cluster 不会乱序
+
+写入失败：已确认的音频块留在队列中退避重试（INGEST_WRITE_RETRIES 次），
+仍失败时丢弃该批并发送带 sequence_start / sequence_end 的 CHUNK_ERROR，由客户端重发
+
+Usage:
+    pipeline = AudioIngestPipeline(session_id, write_fn, transcribe_fn, send_fn)
+    pipeline.start()
+    accepted = await pipeline.ingest(seq, chunk)
+    await pipeline.close()   # 结束会议前：写完队列中的音频，等待进行中的转写结束
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+from logger_config import get_logger
+from services.metrics import INGEST_LATENCY_SECONDS
+
+logger = get_logger(__name__)
+
+
+# ========== 配置读取 ==========
+
+# 每个会议内存队列的上限（字节），超过后拒绝新音频块
+INGEST_QUEUE_MAX_BYTES = int(os.getenv("INGEST_QUEUE_MAX_BYTES", str(16 * 1024 * 1024)))
+# 写入音频失败后的重试次数（指数退避），耗尽后丢弃该批并通知客户端重发
+INGEST_WRITE_RETRIES = int(os.getenv("INGEST_WRITE_RETRIES", "5"))
+# 实时转写间隔（秒）
+LIVE_TRANSCRIBE_INTERVAL = float(os.getenv("LIVE_TRANSCRIBE_INTERVAL", "30"))
+
+# 背压高 / 低水位（占上限的比例）
+_HIGH_WATERMARK = 0.8
+_LOW_WATERMARK = 0.5
+
+# 写入重试退避（秒）
+_RETRY_BASE_DELAY = 0.5
+_RETRY_MAX_DELAY = 8.0
+
+Chunk = Union[bytes, memoryview]
+
+
+class AudioIngestPipeline:
+    """单个会议的音频接收管道"""
+
+    def __init__(
+        self,
+        session_id: str,
+        write_fn: Callable[[List[Chunk], int], Any],
+        transcribe_fn: Callable[[], Awaitable[Optional[str]]],
+        send_fn: Callable[[Dict[str, Any]], Awaitable[Any]],
+        max_bytes: int = INGEST_QUEUE_MAX_BYTES,
+        transcribe_interval: float = LIVE_TRANSCRIBE_INTERVAL,
+    ):
+        """
+        Args:
+            session_id: 会议ID
+            write_fn: 同步写入函数 (chunks, 本批最后一个块的序号) -> None，在线程中执行
+            transcribe_fn: 增量转写 async () -> 新文本或 None
+            send_fn: 推送消息 async (message) -> None
+            max_bytes: 内存队列上限（字节）
+            transcribe_interval: 两次实时转写的最小间隔（秒）
+        """
+        self.session_id = session_id
+        self._write_fn = write_fn
+        self._transcribe_fn = transcribe_fn
+        self._send_fn = send_fn
+        self.max_bytes = max_bytes
+        self.transcribe_interval = transcribe_interval
+
+        self._queue: Deque[Tuple[int, Chunk, float]] = deque()  # (序号, 音频块, 接收时刻)
+        self.queued_bytes = 0
+        self.paused = False
+        self.closed = False
+        self.last_sequence: Optional[int] = None
+        self.written_sequence: Optional[int] = None  # 已写入音频文件的最后序号
+        self.gap_sequence: Optional[int] = None  # 被拒绝、尚未重新接收的最小序号
+
+        self._queued = asyncio.Event()      # 队列中有待写入的音频
+        self._written = asyncio.Event()     # 有尚未转写的新音频落盘
+        self._closing = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self._transcriber: Optional[asyncio.Task] = None
+        self._last_transcribe = 0.0
+        self._write_attempts = 0  # 当前批次已失败次数
+
+        # 统计
+        self.chunks_received = 0
+        self.chunks_rejected = 0
+        self.bytes_written = 0
+        self.write_failures = 0
+        self.chunks_dropped = 0
+        self.transcribe_passes = 0
+
+    # ---------- 生命周期 ----------
+
+    def start(self):
+        self._writer = asyncio.create_task(self._write_loop())
+        self._transcriber = asyncio.create_task(self._transcribe_loop())
+
+    async def close(self):
+        """
+        停止接收：写完队列中的音频，等待进行中的转写结束
+
+        之后的全量转写 / 结束会议不会与实时转写并发
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self._closing.set()
+        self._queued.set()
+        self._written.set()
+        for task in (self._writer, self._transcriber):
+            if task is not None:
+                try:
+                    await task
+                except Exception as e:
+                    logger.error(f"[{self.session_id}] 接收管道任务异常: {e}")
+
+    # ---------- 接收 ----------
+
+    async def ingest(self, sequence: int, chunk: Chunk) -> bool:
+        """
+        放入队列并确认；队列已满，或有更早的块被拒绝尚未重发时拒绝
+        （客户端按 rejected 消息中的序号重发）
+
+        Returns:
+            是否接收
+        """
+        size = len(chunk)
+        out_of_order = self.gap_sequence is not None and sequence > self.gap_sequence
+        if self.closed or out_of_order or self.queued_bytes + size > self.max_bytes:
+            self.chunks_rejected += 1
+            if self.gap_sequence is None or sequence < self.gap_sequence:
+                self.gap_sequence = sequence
+            await self._send({
+                "type": "backpressure",
+                "state": "rejected",
+                "sequence": sequence,
+                "queued_bytes": self.queued_bytes,
+            })
+            return False
+
+        if sequence == self.gap_sequence:
+            self.gap_sequence = None
+        self._queue.append((sequence, chunk, time.monotonic()))
+        self.queued_bytes += size
+        self.chunks_received += 1
+        self.last_sequence = sequence
+        self._queued.set()
+
+        await self._send({"type": "ack", "sequence": sequence})
+
+        if not self.paused and self.queued_bytes >= self.max_bytes * _HIGH_WATERMARK:
+            self.paused = True
+            logger.warning(f"[{self.session_id}] 音频队列达到高水位 ({self.queued_bytes} bytes)，通知客户端暂停")
+            await self._send({"type": "backpressure", "state": "pause", "queued_bytes": self.queued_bytes})
+        return True
+
+    # ---------- 写入 ----------
+
+    async def _write_loop(self):
+        while True:
+            await self._queued.wait()
+            self._queued.clear()
+
+            if self._queue:
+                batch = [chunk for _, chunk, _ in self._queue]
+                first_sequence = self._queue[0][0]
+                batch_sequence = self._queue[len(batch) - 1][0]
+                size = sum(len(chunk) for chunk in batch)
+                try:
+                    await asyncio.to_thread(self._write_fn, batch, batch_sequence)
+                except Exception as e:
+                    # 音频块已确认给客户端：保留在队列中退避重试，队列涨到高水位时照常通知暂停
+                    self.write_failures += 1
+                    self._write_attempts += 1
+                    if self._write_attempts <= INGEST_WRITE_RETRIES:
+                        delay = min(_RETRY_MAX_DELAY, _RETRY_BASE_DELAY * 2 ** (self._write_attempts - 1))
+                        logger.warning(
+                            f"[{self.session_id}] 写入音频失败，{delay:.1f}s 后重试 "
+                            f"({self._write_attempts}/{INGEST_WRITE_RETRIES}): {e}"
+                        )
+                        await asyncio.sleep(delay)
+                        self._queued.set()
+                        continue
+                    # 重试耗尽：丢弃本批，告知丢失的序号区间，由客户端重发
+                    logger.error(
+                        f"[{self.session_id}] 写入音频失败，丢弃音频块 {first_sequence}-{batch_sequence}: {e}",
+                        exc_info=True
+                    )
+                    self._write_attempts = 0
+                    for _ in batch:
+                        self._queue.popleft()
+                    self.queued_bytes -= size
+                    self.chunks_dropped += len(batch)
+                    await self._send({
+                        "type": "error",
+                        "code": "CHUNK_ERROR",
+                        "message": f"写入音频失败: {e}",
+                        "recoverable": True,
+                        "sequence_start": first_sequence,
+                        "sequence_end": batch_sequence,
+                    })
+                else:
+                    self._write_attempts = 0
+                    self.written_sequence = batch_sequence
+                    # 写入期间新到达的块仍在队列尾部
+                    written_at = time.monotonic()
+                    for _ in batch:
+                        INGEST_LATENCY_SECONDS.observe(written_at - self._queue.popleft()[2])
+                    self.queued_bytes -= size
+                    self.bytes_written += size
+                    self._written.set()
+
+                if self.paused and self.queued_bytes <= self.max_bytes * _LOW_WATERMARK:
+                    self.paused = False
+                    await self._send({"type": "backpressure", "state": "resume", "queued_bytes": self.queued_bytes})
+
+            if self._queue:
+                self._queued.set()
+            elif self.closed:
+                return
+
+    # ---------- 转写 ----------
+
+    async def _transcribe_loop(self):
+        while True:
+            await self._written.wait()
+            if self.closed:
+                return
+
+            # 首次有音频立即转写，之后按间隔
+            if self._last_transcribe:
+                remaining = self._last_transcribe + self.transcribe_interval - time.monotonic()
+                if remaining > 0:
+                    try:
+                        await asyncio.wait_for(self._closing.wait(), timeout=remaining)
+                        return
+                    except asyncio.TimeoutError:
+                        pass
+
+            self._written.clear()
+            self._last_transcribe = time.monotonic()
+            self.transcribe_passes += 1
+            try:
+                text = await self._transcribe_fn()
+            except Exception as e:
+                logger.error(f"[{self.session_id}] 实时转写失败: {e}", exc_info=True)
+                continue
+
+            if text:
+                await self._send({
+                    "type": "transcript",
+                    "text": text,
+                    "sequence": self.last_sequence,
+                    "is_final": False,
+                })
+
+    # ---------- 工具 ----------
+
+    async def _send(self, message: Dict[str, Any]):
+        try:
+            await self._send_fn(message)
+        except Exception as e:
+            logger.debug(f"[{self.session_id}] 推送消息失败: {e}")
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "queued_chunks": len(self._queue),
+            "queued_bytes": self.queued_bytes,
+            "paused": self.paused,
+            "chunks_received": self.chunks_received,
+            "chunks_rejected": self.chunks_rejected,
+            "bytes_written": self.bytes_written,
+            "write_failures": self.write_failures,
+            "chunks_dropped": self.chunks_dropped,
+            "written_sequence": self.written_sequence,
+            "transcribe_passes": self.transcribe_passes,
+        }
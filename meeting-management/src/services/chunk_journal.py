@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+会议音频块日志（崩溃恢复）
+
+每个实时会议在会议目录下写一个只追加的 journal.jsonl，每行一条记录：
+    {"op": "open", "meeting_id", "title", "user_id", "start_time", "audio_path", "offset"}
+    {"op": "chunks", "seq": 最后一个音频块序号, "count": 块数, "offset": 写入后的音频字节数}
+    {"op": "transcript", "parts": [新确认的片段], "cursor": 已转写到的音频时间（秒）}
+    {"op": "draft", "draft": {...}, "cursor": 草稿覆盖的片段数}
+    {"op": "closed"}
+
+落盘策略：每次 fsync 都先音频文件、后日志，日志中的偏移不会超过已落盘的音频；
+chunks 记录按批 fsync（间隔 JOURNAL_FSYNC_INTERVAL），transcript / draft / closed 记录立即 fsync；崩溃时最多丢失最后一个间隔内的音频块，
+客户端 resume 时服务端返回已落盘的最后序号，之后的块由客户端重发
+
+服务重启后 replay_journal() 还原会话：音频文件截断到最后一次记录的偏移，已确认的转写片段和游标保留，
+恢复只需转写游标之后的尾部
+
+Usage:
+    journal = ChunkJournal(meeting_dir / JOURNAL_NAME)
+    journal.open_session({...})
+    journal.record_chunks(last_sequence, count, offset, data_file=f)
+    state = replay_journal(path)
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from logger_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# ========== 配置读取 ==========
+
+# chunks 记录的 fsync 间隔（秒），0 表示每批都 fsync
+JOURNAL_FSYNC_INTERVAL = float(os.getenv("JOURNAL_FSYNC_INTERVAL", "1"))
+# 启动时只恢复最近修改过的日志（秒），更早的视为已放弃
+JOURNAL_RECOVERY_MAX_AGE = int(os.getenv("JOURNAL_RECOVERY_MAX_AGE", str(24 * 3600)))
+
+JOURNAL_NAME = "journal.jsonl"
+
+
+class ChunkJournal:
+    """单个会议的音频块日志（写入线程与转写线程共用，内部加锁）"""
+
+    def __init__(self, path: Path, fsync_interval: float = JOURNAL_FSYNC_INTERVAL):
+        self.path = Path(path)
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        _drop_partial_line(self.path)
+        self._file = open(self.path, "ab")
+        self._dirty = False
+        self._last_sync = time.monotonic()
+        self._data_file: Optional[BinaryIO] = None  # 音频文件，日志 fsync 前先 fsync
+
+        # 统计
+        self.records = 0
+        self.syncs = 0
+
+    # ---------- 记录 ----------
+
+    def open_session(self, meta: Dict[str, Any]):
+        self._append({"op": "open", **meta}, sync=True)
+
+    def record_chunks(self, last_sequence: Optional[int], count: int, offset: int,
+                      data_file: Optional[BinaryIO] = None):
+        """
+        记录一批已写入音频文件的音频块（按间隔 fsync，先音频文件后日志）
+
+        Args:
+            last_sequence: 本批最后一个块的序号（命令行路径可能没有序号）
+            count: 本批块数
+            offset: 写入后的音频文件字节数
+            data_file: 音频文件对象，fsync 日志前先 fsync 它
+        """
+        with self._lock:
+            if data_file is not None:
+                self._data_file = data_file
+            self._write({"op": "chunks", "seq": last_sequence, "count": count, "offset": offset})
+            if time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+
+    def record_transcript(self, parts: List[Dict[str, Any]], cursor: float):
+        self._append({"op": "transcript", "parts": parts, "cursor": cursor}, sync=True)
+
+    def record_draft(self, draft: Dict[str, Any], cursor: int):
+        self._append({"op": "draft", "draft": draft, "cursor": cursor}, sync=True)
+
+    def close(self, finished: bool = False):
+        """关闭日志；finished=True 表示会议已正常结束，启动时不再恢复"""
+        with self._lock:
+            if self._file.closed:
+                return
+            if finished:
+                self._write({"op": "closed"})
+            self._sync()
+            self._file.close()
+
+    # ---------- 内部 ----------
+
+    def _append(self, record: Dict[str, Any], sync: bool = False):
+        with self._lock:
+            self._write(record)
+            if sync:
+                self._sync()
+
+    def _write(self, record: Dict[str, Any]):
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self._file.write(line.encode("utf-8"))
+        self._dirty = True
+        self.records += 1
+
+    def _sync(self):
+        if self._dirty:
+            if self._data_file is not None:
+                try:
+                    os.fsync(self._data_file.fileno())
+                except (OSError, ValueError):
+                    # 音频文件已关闭（关闭前已 flush），由操作系统落盘
+                    pass
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._dirty = False
+            self.syncs += 1
+        self._last_sync = time.monotonic()
+
+
+def _drop_partial_line(path: Path):
+    """截掉崩溃时写了一半的最后一行，之后追加的记录从新行开始"""
+    if not path.exists():
+        return
+    with open(path, "r+b") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        # 从尾部向前找最后一个换行
+        pos = size
+        while pos > 0:
+            step = min(4096, pos)
+            f.seek(pos - step)
+            buf = f.read(step)
+            index = buf.rfind(b"\n")
+            if index >= 0:
+                pos = pos - step + index + 1
+                break
+            pos -= step
+        f.truncate(pos)
+        logger.warning(f"截掉日志中不完整的最后一行: {path}")
+
+
+def _read_records(path: Path) -> Iterator[Dict[str, Any]]:
+    """逐行读取；崩溃时写了一半的行忽略"""
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logger.debug(f"忽略不完整的日志行: {path}")
+
+
+def replay_journal(path: Path) -> Optional[Dict[str, Any]]:
+    """
+    重放日志，还原会话状态（会话快照的字段，见 meeting_skill._session_snapshot，
+    另含只记在日志里的 transcript_parts / minutes_draft）
+
+    Returns:
+        会话状态（含 closed 标记）；日志缺少 open 记录时返回 None
+    """
+    state: Optional[Dict[str, Any]] = None
+    for record in _read_records(Path(path)):
+        op = record.pop("op", None)
+        if op == "open":
+            offset = record.pop("offset", 0)
+            state = {
+                **record,
+                "meeting_dir": str(Path(path).parent),
+                "audio_offset": offset,
+                "chunk_count": 0,
+                "last_sequence": None,
+                "transcript_parts": [],
+                "transcript_cursor": 0.0,
+                "minutes_draft": None,
+                "draft_cursor": 0,
+                "closed": False,
+            }
+        elif state is None:
+            continue
+        elif op == "chunks":
+            state["audio_offset"] = record["offset"]
+            state["chunk_count"] += record.get("count", 0)
+            if record.get("seq") is not None:
+                state["last_sequence"] = record["seq"]
+        elif op == "transcript":
+            state["transcript_parts"].extend(record["parts"])
+            state["transcript_cursor"] = record["cursor"]
+        elif op == "draft":
+            state["minutes_draft"] = record["draft"]
+            state["draft_cursor"] = record["cursor"]
+        elif op == "closed":
+            state["closed"] = True
+    return state
+
+
+def find_unfinished_journals(
+    root: Path, max_age: int = JOURNAL_RECOVERY_MAX_AGE
+) -> List[Tuple[Path, Dict[str, Any]]]:
+    """
+    查找未正常结束的会议日志（output/meetings/YYYY/MM/{meeting_id}/journal.jsonl）
+
+    Returns:
+        [(日志路径, 重放得到的会话状态)]
+    """
+    root = Path(root)
+    if not root.exists():
+        return []
+    deadline = time.time() - max_age
+    found = []
+    for path in root.glob(f"*/*/*/{JOURNAL_NAME}"):
+        try:
+            if path.stat().st_mtime < deadline:
+                continue
+            state = replay_journal(path)
+        except OSError:
+            continue
+        if state is not None and not state["closed"]:
+            found.append((path, state))
+    return found
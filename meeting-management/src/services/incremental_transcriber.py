@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+"""
+增量实时转写引擎
+每个会议会话维护一个解码游标，只转写新到达的音频 + 一小段重叠窗口
+
+原理：
+- MediaRecorder 产出的 webm 由 EBML 头 + 若干 Cluster 组成，
+  每个 Cluster 自带绝对时间码，可以用"头部 + 任意 Cluster 起的字节"单独解码
+- 增量扫描新写入的字节，记录 Cluster 的 (字节偏移, 时间码)
+- 每次转写从 (已确认游标 - 重叠窗口) 所在的 Cluster 开始解码，
+  按时间戳拼接片段：只接收中点落在游标之后的片段，避免重复
+- 末尾 tail_guard 秒内的片段可能是半句话，暂不确认，留给下一轮
+- 已解码的 PCM 缓存在会话的环形缓冲中，每轮只解码上次解码末尾之后的 Cluster
+- 待转写的音频超过缓冲容量时（恢复后的尾部、转写积压）按容量分多轮解码和转写
+- 非 webm 容器按时间 seek 解码新区间；不支持 seek 的容器只能从头解码（限制，首次使用时记录日志）
+
+这样每轮 Whisper 的计算量与新增音频成正比，整场会议 O(n) 而非 O(n²)
+
+更新记录:
+- 2026-10-16: 初始版本，替换 append_audio_chunk 的整文件重转写
+- 2026-10-16: 解码移至 services/audio_decoder.py，增加 PCM 环形缓冲
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from logger_config import get_logger
+from services.audio_decoder import SAMPLE_RATE, PcmRingBuffer, decode_pcm, decode_range
+from services.tracing import span
+
+logger = get_logger(__name__)
+
+
+# ========== 配置读取 ==========
+
+# 重叠窗口（秒）：每轮从游标前这么多秒开始转写，保证跨窗口的词不被截断
+LIVE_OVERLAP_SECONDS = float(os.getenv("LIVE_TRANSCRIBE_OVERLAP_SECONDS", "2.0"))
+# 尾部保护（秒）：结束时间落在音频末尾这么多秒内的片段暂不确认
+LIVE_TAIL_GUARD_SECONDS = float(os.getenv("LIVE_TRANSCRIBE_TAIL_GUARD_SECONDS", "1.0"))
+
+# EBML 元素 ID
+_CLUSTER_ID = b"\x1f\x43\xb6\x75"
+_TIMECODE_ID = 0xE7
+
+# 扫描回退字节数（防止 Cluster 头跨两次写入被截断）
+_SCAN_BACKTRACK = 32
+
+
+def _read_vint(buf: bytes, pos: int) -> Optional[Tuple[int, int]]:
+    """
+    读取 EBML 变长整数
+
+    Returns:
+        (值, 占用字节数)，数据不完整或非法时返回 None
+    """
+    if pos >= len(buf):
+        return None
+    first = buf[pos]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not (first & mask):
+        mask >>= 1
+        length += 1
+    if length > 8 or pos + length > len(buf):
+        return None
+    value = first & (mask - 1)
+    for b in buf[pos + 1:pos + length]:
+        value = (value << 8) | b
+    return value, length
+
+
+def _parse_cluster_timecode(buf: bytes, pos: int) -> Optional[int]:
+    """
+    解析 pos 处 Cluster 的时间码（毫秒，默认 TimecodeScale=1ms）
+
+    Returns:
+        时间码；不是合法 Cluster 头返回 -1；数据尚不完整返回 None
+    """
+    p = pos + len(_CLUSTER_ID)
+    size = _read_vint(buf, p)  # Cluster 大小（MediaRecorder 为未知大小）
+    if size is None:
+        return None
+    p += size[1]
+    if p >= len(buf):
+        return None
+    if buf[p] != _TIMECODE_ID:
+        return -1
+    tc_size = _read_vint(buf, p + 1)
+    if tc_size is None:
+        return None
+    length = tc_size[0]
+    start = p + 1 + tc_size[1]
+    if length > 8:
+        return -1
+    if start + length > len(buf):
+        return None
+    return int.from_bytes(buf[start:start + length], "big")
+
+
+def scan_webm_clusters(buf: bytes, base_offset: int = 0) -> Tuple[List[Tuple[int, int]], int]:
+    """
+    扫描字节块中的 Cluster
+
+    Args:
+        buf: 待扫描的字节
+        base_offset: buf 在文件中的起始偏移
+
+    Returns:
+        ([(绝对偏移, 时间码ms)], 下次扫描应开始的绝对偏移)
+    """
+    clusters = []
+    pos = buf.find(_CLUSTER_ID)
+    while pos != -1:
+        timecode = _parse_cluster_timecode(buf, pos)
+        if timecode is None:
+            # Cluster 头还没写完整，下次从这里重新扫描
+            return clusters, base_offset + pos
+        if timecode >= 0:
+            clusters.append((base_offset + pos, timecode))
+        pos = buf.find(_CLUSTER_ID, pos + 1)
+    return clusters, base_offset + max(0, len(buf) - _SCAN_BACKTRACK)
+
+
+def stitch_segments(
+    segments: List[Dict[str, Any]],
+    cursor: float,
+    audio_end: float,
+    final: bool = False,
+    tail_guard: float = LIVE_TAIL_GUARD_SECONDS
+) -> Tuple[List[Dict[str, Any]], float]:
+    """
+    按时间戳拼接片段
+
+    Args:
+        segments: 本轮转写片段（绝对时间，按 start 升序）
+        cursor: 已确认到的时间（秒）
+        audio_end: 本轮音频的结束时间（秒）
+        final: 是否最后一轮（确认全部剩余片段）
+        tail_guard: 尾部保护秒数
+
+    Returns:
+        (新确认的片段, 新游标)
+    """
+    committed = []
+    new_cursor = cursor
+    held_back = False
+    for seg in segments:
+        midpoint = (seg["start"] + seg["end"]) / 2
+        if midpoint <= cursor:
+            continue  # 重叠窗口内已确认过的片段
+        if not final and seg["end"] > audio_end - tail_guard:
+            held_back = True  # 可能是半句话，留给下一轮
+            break
+        # 与上一段的重叠部分裁掉，保证片段互不重叠
+        committed.append(dict(seg, start=max(seg["start"], new_cursor)))
+        new_cursor = max(new_cursor, seg["end"])
+
+    # 游标之后没有待定片段（静音），直接推进，避免长时间静音让窗口无限增长
+    if not held_back:
+        new_cursor = max(new_cursor, audio_end if final else audio_end - tail_guard)
+    return committed, new_cursor
+
+
+class IncrementalTranscriber:
+    """
+    单个会话的增量转写器
+
+    用法：
+        transcriber = IncrementalTranscriber(audio_path)
+        new_segments = transcriber.step(model)        # 每 30 秒
+        tail_segments = transcriber.step(model, final=True)  # 会议结束
+    """
+
+    def __init__(
+        self,
+        audio_path: str,
+        language: str = "zh",
+        overlap: float = LIVE_OVERLAP_SECONDS,
+        tail_guard: float = LIVE_TAIL_GUARD_SECONDS
+    ):
+        self.audio_path = Path(audio_path)
+        self.language = language
+        self.overlap = overlap
+        self.tail_guard = tail_guard
+
+        # 容器结构
+        self.header: Optional[bytes] = None  # 首个 Cluster 之前的 EBML 头
+        self.clusters: List[Tuple[int, int]] = []  # [(字节偏移, 时间码ms)]
+        self._scan_pos = 0
+        self._range_logged = False  # 非 webm 容器的解码方式只提示一次
+
+        # 已解码的 PCM（重叠窗口起点之后）
+        self.pcm = PcmRingBuffer()
+
+        # 转写游标
+        self.cursor = 0.0  # 已确认转写到的音频时间（秒）
+        self.segments: List[Dict[str, Any]] = []  # 已确认片段（绝对时间，互不重叠）
+        self.last_window = 0.0  # 最近一次 step 送入模型的音频时长（秒），未转写为 0
+
+    @property
+    def is_webm(self) -> bool:
+        return bool(self.clusters)
+
+    def _scan(self, size: int):
+        """增量扫描新写入的字节，更新 Cluster 索引"""
+        if size <= self._scan_pos:
+            return
+        with open(self.audio_path, "rb") as f:
+            f.seek(self._scan_pos)
+            buf = f.read(size - self._scan_pos)
+
+        found, next_pos = scan_webm_clusters(buf, self._scan_pos)
+        last_offset = self.clusters[-1][0] if self.clusters else -1
+        last_timecode = self.clusters[-1][1] if self.clusters else -1
+        for offset, timecode in found:
+            # 回退扫描会重复命中；时间码倒退的视为载荷中的误匹配
+            if offset <= last_offset or timecode < last_timecode:
+                continue
+            self.clusters.append((offset, timecode))
+            last_offset, last_timecode = offset, timecode
+        self._scan_pos = max(self._scan_pos, next_pos)
+
+        if self.header is None and self.clusters:
+            with open(self.audio_path, "rb") as f:
+                self.header = f.read(self.clusters[0][0])
+
+    @property
+    def pass_seconds(self) -> float:
+        """单轮送入模型的最长音频（秒）：留出 Cluster 粒度的余量，保证一轮解码不超过 PCM 缓冲容量"""
+        return max(self.overlap + 1.0, self.pcm.capacity / self.pcm.sample_rate * 0.75)
+
+    def _read_range(self, size: int, start_time: float, end_time: float) -> Tuple[bytes, int]:
+        """
+        读取 start_time 所在 Cluster 到 end_time 之后第一个 Cluster 之前的字节（拼上 EBML 头）
+
+        Returns:
+            (待解码字节, 读取截止的文件偏移)；至少包含一个 Cluster，保证每轮都有进展
+        """
+        start_ms, end_ms = start_time * 1000, end_time * 1000
+        start_offset = self.clusters[0][0]
+        for offset, timecode in self.clusters:
+            if timecode > start_ms:
+                break
+            start_offset = offset
+        end_offset = size
+        for offset, timecode in self.clusters:
+            if offset > start_offset and timecode >= end_ms:
+                end_offset = offset
+                break
+
+        with open(self.audio_path, "rb") as f:
+            f.seek(start_offset)
+            body = f.read(end_offset - start_offset)
+        return self.header + body, end_offset
+
+    def _decode_new(self, size: int, until: float) -> bool:
+        """
+        解码缓冲末尾之后、until（秒）之前新到达的音频，追加到 PCM 缓冲
+
+        Returns:
+            until 之后是否还有未解码的音频（需要再转写一轮）
+        """
+        window_start = max(0.0, self.cursor - self.overlap)
+        if len(self.pcm) and self.pcm.start_time <= window_start:
+            decode_from = self.pcm.end_time  # 只补解码新增部分
+        else:
+            decode_from = window_start
+
+        if self.is_webm and self.header is not None:
+            data, end_offset = self._read_range(size, decode_from, until)
+            start_time, pcm = decode_pcm(data)
+            if len(pcm):
+                self.pcm.append(start_time, pcm)
+            return end_offset < size
+
+        # 非 webm 容器（ogg / wav 等）无法按 Cluster 切分，按时间 seek 后解码区间；
+        # 容器不支持 seek 时 decode_range 从头解码，每轮开销随会议时长增长
+        if decode_from >= until:
+            return True
+        if not self._range_logged:
+            self._range_logged = True
+            logger.info(
+                f"[{self.audio_path.parent.name}] 非 webm 音频（{self.audio_path.suffix}），"
+                f"增量转写按时间 seek 解码；容器不支持 seek 时每轮从头解码"
+            )
+        pcm = decode_range(str(self.audio_path), decode_from, until)
+        if len(pcm):
+            self.pcm.append(decode_from, pcm)
+        return decode_from + len(pcm) / SAMPLE_RATE >= until - 1.0 / SAMPLE_RATE
+
+    def step(self, model, final: bool = False) -> List[Dict[str, Any]]:
+        """
+        转写新到达的音频
+
+        Args:
+            model: faster-whisper WhisperModel
+            final: 是否最后一轮（会议结束，确认全部剩余内容）
+
+        Returns:
+            新确认的片段 [{"start": 秒, "end": 秒, "text": "..."}]
+        """
+        self.last_window = 0.0
+        size = self.audio_path.stat().st_size if self.audio_path.exists() else 0
+        if size == 0:
+            return []
+
+        with span("audio.decode", bytes=size):
+            self._scan(size)
+
+        # 待转写的音频超过 PCM 缓冲容量时（恢复后的尾部、转写积压）分多轮转写，
+        # 每轮只解码一个缓冲容量以内的区间，最早的音频不会被覆盖
+        committed: List[Dict[str, Any]] = []
+        while True:
+            cursor, decoded_end = self.cursor, self.pcm.end_time
+            new, more = self._transcribe_pass(model, size, final)
+            committed.extend(new)
+            if not more or (self.cursor <= cursor and self.pcm.end_time <= decoded_end):
+                break
+        return committed
+
+    def _transcribe_pass(self, model, size: int, final: bool) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        解码并转写一轮（不超过 pass_seconds）
+
+        Returns:
+            (新确认的片段, 之后是否还有音频)
+        """
+        window_start = max(0.0, self.cursor - self.overlap)
+        with span("audio.decode", window_start=round(window_start, 2)):
+            more = self._decode_new(size, window_start + self.pass_seconds)
+
+        # 只取 (游标 - 重叠窗口) 之后的部分
+        offset, pcm = self.pcm.read_from(window_start)
+        audio_end = offset + len(pcm) / SAMPLE_RATE
+
+        if audio_end <= self.cursor or len(pcm) == 0:
+            return [], more
+
+        self.last_window += audio_end - offset
+        with span("whisper.transcribe", window_start=round(offset, 2), window_end=round(audio_end, 2)):
+            # 片段是生成器，消费完才算转写结束
+            segments, _ = model.transcribe(pcm, beam_size=5, language=self.language)
+            absolute = [
+                {
+                    "start": offset + seg.start,
+                    "end": offset + seg.end,
+                    "text": seg.text.strip()
+                }
+                for seg in segments
+            ]
+
+        committed, cursor = stitch_segments(
+            absolute, self.cursor, audio_end, final=final and not more, tail_guard=self.tail_guard
+        )
+        if more and cursor <= self.cursor:
+            # 整轮都是待定片段（一句话跨越整个区间）：直接确认，保证分轮转写能推进
+            committed, cursor = stitch_segments(absolute, self.cursor, audio_end, final=True)
+        self.cursor = cursor
+        self.segments.extend(committed)
+        self.pcm.discard_before(self.cursor - self.overlap)
+
+        logger.debug(
+            f"[{self.audio_path.parent.name}] 增量转写: 窗口 {offset:.1f}s-{audio_end:.1f}s, "
+            f"新确认 {len(committed)} 段, 游标 {self.cursor:.1f}s"
+        )
+        return committed, more
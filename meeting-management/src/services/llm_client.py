@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+"""
+大模型 HTTP 客户端
+OpenAI 兼容的 /chat/completions 接口（DeepSeek / 公司自研API），供 ai_minutes_generator 使用
+
+- 每个提供商一个 httpx.AsyncClient：连接池 + keep-alive，安装 h2 时启用 HTTP/2
+- 每个提供商一个并发上限（AI_MAX_CONCURRENCY），多个会议同时生成纪要时排队而不是各占一个线程
+- 流式响应（SSE）：边接收边拼接，读超时按相邻两块计算，长纪要不会因总时长超时
+- 429 / 5xx / 超时 / 连接错误按指数退避 + 随机抖动重试（asyncio.sleep，不占线程）
+
+Usage:
+    from services.llm_client import llm_client
+
+    content = await llm_client.chat_completion(messages, config=get_ai_config(), response_format={"type": "json_object"})
+
+    # 同步代码（线程池 / 命令行）
+    content = llm_client.run_sync(lambda client: client.chat_completion(messages, config=config))
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from logger_config import get_logger
+from services.metrics import AI_REQUEST_SECONDS, AI_RETRIES_TOTAL
+from services.tracing import attach, current_span, span
+
+logger = get_logger(__name__)
+
+
+# ========== 配置读取 ==========
+
+# 每个提供商同时进行的请求数
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "4"))
+# 每个提供商的连接池上限
+AI_MAX_CONNECTIONS = int(os.getenv("AI_MAX_CONNECTIONS", "20"))
+# 是否启用 HTTP/2（需安装 h2）
+AI_HTTP2 = os.getenv("AI_HTTP2", "true").lower() == "true"
+# 是否使用流式响应
+AI_STREAM = os.getenv("AI_STREAM", "true").lower() == "true"
+# 与 ai_minutes_generator 共用的请求配置
+REQUEST_TIMEOUT = int(os.getenv("AI_REQUEST_TIMEOUT", "60"))
+MAX_RETRIES = int(os.getenv("AI_MAX_RETRIES", "3"))
+RETRY_DELAY = float(os.getenv("AI_RETRY_DELAY", "1.0"))
+
+# 建连超时（秒）
+_CONNECT_TIMEOUT = 10.0
+# 空闲连接保留时间（秒）
+_KEEPALIVE_EXPIRY = 60.0
+# 单次退避上限（秒）
+_MAX_BACKOFF = 30.0
+
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+try:
+    import h2  # noqa: F401
+    _H2_AVAILABLE = True
+except ImportError:
+    _H2_AVAILABLE = False
+
+
+class LLMRequestError(Exception):
+    """大模型请求失败；retryable 表示瞬时错误（已耗尽重试）"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retryable: bool = False,
+                 retry_after: Optional[str] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class LLMAuthError(ValueError):
+    """API Key 无效或已过期（401）"""
+
+
+def backoff_delay(attempt: int, base: float = RETRY_DELAY, retry_after: Optional[str] = None) -> float:
+    """
+    第 attempt 次（从 0 开始）失败后的等待时间
+
+    优先使用服务端 Retry-After（秒），否则 base * 2^attempt，乘以 [0.5, 1.5) 的随机抖动
+    """
+    if retry_after:
+        try:
+            return min(float(retry_after), _MAX_BACKOFF)
+        except ValueError:
+            pass
+    return min(base * (2 ** attempt), _MAX_BACKOFF) * random.uniform(0.5, 1.5)
+
+
+@dataclass
+class _Provider:
+    """单个提供商的连接池、并发限制和统计"""
+    name: str
+    client: httpx.AsyncClient
+    semaphore: asyncio.Semaphore
+    limit: int
+    in_flight: int = 0
+    requests: int = 0
+    retries: int = 0
+    failures: int = 0
+    last_latency: float = 0.0
+
+
+class LLMClient:
+    """OpenAI 兼容接口的异步客户端（按提供商共享连接池）"""
+
+    def __init__(self, max_concurrency: int = AI_MAX_CONCURRENCY, http2: bool = AI_HTTP2,
+                 stream: bool = AI_STREAM):
+        self.max_concurrency = max(1, max_concurrency)
+        self.http2 = http2 and _H2_AVAILABLE
+        self.stream = stream
+        self._providers: Dict[Tuple[str, str], _Provider] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        if http2 and not _H2_AVAILABLE:
+            logger.info("未安装 h2，大模型请求使用 HTTP/1.1 keep-alive")
+
+    # ---------- 生命周期 ----------
+
+    def start(self):
+        """绑定当前事件循环（应用启动时调用），之后线程池中的同步调用投递到该循环"""
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self):
+        """关闭所有连接池"""
+        providers = list(self._providers.values())
+        self._providers.clear()
+        self._loop = None
+        for provider in providers:
+            await provider.client.aclose()
+
+    def _provider(self, config: Dict[str, str]) -> _Provider:
+        key = (config["provider"], config["base_url"])
+        provider = self._providers.get(key)
+        if provider is None:
+            client = httpx.AsyncClient(
+                base_url=config["base_url"].rstrip("/"),
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=AI_MAX_CONNECTIONS,
+                    max_keepalive_connections=AI_MAX_CONNECTIONS,
+                    keepalive_expiry=_KEEPALIVE_EXPIRY,
+                ),
+            )
+            provider = _Provider(
+                name=config["provider"], client=client,
+                semaphore=asyncio.Semaphore(self.max_concurrency), limit=self.max_concurrency
+            )
+            self._providers[key] = provider
+        return provider
+
+    # ---------- 请求 ----------
+
+    async def chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        config: Dict[str, str],
+        timeout: float = REQUEST_TIMEOUT,
+        max_retries: int = MAX_RETRIES,
+        on_delta: Optional[Callable[[str], Awaitable[None]]] = None,
+        **params
+    ) -> str:
+        """
+        调用 /chat/completions，返回完整的 message content
+
+        Args:
+            messages: 对话消息
+            config: get_ai_config() 返回的提供商配置
+            timeout: 读超时（秒）；流式响应为相邻两块之间的最长间隔
+            max_retries: 最大尝试次数
+            on_delta: 流式增量回调 async (text) -> None
+            **params: 透传的请求参数（temperature / max_tokens / response_format 等）
+
+        Raises:
+            LLMAuthError: 401
+            LLMRequestError: 其他 HTTP 错误，或瞬时错误耗尽重试
+        """
+        provider = self._provider(config)
+        payload = {"model": config["model"], "messages": messages, **params}
+        if self.stream:
+            payload["stream"] = True
+        headers = {"Authorization": f"Bearer {config['api_key']}"}
+        request_timeout = httpx.Timeout(timeout, connect=_CONNECT_TIMEOUT)
+
+        last_error: Optional[LLMRequestError] = None
+        for attempt in range(max_retries):
+            retry_after = None
+            async with provider.semaphore:
+                provider.in_flight += 1
+                provider.requests += 1
+                start = time.time()
+                outcome = "error"
+                with span("llm.request", provider=provider.name, model=config["model"],
+                          attempt=attempt + 1) as attempt_span:
+                    try:
+                        content = await self._request(provider, payload, headers, request_timeout, on_delta)
+                        outcome = "ok"
+                        attempt_span.set_attribute("response_chars", len(content))
+                        return content
+                    except LLMAuthError:
+                        provider.failures += 1
+                        raise
+                    except LLMRequestError as e:
+                        attempt_span.record_exception(e)
+                        if not e.retryable:
+                            provider.failures += 1
+                            raise
+                        last_error = e
+                        retry_after = e.retry_after
+                    except (httpx.TimeoutException, httpx.TransportError) as e:
+                        attempt_span.record_exception(e)
+                        last_error = LLMRequestError(f"{type(e).__name__}: {e}", retryable=True)
+                    finally:
+                        provider.in_flight -= 1
+                        provider.last_latency = time.time() - start
+                        AI_REQUEST_SECONDS.observe(provider.last_latency, provider=provider.name, outcome=outcome)
+
+            if attempt < max_retries - 1:
+                delay = backoff_delay(attempt, retry_after=retry_after)
+                provider.retries += 1
+                AI_RETRIES_TOTAL.inc(provider=provider.name)
+                logger.warning(f"[{provider.name}] 第 {attempt + 1}/{max_retries} 次请求失败: {last_error}，"
+                               f"{delay:.1f} 秒后重试")
+                await asyncio.sleep(delay)
+
+        provider.failures += 1
+        raise last_error or LLMRequestError("请求失败", retryable=True)
+
+    async def _request(self, provider: _Provider, payload: Dict, headers: Dict,
+                       timeout: httpx.Timeout, on_delta) -> str:
+        async with provider.client.stream(
+            "POST", "/chat/completions", json=payload, headers=headers, timeout=timeout
+        ) as response:
+            if response.status_code >= 400:
+                body = (await response.aread()).decode("utf-8", errors="replace")[:200]
+                if response.status_code == 401:
+                    raise LLMAuthError("API Key 无效或已过期")
+                raise LLMRequestError(
+                    f"HTTP {response.status_code}: {body}",
+                    status_code=response.status_code,
+                    retryable=response.status_code in _RETRYABLE_STATUS,
+                    retry_after=response.headers.get("retry-after"),
+                )
+
+            # 服务端不支持流式时返回普通 JSON
+            if "text/event-stream" not in response.headers.get("content-type", ""):
+                result = json.loads(await response.aread())
+                content = result["choices"][0]["message"]["content"]
+                if on_delta:
+                    await on_delta(content)
+                return content
+
+            parts = []
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    continue  # 读完响应体，连接才能放回连接池复用
+                chunk = json.loads(data)
+                for choice in chunk.get("choices", []):
+                    piece = (choice.get("delta") or {}).get("content")
+                    if piece:
+                        parts.append(piece)
+                        if on_delta:
+                            await on_delta(piece)
+            return "".join(parts)
+
+    # ---------- 同步入口 ----------
+
+    def run_sync(self, call: Callable[["LLMClient"], Awaitable[Any]]) -> Any:
+        """
+        在同步代码中执行 call(client)
+
+        应用运行中（已 start）：投递到应用事件循环，共享连接池和并发限制；
+        否则（命令行 / 测试）：临时事件循环 + 临时客户端
+        """
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is loop:
+                raise RuntimeError("事件循环线程中请直接 await 异步接口")
+            # 投递到事件循环的协程不继承本线程的上下文，显式带上当前 span
+            parent = current_span()
+
+            async def _traced():
+                with attach(parent):
+                    return await call(self)
+
+            return asyncio.run_coroutine_threadsafe(_traced(), loop).result()
+
+        async def _oneshot():
+            client = LLMClient(self.max_concurrency, self.http2, self.stream)
+            try:
+                return await call(client)
+            finally:
+                await client.stop()
+
+        return asyncio.run(_oneshot())
+
+    # ---------- 状态 ----------
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "http2": self.http2,
+            "stream": self.stream,
+            "providers": {
+                p.name: {
+                    "in_flight": p.in_flight,
+                    "limit": p.limit,
+                    "requests": p.requests,
+                    "retries": p.retries,
+                    "failures": p.failures,
+                    "last_latency_seconds": round(p.last_latency, 2),
+                }
+                for p in self._providers.values()
+            },
+        }
+
+
+# 全局客户端实例
+llm_client = LLMClient()
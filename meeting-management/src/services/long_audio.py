@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+长录音并行转写
+超过 LONG_AUDIO_THRESHOLD_SECONDS 的上传录音按静音切分为 30~60 秒的块，
+分发到转写调度器的工作进程池并行转写，再按时间戳合并
+
+流程：
+1. VAD（faster-whisper 自带的 Silero VAD）分块检测语音区间，不整段载入内存
+2. plan_chunks: 在静音处切分，块长尽量落在 [min, max] 秒之间
+3. 顺序解码一遍文件依次切出各块 PCM（iter_pcm_ranges，不逐块 seek：MediaRecorder 产出的
+   webm 没有索引，逐块 seek 会退化为每块从头解码），每块一个进程通道任务转写，时间戳加上块偏移
+4. 按时间排序合并，交给 build_transcript 生成与 transcribe() 相同的结构
+
+Usage:
+    from services.long_audio import transcribe_long_audio, should_use_long_mode
+
+    if should_use_long_mode(duration):
+        result = await transcribe_long_audio(path, job_id=session_id, progress_callback=cb)
+"""
+
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from logger_config import get_logger
+from services.audio_decoder import iter_pcm_ranges
+from services.transcription_scheduler import transcription_scheduler, JobPriority, JobCancelledError
+
+logger = get_logger(__name__)
+
+
+# ========== 配置读取 ==========
+
+# 超过该时长（秒）的上传录音走并行转写，0 表示关闭
+LONG_AUDIO_THRESHOLD_SECONDS = float(os.getenv("LONG_AUDIO_THRESHOLD_SECONDS", "600"))
+# 块长范围（秒）：达到最小值后遇到停顿即切分，超过最大值强制切分
+LONG_AUDIO_CHUNK_MIN_SECONDS = float(os.getenv("LONG_AUDIO_CHUNK_MIN_SECONDS", "30"))
+LONG_AUDIO_CHUNK_MAX_SECONDS = float(os.getenv("LONG_AUDIO_CHUNK_MAX_SECONDS", "60"))
+
+# 视为自然停顿的最短静音（秒）
+_PAUSE_SECONDS = 1.0
+# VAD 分块解码的块长（秒），控制内存
+_VAD_BLOCK_SECONDS = 600
+
+# 进度区间：VAD 占 0~10%，转写占 10~100%
+_VAD_PROGRESS = 10
+
+
+def should_use_long_mode(duration: float) -> bool:
+    """是否启用长录音并行转写"""
+    return LONG_AUDIO_THRESHOLD_SECONDS > 0 and duration >= LONG_AUDIO_THRESHOLD_SECONDS
+
+
+def plan_chunks(
+    speech: List[Tuple[float, float]],
+    min_seconds: float = LONG_AUDIO_CHUNK_MIN_SECONDS,
+    max_seconds: float = LONG_AUDIO_CHUNK_MAX_SECONDS
+) -> List[Tuple[float, float]]:
+    """
+    在静音处切分语音区间
+
+    Args:
+        speech: 语音区间 [(start, end)]（秒，升序）
+        min_seconds: 块达到该长度后，遇到 >= 1 秒的停顿即切分
+        max_seconds: 加入下一段会超过该长度时切分；单段超长则硬切
+
+    Returns:
+        块 [(start, end)]，切点位于静音中点
+    """
+    chunks: List[Tuple[float, float]] = []
+    chunk_start: Optional[float] = None
+    chunk_end = 0.0
+
+    for start, end in speech:
+        if chunk_start is not None:
+            gap = start - chunk_end
+            too_long = end - chunk_start > max_seconds
+            natural_pause = chunk_end - chunk_start >= min_seconds and gap >= _PAUSE_SECONDS
+            if too_long or natural_pause:
+                cut = chunk_end + gap / 2
+                chunks.append((chunk_start, cut))
+                chunk_start = cut
+        else:
+            chunk_start = start
+        chunk_end = end
+
+        # 单段语音超过最大块长：硬切
+        while chunk_end - chunk_start > max_seconds:
+            chunks.append((chunk_start, chunk_start + max_seconds))
+            chunk_start += max_seconds
+
+    if chunk_start is not None and chunk_end > chunk_start:
+        chunks.append((chunk_start, chunk_end))
+    return chunks
+
+
+def detect_speech(audio_path: str) -> Tuple[float, List[Tuple[float, float]]]:
+    """
+    分块 VAD 检测语音区间（在工作进程中执行）
+
+    Returns:
+        (音频时长（秒）, [(start, end)])
+    """
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    from services.audio_decoder import SAMPLE_RATE, iter_pcm_blocks
+
+    options = VadOptions(min_silence_duration_ms=500)
+    speech: List[Tuple[float, float]] = []
+    duration = 0.0
+
+    for offset, pcm in iter_pcm_blocks(audio_path, _VAD_BLOCK_SECONDS):
+        for ts in get_speech_timestamps(pcm, options):
+            start = offset + ts["start"] / SAMPLE_RATE
+            end = offset + ts["end"] / SAMPLE_RATE
+            if speech and start - speech[-1][1] < 0.01:
+                speech[-1] = (speech[-1][0], end)  # 跨块边界的同一段语音
+            else:
+                speech.append((start, end))
+        duration = offset + len(pcm) / SAMPLE_RATE
+
+    return duration, speech
+
+
+def transcribe_chunk(pcm: Any, start: float, model: str, language: str) -> List[Dict[str, Any]]:
+    """
+    转写一个块的 PCM（在工作进程中执行）
+
+    Args:
+        pcm: 16kHz 单声道 float32 数组
+        start: 块在文件中的起点（秒）
+
+    Returns:
+        [{"start": 秒, "end": 秒, "text": "..."}]（绝对时间）
+    """
+    from meeting_skill import _whisper_model
+
+    if len(pcm) == 0:
+        return []
+
+    with _whisper_model(model) as model_obj:
+        segments, _ = model_obj.transcribe(pcm, beam_size=5, language=language)
+        return [
+            {"start": start + s.start, "end": start + s.end, "text": s.text}
+            for s in segments
+        ]
+
+
+async def transcribe_long_audio(
+    audio_path: str,
+    job_id: str,
+    model: str = "auto",
+    language: str = "zh",
+    progress_callback: Optional[Callable[[int], Awaitable[None]]] = None
+) -> Dict[str, Any]:
+    """
+    长录音并行转写
+
+    Args:
+        audio_path: 音频文件路径
+        job_id: 调度任务标识（会议 ID，可用于取消）
+        model: 模型大小，auto 使用环境变量配置
+        language: 语言代码
+        progress_callback: 进度回调 async (percent) -> None
+
+    Returns:
+        与 meeting_skill.transcribe() 相同的结构
+    """
+    from meeting_skill import WHISPER_LANGUAGE, WHISPER_MODEL, build_transcript
+
+    model = WHISPER_MODEL if model == "auto" else model
+    language = WHISPER_LANGUAGE if WHISPER_LANGUAGE != "auto" else language
+
+    async def report(percent: int):
+        if progress_callback:
+            try:
+                await progress_callback(percent)
+            except Exception as e:
+                logger.warning(f"[{job_id}] 进度回调失败: {e}")
+
+    # Step 1: VAD
+    duration, speech = await transcription_scheduler.run(
+        detect_speech, audio_path, priority=JobPriority.BATCH, job_id=job_id
+    )
+    chunks = plan_chunks(speech)
+    logger.info(f"[{job_id}] 长录音并行转写: 时长 {duration:.0f}s, 语音 {len(speech)} 段, 切分 {len(chunks)} 块")
+    await report(_VAD_PROGRESS)
+
+    # Step 2: 顺序解码切块，分块并行转写（在途块数限制为进程数的 2 倍，不占满调度队列，
+    # 也限制了已解码待转写的 PCM 内存）
+    window = transcription_scheduler.workers * 2
+    segments: List[Dict[str, Any]] = []
+    jobs = []
+    pending = set()
+    done = 0
+    chunk_pcm = iter_pcm_ranges(audio_path, chunks)
+    try:
+        while True:
+            item = await asyncio.to_thread(next, chunk_pcm, None)
+            if item is None:
+                break
+            start, _, pcm = item
+            job = await transcription_scheduler.submit(
+                transcribe_chunk, pcm, start, model, language,
+                priority=JobPriority.BATCH, job_id=job_id
+            )
+            jobs.append(job)
+            pending.add(job.future)
+            while len(pending) >= window:
+                finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in finished:
+                    segments.extend(future.result())
+                    done += 1
+                await report(_VAD_PROGRESS + (100 - _VAD_PROGRESS) * done // len(chunks))
+
+        for future in asyncio.as_completed(pending):
+            segments.extend(await future)
+            done += 1
+            await report(_VAD_PROGRESS + (100 - _VAD_PROGRESS) * done // len(chunks))
+    except asyncio.CancelledError:
+        cancelled_by_user = any(job.cancelled for job in jobs)
+        transcription_scheduler.cancel(job_id)
+        if cancelled_by_user:
+            raise JobCancelledError(f"任务已取消: {job_id}")
+        raise
+    except Exception:
+        # 任一块失败：丢弃其余排队中的块
+        transcription_scheduler.cancel(job_id)
+        raise
+
+    # Step 3: 按时间合并
+    segments.sort(key=lambda s: s["start"])
+    return build_transcript(segments, duration=duration, language=language, model_used=model)
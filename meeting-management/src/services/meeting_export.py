@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+会议纪要导出（save_meeting 使用）
+
+- JSON 和 Word 在导出线程池中并行生成；每个文件先写同目录临时文件再 os.replace，
+  读取方（下载接口、索引重建）不会看到写了一半的文件
+- 录音备份优先硬链接（同一文件系统，瞬间完成、不占额外空间），其次 reflink
+  （Linux FICLONE，btrfs / XFS 等写时复制文件系统），都不支持时流式复制
+- minutes_latest.* 同样链接到本版本文件，不再整份复制
+
+硬链接与原文件共享数据：原文件之后只会被删除或整体替换（os.replace），不会原地修改，
+备份不受影响
+
+Usage:
+    from services.meeting_export import atomic_write, link_or_copy, run_parallel
+
+    results = run_parallel({
+        "json": lambda: atomic_write(json_path, lambda f: f.write(data)),
+        "docx": lambda: atomic_write(docx_path, lambda f: doc.save(f)),
+    })
+    method = link_or_copy(audio_path, backup_path)   # "hardlink" | "reflink" | "copy"
+"""
+
+import contextvars
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Optional
+
+from logger_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# ========== 配置读取 ==========
+
+# 导出线程数（JSON / Word / 录音备份并行）
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "3"))
+
+# Linux ioctl FICLONE：整文件 reflink
+_FICLONE = 0x40049409
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="export")
+        return _pool
+
+
+def run_parallel(jobs: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+    """
+    在导出线程池中并行执行各任务并等待全部完成（各任务继承调用方的 contextvars，链路追踪 span 挂在调用方下）
+
+    Returns:
+        {任务名: 返回值}；任一任务失败时等其余任务结束后抛出第一个异常
+    """
+    pool = _get_pool()
+    futures = {name: pool.submit(contextvars.copy_context().run, fn) for name, fn in jobs.items()}
+    results: Dict[str, Any] = {}
+    error: Optional[BaseException] = None
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except BaseException as e:
+            error = error or e
+    if error is not None:
+        raise error
+    return results
+
+
+def atomic_write(path: Path, write: Callable[[BinaryIO], Any]) -> Path:
+    """
+    原子写入：write(f) 写同目录临时文件，完成后替换 path；失败时删除临时文件，原文件不变
+    """
+    path = Path(path)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".tmp_{path.stem}_", suffix=path.suffix)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(temp_path, path)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+    return path
+
+
+def link_or_copy(src: Path, dst: Path, max_retries: int = 5) -> str:
+    """
+    把 src 放到 dst（原子替换已有文件）：硬链接 > reflink > 流式复制
+
+    Returns:
+        实际方式 "hardlink" | "reflink" | "copy"（src 与 dst 是同一文件时返回 "same"）
+    """
+    src, dst = Path(src), Path(dst)
+    if dst.exists() and os.path.samefile(src, dst):
+        return "same"
+    temp = dst.with_name(f".tmp_{dst.name}")
+    temp.unlink(missing_ok=True)
+    try:
+        method = _place(src, temp, max_retries)
+        os.replace(temp, dst)
+    except BaseException:
+        temp.unlink(missing_ok=True)
+        raise
+    return method
+
+
+def _place(src: Path, dst: Path, max_retries: int) -> str:
+    try:
+        os.link(src, dst)
+        return "hardlink"
+    except OSError as e:
+        # 跨文件系统 / 文件系统不支持（FAT、部分网络盘）
+        logger.debug(f"硬链接失败，尝试 reflink: {e}")
+
+    if _reflink(src, dst):
+        return "reflink"
+
+    # Windows 下文件可能仍被占用（WinError 32），重试
+    for attempt in range(max_retries):
+        try:
+            shutil.copyfile(src, dst)  # Linux 走 sendfile，macOS 走 fcopyfile
+            shutil.copystat(src, dst)
+            return "copy"
+        except PermissionError:
+            if attempt == max_retries - 1:
+                raise
+            logger.warning(f"复制文件被占用 {src.name}，{attempt + 1}/{max_retries} 重试...")
+            time.sleep(0.5)
+    return "copy"
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    try:
+        import fcntl
+    except ImportError:  # Windows
+        return False
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        return True
+    except OSError:
+        dst.unlink(missing_ok=True)
+        return False
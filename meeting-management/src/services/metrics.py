@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+"""
+运行指标（Prometheus 文本格式，GET /metrics）
+
+会议流水线各阶段的延迟直方图和运行状态，常开也不影响性能：
+- 计数按线程分片：每个线程只写自己的分片（首次写入时登记一次），记录路径无锁；
+  采集时汇总所有分片，死亡线程的分片保留，计数单调不减
+- 仪表盘（Gauge）在采集时回调读取（活跃会话、队列字节数、执行器占用），记录路径零开销
+- 不依赖 prometheus_client
+
+已定义的指标见文件末尾；新增指标用 metrics.counter() / histogram() / gauge() 注册
+
+Usage:
+    from services.metrics import AI_REQUEST_SECONDS, metrics
+
+    AI_REQUEST_SECONDS.observe(1.2, provider="deepseek", outcome="ok")
+    with DOCX_RENDER_SECONDS.time():
+        render()
+
+    text = metrics.render()
+"""
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 默认延迟分桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[str, ...]
+
+
+class _Shards:
+    """按线程分片的存储：写入只访问本线程的 dict，无锁"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._all: List[Dict[LabelKey, Any]] = []
+        self._lock = threading.Lock()  # 只在线程首次写入时登记分片
+
+    def mine(self) -> Dict[LabelKey, Any]:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard: Dict[LabelKey, Any] = {}
+            with self._lock:
+                self._all.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def snapshot(self) -> List[Dict[LabelKey, Any]]:
+        # dict.copy() 在 GIL 下原子完成，不会与所属线程的写入冲突
+        with self._lock:
+            shards = list(self._all)
+        return [shard.copy() for shard in shards]
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, Any]) -> LabelKey:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} 需要标签 {self.labelnames}，实际 {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> Iterator[Tuple[str, LabelKey, Tuple[Tuple[str, str], ...], float]]:
+        """(后缀, 标签值, 额外标签, 值)"""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {_escape_help(self.documentation)}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for suffix, key, extra, value in self._samples():
+            pairs = list(zip(self.labelnames, key)) + list(extra)
+            labels = ",".join(f'{name}="{_escape_label(value_)}"' for name, value_ in pairs)
+            lines.append(f"{self.name}{suffix}{{{labels}}} {_format_value(value)}" if labels
+                         else f"{self.name}{suffix} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """单调递增计数"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._shards = _Shards()
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        shard = self._shards.mine()
+        shard[key] = shard.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        key = self._key(labels)
+        return sum(shard.get(key, 0) for shard in self._shards.snapshot())
+
+    def _samples(self):
+        totals: Dict[LabelKey, float] = {}
+        for shard in self._shards.snapshot():
+            for key, value in shard.items():
+                totals[key] = totals.get(key, 0) + value
+        for key in sorted(totals):
+            yield "", key, (), totals[key]
+
+
+class Histogram(_Metric):
+    """分桶直方图（每个标签组合一个 [各桶计数..., 超出最大桶的计数, 总和] 列表）"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._shards = _Shards()
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        shard = self._shards.mine()
+        cell = shard.get(key)
+        if cell is None:
+            cell = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """记录 with 块的耗时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _merged(self) -> Dict[LabelKey, List[float]]:
+        merged: Dict[LabelKey, List[float]] = {}
+        for shard in self._shards.snapshot():
+            for key, cell in shard.items():
+                total = merged.setdefault(key, [0] * len(cell))
+                for i, value in enumerate(list(cell)):
+                    total[i] += value
+        return merged
+
+    def count(self, **labels) -> int:
+        cell = self._merged().get(self._key(labels))
+        return int(sum(cell[:-1])) if cell else 0
+
+    def _samples(self):
+        merged = self._merged()
+        for key in sorted(merged):
+            cell = merged[key]
+            cumulative = 0
+            for bound, hits in zip(self.buckets, cell):
+                cumulative += hits
+                yield "_bucket", key, (("le", _format_value(bound)),), cumulative
+            cumulative += cell[len(self.buckets)]
+            yield "_bucket", key, (("le", "+Inf"),), cumulative
+            yield "_sum", key, (), cell[-1]
+            yield "_count", key, (), cumulative
+
+
+GaugeValue = Union[float, Dict[LabelKey, float]]
+
+
+class Gauge(_Metric):
+    """
+    瞬时值
+
+    set() 直接赋值（最后一次写入为准）；set_function() 在采集时回调，
+    回调返回数值（无标签）或 {标签值元组: 数值}
+    """
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+        self._function: Optional[Callable[[], GaugeValue]] = None
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def set_function(self, fn: Callable[[], GaugeValue]):
+        self._function = fn
+
+    def _samples(self):
+        values = dict(self._values)
+        if self._function is not None:
+            result = self._function()
+            if isinstance(result, dict):
+                values.update({tuple(str(v) for v in key): value for key, value in result.items()})
+            else:
+                values[()] = result
+        for key in sorted(values):
+            yield "", key, (), values[key]
+
+
+class MetricsRegistry:
+    """指标注册表（同名指标重复注册时返回已有对象）"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"指标 {name} 已注册为 {metric.type_name}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def render(self) -> str:
+        """Prometheus 文本格式（version 0.0.4）"""
+        with self._lock:
+            registered = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in registered:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                # 单个回调失败不影响其他指标
+                lines.append(f"# {metric.name} 采集失败: {_escape_help(str(e))}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        if math.isnan(value):
+            return "NaN"
+        return repr(value)
+    return str(value)
+
+
+# 全局注册表
+metrics = MetricsRegistry()
+
+
+# ========== 会议流水线指标 ==========
+
+INGEST_LATENCY_SECONDS = metrics.histogram(
+    "meeting_ingest_latency_seconds",
+    "WebSocket 音频块从接收到写入音频文件的耗时",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+TRANSCRIBE_RTF = metrics.histogram(
+    "meeting_transcribe_rtf",
+    "转写实时率（转写耗时 / 音频时长）；mode=live 为实时增量转写，upload 为上传转写的端到端耗时",
+    ("model", "mode"),
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0),
+)
+QUEUE_WAIT_SECONDS = metrics.histogram(
+    "meeting_queue_wait_seconds",
+    "转写调度器中任务的排队时间",
+    ("lane", "priority"),
+)
+AI_REQUEST_SECONDS = metrics.histogram(
+    "meeting_ai_request_seconds",
+    "大模型单次请求耗时（每次尝试记录一次）",
+    ("provider", "outcome"),
+    buckets=(0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0),
+)
+AI_RETRIES_TOTAL = metrics.counter(
+    "meeting_ai_retries_total",
+    "大模型请求重试次数",
+    ("provider",),
+)
+DOCX_RENDER_SECONDS = metrics.histogram(
+    "meeting_docx_render_seconds",
+    "Word 纪要生成耗时",
+)
+ACTIVE_SESSIONS = metrics.gauge(
+    "meeting_active_sessions",
+    "当前 WebSocket 会议连接数",
+)
+BUFFERED_BYTES = metrics.gauge(
+    "meeting_buffered_bytes",
+    "接收管道内存队列中尚未落盘的音频字节数（所有会议合计）",
+)
+EXECUTOR_SATURATION = metrics.gauge(
+    "meeting_executor_saturation",
+    "转写执行器占用率（执行中任务数 / 并发上限）",
+    ("lane",),
+)
+EXECUTOR_QUEUE_DEPTH = metrics.gauge(
+    "meeting_executor_queue_depth",
+    "转写调度器排队中的任务数",
+    ("lane",),
+)
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+AI 纪要结果缓存
+转写文本、模板、模型都没变时，重新生成 / 重复结束会议 / 重复上传不再调用大模型
+
+缓存的是每次 JSON 请求的结果（_complete_json），键为以下内容的 sha256：
+- 提供商 + 模型
+- 系统提示词（即模板版本：模板内容修改后自动失效）
+- 用户消息（过滤噪声后的转写文本或分段 / 分段要点，含标题提示）
+
+长会议 map-reduce 的分段提取使用与模板无关的 MAP_TEMPLATE，
+因此换模板重新生成时只需重新执行最后的合并请求
+
+存储: SQLite（默认 data/minutes_cache.db），过期（TTL）+ 按总大小的 LRU 淘汰
+
+Usage:
+    from services.minutes_cache import minutes_cache
+
+    key = minutes_cache.make_key(config, messages)
+    result = minutes_cache.get(key)
+    minutes_cache.put(key, result, kind="minutes")
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from logger_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# ========== 配置读取 ==========
+
+# 是否启用缓存
+AI_CACHE_ENABLED = os.getenv("AI_CACHE_ENABLED", "true").lower() == "true"
+# 缓存文件
+AI_CACHE_PATH = os.getenv("AI_CACHE_PATH", "./data/minutes_cache.db")
+# 过期时间（秒），默认 30 天
+AI_CACHE_TTL = int(os.getenv("AI_CACHE_TTL", str(30 * 24 * 3600)))
+# 缓存总大小上限（字节），超过后按最近访问时间淘汰
+AI_CACHE_MAX_BYTES = int(os.getenv("AI_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# 淘汰后保留的比例，避免每次写入都触发淘汰
+_EVICT_TARGET = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS minutes_cache (
+    key          TEXT PRIMARY KEY,
+    kind         TEXT NOT NULL,
+    model        TEXT,
+    value        TEXT NOT NULL,
+    size         INTEGER NOT NULL,
+    created_at   REAL NOT NULL,
+    accessed_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_minutes_cache_accessed ON minutes_cache(accessed_at);
+"""
+
+
+class MinutesCache:
+    """
+    大模型 JSON 结果缓存
+
+    每次操作独立连接（WAL 模式），可在线程池 / 多进程中同时使用
+    """
+
+    def __init__(self, path: str = AI_CACHE_PATH, ttl: int = AI_CACHE_TTL,
+                 max_bytes: int = AI_CACHE_MAX_BYTES, enabled: bool = AI_CACHE_ENABLED):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+        # 统计（进程内）
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    # ---------- 连接 ----------
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self._ensure_schema()
+        conn = sqlite3.connect(str(self.path), timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _ensure_schema(self):
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=10)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                conn.commit()
+            finally:
+                conn.close()
+            self._initialized = True
+
+    # ---------- 键 ----------
+
+    @staticmethod
+    def make_key(config: Dict[str, str], messages: List[Dict[str, str]]) -> str:
+        """提供商 + 模型 + 模板版本（系统提示词）+ 用户消息 的 sha256"""
+        h = hashlib.sha256()
+        h.update(f"{config['provider']}\0{config['model']}\0".encode("utf-8"))
+        for message in messages:
+            h.update(f"{message['role']}\0{message['content']}\0".encode("utf-8"))
+        return h.hexdigest()
+
+    # ---------- 读写 ----------
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """命中且未过期时返回结果，并刷新访问时间"""
+        if not self.enabled:
+            return None
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT value, created_at FROM minutes_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or (self.ttl > 0 and now - row[1] > self.ttl):
+                    if row is not None:
+                        conn.execute("DELETE FROM minutes_cache WHERE key = ?", (key,))
+                    self.misses += 1
+                    return None
+                conn.execute("UPDATE minutes_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            logger.warning(f"读取纪要缓存失败: {e}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Dict[str, Any], kind: str = "minutes", model: str = ""):
+        """写入结果；总大小超过上限时按最近访问时间淘汰"""
+        if not self.enabled:
+            return
+        data = json.dumps(value, ensure_ascii=False)
+        size = len(data.encode("utf-8"))
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO minutes_cache (key, kind, model, value, size, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, kind, model, data, size, now, now),
+                )
+                self.writes += 1
+                self._evict(conn, now)
+        except sqlite3.Error as e:
+            logger.warning(f"写入纪要缓存失败: {e}")
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        if self.ttl > 0:
+            self.evictions += conn.execute(
+                "DELETE FROM minutes_cache WHERE created_at < ?", (now - self.ttl,)
+            ).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM minutes_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        target = total - int(self.max_bytes * _EVICT_TARGET)
+        freed = 0
+        keys = []
+        for key, size in conn.execute("SELECT key, size FROM minutes_cache ORDER BY accessed_at"):
+            keys.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        conn.executemany("DELETE FROM minutes_cache WHERE key = ?", keys)
+        self.evictions += len(keys)
+        logger.info(f"纪要缓存超过上限，淘汰 {len(keys)} 条 ({freed} bytes)")
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM minutes_cache")
+
+    # ---------- 状态 ----------
+
+    def get_status(self) -> Dict[str, Any]:
+        status: Dict[str, Any] = {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "max_bytes": self.max_bytes,
+        }
+        if self.enabled:
+            try:
+                with self._connect() as conn:
+                    entries, size = conn.execute(
+                        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM minutes_cache"
+                    ).fetchone()
+                status.update(entries=entries, size_bytes=size)
+            except sqlite3.Error as e:
+                status["error"] = str(e)
+        return status
+
+
+# 全局缓存实例
+minutes_cache = MinutesCache()
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+会议进行中的纪要草稿
+每隔 LIVE_DRAFT_INTERVAL 秒，用上一版草稿之后新增的实时转写更新滚动草稿（议题、行动项），
+通过 WebSocket 推送 minutes_draft 消息；结束会议时 finalize_meeting 只需合并草稿和尾部转写
+
+每个会议一个 MinutesDrafter：
+- fetch_fn(start) -> (新增文本, 新游标): 读取游标之后的实时转写
+- store_fn(draft, cursor): 保存草稿及其覆盖到的游标（finalize_meeting 读取）
+- send_fn(message): 推送草稿
+
+Usage:
+    drafter = MinutesDrafter(session_id, fetch_fn, store_fn, send_fn)
+    drafter.start()
+    await drafter.close()   # 结束会议前：停止更新，进行中的更新直接取消（尾部由最终合并处理）
+"""
+
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from logger_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# ========== 配置读取 ==========
+
+# 草稿更新间隔（秒），0 表示关闭
+LIVE_DRAFT_INTERVAL = float(os.getenv("LIVE_DRAFT_INTERVAL", "300"))
+# 新增转写少于该字符数时跳过本轮更新
+LIVE_DRAFT_MIN_CHARS = int(os.getenv("LIVE_DRAFT_MIN_CHARS", "200"))
+
+
+class MinutesDrafter:
+    """单个会议的滚动纪要草稿"""
+
+    def __init__(
+        self,
+        session_id: str,
+        fetch_fn: Callable[[int], Tuple[str, int]],
+        store_fn: Callable[[Dict[str, Any], int], Any],
+        send_fn: Callable[[Dict[str, Any]], Awaitable[Any]],
+        update_fn: Optional[Callable[[Optional[Dict], str], Awaitable[Optional[Dict]]]] = None,
+        interval: float = LIVE_DRAFT_INTERVAL,
+        min_chars: int = LIVE_DRAFT_MIN_CHARS,
+    ):
+        """
+        Args:
+            session_id: 会议ID
+            fetch_fn: 读取游标之后的实时转写 (start) -> (text, cursor)
+            store_fn: 保存草稿 (draft, cursor) -> None
+            send_fn: 推送消息 async (message) -> None
+            update_fn: 更新草稿 async (draft, new_text) -> 新草稿或 None，默认 update_minutes_draft
+            interval: 更新间隔（秒）
+            min_chars: 触发更新的最少新增字符数
+        """
+        if update_fn is None:
+            from ai_minutes_generator import update_minutes_draft
+            update_fn = update_minutes_draft
+
+        self.session_id = session_id
+        self._fetch_fn = fetch_fn
+        self._store_fn = store_fn
+        self._send_fn = send_fn
+        self._update_fn = update_fn
+        self.interval = interval
+        self.min_chars = min_chars
+
+        self.draft: Optional[Dict[str, Any]] = None
+        self.cursor = 0
+        self.revision = 0
+        self.failures = 0
+        self._closing = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    # ---------- 生命周期 ----------
+
+    def start(self):
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._loop())
+
+    async def close(self):
+        """停止更新；进行中的请求直接取消，未并入草稿的转写由结束时的合并处理"""
+        self._closing.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                logger.error(f"[{self.session_id}] 纪要草稿任务异常: {e}")
+            self._task = None
+
+    # ---------- 更新 ----------
+
+    async def _loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._closing.wait(), timeout=self.interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            await self.update()
+
+    async def update(self, force: bool = False) -> bool:
+        """
+        用游标之后的新增转写更新一次草稿
+
+        Args:
+            force: 忽略最少字符数
+
+        Returns:
+            是否生成了新草稿
+        """
+        text, cursor = self._fetch_fn(self.cursor)
+        text = text.strip()
+        if not text or (not force and len(text) < self.min_chars):
+            return False
+
+        try:
+            draft = await self._update_fn(self.draft, text)
+        except Exception as e:
+            draft = None
+            logger.warning(f"[{self.session_id}] 纪要草稿更新失败: {e}")
+        if draft is None:
+            self.failures += 1
+            return False
+
+        self.draft = draft
+        self.cursor = cursor
+        self.revision += 1
+        self._store_fn(draft, cursor)
+        logger.info(f"[{self.session_id}] 纪要草稿第 {self.revision} 版: "
+                    f"{len(draft.get('topics', []))} 个议题")
+
+        try:
+            await self._send_fn({
+                "type": "minutes_draft",
+                "revision": self.revision,
+                "draft": draft,
+            })
+        except Exception as e:
+            logger.debug(f"[{self.session_id}] 推送纪要草稿失败: {e}")
+        return True
+
+    # ---------- 状态 ----------
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "revision": self.revision,
+            "cursor": self.cursor,
+            "failures": self.failures,
+            "interval": self.interval,
+        }
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+Whisper 模型共享池
+所有转写入口（上传转写 / 实时转写 / 转写服务）共用，避免每次请求重新加载模型
+
+特性：
+- 按 (模型大小, 设备, 精度) 分池
+- 每个池最多 WHISPER_POOL_SIZE 个实例，全局最多 WHISPER_MAX_INSTANCES 个
+- 引用计数借出：实例满额时共享负载最低的实例，不阻塞、不额外加载
+- 空闲超过 WHISPER_MODEL_IDLE_TTL 秒的实例被回收（启动时预热的实例常驻）
+
+Usage:
+    from services.model_registry import model_registry
+
+    with model_registry.checkout("small", "cpu", "int8") as model:
+        segments, info = model.transcribe(audio)
+        segments = list(segments)  # 生成器必须在借出期间消费完
+"""
+
+import asyncio
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from logger_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# ========== 配置读取 ==========
+
+WHISPER_POOL_SIZE = int(os.getenv("WHISPER_POOL_SIZE", "1"))  # 每种模型最多实例数
+WHISPER_MAX_INSTANCES = int(os.getenv("WHISPER_MAX_INSTANCES", str(WHISPER_POOL_SIZE + 1)))  # 全局实例上限
+WHISPER_MODEL_IDLE_TTL = int(os.getenv("WHISPER_MODEL_IDLE_TTL", "1800"))  # 空闲回收时间（秒）
+WHISPER_CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", "0"))  # 每个实例的 CPU 线程数，0 为自动
+
+# (模型大小, 设备, 精度)
+ModelKey = Tuple[str, str, str]
+
+
+@dataclass
+class PooledModel:
+    """池中的一个模型实例"""
+    key: ModelKey
+    model: Any
+    ref_count: int = 0
+    last_used: float = field(default_factory=time.time)
+    pinned: bool = False  # 预热实例不回收
+
+
+class WhisperModelRegistry:
+    """
+    Whisper 模型注册表（进程内单例）
+
+    线程安全：借出/归还在线程池中调用，使用 Condition 保护
+    """
+
+    def __init__(
+        self,
+        pool_size: int = WHISPER_POOL_SIZE,
+        max_instances: int = WHISPER_MAX_INSTANCES,
+        idle_ttl: int = WHISPER_MODEL_IDLE_TTL
+    ):
+        self.pool_size = max(1, pool_size)
+        self.max_instances = max(1, max_instances)
+        self.idle_ttl = idle_ttl
+        self.cpu_threads = WHISPER_CPU_THREADS
+
+        self._cond = threading.Condition()
+        self._pools: Dict[ModelKey, List[PooledModel]] = {}
+        self._loading: Dict[ModelKey, int] = {}  # 正在加载中的实例数
+        self._evict_task: Optional[asyncio.Task] = None
+
+    # ---------- 生命周期 ----------
+
+    def start(self):
+        """启动定时回收任务（需在事件循环中调用）"""
+        if self._evict_task is None:
+            self._evict_task = asyncio.create_task(self._evict_loop())
+            logger.info("Whisper 模型池已启动")
+
+    def stop(self):
+        """停止定时回收任务"""
+        if self._evict_task:
+            self._evict_task.cancel()
+            self._evict_task = None
+            logger.info("Whisper 模型池已停止")
+
+    async def _evict_loop(self):
+        """定期回收空闲模型"""
+        while True:
+            try:
+                await asyncio.sleep(60)
+                self.evict_idle()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"模型回收任务异常: {e}")
+
+    def warm_up(self, model_size: str, device: str, compute_type: str):
+        """
+        预热模型（启动时调用，阻塞直到加载完成）
+
+        预热的实例常驻内存，不参与空闲回收
+        """
+        key = (model_size, device, compute_type)
+        with self.checkout(*key) as _:
+            pass
+        with self._cond:
+            for entry in self._pools.get(key, [])[:1]:
+                entry.pinned = True
+        logger.info(f"Whisper 模型已预热: {key}")
+
+    # ---------- 借出 / 归还 ----------
+
+    @contextmanager
+    def checkout(self, model_size: str, device: str, compute_type: str) -> Iterator[Any]:
+        """借出模型实例，退出上下文时归还"""
+        entry = self._acquire((model_size, device, compute_type))
+        try:
+            yield entry.model
+        finally:
+            self._release(entry)
+
+    def _total_instances(self) -> int:
+        return sum(len(p) for p in self._pools.values()) + sum(self._loading.values())
+
+    def _acquire(self, key: ModelKey) -> PooledModel:
+        with self._cond:
+            while True:
+                pool = self._pools.setdefault(key, [])
+                idle = [e for e in pool if e.ref_count == 0]
+                if idle:
+                    entry = idle[0]
+                    break
+
+                can_grow = len(pool) + self._loading.get(key, 0) < self.pool_size
+                if can_grow and self._total_instances() >= self.max_instances:
+                    # 全局满额：先尝试回收其他池的空闲实例
+                    can_grow = self._evict_one_locked(exclude=key)
+
+                if can_grow:
+                    self._loading[key] = self._loading.get(key, 0) + 1
+                    entry = None
+                    break
+
+                if pool:
+                    # 无法扩容：共享当前负载最低的实例
+                    entry = min(pool, key=lambda e: e.ref_count)
+                    break
+
+                # 该模型还没有实例（正在加载或全局满额且全部忙），等待
+                self._cond.wait()
+
+            if entry is not None:
+                entry.ref_count += 1
+                entry.last_used = time.time()
+                return entry
+
+        # 在锁外加载，避免阻塞其他模型的借出
+        try:
+            model = self._load(key)
+        except Exception:
+            with self._cond:
+                self._loading[key] -= 1
+                self._cond.notify_all()
+            raise
+
+        with self._cond:
+            self._loading[key] -= 1
+            entry = PooledModel(key=key, model=model, ref_count=1)
+            self._pools[key].append(entry)
+            self._cond.notify_all()
+            return entry
+
+    def _release(self, entry: PooledModel):
+        with self._cond:
+            entry.ref_count = max(0, entry.ref_count - 1)
+            entry.last_used = time.time()
+            self._cond.notify_all()
+
+    def _load(self, key: ModelKey) -> Any:
+        from faster_whisper import WhisperModel
+
+        model_size, device, compute_type = key
+        logger.info(f"正在加载 Whisper 模型: {model_size} (设备: {device}, 精度: {compute_type}) ...")
+        start_time = time.time()
+        model = WhisperModel(model_size, device=device, compute_type=compute_type, cpu_threads=self.cpu_threads)
+        logger.info(f"Whisper 模型加载完成: {model_size} ({time.time() - start_time:.2f}s)")
+        return model
+
+    # ---------- 回收 ----------
+
+    def _evict_one_locked(self, exclude: Optional[ModelKey] = None) -> bool:
+        """回收最久未使用的一个空闲实例（调用方持有锁）"""
+        candidates = [
+            e for k, pool in self._pools.items() if k != exclude
+            for e in pool if e.ref_count == 0 and not e.pinned
+        ]
+        if not candidates:
+            return False
+        victim = min(candidates, key=lambda e: e.last_used)
+        self._pools[victim.key].remove(victim)
+        logger.info(f"回收 Whisper 模型实例: {victim.key}")
+        return True
+
+    def evict_idle(self) -> int:
+        """回收空闲超时的实例，返回回收数量"""
+        now = time.time()
+        evicted = 0
+        with self._cond:
+            for key, pool in self._pools.items():
+                for entry in list(pool):
+                    if entry.ref_count == 0 and not entry.pinned and now - entry.last_used > self.idle_ttl:
+                        pool.remove(entry)
+                        evicted += 1
+                        logger.info(f"回收空闲 Whisper 模型实例: {key}")
+            if evicted:
+                self._cond.notify_all()
+        return evicted
+
+    # ---------- 状态 ----------
+
+    def is_loaded(self, model_size: str, device: str, compute_type: str) -> bool:
+        """指定模型是否已有实例"""
+        with self._cond:
+            return bool(self._pools.get((model_size, device, compute_type)))
+
+    def get_status(self) -> dict:
+        """获取模型池状态"""
+        with self._cond:
+            return {
+                "pool_size": self.pool_size,
+                "max_instances": self.max_instances,
+                "loaded_instances": sum(len(p) for p in self._pools.values()),
+                "in_use": sum(e.ref_count for p in self._pools.values() for e in p),
+                "models": [
+                    {
+                        "model": key[0],
+                        "device": key[1],
+                        "compute_type": key[2],
+                        "instances": len(pool),
+                        "ref_counts": [e.ref_count for e in pool]
+                    }
+                    for key, pool in self._pools.items() if pool
+                ]
+            }
+
+
+# 全局单例
+model_registry = WhisperModelRegistry()
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+会议全文检索索引
+替代 list_meetings 中 title/full_text/summary 的 ilike('%kw%') 全表扫描
+
+分词：中文按相邻二字切分（bigram），英文/数字按词，查询同样切分后做短语匹配，
+不依赖 jieba / zhparser 等额外组件
+
+存储：
+- SQLite: FTS5 虚表 meeting_search（rowid 对应 meeting_search_docs.id），bm25 排序
+- 瀚高/PostgreSQL: meeting_search(session_id, tsv) + GIN 索引，'simple' 配置，ts_rank 排序
+
+维护：监听 ORM flush，MeetingModel 的标题 / 转写 / 纪要字段变化时在同一事务内更新索引，
+无需在各写入点手动调用
+
+已知限制：单字查询按前缀匹配，只能命中以该字开头的二字词
+
+Usage:
+    from services.search_index import search_subquery, make_snippet
+
+    search = search_subquery(keyword)
+    query = query.join(search, MeetingModel.session_id == search.c.session_id).order_by(search.c.rank)
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import Float, String, event, text
+from sqlalchemy.orm import Session
+
+from database.connection import DB_TYPE
+from logger_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# 参与索引的字段：标题单独加权，其余合并为正文
+_INDEXED_FIELDS = ("title", "full_text", "summary", "topics", "action_items")
+
+# 中日韩统一表意文字
+_CJK = r"㐀-䶿一-鿿豈-﫿"
+_TOKEN_RE = re.compile(rf"[{_CJK}]+|[0-9A-Za-z]+")
+_CJK_RE = re.compile(rf"[{_CJK}]")
+
+# 片段上下文长度（字符）
+_SNIPPET_CONTEXT = 30
+
+_SQLITE_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS meeting_search_docs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id VARCHAR(64) NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS meeting_search USING fts5(
+        title, body, tokenize = 'unicode61'
+    )
+    """,
+]
+
+_PG_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS meeting_search (
+        session_id VARCHAR(64) PRIMARY KEY,
+        tsv TSVECTOR NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_meeting_search_tsv ON meeting_search USING GIN (tsv)",
+]
+
+
+# ========== 分词 ==========
+
+def tokenize(content: str) -> List[str]:
+    """中文切为相邻二字，英文/数字按词（小写）"""
+    tokens = []
+    for run in _TOKEN_RE.findall(content or ""):
+        if _CJK_RE.match(run):
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run.lower())
+    return tokens
+
+
+def _flatten(value: Any) -> str:
+    """JSON 字段（纪要议题、行动项等）展开为纯文本"""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        stripped = value.strip()
+        if stripped[:1] in ("{", "["):
+            try:
+                return _flatten(json.loads(stripped))
+            except ValueError:
+                pass
+        return value
+    if isinstance(value, dict):
+        return " ".join(_flatten(v) for k, v in value.items() if not str(k).startswith("_"))
+    if isinstance(value, (list, tuple)):
+        return " ".join(_flatten(v) for v in value)
+    return str(value)
+
+
+def _document(meeting) -> Dict[str, str]:
+    """会议 -> 索引文档（已分词，空格分隔）"""
+    body = " ".join(_flatten(getattr(meeting, f, None)) for f in _INDEXED_FIELDS[1:])
+    return {
+        "session_id": meeting.session_id,
+        "title": " ".join(tokenize(meeting.title or "")),
+        "body": " ".join(tokenize(body)),
+    }
+
+
+def _build_query(keyword: str) -> Optional[str]:
+    """
+    关键词 -> 检索表达式
+
+    空格分隔的多个词为 AND，每个词内部为短语（相邻 token 连续出现）
+    """
+    phrases = []
+    for term in keyword.split():
+        tokens = tokenize(term)
+        if not tokens:
+            continue
+        prefix = len(tokens) == 1 and len(tokens[0]) == 1 and _CJK_RE.match(tokens[0])
+        if DB_TYPE == "highgo":
+            quoted = ["'" + t.replace("'", "''") + "'" for t in tokens]
+            phrases.append(quoted[0] + ":*" if prefix else "(" + " <-> ".join(quoted) + ")")
+        else:
+            phrase = '"' + " ".join(t.replace('"', '""') for t in tokens) + '"'
+            phrases.append(phrase + "*" if prefix else phrase)
+    if not phrases:
+        return None
+    return " & ".join(phrases) if DB_TYPE == "highgo" else " AND ".join(phrases)
+
+
+# ========== 建表 / 写入 ==========
+
+async def init_search_index(conn):
+    """建表（init_db 中调用），索引为空而已有会议时回填"""
+    for ddl in (_PG_DDL if DB_TYPE == "highgo" else _SQLITE_DDL):
+        await conn.execute(text(ddl))
+    await conn.run_sync(_backfill)
+
+
+def _backfill(sync_conn):
+    """索引表为空时为已有会议建立索引"""
+    from models.meeting import MeetingModel
+
+    table = "meeting_search" if DB_TYPE == "highgo" else "meeting_search_docs"
+    if sync_conn.execute(text(f"SELECT 1 FROM {table} LIMIT 1")).first():
+        return
+
+    meetings_table = MeetingModel.__table__
+    columns = [meetings_table.c.session_id] + [meetings_table.c[f] for f in _INDEXED_FIELDS]
+    rows = sync_conn.execute(meetings_table.select().with_only_columns(*columns)).all()
+    for row in rows:
+        _upsert(sync_conn, _document(row))
+    if rows:
+        logger.info(f"全文检索索引已回填: {len(rows)} 个会议")
+
+
+def _upsert(conn, doc: Dict[str, str]):
+    if DB_TYPE == "highgo":
+        conn.execute(text(
+            "INSERT INTO meeting_search (session_id, tsv) VALUES (:session_id, "
+            "setweight(to_tsvector('simple', :title), 'A') || setweight(to_tsvector('simple', :body), 'B')) "
+            "ON CONFLICT (session_id) DO UPDATE SET tsv = EXCLUDED.tsv"
+        ), doc)
+        return
+
+    conn.execute(text("INSERT OR IGNORE INTO meeting_search_docs (session_id) VALUES (:session_id)"), doc)
+    doc_id = conn.execute(
+        text("SELECT id FROM meeting_search_docs WHERE session_id = :session_id"), doc
+    ).scalar_one()
+    conn.execute(text("DELETE FROM meeting_search WHERE rowid = :id"), {"id": doc_id})
+    conn.execute(
+        text("INSERT INTO meeting_search (rowid, title, body) VALUES (:id, :title, :body)"),
+        dict(doc, id=doc_id),
+    )
+
+
+def _delete(conn, session_id: str):
+    if DB_TYPE == "highgo":
+        conn.execute(text("DELETE FROM meeting_search WHERE session_id = :sid"), {"sid": session_id})
+        return
+    doc_id = conn.execute(
+        text("SELECT id FROM meeting_search_docs WHERE session_id = :sid"), {"sid": session_id}
+    ).scalar()
+    if doc_id is not None:
+        conn.execute(text("DELETE FROM meeting_search WHERE rowid = :id"), {"id": doc_id})
+        conn.execute(text("DELETE FROM meeting_search_docs WHERE id = :id"), {"id": doc_id})
+
+
+def _changed(obj) -> bool:
+    from sqlalchemy import inspect as sa_inspect
+
+    state = sa_inspect(obj)
+    return any(state.attrs[f].history.has_changes() for f in _INDEXED_FIELDS)
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_search_index(session: Session, flush_context):
+    """MeetingModel 新增/修改/删除时在同一事务内同步索引"""
+    from models.meeting import MeetingModel
+
+    upserts = [
+        obj for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, MeetingModel) and (obj in session.new or _changed(obj))
+    ]
+    deletes = [obj for obj in session.deleted if isinstance(obj, MeetingModel)]
+    if not upserts and not deletes:
+        return
+
+    conn = session.connection()
+    # SAVEPOINT：索引失败只回滚索引写入，不影响业务数据（下次修改时重建该条）
+    savepoint = conn.begin_nested()
+    try:
+        for obj in upserts:
+            _upsert(conn, _document(obj))
+        for obj in deletes:
+            _delete(conn, obj.session_id)
+        savepoint.commit()
+    except Exception as e:
+        savepoint.rollback()
+        logger.error(f"更新全文检索索引失败: {e}")
+
+
+# ========== 查询 ==========
+
+def search_subquery(keyword: str):
+    """
+    关键词检索子查询
+
+    Returns:
+        子查询 (session_id, rank)，rank 越小越相关；关键词无有效 token 时返回 None
+    """
+    query = _build_query(keyword)
+    if query is None:
+        return None
+
+    if DB_TYPE == "highgo":
+        stmt = text(
+            "SELECT session_id, -ts_rank(tsv, to_tsquery('simple', :q)) AS rank "
+            "FROM meeting_search WHERE tsv @@ to_tsquery('simple', :q)"
+        )
+    else:
+        # bm25 列权重：标题 10，正文 1
+        stmt = text(
+            "SELECT d.session_id AS session_id, bm25(meeting_search, 10.0, 1.0) AS rank "
+            "FROM meeting_search JOIN meeting_search_docs d ON d.id = meeting_search.rowid "
+            "WHERE meeting_search MATCH :q"
+        )
+    return stmt.bindparams(q=query).columns(session_id=String, rank=Float).subquery("search")
+
+
+def make_snippet(keyword: str, texts: Iterable[Optional[str]], context: int = _SNIPPET_CONTEXT) -> str:
+    """
+    生成高亮片段：在第一个命中的文本中截取关键词前后 context 个字符，关键词用 <mark> 包裹
+    """
+    terms = [t for t in keyword.split() if t]
+    if not terms:
+        return ""
+    pattern = re.compile("|".join(re.escape(t) for t in terms), re.IGNORECASE)
+
+    for content in texts:
+        content = _flatten(content)
+        match = pattern.search(content)
+        if not match:
+            continue
+        start = max(0, match.start() - context)
+        end = min(len(content), match.end() + context)
+        window = content[start:end].replace("\n", " ")
+        snippet = pattern.sub(lambda m: f"<mark>{m.group(0)}</mark>", window)
+        return ("..." if start > 0 else "") + snippet + ("..." if end < len(content) else "")
+    return ""
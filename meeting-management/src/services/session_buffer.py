@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+WebSocket 会话缓冲（MeetingSession 使用）
+
+每个音频块 / 每次编辑的开销与会议时长无关：
+- AudioChunkBuffer: 各块依次写入同一个 bytearray（首次写入时分配，按需倍增），每块只记录
+  (序号, 偏移, 长度)；取出时拷贝一次成连续 bytes，各块以该 bytes 的 memoryview 切片返回，
+  合并时 contiguous_bytes() 直接取回这段 bytes，不再拷贝
+- TranscriptLog: 片段按 id 存字典，每个片段在行列表中有固定下标；编辑只替换一行，
+  完整文本在读取时才拼接（有改动后第一次读取时重建，之后复用）
+
+Usage:
+    buffer = AudioChunkBuffer(8 * 1024 * 1024)
+    buffer.append(seq, timestamp_ms, data, "audio/webm")
+    chunks = buffer.drain()
+    audio = contiguous_bytes(chunks)
+
+    log = TranscriptLog(lambda seg: f"[{seg.start_time_ms}] {seg.text}")
+    log.append(segment)
+    log.update(segment.id, "新文本")
+    text = log.text
+"""
+
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+Chunk = Union[bytes, bytearray, memoryview]
+
+# 首次分配的最小字节数
+_MIN_ALLOCATION = 64 * 1024
+
+
+class AudioChunkBuffer:
+    """
+    音频块缓冲（在事件循环中追加和取出，不加锁）
+
+    首次写入时才分配，按需倍增到 capacity；取出后从头复用已分配的空间，
+    没有写入过音频的会话不占内存
+    """
+
+    def __init__(self, capacity: int, max_chunks: int = 1000):
+        self.capacity = capacity
+        self.max_chunks = max_chunks
+        self._buf = bytearray()
+        self.nbytes = 0
+        # (seq, timestamp_ms, mime_type, received_at, 起始位置, 长度)
+        self._chunks: Deque[Tuple[int, int, str, float, int, int]] = deque()
+        self._ordered = True  # 按序号到达时取出不必排序
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    @property
+    def allocated(self) -> int:
+        """已分配的字节数"""
+        return len(self._buf)
+
+    def append(self, seq: int, timestamp_ms: int, data: Chunk, mime_type: str) -> bool:
+        """
+        写入一个音频块
+
+        Returns:
+            是否写入（超出容量或块数上限时返回 False，调用方应先取出转写）
+        """
+        size = len(data)
+        if self.nbytes + size > self.capacity or len(self._chunks) >= self.max_chunks:
+            return False
+
+        start = self.nbytes
+        self._reserve(start + size)
+        self._buf[start:start + size] = data
+
+        if self._chunks and seq < self._chunks[-1][0]:
+            self._ordered = False
+        self._chunks.append((seq, timestamp_ms, mime_type, time.time(), start, size))
+        self.nbytes += size
+        return True
+
+    def _reserve(self, needed: int):
+        if needed <= len(self._buf):
+            return
+        size = min(self.capacity, max(needed, 2 * len(self._buf), _MIN_ALLOCATION))
+        self._buf.extend(bytes(size - len(self._buf)))
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """
+        按序号取出全部音频块并清空
+
+        Returns:
+            [{"seq", "timestamp_ms", "mime_type", "received_at", "data"}]，
+            data 是同一段连续 bytes 的 memoryview 切片
+        """
+        records = list(self._chunks)
+        if not self._ordered:
+            records.sort(key=lambda r: r[0])
+        with memoryview(self._buf) as view:
+            if self._ordered:
+                data = memoryview(bytes(view[:self.nbytes]))
+            else:
+                data = memoryview(b"".join([view[start:start + size] for _, _, _, _, start, size in records]))
+
+        chunks = []
+        pos = 0
+        for seq, timestamp_ms, mime_type, received_at, _, size in records:
+            chunks.append({
+                "seq": seq,
+                "timestamp_ms": timestamp_ms,
+                "mime_type": mime_type,
+                "received_at": received_at,
+                "data": data[pos:pos + size],
+            })
+            pos += size
+
+        self._chunks.clear()
+        self.nbytes = 0
+        self._ordered = True
+        return chunks
+
+
+def contiguous_bytes(chunks: List[Dict[str, Any]]) -> Optional[bytes]:
+    """
+    chunks 原样来自 AudioChunkBuffer.drain() 时返回其底层 bytes（不拷贝），否则返回 None
+
+    判断条件：所有 data 是同一个 bytes 的 memoryview、序号递增、长度合计等于整段
+    （drain() 的切片按序号首尾相接，满足这三点即为原样）
+    """
+    if not chunks:
+        return None
+    base = chunks[0].get("data")
+    if not isinstance(base, memoryview) or not isinstance(base.obj, bytes):
+        return None
+    total = 0
+    last_seq = None
+    for chunk in chunks:
+        data = chunk.get("data")
+        if not isinstance(data, memoryview) or data.obj is not base.obj:
+            return None
+        seq = chunk.get("seq", 0)
+        if last_seq is not None and seq <= last_seq:
+            return None
+        last_seq = seq
+        total += len(data)
+    return base.obj if total == len(base.obj) else None
+
+
+class TranscriptLog:
+    """
+    转写片段及完整文本
+
+    片段按 id 存字典（插入顺序即时间顺序），行列表下标固定；
+    追加、按 id 修改都是 O(1)，完整文本读取时才拼接
+    """
+
+    def __init__(self, format_line: Callable[[Any], str], separator: str = "\n"):
+        self._format_line = format_line
+        self._separator = separator
+        self._segments: Dict[str, Any] = {}
+        self._offsets: Dict[str, int] = {}  # 片段 id -> 在 _lines 中的下标
+        self._lines: List[str] = []
+        self._text: Optional[str] = ""
+
+    def __len__(self) -> int:
+        return len(self._segments)
+
+    def __contains__(self, segment_id: str) -> bool:
+        return segment_id in self._segments
+
+    def get(self, segment_id: str) -> Optional[Any]:
+        return self._segments.get(segment_id)
+
+    def segments(self) -> List[Any]:
+        return list(self._segments.values())
+
+    def append(self, segment: Any):
+        self._offsets[segment.id] = len(self._lines)
+        self._segments[segment.id] = segment
+        self._lines.append(self._format_line(segment))
+        self._text = None
+
+    def update(self, segment_id: str, new_text: str) -> bool:
+        """修改片段文本，片段不存在时返回 False"""
+        segment = self._segments.get(segment_id)
+        if segment is None:
+            return False
+        segment.text = new_text
+        self._lines[self._offsets[segment_id]] = self._format_line(segment)
+        self._text = None
+        return True
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self._separator.join(self._lines)
+        return self._text
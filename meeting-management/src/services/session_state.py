@@ -0,0 +1,460 @@
+# -*- coding: utf-8 -*-
+"""
+实时会议会话状态存储（多 worker / 多节点共享）
+
+进程内只保留无法序列化的部分（文件句柄、增量转写器、WebSocket 连接），
+可序列化的会话快照（音频路径、标题、转写 / 草稿游标）写入共享存储，
+已确认的转写片段和纪要草稿在会议目录下的音频块日志里（services/chunk_journal.py），
+worker 重启或崩溃后，客户端带 resume 重连即可接着录
+
+后端（SESSION_STATE_BACKEND）：
+- memory: 进程内（默认，单 worker，与原行为一致）
+- sqlite: 同一主机的多个 worker 共享一个 SQLite 文件（WAL）
+- redis:  多节点共享（需安装 redis 客户端；任何兼容 Redis 协议的服务均可）
+
+租约（lease）：带过期时间的键，持有者定期续期，崩溃后自动过期
+- owner:{session_id}      会话归属的 worker，重连到其他 worker 时返回 redirect（会话亲和）
+- lifecycle:{session_id}  start / end / resume 的跨 worker 互斥
+
+Usage:
+    from services.session_state import session_store, lifecycle_lock, WORKER_ID
+
+    async with lifecycle_lock(session_id):
+        session_store.save_state(session_id, snapshot)
+"""
+
+import asyncio
+import json
+from abc import ABC, abstractmethod
+import os
+import socket
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from logger_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# ========== 配置读取 ==========
+
+# 会话状态后端: memory / sqlite / redis
+SESSION_STATE_BACKEND = os.getenv("SESSION_STATE_BACKEND", "memory").lower()
+# sqlite 后端文件
+SESSION_STATE_PATH = os.getenv("SESSION_STATE_PATH", "./data/session_state.db")
+# redis 后端地址
+SESSION_STATE_REDIS_URL = os.getenv("SESSION_STATE_REDIS_URL", "redis://localhost:6379/0")
+# 会话归属租约时长（秒），worker 每 1/3 时长续期一次
+SESSION_OWNER_TTL = int(os.getenv("SESSION_OWNER_TTL", "30"))
+# 生命周期锁租约时长 / 等待上限（秒）
+LIFECYCLE_LOCK_TTL = int(os.getenv("LIFECYCLE_LOCK_TTL", "60"))
+LIFECYCLE_LOCK_TIMEOUT = float(os.getenv("LIFECYCLE_LOCK_TIMEOUT", "30"))
+# 本节点对外地址（多节点时写入会话快照，重连到其他节点时返回给客户端），如 ws://10.0.0.2:8765
+NODE_URL = os.getenv("NODE_URL", "")
+
+# 本 worker 标识（主机名:进程号）
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+_LOCK_POLL_INTERVAL = 0.05
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS session_state (
+    session_id   TEXT PRIMARY KEY,
+    data         TEXT NOT NULL,
+    updated_at   REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS session_leases (
+    key          TEXT PRIMARY KEY,
+    owner        TEXT NOT NULL,
+    expires_at   REAL NOT NULL
+);
+"""
+
+
+def owner_key(session_id: str) -> str:
+    return f"owner:{session_id}"
+
+
+def lifecycle_key(session_id: str) -> str:
+    return f"lifecycle:{session_id}"
+
+
+class SessionStateStore(ABC):
+    """
+    会话状态后端接口
+
+    - 会话快照: save_state / load_state / delete_state / list_states（JSON 可序列化的字典）
+    - 租约: acquire（获取或续期）/ release / holder
+    """
+
+    backend = ""
+
+    @abstractmethod
+    def save_state(self, session_id: str, state: Dict[str, Any]):
+        ...
+
+    @abstractmethod
+    def load_state(self, session_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def delete_state(self, session_id: str):
+        ...
+
+    @abstractmethod
+    def list_states(self) -> List[str]:
+        ...
+
+    @abstractmethod
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        """获取或续期租约：未被持有 / 已过期 / 本身就是持有者时成功"""
+
+    @abstractmethod
+    def release(self, key: str, owner: str) -> bool:
+        ...
+
+    @abstractmethod
+    def holder(self, key: str) -> Optional[str]:
+        """当前持有者（已过期视为无人持有）"""
+
+    def get_status(self) -> Dict[str, Any]:
+        return {"backend": self.backend, "worker_id": WORKER_ID, "sessions": len(self.list_states())}
+
+
+class MemorySessionStore(SessionStateStore):
+    """进程内会话状态（单 worker）"""
+
+    backend = "memory"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states: Dict[str, str] = {}
+        self._leases: Dict[str, Tuple[str, float]] = {}
+
+    # ---------- 会话快照 ----------
+
+    def save_state(self, session_id: str, state: Dict[str, Any]):
+        data = json.dumps(state, ensure_ascii=False)
+        with self._lock:
+            self._states[session_id] = data
+
+    def load_state(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            data = self._states.get(session_id)
+        return json.loads(data) if data is not None else None
+
+    def delete_state(self, session_id: str):
+        with self._lock:
+            self._states.pop(session_id, None)
+
+    def list_states(self) -> List[str]:
+        with self._lock:
+            return list(self._states)
+
+    # ---------- 租约 ----------
+
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            current = self._leases.get(key)
+            if current is not None and current[0] != owner and current[1] > now:
+                return False
+            self._leases[key] = (owner, now + ttl)
+            return True
+
+    def release(self, key: str, owner: str) -> bool:
+        with self._lock:
+            current = self._leases.get(key)
+            if current is None or current[0] != owner:
+                return False
+            del self._leases[key]
+            return True
+
+    def holder(self, key: str) -> Optional[str]:
+        with self._lock:
+            current = self._leases.get(key)
+        if current is None or current[1] <= time.time():
+            return None
+        return current[0]
+
+
+class SQLiteSessionStore(SessionStateStore):
+    """
+    SQLite 会话状态（同一主机的多个 worker 共享）
+
+    每次操作独立连接（WAL 模式），租约的获取 / 续期是单条条件 UPSERT，跨进程原子
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str = SESSION_STATE_PATH):
+        self.path = Path(path)
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self._ensure_schema()
+        conn = sqlite3.connect(str(self.path), timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _ensure_schema(self):
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=10)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                conn.commit()
+            finally:
+                conn.close()
+            self._initialized = True
+
+    # ---------- 会话快照 ----------
+
+    def save_state(self, session_id: str, state: Dict[str, Any]):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO session_state (session_id, data, updated_at) VALUES (?, ?, ?)",
+                (session_id, json.dumps(state, ensure_ascii=False), time.time())
+            )
+
+    def load_state(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT data FROM session_state WHERE session_id = ?", (session_id,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def delete_state(self, session_id: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM session_state WHERE session_id = ?", (session_id,))
+
+    def list_states(self) -> List[str]:
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("SELECT session_id FROM session_state")]
+
+    # ---------- 租约 ----------
+
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO session_leases (key, owner, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE session_leases.owner = excluded.owner OR session_leases.expires_at <= ?
+                """,
+                (key, owner, now + ttl, now)
+            )
+            return cursor.rowcount == 1
+
+    def release(self, key: str, owner: str) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute("DELETE FROM session_leases WHERE key = ? AND owner = ?", (key, owner))
+            return cursor.rowcount == 1
+
+    def holder(self, key: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT owner FROM session_leases WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def get_status(self) -> Dict[str, Any]:
+        status = super().get_status()
+        status["path"] = str(self.path)
+        return status
+
+
+# 获取 / 续期：键不存在或持有者是自己时设置（带过期）
+_REDIS_ACQUIRE = """
+local current = redis.call('GET', KEYS[1])
+if current == false or current == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+# 释放：持有者是自己时删除
+_REDIS_RELEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisSessionStore(SessionStateStore):
+    """
+    Redis 会话状态（多节点共享）
+
+    租约用 Lua 脚本保证比较和设置的原子性，过期交给 Redis 的 PX
+    """
+
+    backend = "redis"
+
+    def __init__(self, url: str = SESSION_STATE_REDIS_URL, prefix: str = "meeting:", client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("SESSION_STATE_BACKEND=redis 需要安装 redis: pip install redis")
+            client = redis.Redis.from_url(url, decode_responses=True)
+        self.client = client
+        self.prefix = prefix
+        self._acquire = client.register_script(_REDIS_ACQUIRE)
+        self._release = client.register_script(_REDIS_RELEASE)
+
+    def _state_key(self, session_id: str) -> str:
+        return f"{self.prefix}state:{session_id}"
+
+    def _lease_key(self, key: str) -> str:
+        return f"{self.prefix}lease:{key}"
+
+    def save_state(self, session_id: str, state: Dict[str, Any]):
+        self.client.set(self._state_key(session_id), json.dumps(state, ensure_ascii=False))
+
+    def load_state(self, session_id: str) -> Optional[Dict[str, Any]]:
+        data = self.client.get(self._state_key(session_id))
+        return json.loads(data) if data is not None else None
+
+    def delete_state(self, session_id: str):
+        self.client.delete(self._state_key(session_id))
+
+    def list_states(self) -> List[str]:
+        start = len(self._state_key(""))
+        return [key[start:] for key in self.client.scan_iter(match=self._state_key("*"))]
+
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        return bool(self._acquire(keys=[self._lease_key(key)], args=[owner, int(ttl * 1000)]))
+
+    def release(self, key: str, owner: str) -> bool:
+        return bool(self._release(keys=[self._lease_key(key)], args=[owner]))
+
+    def holder(self, key: str) -> Optional[str]:
+        return self.client.get(self._lease_key(key))
+
+
+def create_session_store(backend: str = SESSION_STATE_BACKEND) -> SessionStateStore:
+    """按配置创建会话状态后端"""
+    if backend == "sqlite":
+        return SQLiteSessionStore()
+    if backend == "redis":
+        return RedisSessionStore()
+    if backend != "memory":
+        logger.warning(f"未知的 SESSION_STATE_BACKEND={backend}，使用 memory")
+    return MemorySessionStore()
+
+
+# 全局单例
+session_store = create_session_store()
+
+
+# ========== 跨 worker 锁 ==========
+
+# 进程内先用 asyncio.Lock 排队，只有队首去竞争共享租约；无人引用时自动回收
+_local_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+async def _renew_lease(store, key: str, owner: str, ttl: float):
+    """持有期间定期续期（长时间的 finalize 不会被其他 worker 抢占）"""
+    while True:
+        await asyncio.sleep(ttl / 3)
+        if not await asyncio.to_thread(store.acquire, key, owner, ttl):
+            logger.warning(f"租约 {key} 已被其他 worker 获取")
+            return
+
+
+@asynccontextmanager
+async def lifecycle_lock(
+    session_id: str,
+    store=None,
+    ttl: float = LIFECYCLE_LOCK_TTL,
+    timeout: float = LIFECYCLE_LOCK_TIMEOUT,
+):
+    """
+    会话生命周期锁（start / end / resume 互斥，跨 worker）
+
+    Raises:
+        TimeoutError: timeout 秒内未获取到
+    """
+    store = store or session_store
+    local = _local_locks.get(session_id)
+    if local is None:
+        local = _local_locks[session_id] = asyncio.Lock()
+
+    async with local:
+        key = lifecycle_key(session_id)
+        deadline = time.monotonic() + timeout
+        while not await asyncio.to_thread(store.acquire, key, WORKER_ID, ttl):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"获取会话 {session_id} 的生命周期锁超时")
+            await asyncio.sleep(_LOCK_POLL_INTERVAL)
+
+        renew = asyncio.create_task(_renew_lease(store, key, WORKER_ID, ttl))
+        try:
+            yield
+        finally:
+            renew.cancel()
+            await asyncio.to_thread(store.release, key, WORKER_ID)
+
+
+# ========== 会话归属（亲和） ==========
+
+class SessionOwnership:
+    """
+    本 worker 对一个会话的归属租约，会议进行期间后台续期
+
+    其他 worker 收到该会话的连接时，通过 session_owner() 找到归属 worker 返回 redirect；
+    本 worker 崩溃后租约过期，任意 worker 都可以接管（resume）
+    """
+
+    def __init__(self, session_id: str, store=None, ttl: float = SESSION_OWNER_TTL):
+        self.session_id = session_id
+        self.store = store or session_store
+        self.ttl = ttl
+        self._task: Optional[asyncio.Task] = None
+
+    async def claim(self) -> bool:
+        """获取归属并开始续期；会话属于其他存活 worker 时返回 False"""
+        if not await asyncio.to_thread(self.store.acquire, owner_key(self.session_id), WORKER_ID, self.ttl):
+            return False
+        if self._task is None:
+            self._task = asyncio.create_task(
+                _renew_lease(self.store, owner_key(self.session_id), WORKER_ID, self.ttl)
+            )
+        return True
+
+    async def release(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await asyncio.to_thread(self.store.release, owner_key(self.session_id), WORKER_ID)
+
+
+async def session_owner(session_id: str, store=None) -> Optional[Dict[str, Any]]:
+    """
+    会话当前归属的其他 worker
+
+    Returns:
+        {"worker_id", "node_url"}；无人持有或属于本 worker 时返回 None
+    """
+    store = store or session_store
+    worker_id = await asyncio.to_thread(store.holder, owner_key(session_id))
+    if worker_id is None or worker_id == WORKER_ID:
+        return None
+    state = await asyncio.to_thread(store.load_state, session_id) or {}
+    return {"worker_id": worker_id, "node_url": state.get("node_url") or None}
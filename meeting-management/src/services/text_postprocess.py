@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+转写文本后处理
+噪声词过滤 + 繁简转换，Whisper 每个片段都会经过这里
+
+- NoiseFilter: 所有噪声词编译成一个正则（长词优先），一次扫描完成过滤，替代逐词 count + replace
+- 繁简转换器进程内只创建一次（opencc.OpenCC('t2s') 加载词典较慢）
+- to_simplified_batch: 多个片段拼接后一次转换，减少逐段调用开销
+
+基准测试: python scripts/bench_postprocess.py
+
+Usage:
+    from services.text_postprocess import get_noise_filter, to_simplified_batch, postprocess_segments
+
+    text = get_noise_filter().filter(text)
+    texts = postprocess_segments([seg["text"] for seg in segments])
+"""
+
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Iterable, List, Optional, Pattern, Tuple
+
+from logger_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# ========== 配置读取 ==========
+
+# 噪声词（逗号分隔），与 ai_minutes_generator.NOISE_WORDS 相同
+DEFAULT_NOISE_WORDS = "字幕by索兰娅,字幕,索兰娅,suolan,字幕制作"
+NOISE_WORDS = [w.strip() for w in os.getenv("AI_NOISE_WORDS", DEFAULT_NOISE_WORDS).split(",") if w.strip()]
+
+# 繁简转换开关
+ENABLE_SIMPLIFIED_CHINESE = os.getenv("ENABLE_SIMPLIFIED_CHINESE", "true").lower() == "true"
+
+# 批量繁简转换时的片段分隔符（t2s 不改变换行）
+_BATCH_SEPARATOR = "\n"
+
+
+class NoiseFilter:
+    """编译后的噪声词过滤器：一次扫描删除全部噪声词并规整空白"""
+
+    def __init__(self, words: Iterable[str]):
+        # 去重，长词优先（"字幕by索兰娅" 先于 "字幕" 匹配）
+        self.words: Tuple[str, ...] = tuple(sorted({w for w in words if w}, key=len, reverse=True))
+        self._pattern: Optional[Pattern[str]] = (
+            re.compile("|".join(re.escape(w) for w in self.words)) if self.words else None
+        )
+
+    def filter_count(self, text: str) -> Tuple[str, int]:
+        """
+        Returns:
+            (过滤并规整空白后的文本, 删除的噪声词个数)
+        """
+        if not text or self._pattern is None:
+            return text, 0
+        filtered, removed = self._pattern.subn("", text)
+        return " ".join(filtered.split()), removed
+
+    def filter(self, text: str) -> str:
+        return self.filter_count(text)[0]
+
+
+@lru_cache(maxsize=16)
+def _build_noise_filter(words: Tuple[str, ...]) -> NoiseFilter:
+    return NoiseFilter(words)
+
+
+def get_noise_filter(words: Optional[Iterable[str]] = None) -> NoiseFilter:
+    """获取噪声词过滤器（按词表缓存，默认 AI_NOISE_WORDS）"""
+    return _build_noise_filter(tuple(NOISE_WORDS if words is None else words))
+
+
+# ========== 繁简转换 ==========
+
+_converter = None
+_converter_loaded = False
+_converter_lock = threading.Lock()
+
+
+def get_converter():
+    """进程内共享的 opencc 繁简转换器；未启用或未安装 opencc 时返回 None"""
+    global _converter, _converter_loaded
+    if _converter_loaded:
+        return _converter
+    with _converter_lock:
+        if not _converter_loaded:
+            if ENABLE_SIMPLIFIED_CHINESE:
+                try:
+                    import opencc
+                    _converter = opencc.OpenCC('t2s')  # 繁体转简体
+                    logger.info("繁简转换已启用")
+                except ImportError:
+                    logger.warning("opencc-python未安装，繁简转换未启用。安装: pip install opencc-python-reimplemented")
+            _converter_loaded = True
+    return _converter
+
+
+def to_simplified(text: str) -> str:
+    """将繁体中文转换为简体中文，失败返回原文"""
+    if not text:
+        return text
+    converter = get_converter()
+    if converter is None:
+        return text
+    try:
+        return converter.convert(text)
+    except Exception as e:
+        logger.warning(f"繁简转换失败: {e}, 返回原文")
+        return text
+
+
+def to_simplified_batch(texts: List[str]) -> List[str]:
+    """多个片段拼接后一次转换；片段本身含分隔符时逐段转换"""
+    converter = get_converter()
+    if converter is None or not texts:
+        return list(texts)
+    if any(_BATCH_SEPARATOR in t for t in texts):
+        return [to_simplified(t) for t in texts]
+    converted = to_simplified(_BATCH_SEPARATOR.join(texts)).split(_BATCH_SEPARATOR)
+    if len(converted) != len(texts):
+        return [to_simplified(t) for t in texts]
+    return converted
+
+
+def postprocess_segments(texts: List[str], noise_filter: Optional[NoiseFilter] = None) -> List[str]:
+    """
+    转写片段后处理：噪声词过滤 + 批量繁简转换
+
+    Returns:
+        与输入一一对应的文本（过滤后可能为空字符串）
+    """
+    noise_filter = noise_filter or get_noise_filter()
+    return to_simplified_batch([noise_filter.filter(t) for t in texts])
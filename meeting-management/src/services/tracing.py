@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+"""
+会议处理链路追踪（结构化 span，字段与 OpenTelemetry 一致）
+
+一次结束会议 / 上传处理是一棵 span 树，每个 span 记录名称、起止时间（Unix 纳秒）、
+父子关系、属性和状态，附带 meeting.id；默认按会议导出到 TRACE_DIR/{meeting_id}.jsonl，
+GET /api/v1/meetings/{id}/trace 读取并组装成树，查看结束会议后的时间花在哪里
+
+- span 结束时只序列化并放入有界队列，由后台线程批量追加到文件，事件循环上结束的 span
+  （llm.request、upload.process、meeting.end 等）不做磁盘 IO；队列满时丢弃并计数
+- 超过 TRACE_RETENTION_DAYS 未更新的会议文件由后台线程定期删除
+
+- 当前 span 存在 contextvars 中：asyncio 任务、asyncio.to_thread、调度器线程通道自动继承；
+  其他线程（如 run_coroutine_threadsafe 投递的协程）用 attach() 显式挂到父 span 下
+- 没有会议上下文的 span 不记录（空操作），非会议请求不产生任何开销以外的写入
+- 不依赖 opentelemetry SDK；导出格式可直接转换为 OTLP JSON
+
+Usage:
+    from services.tracing import span, traced
+
+    with span("finalize.read_audio", meeting_id=meeting_id) as s:
+        data = f.read()
+        s.set_attribute("bytes", len(data))
+
+    @traced("upload.process", meeting_arg="session_id")
+    async def transcribe_file_task(session_id, ...): ...
+"""
+
+import asyncio
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import os
+import queue
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from logger_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# ========== 配置读取 ==========
+
+# 是否记录链路追踪
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "true").lower() == "true"
+# span 导出目录（每个会议一个 JSONL 文件）
+TRACE_DIR = Path(os.getenv("TRACE_DIR", "./output/traces"))
+# 会议 span 文件保留天数（按最后修改时间），0 表示不清理
+TRACE_RETENTION_DAYS = float(os.getenv("TRACE_RETENTION_DAYS", "30"))
+# 待写入 span 队列上限（条），满了之后丢弃
+TRACE_QUEUE_SIZE = int(os.getenv("TRACE_QUEUE_SIZE", "10000"))
+
+# 过期文件清理间隔（秒）
+_PRUNE_INTERVAL = 3600
+# 后台线程每批最多写入的 span 数
+_WRITE_BATCH = 512
+
+SERVICE_NAME = "meeting-management"
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+_SAFE_ID = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class Span:
+    """一个计时区间（结束时导出）"""
+
+    def __init__(self, name: str, meeting_id: str, parent: Optional["Span"] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.meeting_id = meeting_id
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent.span_id if parent else None
+        self.attributes: Dict[str, Any] = {"meeting.id": meeting_id, **(attributes or {})}
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = "OK"
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_exception(self, error: BaseException):
+        self.status = "ERROR"
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "kind": "INTERNAL",
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3) if self.end_ns else None,
+            "attributes": self.attributes,
+            "status": {"code": self.status, "message": self.status_message},
+            "resource": {"service.name": SERVICE_NAME},
+        }
+
+
+class _NoopSpan:
+    """没有会议上下文 / 追踪关闭时的占位 span"""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def record_exception(self, error: BaseException):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+# ========== 导出 ==========
+
+class JsonlSpanExporter:
+    """
+    按会议追加写 JSONL（后台线程写入，不 fsync）
+
+    export() 只把序列化后的一行放入队列；写入线程首次导出时启动，
+    每批按会议合并，一个文件一次打开
+    """
+
+    def __init__(self, directory: Path = TRACE_DIR, queue_size: int = TRACE_QUEUE_SIZE,
+                 retention_days: float = TRACE_RETENTION_DAYS):
+        self.directory = Path(directory)
+        self.retention_days = retention_days
+        self._queue: "queue.Queue[Optional[Tuple[str, str]]]" = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._last_prune = 0.0
+        self.dropped = 0
+
+    def path_for(self, meeting_id: str) -> Path:
+        return self.directory / f"{_SAFE_ID.sub('_', meeting_id)}.jsonl"
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n"
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((span.meeting_id, line))
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """等待队列中已有的 span 写完"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """写完剩余 span 并停止写入线程"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            while len(items) < _WRITE_BATCH:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in items
+            self._write([item for item in items if item is not None])
+            self._maybe_prune()
+            for _ in items:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, items: List[Tuple[str, str]]):
+        by_meeting: Dict[str, List[str]] = {}
+        for meeting_id, line in items:
+            by_meeting.setdefault(meeting_id, []).append(line)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            for meeting_id, lines in by_meeting.items():
+                with open(self.path_for(meeting_id), "a", encoding="utf-8") as f:
+                    f.writelines(lines)
+        except OSError as e:
+            logger.debug(f"写入 span 失败: {e}")
+
+    def _maybe_prune(self):
+        now = time.time()
+        if self.retention_days <= 0 or now - self._last_prune < _PRUNE_INTERVAL:
+            return
+        self._last_prune = now
+        self.prune(now - self.retention_days * 86400)
+
+    def prune(self, before: float) -> int:
+        """删除最后修改早于 before（Unix 秒）的会议文件，返回删除数"""
+        removed = 0
+        try:
+            paths = list(self.directory.glob("*.jsonl"))
+        except OSError:
+            return 0
+        for path in paths:
+            try:
+                if path.stat().st_mtime < before:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        if removed:
+            logger.info(f"清理过期链路文件: {removed} 个")
+        return removed
+
+    def load(self, meeting_id: str) -> List[Dict[str, Any]]:
+        self.flush()
+        path = self.path_for(meeting_id)
+        if not path.exists():
+            return []
+        spans = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    spans.append(json.loads(line))
+                except ValueError:
+                    continue  # 崩溃时写了一半的行
+        return spans
+
+
+exporter = JsonlSpanExporter()
+
+
+def shutdown_tracing():
+    """写完队列中剩余的 span（进程退出前）"""
+    exporter.close()
+
+
+atexit.register(shutdown_tracing)
+
+
+# ========== 记录 ==========
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, meeting_id: Optional[str] = None, **attributes) -> Iterator[Any]:
+    """
+    记录一个 span（当前 span 的子 span；meeting_id 缺省时继承父 span）
+
+    with 块内抛出的异常记为 ERROR 状态后继续向上抛出
+    """
+    parent = _current.get()
+    meeting_id = meeting_id or (parent.meeting_id if parent else None)
+    if not TRACE_ENABLED or not meeting_id:
+        yield _NOOP
+        return
+
+    # 父 span 属于其他会议时另起一条链路
+    if parent is not None and parent.meeting_id != meeting_id:
+        parent = None
+    current = Span(name, meeting_id, parent, attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.record_exception(e)
+        raise
+    finally:
+        _current.reset(token)
+        current.end_ns = time.time_ns()
+        exporter.export(current)
+
+
+@contextmanager
+def attach(parent: Optional[Span]) -> Iterator[None]:
+    """在其他线程 / 事件循环中把 parent 设为当前 span"""
+    token = _current.set(parent)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def traced(name: str, meeting_arg: str = "meeting_id") -> Callable:
+    """装饰器：整个函数记为一个 span，meeting_id 取自参数 meeting_arg（支持同步 / 异步函数）"""
+    def decorator(fn: Callable) -> Callable:
+        signature = inspect.signature(fn)
+
+        def meeting_of(args, kwargs) -> Optional[str]:
+            try:
+                return signature.bind_partial(*args, **kwargs).arguments.get(meeting_arg)
+            except TypeError:
+                return None
+
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name, meeting_id=meeting_of(args, kwargs)):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name, meeting_id=meeting_of(args, kwargs)):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ========== 查询 ==========
+
+def build_trace_tree(spans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    按 trace_id 分组并组装父子关系
+
+    Returns:
+        [{"trace_id", "name", "start_time_unix_nano", "duration_ms", "status", "spans": [根 span（含 children）]}]，
+        按开始时间排序
+    """
+    nodes = {s["span_id"]: {**s, "children": []} for s in spans}
+    traces: Dict[str, List[Dict[str, Any]]] = {}
+    for node in sorted(nodes.values(), key=lambda n: n["start_time_unix_nano"]):
+        parent = nodes.get(node.get("parent_span_id"))
+        if parent is not None:
+            parent["children"].append(node)
+        else:
+            traces.setdefault(node["trace_id"], []).append(node)
+
+    result = []
+    for trace_id, roots in traces.items():
+        start = min(r["start_time_unix_nano"] for r in roots)
+        end = max(r["end_time_unix_nano"] or r["start_time_unix_nano"] for r in roots)
+        result.append({
+            "trace_id": trace_id,
+            "name": roots[0]["name"],
+            "start_time_unix_nano": start,
+            "duration_ms": round((end - start) / 1e6, 3),
+            "status": "ERROR" if any(n["status"]["code"] == "ERROR" for n in nodes.values()
+                                     if n["trace_id"] == trace_id) else "OK",
+            "spans": roots,
+        })
+    return sorted(result, key=lambda t: t["start_time_unix_nano"])
+
+
+def load_trace(meeting_id: str) -> List[Dict[str, Any]]:
+    """读取会议的全部链路（组装成树）"""
+    return build_trace_tree(exporter.load(meeting_id))
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""
+转写片段存储
+转写片段从 meetings.transcript_segments（整段 JSON）拆分到独立的 transcript_segments 表，
+编辑单个片段只更新一行，转写接口按游标分页读取
+
+表结构：
+- transcript_segments(id, session_id, segment_id, start_ms, end_ms, speaker, text)
+- 唯一索引 (session_id, segment_id)：按片段 ID 更新
+- 索引 (session_id, start_ms, id)：按时间顺序分页
+- transcript_stale(session_id)：片段编辑后 meetings.full_text 已过期的会议
+
+完整文本延迟重建：编辑片段只记过期标记，不重新拼接 full_text（也不触发全文索引重新分词），
+读取完整文本前调用 refresh_full_text 按需重建；连续多次编辑只重建一次
+（全文索引随重建后的 full_text 更新，编辑到下次读取之间检索命中的仍是旧文本）
+
+迁移：init_db 时把旧 JSON 列中的片段写入新表，并清空 JSON 列
+
+Usage:
+    from services.transcript_store import list_segments, update_segment_texts
+
+    rows, next_cursor = await list_segments(db, session_id, cursor=cursor, limit=200)
+    updated = await update_segment_texts(db, session_id, {"seg-0001": "新文本"})
+    await mark_full_text_stale(db, session_id)
+    await refresh_full_text(db, meeting)   # 读取 meeting.full_text 前
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import (
+    Column, Index, Integer, MetaData, String, Table, Text,
+    bindparam, delete, func, insert, select, tuple_, update
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from logger_config import get_logger
+
+logger = get_logger(__name__)
+
+
+metadata = MetaData()
+
+transcript_segments_table = Table(
+    "transcript_segments",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("session_id", String(50), nullable=False, comment="会议ID"),
+    Column("segment_id", String(32), nullable=False, comment="片段ID"),
+    Column("start_ms", Integer, nullable=False, default=0, comment="开始时间（毫秒）"),
+    Column("end_ms", Integer, nullable=False, default=0, comment="结束时间（毫秒）"),
+    Column("speaker", String(100), default="", comment="发言人"),
+    Column("text", Text, nullable=False, default="", comment="转写文本"),
+    Index("uq_transcript_segments_session_segment", "session_id", "segment_id", unique=True),
+    Index("idx_transcript_segments_session_start", "session_id", "start_ms", "id"),
+)
+
+# 片段已编辑、meetings.full_text 尚未重建的会议
+transcript_stale_table = Table(
+    "transcript_stale",
+    metadata,
+    Column("session_id", String(50), primary_key=True, comment="会议ID"),
+)
+
+_t = transcript_segments_table
+_stale = transcript_stale_table
+
+# 迁移时每批处理的会议数
+_MIGRATE_BATCH = 50
+
+_TIMESTAMP_RE = re.compile(r"^(?:(\d+):)?(\d+):(\d+)$")
+
+
+# ========== 片段格式 ==========
+
+def _timestamp_to_ms(timestamp: str) -> int:
+    """'HH:MM:SS' / 'MM:SS' -> 毫秒"""
+    match = _TIMESTAMP_RE.match((timestamp or "").strip())
+    if not match:
+        return 0
+    hours, minutes, seconds = (int(v) if v else 0 for v in match.groups())
+    return ((hours * 60 + minutes) * 60 + seconds) * 1000
+
+
+def normalize_segments(segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    各来源的片段字典统一为表行
+
+    兼容：
+    - API 格式 {"id", "start_time_ms", "end_time_ms", "speaker", "text"}
+    - transcribe() 结果 {"start": 秒, "end": 秒, "timestamp", "speaker", "text"}
+    """
+    rows = []
+    for i, seg in enumerate(segments or []):
+        if "start_time_ms" in seg:
+            start_ms = int(seg.get("start_time_ms") or 0)
+            end_ms = int(seg.get("end_time_ms") or start_ms)
+        elif "start" in seg:
+            start_ms = int(float(seg.get("start") or 0) * 1000)
+            end_ms = int(float(seg.get("end") or 0) * 1000)
+        else:
+            start_ms = end_ms = _timestamp_to_ms(seg.get("timestamp", ""))
+        rows.append({
+            "segment_id": str(seg.get("id") or f"seg-{i:04d}"),
+            "start_ms": start_ms,
+            "end_ms": end_ms,
+            "speaker": seg.get("speaker") or "",
+            "text": seg.get("text") or "",
+        })
+    return rows
+
+
+def segment_to_dict(row) -> Dict[str, Any]:
+    """表行 -> API 片段格式"""
+    return {
+        "id": row.segment_id,
+        "text": row.text,
+        "start_time_ms": row.start_ms,
+        "end_time_ms": row.end_ms,
+        "speaker": row.speaker or "",
+    }
+
+
+def format_full_text(rows) -> str:
+    """按时间顺序拼接完整文本，每行 [MM:SS] 文本"""
+    lines = []
+    for start_ms, text in rows:
+        lines.append(f"[{start_ms // 60000:02d}:{(start_ms // 1000) % 60:02d}] {text}")
+    return "\n".join(lines)
+
+
+# ========== 游标 ==========
+
+def encode_cursor(start_ms: int, row_id: int) -> str:
+    return f"{start_ms}:{row_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    """游标 -> (start_ms, id)，格式错误抛 ValueError"""
+    start_ms, row_id = cursor.split(":", 1)
+    return int(start_ms), int(row_id)
+
+
+# ========== 建表 / 迁移 ==========
+
+async def init_transcript_store(conn):
+    """建表并迁移旧 JSON 列（init_db 中调用）"""
+    await conn.run_sync(metadata.create_all)
+    await conn.run_sync(_migrate_json_segments)
+
+
+def _migrate_json_segments(sync_conn) -> int:
+    """
+    把 meetings.transcript_segments 中尚未迁移的片段写入新表，并清空 JSON 列
+
+    Returns:
+        迁移的会议数
+    """
+    from models.meeting import MeetingModel
+
+    meetings = MeetingModel.__table__
+    migrated_ids = select(_t.c.session_id).distinct()
+    rows = sync_conn.execute(
+        select(meetings.c.session_id, meetings.c.transcript_segments)
+        .where(meetings.c.transcript_segments.isnot(None))
+        .where(meetings.c.session_id.notin_(migrated_ids))
+    ).all()
+
+    count = 0
+    for start in range(0, len(rows), _MIGRATE_BATCH):
+        for session_id, segments in rows[start:start + _MIGRATE_BATCH]:
+            if not segments:
+                continue
+            sync_conn.execute(
+                insert(_t),
+                [dict(r, session_id=session_id) for r in normalize_segments(segments)]
+            )
+            sync_conn.execute(
+                meetings.update().where(meetings.c.session_id == session_id).values(transcript_segments=[])
+            )
+            count += 1
+    if count:
+        logger.info(f"转写片段已迁移到 transcript_segments 表: {count} 个会议")
+    return count
+
+
+# ========== 读写 ==========
+
+async def replace_segments(db: AsyncSession, session_id: str, segments: List[Dict[str, Any]]) -> int:
+    """
+    整体替换会议的转写片段（重新转写后调用，不提交事务）
+
+    Returns:
+        写入的片段数
+    """
+    rows = [dict(r, session_id=session_id) for r in normalize_segments(segments)]
+    await db.execute(delete(_t).where(_t.c.session_id == session_id))
+    # 调用方随后写入新的 full_text
+    await db.execute(delete(_stale).where(_stale.c.session_id == session_id))
+    if rows:
+        await db.execute(insert(_t), rows)
+    return len(rows)
+
+
+async def count_segments(db: AsyncSession, session_id: str) -> int:
+    result = await db.execute(select(func.count()).select_from(_t).where(_t.c.session_id == session_id))
+    return result.scalar_one()
+
+
+async def list_segments(
+    db: AsyncSession,
+    session_id: str,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    按时间顺序读取片段（键集分页）
+
+    Args:
+        cursor: 上一页返回的 next_cursor，None 从头读取
+        limit: 每页条数，None 读取全部
+
+    Returns:
+        (片段列表, next_cursor)，没有更多数据时 next_cursor 为 None
+    """
+    query = (
+        select(_t.c.id, _t.c.segment_id, _t.c.start_ms, _t.c.end_ms, _t.c.speaker, _t.c.text)
+        .where(_t.c.session_id == session_id)
+        .order_by(_t.c.start_ms, _t.c.id)
+    )
+    if cursor:
+        query = query.where(tuple_(_t.c.start_ms, _t.c.id) > tuple_(*decode_cursor(cursor)))
+    if limit is not None:
+        query = query.limit(limit + 1)
+
+    rows = (await db.execute(query)).all()
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].start_ms, rows[-1].id)
+    return [segment_to_dict(r) for r in rows], next_cursor
+
+
+async def update_segment_texts(db: AsyncSession, session_id: str, texts: Dict[str, str]) -> int:
+    """
+    按片段 ID 更新文本，每个片段一条单行 UPDATE（不提交事务）
+
+    Returns:
+        实际更新的片段数
+    """
+    stmt = (
+        update(_t)
+        .where(_t.c.session_id == session_id)
+        .where(_t.c.segment_id == bindparam("sid"))
+        .values(text=bindparam("new_text"))
+    )
+    updated = 0
+    for segment_id, text in texts.items():
+        result = await db.execute(stmt, {"sid": segment_id, "new_text": text})
+        updated += result.rowcount or 0
+    return updated
+
+
+async def build_full_text(db: AsyncSession, session_id: str) -> str:
+    """由片段表重新生成完整文本（只读取 start_ms/text 两列）"""
+    result = await db.execute(
+        select(_t.c.start_ms, _t.c.text)
+        .where(_t.c.session_id == session_id)
+        .order_by(_t.c.start_ms, _t.c.id)
+    )
+    return format_full_text(result.all())
+
+
+async def mark_full_text_stale(db: AsyncSession, session_id: str):
+    """片段文本已修改：标记 full_text 过期，读取前由 refresh_full_text 重建（不提交事务）"""
+    await db.execute(delete(_stale).where(_stale.c.session_id == session_id))
+    await db.execute(insert(_stale).values(session_id=session_id))
+
+
+async def refresh_full_text(db: AsyncSession, meeting) -> bool:
+    """
+    full_text 已过期时由片段表重建并赋值给 meeting（不提交事务）
+
+    Returns:
+        是否重建（调用方据此决定是否提交）
+    """
+    result = await db.execute(delete(_stale).where(_stale.c.session_id == meeting.session_id))
+    if not result.rowcount:
+        return False
+    meeting.full_text = await build_full_text(db, meeting.session_id)
+    return True
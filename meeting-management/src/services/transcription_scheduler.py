@@ -0,0 +1,431 @@
+# -*- coding: utf-8 -*-
+"""
+转写任务调度器
+有界优先级队列 + 工作进程池，替代直接在事件循环 / 默认线程池中执行转写
+
+两条执行通道：
+- 进程通道：无状态的文件转写（上传转写、结束会议转写），
+  N 个工作进程各自持有预热好的 Whisper 模型，吞吐随 CPU 核数扩展，不受 GIL 影响
+- 线程通道：依赖进程内会话状态的任务（实时追加音频块、finalize_meeting），有界线程池
+
+优先级：LIVE（实时会话）> FINALIZE（会议结束）> BATCH（批量上传）
+
+Usage:
+    from services.transcription_scheduler import transcription_scheduler, JobPriority
+
+    result = await transcription_scheduler.run(
+        transcribe, audio_path, priority=JobPriority.BATCH, job_id=session_id
+    )
+    transcription_scheduler.cancel(session_id)
+"""
+
+import asyncio
+import contextvars
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from logger_config import get_logger
+from services.metrics import EXECUTOR_QUEUE_DEPTH, EXECUTOR_SATURATION, QUEUE_WAIT_SECONDS
+from services.tracing import span
+
+logger = get_logger(__name__)
+
+
+# ========== 配置读取 ==========
+
+# 转写工作进程数（每个进程持有一份模型，注意内存）
+TRANSCRIBE_WORKERS = int(os.getenv("TRANSCRIBE_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+# 线程通道并发数（实时追加 / finalize_meeting 等依赖进程内状态的任务）
+TRANSCRIBE_THREAD_WORKERS = int(os.getenv("TRANSCRIBE_THREAD_WORKERS", "4"))
+# 每条通道的队列上限，满了之后 submit 会等待（背压）
+TRANSCRIBE_QUEUE_SIZE = int(os.getenv("TRANSCRIBE_QUEUE_SIZE", "32"))
+# 工作进程启动时是否预热模型
+TRANSCRIBE_WORKER_WARMUP = os.getenv("TRANSCRIBE_WORKER_WARMUP", "true").lower() == "true"
+
+
+class JobPriority(IntEnum):
+    """任务优先级（数值越小越优先）"""
+    LIVE = 0
+    FINALIZE = 1
+    BATCH = 2
+
+
+class JobCancelledError(Exception):
+    """任务已取消"""
+    pass
+
+
+class QueueFullError(Exception):
+    """队列已满（wait=False 时抛出）"""
+    pass
+
+
+@dataclass(order=True)
+class TranscriptionJob:
+    """调度队列中的任务"""
+    priority: int
+    seq: int
+    job_id: str = field(compare=False)
+    fn: Callable = field(compare=False)
+    args: tuple = field(compare=False, default=())
+    kwargs: dict = field(compare=False, default_factory=dict)
+    in_process: bool = field(compare=False, default=False)
+    future: Optional[asyncio.Future] = field(compare=False, default=None)
+    enqueued_at: float = field(compare=False, default_factory=time.time)
+    started_at: Optional[float] = field(compare=False, default=None)
+    # 提交方的上下文（线程通道中执行时沿用，链路追踪的父 span 随之传递）
+    context: Optional[contextvars.Context] = field(compare=False, default=None)
+
+    def __hash__(self) -> int:
+        # seq 全局唯一，可作为集合元素
+        return hash(self.seq)
+
+    @property
+    def cancelled(self) -> bool:
+        return self.future is not None and self.future.cancelled()
+
+
+def _worker_init(workers: int):
+    """工作进程初始化：按进程数均分 CPU 线程，预热模型，之后该进程的每个任务直接复用"""
+    from logger_config import setup_logging, LOG_LEVEL
+    from services.model_registry import model_registry
+
+    # spawn 启动的进程没有日志配置：只输出到控制台（日志文件由主进程写，避免多进程同时轮转）
+    setup_logging(log_dir=None, log_level=LOG_LEVEL, enable_file=False)
+
+    if model_registry.cpu_threads == 0:
+        # 多个进程同时转写时避免线程超订，吞吐随核数线性扩展
+        model_registry.cpu_threads = max(1, (os.cpu_count() or 1) // workers)
+
+    if not TRANSCRIBE_WORKER_WARMUP:
+        return
+    try:
+        from meeting_skill import WHISPER_MODEL, _detect_device, _get_compute_type
+
+        device = _detect_device()
+        model_registry.warm_up(WHISPER_MODEL, device, _get_compute_type(device))
+    except Exception as e:
+        logger.warning(f"工作进程预热模型失败（首个任务时再加载）: {e}")
+
+
+class _Lane:
+    """一条执行通道：有界优先级队列 + 固定数量的分发协程"""
+
+    def __init__(self, name: str, concurrency: int, queue_size: int):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.queue: asyncio.PriorityQueue = asyncio.PriorityQueue(maxsize=queue_size)
+        self.running: Set[TranscriptionJob] = set()
+        self.dispatchers: List[asyncio.Task] = []
+
+        # 指标
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_last = 0.0
+
+    def record_wait(self, wait: float):
+        self.wait_last = wait
+        self.wait_max = max(self.wait_max, wait)
+        self.wait_total += wait
+
+    def get_status(self) -> dict:
+        started = self.completed + self.failed
+        return {
+            "concurrency": self.concurrency,
+            "queue_depth": self.queue.qsize(),
+            "queue_capacity": self.queue.maxsize,
+            "running": len(self.running),
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "wait_seconds": {
+                "last": round(self.wait_last, 3),
+                "max": round(self.wait_max, 3),
+                "avg": round(self.wait_total / started, 3) if started else 0.0
+            }
+        }
+
+
+class TranscriptionScheduler:
+    """
+    转写任务调度器（单例）
+
+    需在事件循环中 start()，应用关闭时 await stop()
+    """
+
+    def __init__(
+        self,
+        workers: int = TRANSCRIBE_WORKERS,
+        thread_workers: int = TRANSCRIBE_THREAD_WORKERS,
+        queue_size: int = TRANSCRIBE_QUEUE_SIZE
+    ):
+        self.workers = max(1, workers)
+        self.thread_workers = max(1, thread_workers)
+        self.queue_size = queue_size
+
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._lanes: Dict[str, _Lane] = {}
+        self._jobs: Dict[str, Set[TranscriptionJob]] = {}
+        self._seq = itertools.count()
+        self._started = False
+
+    # ---------- 生命周期 ----------
+
+    def _create_process_pool(self) -> ProcessPoolExecutor:
+        # spawn：避免 fork 带着事件循环和线程锁进入子进程
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_worker_init,
+            initargs=(self.workers,)
+        )
+
+    def start(self):
+        """启动调度器（创建进程池/线程池和分发协程）"""
+        if self._started:
+            return
+        self._process_pool = self._create_process_pool()
+        self._thread_pool = ThreadPoolExecutor(
+            max_workers=self.thread_workers, thread_name_prefix="transcribe"
+        )
+        self._lanes = {
+            "process": _Lane("process", self.workers, self.queue_size),
+            "thread": _Lane("thread", self.thread_workers, self.queue_size),
+        }
+        for lane in self._lanes.values():
+            lane.dispatchers = [
+                asyncio.create_task(self._dispatch_loop(lane)) for _ in range(lane.concurrency)
+            ]
+        self._started = True
+        logger.info(f"转写调度器已启动 (进程={self.workers}, 线程={self.thread_workers}, 队列={self.queue_size})")
+
+    async def stop(self):
+        """停止调度器，取消排队中的任务"""
+        if not self._started:
+            return
+        for lane in self._lanes.values():
+            for task in lane.dispatchers:
+                task.cancel()
+            while not lane.queue.empty():
+                job = lane.queue.get_nowait()
+                if job.future and not job.future.done():
+                    job.future.cancel()
+        if self._process_pool:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+        if self._thread_pool:
+            self._thread_pool.shutdown(wait=False, cancel_futures=True)
+        self._started = False
+        logger.info("转写调度器已停止")
+
+    # ---------- 提交 / 取消 ----------
+
+    async def submit(
+        self,
+        fn: Callable,
+        *args,
+        priority: JobPriority = JobPriority.BATCH,
+        in_process: bool = False,
+        job_id: Optional[str] = None,
+        wait: bool = True,
+        **kwargs
+    ) -> TranscriptionJob:
+        """
+        提交任务到队列
+
+        Args:
+            fn: 任务函数（进程通道要求可 pickle 的模块级函数）
+            priority: 优先级
+            in_process: True 走线程通道（需要访问进程内状态），False 走进程通道
+            job_id: 任务标识（用于取消），默认自动生成
+            wait: 队列满时是否等待；False 则抛出 QueueFullError
+
+        Returns:
+            TranscriptionJob，通过 await job.future 获取结果
+        """
+        if not self._started:
+            self.start()
+
+        lane = self._lanes["thread" if in_process else "process"]
+        seq = next(self._seq)
+        job = TranscriptionJob(
+            priority=int(priority),
+            seq=seq,
+            job_id=job_id or f"job-{seq}",
+            fn=fn,
+            args=args,
+            kwargs=kwargs,
+            in_process=in_process,
+            future=asyncio.get_running_loop().create_future(),
+            context=contextvars.copy_context() if in_process else None
+        )
+
+        if wait:
+            await lane.queue.put(job)
+        else:
+            try:
+                lane.queue.put_nowait(job)
+            except asyncio.QueueFull:
+                raise QueueFullError(f"转写队列已满 ({lane.queue.maxsize})")
+
+        self._jobs.setdefault(job.job_id, set()).add(job)
+        logger.debug(f"[{job.job_id}] 任务入队: lane={lane.name}, priority={priority.name if isinstance(priority, JobPriority) else priority}, 深度={lane.queue.qsize()}")
+        return job
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """提交任务并等待结果（调用方被取消时同步取消任务）"""
+        with span(f"scheduler.{getattr(fn, '__name__', 'job')}") as job_span:
+            job = await self.submit(fn, *args, **kwargs)
+            job_span.set_attribute("lane", "thread" if job.in_process else "process")
+            try:
+                return await self._wait(job)
+            finally:
+                if job.started_at is not None:
+                    job_span.set_attribute("queue_wait_ms", round((job.started_at - job.enqueued_at) * 1000, 1))
+
+    async def _wait(self, job: TranscriptionJob) -> Any:
+        caller_cancelled = False
+        try:
+            # shield：调用方被取消时不直接取消 future，由下面统一处理
+            return await asyncio.shield(job.future)
+        except asyncio.CancelledError:
+            if not job.future.cancelled():
+                # 调用方自身被取消：丢弃排队中的任务，继续向上传播
+                caller_cancelled = True
+                job.future.cancel()
+            if caller_cancelled:
+                raise
+            raise JobCancelledError(f"任务已取消: {job.job_id}")
+
+    def cancel(self, job_id: str) -> int:
+        """
+        取消任务
+
+        排队中的任务直接丢弃；已在执行的进程任务无法中断，其结果会被丢弃
+
+        Returns:
+            取消的任务数
+        """
+        count = 0
+        for job in list(self._jobs.get(job_id, set())):
+            if job.future and not job.future.done():
+                job.future.cancel()
+                count += 1
+        if count:
+            logger.info(f"[{job_id}] 已取消 {count} 个转写任务")
+        return count
+
+    def _forget(self, job: TranscriptionJob):
+        jobs = self._jobs.get(job.job_id)
+        if jobs is not None:
+            jobs.discard(job)
+            if not jobs:
+                del self._jobs[job.job_id]
+
+    # ---------- 分发 ----------
+
+    async def _dispatch_loop(self, lane: _Lane):
+        """从队列取任务交给执行器；每个分发协程同一时刻只执行一个任务"""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                job: TranscriptionJob = await lane.queue.get()
+            except asyncio.CancelledError:
+                break
+
+            try:
+                if job.cancelled:
+                    lane.cancelled += 1
+                    continue
+
+                job.started_at = time.time()
+                lane.record_wait(job.started_at - job.enqueued_at)
+                QUEUE_WAIT_SECONDS.observe(
+                    job.started_at - job.enqueued_at, lane=lane.name, priority=_priority_name(job.priority)
+                )
+                lane.running.add(job)
+
+                executor = self._thread_pool if job.in_process else self._process_pool
+                try:
+                    if job.context is not None:
+                        result = await loop.run_in_executor(
+                            executor, job.context.run, _call, job.fn, job.args, job.kwargs
+                        )
+                    else:
+                        result = await loop.run_in_executor(executor, _call, job.fn, job.args, job.kwargs)
+                    lane.completed += 1
+                    if job.future and not job.future.done():
+                        job.future.set_result(result)
+                except BrokenProcessPool as e:
+                    lane.failed += 1
+                    logger.error(f"[{job.job_id}] 工作进程异常退出，重建进程池: {e}")
+                    self._process_pool = self._create_process_pool()
+                    if job.future and not job.future.done():
+                        job.future.set_exception(e)
+                except Exception as e:
+                    lane.failed += 1
+                    if job.future and not job.future.done():
+                        job.future.set_exception(e)
+                finally:
+                    lane.running.discard(job)
+            except asyncio.CancelledError:
+                if job.future and not job.future.done():
+                    job.future.cancel()
+                break
+            finally:
+                self._forget(job)
+                lane.queue.task_done()
+
+    # ---------- 状态 ----------
+
+    def get_status(self) -> dict:
+        """获取调度器状态（用于 /health）"""
+        if not self._started:
+            return {"status": "stopped"}
+
+        lanes = {name: lane.get_status() for name, lane in self._lanes.items()}
+        full = any(s["queue_depth"] >= s["queue_capacity"] > 0 for s in lanes.values())
+        return {
+            "status": "degraded" if full else "ok",
+            "workers": self.workers,
+            "queue_depth": sum(s["queue_depth"] for s in lanes.values()),
+            "running": sum(s["running"] for s in lanes.values()),
+            "lanes": lanes
+        }
+
+    def saturation(self) -> Dict[tuple, float]:
+        """各通道占用率（/metrics 采集时回调）"""
+        return {(name,): len(lane.running) / lane.concurrency for name, lane in self._lanes.items()}
+
+    def queue_depths(self) -> Dict[tuple, int]:
+        """各通道排队任务数（/metrics 采集时回调）"""
+        return {(name,): lane.queue.qsize() for name, lane in self._lanes.items()}
+
+
+def _call(fn: Callable, args: tuple, kwargs: dict) -> Any:
+    """执行器入口（模块级函数，可被 pickle）"""
+    return fn(*args, **kwargs)
+
+
+def _priority_name(priority: int) -> str:
+    try:
+        return JobPriority(priority).name.lower()
+    except ValueError:
+        return str(priority)
+
+
+# 全局单例
+transcription_scheduler = TranscriptionScheduler()
+
+EXECUTOR_SATURATION.set_function(transcription_scheduler.saturation)
+EXECUTOR_QUEUE_DEPTH.set_function(transcription_scheduler.queue_depths)
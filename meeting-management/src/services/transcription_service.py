@@ -8,15 +8,17 @@
 """
 
 import os
-import time
 import asyncio
 import random
 from typing import List, Optional, Callable, AsyncGenerator
-from pathlib import Path
 from dataclasses import dataclass
 
 from logger_config import get_logger
 from models.meeting import TranscriptSegment
+from services.model_registry import model_registry
+from services.audio_decoder import decode_pcm
+from services.session_buffer import contiguous_bytes
+from services.text_postprocess import to_simplified, to_simplified_batch
 
 logger = get_logger(__name__)
 
@@ -49,14 +51,8 @@ def convert_to_simplified(text: str) -> str:
     """
     if not ENABLE_SIMPLIFIED_CHINESE or not text:
         return text
-    
-    try:
-        import opencc
-        converter = opencc.OpenCC('t2s')  # 繁体转简体
-        return converter.convert(text)
-    except Exception as e:
-        logger.warning(f"繁简转换失败: {e}, 返回原文")
-        return text
+    # 转换器进程内只创建一次
+    return to_simplified(text)
 
 
 def _detect_device() -> str:
@@ -236,41 +232,41 @@ class WhisperTranscriptionService:
         self.compute_type = _get_compute_type(self.device)
         self.language = WHISPER_LANGUAGE
         
-        self.model = None
         self._model_loaded = False
         
         logger.info(f"Whisper 转写服务已初始化 (model={self.model_size}, device={self.device}, compute_type={self.compute_type})")
     
     async def _load_model(self):
-        """异步加载模型"""
+        """异步预热共享模型池中的模型"""
         if self._model_loaded:
             return
         
         try:
-            from faster_whisper import WhisperModel
-            
-            logger.info(f"正在加载 Whisper 模型: {self.model_size} ...")
-            start_time = time.time()
-            
             # 在线程池中加载模型避免阻塞事件循环
             loop = asyncio.get_event_loop()
-            self.model = await loop.run_in_executor(
+            await loop.run_in_executor(
                 None,
-                lambda: WhisperModel(
-                    self.model_size, 
-                    device=self.device, 
-                    compute_type=self.compute_type
-                )
+                model_registry.warm_up,
+                self.model_size,
+                self.device,
+                self.compute_type
             )
-            
             self._model_loaded = True
-            load_time = time.time() - start_time
-            logger.info(f"Whisper 模型加载完成: {self.model_size} ({load_time:.2f}s)")
             
         except Exception as e:
             logger.error(f"Whisper 模型加载失败: {e}")
             raise
     
+    def _transcribe_audio(self, audio):
+        """借出共享模型转写（文件路径或 PCM 数组，在线程池中执行）"""
+        with model_registry.checkout(self.model_size, self.device, self.compute_type) as model:
+            segments, info = model.transcribe(
+                audio,
+                beam_size=5,
+                language=self.language if self.language != "auto" else None
+            )
+            return list(segments), info
+    
     async def transcribe(
         self,
         audio_chunks: List[dict],
@@ -281,9 +277,8 @@ class WhisperTranscriptionService:
         
         流程：
         1. 合并音频片段
-        2. 保存为临时文件
+        2. 内存解码为 16kHz PCM（不落盘临时文件）
         3. 调用 Whisper 转写
-        4. 清理临时文件
         """
         if not audio_chunks:
             return []
@@ -295,57 +290,55 @@ class WhisperTranscriptionService:
         # 合并音频数据
         audio_data = self._merge_audio_chunks(audio_chunks)
         
-        # 保存临时文件
-        temp_file = Path(f"/tmp/whisper_{int(time.time())}.webm")
-        try:
-            temp_file.write_bytes(audio_data)
-            
-            # 转写
-            loop = asyncio.get_event_loop()
-            segments, info = await loop.run_in_executor(
-                None,
-                lambda: self.model.transcribe(
-                    str(temp_file), 
-                    beam_size=5, 
-                    language=self.language if self.language != "auto" else None
-                )
-            )
-            
-            logger.info(f"Whisper 转写完成: 语言={info.language}, 概率={info.language_probability:.2f}")
-            
-            # 转换为结果格式
-            results = []
-            for segment in segments:
-                results.append(TranscriptionResult(
-                    text=convert_to_simplified(segment.text.strip()),
-                    start_ms=base_timestamp_ms + int(segment.start * 1000),
-                    end_ms=base_timestamp_ms + int(segment.end * 1000),
-                    confidence=segment.avg_logprob
-                ))
-            
-            return results
-            
-        finally:
-            # 清理临时文件
-            if temp_file.exists():
-                temp_file.unlink()
+        # 解码 + 转写
+        loop = asyncio.get_event_loop()
+        segments, info = await loop.run_in_executor(
+            None, self._transcribe_bytes, audio_data
+        )
+        
+        logger.info(f"Whisper 转写完成: 语言={info.language}, 概率={info.language_probability:.2f}")
+        
+        # 转换为结果格式（全部片段一次繁简转换）
+        texts = [segment.text.strip() for segment in segments]
+        if ENABLE_SIMPLIFIED_CHINESE:
+            texts = to_simplified_batch(texts)
+        results = []
+        for segment, text in zip(segments, texts):
+            results.append(TranscriptionResult(
+                text=text,
+                start_ms=base_timestamp_ms + int(segment.start * 1000),
+                end_ms=base_timestamp_ms + int(segment.end * 1000),
+                confidence=segment.avg_logprob
+            ))
+        
+        return results
+    
+    def _transcribe_bytes(self, audio_data: bytes):
+        """内存解码后转写（在线程池中执行）"""
+        _, pcm = decode_pcm(audio_data)
+        return self._transcribe_audio(pcm)
     
     def _merge_audio_chunks(self, chunks: List[dict]) -> bytes:
         """合并音频片段为完整数据"""
+        # MeetingSession.get_and_clear_buffer() 的结果已按序号连续，直接取回整段
+        merged = contiguous_bytes(chunks)
+        if merged is not None:
+            return merged
+
         # 按序列号排序
         sorted_chunks = sorted(chunks, key=lambda x: x.get("seq", 0))
         
-        # 合并数据
-        merged = bytearray()
+        # 合并数据（join 一次分配）
+        parts = []
         for chunk in sorted_chunks:
             data = chunk.get("data", b"")
             if isinstance(data, str):
                 # Base64 解码
                 import base64
                 data = base64.b64decode(data)
-            merged.extend(data)
+            parts.append(data)
         
-        return bytes(merged)
+        return b"".join(parts)
 
 
 class TranscriptionService:
@@ -399,6 +392,7 @@ class TranscriptionService:
             "mock_enabled": self.mock_service.enabled,
             "whisper_loaded": self.whisper_service._model_loaded if self.whisper_service else False,
             "active_tasks": len(self._active_tasks),
+            "model_pool": model_registry.get_status(),
             "config": {
                 "model": WHISPER_MODEL,
                 "device": _detect_device(),
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+上传文件流式落盘
+/upload/audio 不再把整个文件读入内存：按固定大小分块读取、写盘（aiofiles，不阻塞事件循环），
+边写边计算 sha256，超过大小上限立即中止；每个上传的内存占用为 O(块大小)
+
+断点续传（网络不稳定的客户端）:
+    POST /upload/resumable                       -> upload_id, offset=0
+    PUT  /upload/resumable/{upload_id}?offset=N  -> 请求体为从 N 开始的原始字节，返回新 offset
+    GET  /upload/resumable/{upload_id}           -> 当前 offset（断线后从这里继续）
+    POST /upload/resumable/{upload_id}/complete  -> 校验 sha256，创建会议并开始转写
+
+未完成的上传保存在 {UPLOAD_DIR}/.partial/：{upload_id}.part（数据）+ {upload_id}.json（元数据），
+超过 UPLOAD_SESSION_TTL 未更新的自动清理
+
+Usage:
+    size, sha256 = await save_stream(read_chunks(upload_file), dest_path, max_bytes)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import aiofiles
+import aiofiles.os
+
+from logger_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# ========== 配置读取 ==========
+
+# 读取 / 写入块大小（字节）
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+# 未完成的断点续传保留时间（秒）
+UPLOAD_SESSION_TTL = int(os.getenv("UPLOAD_SESSION_TTL", str(24 * 3600)))
+
+PARTIAL_DIRNAME = ".partial"
+
+
+class UploadTooLargeError(Exception):
+    """上传超过大小上限"""
+
+
+class UploadOffsetError(Exception):
+    """续传偏移与服务端已接收的字节数不一致"""
+
+    def __init__(self, expected: int):
+        super().__init__(f"offset 不匹配，服务端已接收 {expected} 字节")
+        self.expected = expected
+
+
+async def read_chunks(upload_file, chunk_size: int = UPLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """按块读取 FastAPI UploadFile"""
+    while True:
+        chunk = await upload_file.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def save_stream(
+    chunks: AsyncIterator[bytes],
+    dest: Path,
+    max_bytes: int,
+    append: bool = False,
+    start_size: int = 0,
+    hasher=None,
+) -> Tuple[int, str]:
+    """
+    流式写入文件，边写边计算 sha256
+
+    Args:
+        chunks: 数据块
+        dest: 目标文件
+        max_bytes: 文件总大小上限
+        append: 追加写入（断点续传）
+        start_size: 追加前已有的字节数
+        hasher: 已有内容的 sha256 状态（追加时继续计算）
+
+    Returns:
+        (文件总大小, sha256 十六进制)；追加且未提供 hasher 时 sha256 为空
+
+    Raises:
+        UploadTooLargeError: 超过上限（非追加模式删除已写入的部分）
+    """
+    size = start_size
+    hasher = hasher if hasher is not None else (None if append and start_size else hashlib.sha256())
+    try:
+        async with aiofiles.open(dest, "ab" if append else "wb") as f:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"文件大小超过限制: {max_bytes / 1024 / 1024:.0f}MB")
+                await f.write(chunk)
+                if hasher is not None:
+                    hasher.update(chunk)
+    except BaseException:
+        if not append and dest.exists():
+            dest.unlink()
+        raise
+    return size, hasher.hexdigest() if hasher is not None else ""
+
+
+def file_sha256(path: Path, chunk_size: int = UPLOAD_CHUNK_SIZE) -> str:
+    """按块计算文件 sha256（在线程中调用）"""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return hasher.hexdigest()
+            hasher.update(chunk)
+
+
+@dataclass
+class ResumableUpload:
+    """断点续传元数据"""
+    upload_id: str
+    filename: str
+    title: str
+    user_id: str
+    total_size: Optional[int]
+    created_at: float
+    updated_at: float
+
+
+class ResumableUploadStore:
+    """断点续传的临时存储（文件系统，可跨进程 / 重启续传）"""
+
+    def __init__(self, upload_dir: Path, max_bytes: int, ttl: int = UPLOAD_SESSION_TTL):
+        self.dir = Path(upload_dir) / PARTIAL_DIRNAME
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # 同一上传的 PUT 串行执行
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # 本进程内续传的 sha256 状态及其覆盖的字节数（与文件大小不一致时 complete 重新计算）
+        self._hashers: Dict[str, Tuple[Any, int]] = {}
+
+    def _paths(self, upload_id: str) -> Tuple[Path, Path]:
+        return self.dir / f"{upload_id}.part", self.dir / f"{upload_id}.json"
+
+    def _lock(self, upload_id: str) -> asyncio.Lock:
+        return self._locks.setdefault(upload_id, asyncio.Lock())
+
+    # ---------- 元数据 ----------
+
+    def create(self, filename: str, title: str, user_id: str, total_size: Optional[int] = None) -> ResumableUpload:
+        if total_size is not None and total_size > self.max_bytes:
+            raise UploadTooLargeError(f"文件大小超过限制: {self.max_bytes / 1024 / 1024:.0f}MB")
+        self.cleanup_expired()
+
+        now = time.time()
+        upload = ResumableUpload(uuid.uuid4().hex, filename, title, user_id, total_size, now, now)
+        part, meta = self._paths(upload.upload_id)
+        part.touch()
+        meta.write_text(json.dumps(asdict(upload), ensure_ascii=False), encoding="utf-8")
+        self._hashers[upload.upload_id] = (hashlib.sha256(), 0)
+        return upload
+
+    def get(self, upload_id: str) -> Optional[Tuple[ResumableUpload, int]]:
+        """Returns: (元数据, 已接收字节数)，不存在返回 None"""
+        part, meta = self._paths(upload_id)
+        if not meta.exists() or not part.exists():
+            return None
+        upload = ResumableUpload(**json.loads(meta.read_text(encoding="utf-8")))
+        return upload, part.stat().st_size
+
+    # ---------- 续传 ----------
+
+    async def append(self, upload_id: str, offset: int, chunks: AsyncIterator[bytes]) -> int:
+        """
+        从 offset 开始追加
+
+        Returns:
+            新的 offset（已接收字节数）
+
+        Raises:
+            KeyError: 上传不存在或已过期
+            UploadOffsetError: offset 与已接收字节数不一致
+            UploadTooLargeError: 超过上限或声明的总大小
+        """
+        async with self._lock(upload_id):
+            found = self.get(upload_id)
+            if found is None:
+                raise KeyError(upload_id)
+            upload, received = found
+            if offset != received:
+                raise UploadOffsetError(received)
+
+            limit = self.max_bytes if upload.total_size is None else min(self.max_bytes, upload.total_size)
+            part, meta = self._paths(upload_id)
+            hasher, hashed = self._hashers.pop(upload_id, (None, 0))
+            if hasher is None or hashed != received:
+                hasher = hashlib.sha256() if received == 0 else None
+            # 中断时已写入的部分保留（客户端按 GET 返回的 offset 续传），sha256 状态失效，complete 时重新计算
+            size, _ = await save_stream(chunks, part, limit, append=True, start_size=received, hasher=hasher)
+            if hasher is not None:
+                self._hashers[upload_id] = (hasher, size)
+
+            upload.updated_at = time.time()
+            meta.write_text(json.dumps(asdict(upload), ensure_ascii=False), encoding="utf-8")
+            return size
+
+    async def complete(self, upload_id: str, dest: Path, expected_sha256: Optional[str] = None) -> Tuple[int, str]:
+        """
+        校验并移动到最终路径
+
+        Returns:
+            (文件大小, sha256)
+
+        Raises:
+            KeyError: 上传不存在
+            ValueError: 大小与声明不符或 sha256 校验失败
+        """
+        async with self._lock(upload_id):
+            found = self.get(upload_id)
+            if found is None:
+                raise KeyError(upload_id)
+            upload, size = found
+            if upload.total_size is not None and size != upload.total_size:
+                raise ValueError(f"上传未完成: {size}/{upload.total_size} 字节")
+            if size == 0:
+                raise ValueError("上传内容为空")
+
+            part, meta = self._paths(upload_id)
+            hasher, hashed = self._hashers.pop(upload_id, (None, 0))
+            if hasher is not None and hashed == size:
+                sha256 = hasher.hexdigest()
+            else:
+                sha256 = await asyncio.to_thread(file_sha256, part)
+            if expected_sha256 and expected_sha256.lower() != sha256:
+                raise ValueError(f"sha256 校验失败: 期望 {expected_sha256}，实际 {sha256}")
+
+            await aiofiles.os.replace(part, dest)
+            meta.unlink(missing_ok=True)
+            self._locks.pop(upload_id, None)
+            return size, sha256
+
+    def abort(self, upload_id: str) -> bool:
+        part, meta = self._paths(upload_id)
+        existed = meta.exists()
+        part.unlink(missing_ok=True)
+        meta.unlink(missing_ok=True)
+        self._hashers.pop(upload_id, None)
+        self._locks.pop(upload_id, None)
+        return existed
+
+    def cleanup_expired(self) -> int:
+        """清理超过 TTL 未更新的上传"""
+        deadline = time.time() - self.ttl
+        removed = 0
+        for meta in self.dir.glob("*.json"):
+            try:
+                if meta.stat().st_mtime < deadline:
+                    removed += self.abort(meta.stem)
+            except OSError:
+                continue
+        if removed:
+            logger.info(f"清理过期的断点续传: {removed} 个")
+        return removed
@@ -6,6 +6,7 @@ WebSocket 连接管理器
 
 import asyncio
 import json
+import os
 import time
 import uuid
 from typing import Dict, Optional, List
@@ -15,6 +16,8 @@ from fastapi import WebSocket
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from logger_config import get_logger
+from services.metrics import ACTIVE_SESSIONS
+from services.session_buffer import AudioChunkBuffer, TranscriptLog
 from models.meeting import (
     MeetingStatus, WSTranscript, WSStatus, WSResult, WSError,
     TranscriptSegment
@@ -23,6 +26,12 @@ from models.meeting import (
 logger = get_logger(__name__)
 
 
+# ========== 配置读取 ==========
+
+# 每个会话的音频缓存上限（字节，首次缓存音频时才分配，按需增长）
+SESSION_AUDIO_BUFFER_BYTES = int(os.getenv("SESSION_AUDIO_BUFFER_BYTES", str(8 * 1024 * 1024)))
+
+
 class MeetingSession:
     """
     单个会议的 WebSocket 会话状态
@@ -40,16 +49,16 @@ class MeetingSession:
         self.websocket: Optional[WebSocket] = None
         self.connected_at: Optional[datetime] = None
         
-        # 音频缓存（用于合并后转写）
-        self.audio_buffer: List[dict] = []  # [{seq, timestamp_ms, data, mime_type}]
-        self.audio_buffer_size = 0  # 字节数
+        # 音频缓存（用于合并后转写）：各块写入同一段缓冲，首次缓存音频时才分配
+        self._audio = AudioChunkBuffer(self.MAX_AUDIO_BUFFER_SIZE, self.MAX_AUDIO_CHUNKS)
         self.last_transcribe_time = 0  # 上次转写时间戳
-        
-        # 转写结果
-        self.transcript_segments: List[TranscriptSegment] = []
-        self.full_text = ""
+
+        # 转写结果：按 id 索引，完整文本读取时才拼接
+        self._transcript = TranscriptLog(
+            lambda seg: f"[{self._format_time(seg.start_time_ms)}] {seg.text}"
+        )
         self.segment_counter = 0
-        
+
         # 会话超时控制
         self.last_activity = time.time()
         self.is_active = False
@@ -75,9 +84,28 @@ class MeetingSession:
                 logger.error(f"[{self.session_id}] WebSocket 发送失败: {e}")
     
     # 音频缓存限制（防止内存溢出）
-    MAX_AUDIO_BUFFER_SIZE = 50 * 1024 * 1024  # 50MB
+    MAX_AUDIO_BUFFER_SIZE = SESSION_AUDIO_BUFFER_BYTES
     MAX_AUDIO_CHUNKS = 1000  # 最大片段数
-    
+
+    @property
+    def audio_buffer_size(self) -> int:
+        """缓存中的音频字节数"""
+        return self._audio.nbytes
+
+    @property
+    def transcript_count(self) -> int:
+        return len(self._transcript)
+
+    @property
+    def transcript_segments(self) -> List[TranscriptSegment]:
+        """转写片段（按时间顺序）"""
+        return self._transcript.segments()
+
+    @property
+    def full_text(self) -> str:
+        """完整转写文本（每行 "[MM:SS] 文本"）"""
+        return self._transcript.text
+
     def add_audio_chunk(self, seq: int, timestamp_ms: int, data: bytes, mime_type: str) -> bool:
         """
         添加音频片段到缓存
@@ -85,26 +113,15 @@ class MeetingSession:
         返回:
             bool: 是否成功添加（如果缓存已满则触发转写并返回False）
         """
-        # 检查缓存是否已满
-        if self.audio_buffer_size + len(data) > self.MAX_AUDIO_BUFFER_SIZE:
-            logger.warning(f"[{self.session_id}] 音频缓存即将溢出 ({self.audio_buffer_size} bytes)，建议立即转写")
-            return False
-        
-        if len(self.audio_buffer) >= self.MAX_AUDIO_CHUNKS:
-            logger.warning(f"[{self.session_id}] 音频片段数达到上限 ({self.MAX_AUDIO_CHUNKS})，建议立即转写")
+        if not self._audio.append(seq, timestamp_ms, data, mime_type):
+            if len(self._audio) >= self.MAX_AUDIO_CHUNKS:
+                logger.warning(f"[{self.session_id}] 音频片段数达到上限 ({self.MAX_AUDIO_CHUNKS})，建议立即转写")
+            else:
+                logger.warning(f"[{self.session_id}] 音频缓存即将溢出 ({self._audio.nbytes} bytes)，建议立即转写")
             return False
-        
-        self.audio_buffer.append({
-            "seq": seq,
-            "timestamp_ms": timestamp_ms,
-            "data": data,
-            "mime_type": mime_type,
-            "received_at": time.time()
-        })
-        self.audio_buffer_size += len(data)
         self.update_activity()
         
-        logger.debug(f"[{self.session_id}] 音频片段 #{seq} 已缓存，当前缓存 {len(self.audio_buffer)} 段，共 {self.audio_buffer_size} 字节")
+        logger.debug(f"[{self.session_id}] 音频片段 #{seq} 已缓存，当前缓存 {len(self._audio)} 段，共 {self._audio.nbytes} 字节")
         return True
     
     def should_transcribe(self, min_chunks: int = 3, min_bytes: int = 50000, min_interval_ms: int = 5000) -> bool:
@@ -115,19 +132,23 @@ class MeetingSession:
         - 或缓存达到 min_bytes 字节
         - 或距离上次转写超过 min_interval_ms 毫秒
         """
-        if len(self.audio_buffer) < min_chunks and self.audio_buffer_size < min_bytes:
+        chunks, size = len(self._audio), self._audio.nbytes
+        if chunks < min_chunks and size < min_bytes:
             return False
         
         if time.time() * 1000 - self.last_transcribe_time > min_interval_ms:
             return True
         
-        return len(self.audio_buffer) >= min_chunks or self.audio_buffer_size >= min_bytes
+        return chunks >= min_chunks or size >= min_bytes
     
     def get_and_clear_buffer(self) -> List[dict]:
-        """获取并清空音频缓存"""
-        chunks = self.audio_buffer.copy()
-        self.audio_buffer = []
-        self.audio_buffer_size = 0
+        """
+        获取并清空音频缓存
+
+        按序号排列；各块 data 是同一段连续 bytes 的 memoryview 切片，
+        transcription_service 合并时直接取回整段，不再拷贝
+        """
+        chunks = self._audio.drain()
         self.last_transcribe_time = time.time() * 1000
         return chunks
     
@@ -141,13 +162,7 @@ class MeetingSession:
             end_time_ms=end_ms,
             speaker_id=speaker_id
         )
-        self.transcript_segments.append(segment)
-        
-        # 更新完整文本
-        if self.full_text:
-            self.full_text += "\n"
-        self.full_text += f"[{self._format_time(start_ms)}] {text}"
-        
+        self._transcript.append(segment)
         self.update_activity()
         return segment
     
@@ -160,19 +175,7 @@ class MeetingSession:
     
     def update_segment(self, segment_id: str, new_text: str) -> bool:
         """更新转写片段文本（支持编辑）"""
-        for seg in self.transcript_segments:
-            if seg.id == segment_id:
-                seg.text = new_text
-                self._rebuild_full_text()
-                return True
-        return False
-    
-    def _rebuild_full_text(self):
-        """重新构建完整文本"""
-        lines = []
-        for seg in self.transcript_segments:
-            lines.append(f"[{self._format_time(seg.start_time_ms)}] {seg.text}")
-        self.full_text = "\n".join(lines)
+        return self._transcript.update(segment_id, new_text)
 
 
 class WebSocketManager:
@@ -360,3 +363,5 @@ class WebSocketManager:
 
 # 全局单例
 websocket_manager = WebSocketManager()
+
+ACTIVE_SESSIONS.set_function(websocket_manager.get_active_sessions_count)
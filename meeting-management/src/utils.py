@@ -9,6 +9,7 @@
 """
 
 import functools
+import logging
 import os
 import platform
 import shutil
@@ -323,10 +324,7 @@ def timer(name: str = "Operation", logger=None):
     finally:
         elapsed = time.time() - start
         msg = f"{name} completed in {elapsed:.2f}s"
-        if logger:
-            logger.info(msg)
-        else:
-            print(msg)
+        (logger or logging.getLogger(__name__)).info(msg)
 
 
 def get_memory_usage() -> dict:
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+长会议分段 map-reduce 纪要生成单元测试
+
+Test Cases:
+1. 按发言时间戳切分，不拆开单条发言；超长发言按句切分
+2. 超过 MAX_TEXT_LENGTH 时分段提取 + 合并，覆盖全部内容（不截断中间部分）
+3. 个别分段失败时用其余分段合并
+4. 结果缓存：相同输入不再请求；换模板只重新 reduce
+5. 会议进行中的滚动草稿：更新只发送新增文本，结束时只合并草稿和尾部
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+import ai_minutes_generator as gen  # noqa: E402
+from services.llm_client import LLMClient  # noqa: E402
+from services.minutes_cache import MinutesCache  # noqa: E402
+
+
+def _utterance(i: int, body: str = "讨论内容") -> str:
+    return f"[00:{i // 60:02d}:{i % 60:02d}] 发言人{i}: 第{i}条{body}。"
+
+
+class _MinutesServer:
+    """按请求类型返回 JSON 的模拟服务：分段 -> 要点，合并 -> 完整纪要"""
+
+    def __init__(self):
+        self.requests = []
+        self.fail_segments = set()
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                system, user = body["messages"][0]["content"], body["messages"][-1]["content"]
+                with server.lock:
+                    server.requests.append((system, user))
+                if system == gen.MAP_TEMPLATE:
+                    segment = user.split("第 ")[1].split("/")[0]
+                    if segment in server.fail_segments:
+                        content = "not json"
+                    else:
+                        content = json.dumps({"topics": [{"title": f"分段{segment}"}], "participants": []},
+                                             ensure_ascii=False)
+                elif system == gen.MERGE_TEMPLATE:
+                    content = json.dumps({"topics": [{"title": "合并"}]}, ensure_ascii=False)
+                elif system in (gen.get_reduce_prompt("detailed"), gen.get_reduce_prompt("concise")):
+                    partials = json.loads(user.split("\n\n")[2])
+                    titles = [t["title"] for p in partials for t in p["topics"]]
+                    content = json.dumps({"title": "长会议", "topics": [{"title": t} for t in titles]},
+                                         ensure_ascii=False)
+                else:
+                    content = json.dumps({"title": "短会议"}, ensure_ascii=False)
+                data = json.dumps({"choices": [{"message": {"content": content}}]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.config = {
+            "provider": "mock",
+            "api_key": "test-key",
+            "base_url": f"http://127.0.0.1:{self.httpd.server_address[1]}",
+            "model": "mock-chat",
+        }
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    mock = _MinutesServer()
+    mock.cache = MinutesCache(str(tmp_path / "minutes_cache.db"))
+    monkeypatch.setattr(gen, "minutes_cache", mock.cache)
+    monkeypatch.setattr(gen, "get_ai_config", lambda: mock.config)
+    monkeypatch.setattr(gen, "MAX_TEXT_LENGTH", 400)
+    monkeypatch.setattr(gen, "MAP_CHUNK_CHARS", 200)
+    yield mock
+    mock.close()
+
+
+def _generate(transcription: str, **kwargs):
+    async def main():
+        client = LLMClient(max_concurrency=4, http2=False)
+        try:
+            return await gen.generate_minutes_with_ai_async(
+                transcription, "长会议", client=client, max_retries=1, **kwargs
+            )
+        finally:
+            await client.stop()
+    return asyncio.run(main())
+
+
+def test_split_on_utterance_boundaries():
+    text = " ".join(_utterance(i) for i in range(40))
+    chunks = gen.split_transcription(text, max_chars=120)
+
+    assert len(chunks) > 1
+    assert all(len(c) <= 120 for c in chunks)
+    assert all(c.startswith("[00:") for c in chunks)
+    # 每条发言完整地出现在某一段中
+    for i in range(40):
+        assert sum(_utterance(i) in c for c in chunks) == 1
+
+    # 单条超长发言按句末标点切分
+    long_text = "[00:00:01] 张三: " + "这是一句话。" * 50
+    chunks = gen.split_transcription(long_text, max_chars=40)
+    assert all(len(c) <= 40 for c in chunks)
+    assert "".join(chunks).replace(" ", "") == long_text.replace(" ", "")
+    assert all(c.endswith("。") for c in chunks[1:-1])
+
+
+def test_map_reduce_covers_whole_meeting(server):
+    text = " ".join(_utterance(i) for i in range(60))
+    segments = len(gen.split_transcription(text, max_chars=200))
+
+    minutes = _generate(text)
+
+    map_requests = [u for s, u in server.requests if s == gen.MAP_TEMPLATE]
+    assert len(map_requests) == segments > 2
+    # 中间部分也送入了模型（截断方案会丢弃）
+    assert any(_utterance(30) in u for u in map_requests)
+    # 最终合并使用模板风格提示词
+    assert server.requests[-1][0] == gen.get_reduce_prompt("detailed")
+
+    assert minutes["title"] == "长会议"
+    assert minutes["_meta"]["mode"] == "map_reduce"
+    assert minutes["_meta"]["chunks"] == segments
+    titles = [t["title"] for t in minutes["topics"]]
+    assert titles == ["合并"] * len(titles) or titles == [f"分段{i}" for i in range(1, segments + 1)]
+    assert all(t["action_items"] == [] for t in minutes["topics"])
+
+
+def test_map_reduce_skips_failed_segment(server):
+    server.fail_segments = {"2"}
+    text = " ".join(_utterance(i) for i in range(20))
+
+    minutes = _generate(text)
+
+    assert minutes is not None
+    assert "分段2" not in [t["title"] for t in minutes["topics"]]
+
+
+def test_short_meeting_single_request(server):
+    minutes = _generate(_utterance(1))
+    assert len(server.requests) == 1
+    assert server.requests[0][0] == gen.get_system_prompt("detailed")
+    assert minutes["_meta"]["mode"] == "single"
+
+
+def test_cache_reuses_results(server):
+    text = " ".join(_utterance(i) for i in range(60))
+    first = _generate(text)
+    requests = len(server.requests)
+    assert first["_meta"]["cached"] is False
+
+    # 相同转写 + 模板 + 模型：不再请求
+    again = _generate(text)
+    assert len(server.requests) == requests
+    assert again["_meta"]["cached"] is True
+    assert [t["title"] for t in again["topics"]] == [t["title"] for t in first["topics"]]
+
+    # 换模板：分段要点命中缓存，只重新 reduce
+    _generate(text, template_style="concise")
+    assert len(server.requests) == requests + 1
+    assert server.requests[-1][0] == gen.get_reduce_prompt("concise")
+
+    # 跳过缓存
+    forced = _generate(text, use_cache=False)
+    assert forced["_meta"]["cache_hits"] == 0
+    assert len(server.requests) == requests * 2 + 1
+    assert server.cache.get_status()["hits"] > 0
+
+
+def test_final_merge_from_live_draft(server):
+    draft = {"topics": [{"title": "进度"}]}
+    text = " ".join(_utterance(i) for i in range(60))
+    tail = _utterance(59)
+
+    minutes = _generate(text, draft=draft, draft_tail=tail)
+
+    # 全文很长，但有草稿时只合并草稿 + 尾部转写
+    assert len(server.requests) == 1
+    system, user = server.requests[0]
+    assert system == gen.get_draft_final_prompt("detailed")
+    assert '"进度"' in user and tail in user and _utterance(30) not in user
+    assert minutes["_meta"]["mode"] == "draft_merge"
+
+
+def test_update_minutes_draft(server):
+    async def main():
+        client = LLMClient(http2=False)
+        try:
+            return await gen.update_minutes_draft({"topics": [{"title": "进度"}]}, _utterance(1), client=client)
+        finally:
+            await client.stop()
+
+    assert asyncio.run(main()) == {"title": "短会议"}
+    system, user = server.requests[0]
+    assert system == gen.DRAFT_TEMPLATE
+    assert '"进度"' in user and _utterance(1) in user
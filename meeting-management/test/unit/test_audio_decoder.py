@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内存音频解码单元测试
+
+Test Cases:
+1. WAV 字节在内存中解码为 16kHz float32
+2. 环形缓冲：重叠部分跳过，按时间读取
+3. 环形缓冲：超出容量丢弃最早样本，跨越环尾读取正确
+4. 环形缓冲：小间隙补静音
+5. 文件按区间 / 分块解码
+6. 顺序解码一遍切出多个区间，与整段解码后切片一致
+"""
+
+import io
+import os
+import sys
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from services.audio_decoder import SAMPLE_RATE, PcmRingBuffer, decode_pcm  # noqa: E402
+
+
+def _wav_bytes(seconds: float, rate: int = 8000) -> bytes:
+    samples = (np.sin(np.arange(int(seconds * rate)) / 10) * 10000).astype("<i2")
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(samples.tobytes())
+    return buf.getvalue()
+
+
+def test_decode_wav_in_memory():
+    start, pcm = decode_pcm(_wav_bytes(2.0))
+    assert start == 0.0
+    assert pcm.dtype == np.float32
+    assert abs(len(pcm) - 2 * SAMPLE_RATE) < SAMPLE_RATE * 0.05
+    assert np.abs(pcm).max() <= 1.0
+
+
+def test_ring_skips_overlap():
+    ring = PcmRingBuffer(capacity_seconds=10, sample_rate=10)
+    ring.append(0.0, np.arange(30, dtype=np.float32))
+    ring.append(2.0, np.arange(20, 40, dtype=np.float32))  # 2.0-3.0s 已缓存
+    assert ring.end_time == 4.0
+    start, data = ring.read_from(2.5)
+    assert start == 2.5
+    assert data.tolist() == list(range(25, 40))
+
+
+def test_ring_wraps_and_drops_oldest():
+    ring = PcmRingBuffer(capacity_seconds=2, sample_rate=10)
+    ring.append(0.0, np.arange(15, dtype=np.float32))
+    ring.append(1.5, np.arange(15, 30, dtype=np.float32))
+    assert ring.start_time == 1.0
+    start, data = ring.read_from(0.0)
+    assert start == 1.0
+    assert data.tolist() == list(range(10, 30))
+
+    ring.discard_before(2.5)
+    assert ring.read_from(0.0)[1].tolist() == list(range(25, 30))
+
+
+def test_ring_pads_small_gap():
+    ring = PcmRingBuffer(capacity_seconds=10, sample_rate=10)
+    ring.append(0.0, np.ones(10, dtype=np.float32))
+    ring.append(1.5, np.ones(5, dtype=np.float32))
+    _, data = ring.read_from(0.0)
+    assert data.tolist() == [1.0] * 10 + [0.0] * 5 + [1.0] * 5
+
+
+def test_decode_range_from_file(tmp_path):
+    from services.audio_decoder import decode_range, iter_pcm_blocks, probe_duration
+
+    path = tmp_path / "a.wav"
+    path.write_bytes(_wav_bytes(5.0))
+    assert abs(probe_duration(str(path)) - 5.0) < 0.05
+
+    pcm = decode_range(str(path), 1.0, 3.0)
+    assert len(pcm) == 2 * SAMPLE_RATE
+
+    blocks = list(iter_pcm_blocks(str(path), 2.0))
+    assert [offset for offset, _ in blocks] == [0.0, 2.0, 4.0]
+    assert sum(len(b) for _, b in blocks) >= int(4.9 * SAMPLE_RATE)
+
+
+def test_iter_pcm_ranges_single_pass(tmp_path, monkeypatch):
+    import av
+
+    from services import audio_decoder
+
+    path = tmp_path / "a.wav"
+    path.write_bytes(_wav_bytes(12.0, rate=SAMPLE_RATE))
+    full = np.concatenate([b for _, b in audio_decoder.iter_pcm_blocks(str(path), 100)])
+
+    opened = []
+    real_open = av.open
+    monkeypatch.setattr(av, "open", lambda *a, **k: opened.append(a[0]) or real_open(*a, **k))
+
+    ranges = [(0.5, 3.25), (3.25, 7.0), (9.0, 11.5), (11.8, 15.0)]
+    chunks = list(audio_decoder.iter_pcm_ranges(str(path), ranges, block_seconds=1.0))
+    assert len(opened) == 1
+    assert [(start, end) for start, end, _ in chunks] == ranges
+    for start, end, pcm in chunks[:3]:
+        expected = full[int(round(start * SAMPLE_RATE)):int(round(end * SAMPLE_RATE))]
+        assert np.array_equal(pcm, expected)
+    assert np.array_equal(chunks[3][2], full[int(11.8 * SAMPLE_RATE):])  # 超出文件末尾：截短
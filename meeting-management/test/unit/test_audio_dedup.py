@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+上传音频去重单元测试
+
+Test Cases:
+1. 登记后按 sha256 命中；重复登记保留首次记录；快速哈希筛选候选
+2. 已存储的文件被删除时登记失效
+3. 硬链接替换重复文件
+"""
+
+import asyncio
+import hashlib
+import os
+import sys
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from services.audio_dedup import (  # noqa: E402
+    find_duplicate, has_candidates, link_duplicate, metadata, quick_hash, register_audio
+)
+
+DATA = os.urandom(1_500_000)
+
+
+def _run(test):
+    async def main():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+        async with AsyncSession(engine) as db:
+            await test(db)
+        await engine.dispose()
+    asyncio.run(main())
+
+
+def test_register_and_find(tmp_path):
+    path = tmp_path / "M1.webm"
+    path.write_bytes(DATA)
+    sha256 = hashlib.sha256(DATA).hexdigest()
+    quick = quick_hash(path)
+
+    # 只读取前 1MB：尾部不同的文件快速哈希相同
+    other = tmp_path / "other.webm"
+    other.write_bytes(DATA[:-1] + b"\0")
+    assert quick_hash(other) == quick
+
+    async def check(db):
+        assert await find_duplicate(db, sha256) is None
+        assert not await has_candidates(db, quick)
+
+        assert await register_audio(db, sha256, quick, "M1", path, len(DATA))
+        assert not await register_audio(db, sha256, quick, "M2", tmp_path / "M2.webm", len(DATA))
+
+        found = await find_duplicate(db, sha256)
+        assert found["session_id"] == "M1" and found["file_path"] == str(path)
+        assert await has_candidates(db, quick)
+        assert not await has_candidates(db, f"{len(DATA) + 1}:{quick.split(':')[1]}")
+
+        # 已存储的文件被删除：登记失效，可重新登记
+        path.unlink()
+        assert await find_duplicate(db, sha256) is None
+        assert not await has_candidates(db, quick)
+        assert await register_audio(db, sha256, quick, "M3", other, len(DATA))
+
+    _run(check)
+
+
+def test_link_duplicate(tmp_path):
+    existing = tmp_path / "M1.webm"
+    existing.write_bytes(DATA)
+    dest = tmp_path / "M2.webm"
+    dest.write_bytes(DATA)
+
+    assert link_duplicate(existing, dest)
+    assert os.path.samefile(existing, dest)
+    assert dest.read_bytes() == DATA
+    assert not list(tmp_path.glob("*.link"))
+
+    # 同一文件不处理；链接失败保留原文件
+    assert not link_duplicate(existing, existing)
+    assert not link_duplicate(tmp_path / "missing.webm", dest)
+    assert dest.read_bytes() == DATA
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebSocket 二进制音频帧单元测试
+
+Test Cases:
+1. 打包/解析往返，载荷为零拷贝 memoryview
+2. 长度不足、版本错误、未知编码、空载荷被拒绝
+3. 帧编码与会议协商的编码不一致时抛 AudioCodecMismatchError（带块序号）
+"""
+
+import os
+import struct
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from services.audio_frame import (  # noqa: E402
+    HEADER_SIZE,
+    AudioCodec,
+    AudioCodecMismatchError,
+    AudioFrameError,
+    pack_audio_frame,
+    parse_audio_frame,
+    parse_codec_name,
+)
+
+
+def test_roundtrip_zero_copy():
+    raw = pack_audio_frame(b"\x1a\x45\xdf\xa3opus", sequence=7, timestamp_ms=1_700_000_000_123)
+    frame = parse_audio_frame(raw)
+    assert HEADER_SIZE == 16
+    assert frame.sequence == 7
+    assert frame.timestamp_ms == 1_700_000_000_123
+    assert frame.codec == AudioCodec.WEBM_OPUS
+    assert isinstance(frame.payload, memoryview)
+    assert frame.payload.obj is raw
+    assert bytes(frame.payload) == b"\x1a\x45\xdf\xa3opus"
+
+
+@pytest.mark.parametrize("raw", [
+    b"\x01\x01",
+    struct.pack(">BBHIQ", 2, 1, 0, 1, 0) + b"x",
+    struct.pack(">BBHIQ", 1, 99, 0, 1, 0) + b"x",
+    struct.pack(">BBHIQ", 1, 1, 0, 1, 0),
+])
+def test_invalid_frames(raw):
+    with pytest.raises(AudioFrameError):
+        parse_audio_frame(raw)
+
+
+def test_codec_mismatch():
+    negotiated = parse_codec_name("WEBM_OPUS")
+    assert negotiated == AudioCodec.WEBM_OPUS
+    with pytest.raises(AudioFrameError):
+        parse_codec_name("mp3")
+
+    ok = pack_audio_frame(b"opus", sequence=1, timestamp_ms=0)
+    assert parse_audio_frame(ok, expected_codec=negotiated).sequence == 1
+
+    raw = pack_audio_frame(b"\x00\x01", sequence=5, timestamp_ms=0, codec=AudioCodec.PCM_S16LE)
+    with pytest.raises(AudioCodecMismatchError) as exc:
+        parse_audio_frame(raw, expected_codec=negotiated)
+    assert exc.value.sequence == 5
+    assert parse_audio_frame(raw).codec == AudioCodec.PCM_S16LE  # 未协商时不校验
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebSocket 音频接收管道单元测试
+
+Test Cases:
+1. 转写进行中继续接收并按序落盘，不丢块
+2. 队列高水位暂停、满时拒绝、回落后恢复
+3. close 写完队列并等待进行中的转写
+4. 写入失败时保留队列退避重试；重试耗尽丢弃并带回丢失的序号区间
+5. 拒绝序号 N 后，N 重发前更大的序号即使放得下也拒绝，音频按序落盘
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from services.audio_ingest import AudioIngestPipeline  # noqa: E402
+
+
+class _Recorder:
+    def __init__(self):
+        self.written = []
+        self.messages = []
+
+    def write(self, chunks, last_sequence=None):
+        self.written.extend(bytes(c) for c in chunks)
+
+    async def send(self, message):
+        self.messages.append(message)
+
+    def of_type(self, msg_type):
+        return [m for m in self.messages if m["type"] == msg_type]
+
+
+def test_ingest_during_transcription():
+    rec = _Recorder()
+
+    async def main():
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def transcribe():
+            started.set()
+            await release.wait()  # 模拟一次很慢的 Whisper 转写
+            return "你好"
+
+        pipeline = AudioIngestPipeline("m1", rec.write, transcribe, rec.send, transcribe_interval=0)
+        pipeline.start()
+
+        await pipeline.ingest(0, b"a")
+        await started.wait()
+
+        # 转写进行中：接收不阻塞，音频继续落盘
+        t0 = time.perf_counter()
+        for seq in range(1, 200):
+            assert await pipeline.ingest(seq, memoryview(b"%03d" % seq))
+        elapsed = time.perf_counter() - t0
+        while pipeline.queued_bytes:
+            await asyncio.sleep(0.01)
+        assert len(rec.written) == 200
+        assert pipeline.written_sequence == 199
+
+        release.set()
+        await pipeline.close()
+        return elapsed
+
+    elapsed = asyncio.run(main())
+    assert elapsed / 199 < 0.005
+    assert rec.written[0] == b"a" and rec.written[1:] == [b"%03d" % i for i in range(1, 200)]
+    assert [m["sequence"] for m in rec.of_type("ack")] == list(range(200))
+    assert rec.of_type("transcript")[0]["text"] == "你好"
+    assert not rec.of_type("backpressure")
+
+
+def test_backpressure():
+    rec = _Recorder()
+    gate = threading.Event()
+
+    def slow_write(chunks, last_sequence):
+        gate.wait()
+        rec.write(chunks)
+
+    async def no_transcribe():
+        return None
+
+    async def main():
+        pipeline = AudioIngestPipeline("m1", slow_write, no_transcribe, rec.send, max_bytes=100)
+        pipeline.start()
+        results = [await pipeline.ingest(seq, b"x" * 10) for seq in range(12)]
+        states = [m["state"] for m in rec.of_type("backpressure")]
+        assert results == [True] * 10 + [False] * 2
+        assert states == ["pause", "rejected", "rejected"]
+        assert rec.of_type("backpressure")[1]["sequence"] == 10
+
+        gate.set()
+        while pipeline.queued_bytes:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.01)
+        assert rec.of_type("backpressure")[-1]["state"] == "resume"
+
+        # 客户端重发被拒绝的块
+        assert await pipeline.ingest(10, b"x" * 10)
+        assert await pipeline.ingest(11, b"x" * 10)
+        await pipeline.close()
+        assert pipeline.get_status()["chunks_rejected"] == 2
+
+    asyncio.run(main())
+    assert len(rec.written) == 12
+
+
+
+def test_reject_later_sequences_until_gap_resent():
+    rec = _Recorder()
+    gate = threading.Event()
+
+    def slow_write(chunks, last_sequence):
+        gate.wait()
+        rec.write(chunks)
+
+    async def no_transcribe():
+        return None
+
+    async def main():
+        pipeline = AudioIngestPipeline("m1", slow_write, no_transcribe, rec.send, max_bytes=100)
+        pipeline.start()
+        try:
+            assert await pipeline.ingest(0, b"a" * 90)
+            assert not await pipeline.ingest(1, b"b" * 20)  # 放不下
+            assert not await pipeline.ingest(2, b"c" * 5)   # 放得下，但 1 尚未重发
+            assert pipeline.gap_sequence == 1
+            assert [m["sequence"] for m in rec.of_type("backpressure") if m["state"] == "rejected"] == [1, 2]
+        finally:
+            gate.set()  # 断言失败时也放行写入线程
+        while pipeline.queued_bytes:
+            await asyncio.sleep(0.01)
+        assert rec.written == [b"a" * 90]
+
+        # 客户端按序重发
+        assert await pipeline.ingest(1, b"b" * 20)
+        assert pipeline.gap_sequence is None
+        assert await pipeline.ingest(2, b"c" * 5)
+        await pipeline.close()
+
+    asyncio.run(main())
+    assert rec.written == [b"a" * 90, b"b" * 20, b"c" * 5]
+
+def test_close_flushes_and_waits():
+    rec = _Recorder()
+    started, done = [], []
+
+    async def transcribe():
+        started.append(True)
+        await asyncio.sleep(0.05)
+        done.append(len(rec.written))
+        return None
+
+    async def main():
+        pipeline = AudioIngestPipeline("m1", rec.write, transcribe, rec.send, transcribe_interval=60)
+        pipeline.start()
+        await pipeline.ingest(0, b"y")
+        while not started:
+            await asyncio.sleep(0.001)
+        for seq in range(1, 5):
+            await pipeline.ingest(seq, b"y")
+        await pipeline.close()
+        # 关闭后不再接收
+        assert not await pipeline.ingest(5, b"y")
+
+    asyncio.run(main())
+    assert len(rec.written) == 5
+    assert len(done) == 1  # 进行中的转写已结束，间隔未到不再转写
+
+
+def _fast_retry(monkeypatch, retries):
+    from services import audio_ingest
+
+    monkeypatch.setattr(audio_ingest, "_RETRY_BASE_DELAY", 0.01)
+    monkeypatch.setattr(audio_ingest, "INGEST_WRITE_RETRIES", retries)
+
+
+def test_write_failure_retries_batch(monkeypatch):
+    _fast_retry(monkeypatch, 3)
+    rec = _Recorder()
+    failures = [OSError("disk busy"), OSError("disk busy")]
+
+    def flaky_write(chunks, last_sequence=None):
+        if failures:
+            raise failures.pop(0)
+        rec.write(chunks, last_sequence)
+
+    async def main():
+        async def transcribe():
+            return None
+
+        pipeline = AudioIngestPipeline("m1", flaky_write, transcribe, rec.send, transcribe_interval=3600)
+        pipeline.start()
+        for seq in range(3):
+            await pipeline.ingest(seq, b"%d" % seq)
+        await pipeline.close()
+        return pipeline
+
+    pipeline = asyncio.run(main())
+    assert b"".join(rec.written) == b"012"
+    assert pipeline.written_sequence == 2 and pipeline.bytes_written == 3
+    assert pipeline.write_failures == 2 and pipeline.chunks_dropped == 0
+    assert not rec.of_type("error")
+
+
+def test_write_failure_drops_with_sequence_range(monkeypatch):
+    _fast_retry(monkeypatch, 2)
+    rec = _Recorder()
+
+    def broken_write(chunks, last_sequence=None):
+        raise OSError("disk full")
+
+    async def main():
+        async def transcribe():
+            return None
+
+        pipeline = AudioIngestPipeline("m1", broken_write, transcribe, rec.send, transcribe_interval=3600)
+        pipeline.start()
+        for seq in range(5, 8):
+            await pipeline.ingest(seq, b"x")
+        await pipeline.close()
+        return pipeline
+
+    pipeline = asyncio.run(main())
+    errors = rec.of_type("error")
+    assert [(e["sequence_start"], e["sequence_end"]) for e in errors][0][0] == 5
+    assert errors[-1]["sequence_end"] == 7 and errors[0]["code"] == "CHUNK_ERROR"
+    assert pipeline.bytes_written == 0 and pipeline.written_sequence is None
+    assert pipeline.chunks_dropped == 3 and pipeline.queued_bytes == 0
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+会议音频块日志（崩溃恢复）单元测试
+
+Test Cases:
+1. 记录重放：序号、偏移、转写游标、草稿；写了一半的最后一行忽略
+2. 批量 fsync：chunks 按间隔，transcript 立即
+3. 启动恢复：音频截断到日志偏移，resume 后继续追加，只需转写游标之后的尾部
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from services.chunk_journal import (  # noqa: E402
+    JOURNAL_NAME, ChunkJournal, find_unfinished_journals, replay_journal
+)
+from services.session_state import MemorySessionStore  # noqa: E402
+
+META = {"meeting_id": "M1", "title": "周会", "user_id": "u1", "start_time": "2026-10-16T09:00:00"}
+
+
+def _open(meeting_dir, **kwargs):
+    meeting_dir.mkdir(parents=True, exist_ok=True)
+    audio = meeting_dir / "audio.webm"
+    audio.write_bytes(b"")
+    journal = ChunkJournal(meeting_dir / JOURNAL_NAME, **kwargs)
+    journal.open_session({**META, "audio_path": str(audio), "offset": 0})
+    return journal, audio
+
+
+def test_record_and_replay(tmp_path):
+    journal, _ = _open(tmp_path)
+    journal.record_chunks(0, 1, 100)
+    journal.record_chunks(3, 3, 400)
+    journal.record_transcript([{"start": 0.0, "end": 2.0, "text": "你好"}], 2.0)
+    journal.record_draft({"topics": []}, 1)
+    journal.record_chunks(5, 2, 600)
+    journal.close()
+
+    # 崩溃时写了一半的记录
+    with open(tmp_path / JOURNAL_NAME, "ab") as f:
+        f.write(b'{"op":"chunks","seq":9,"off')
+
+    state = replay_journal(tmp_path / JOURNAL_NAME)
+    assert (state["last_sequence"], state["chunk_count"], state["audio_offset"]) == (5, 6, 600)
+    assert state["transcript_parts"][0]["text"] == "你好" and state["transcript_cursor"] == 2.0
+    assert state["minutes_draft"] == {"topics": []} and state["draft_cursor"] == 1
+    assert state["meeting_id"] == "M1" and not state["closed"]
+
+    journal = ChunkJournal(tmp_path / JOURNAL_NAME)
+    journal.close(finished=True)
+    assert replay_journal(tmp_path / JOURNAL_NAME)["closed"]
+
+
+def test_batched_fsync(tmp_path):
+    journal, audio = _open(tmp_path, fsync_interval=60)
+    synced = journal.syncs
+    with open(audio, "ab") as f:
+        for seq in range(10):
+            f.write(b"x")
+            f.flush()
+            journal.record_chunks(seq, 1, f.tell(), f)
+    assert journal.syncs == synced  # 间隔内不 fsync
+    journal.record_transcript([], 0.0)
+    assert journal.syncs == synced + 1
+    journal.close()
+
+    journal, audio = _open(tmp_path / "b", fsync_interval=0)
+    synced = journal.syncs
+    journal.record_chunks(0, 1, 1)
+    journal.record_chunks(1, 1, 2)
+    assert journal.syncs == synced + 2
+    journal.close()
+
+
+def test_recover_and_resume(tmp_path, monkeypatch):
+    import meeting_skill
+
+    store = MemorySessionStore()
+    monkeypatch.setattr(meeting_skill, "session_store", store)
+
+    root = tmp_path / "meetings"
+    journal, audio = _open(root / "2026" / "10" / "M1")
+    audio.write_bytes(b"a" * 300 + b"b" * 50)  # 最后 50 字节没有记入日志
+    journal.record_chunks(2, 3, 300)
+    journal.record_transcript([{"start": 0.0, "end": 5.0, "text": "第一段"}], 5.0)
+    journal._file.close()  # 模拟进程崩溃：不写 closed
+
+    finished, _ = _open(root / "2026" / "10" / "M2")
+    finished.close(finished=True)
+
+    assert [state["meeting_id"] for _, state in find_unfinished_journals(root)] == ["M1"]
+    assert meeting_skill.recover_meeting_sessions(root) == 1
+    assert audio.stat().st_size == 300
+
+    # 客户端 resume：从最后落盘的序号之后继续
+    assert meeting_skill.restore_meeting_session("M1") == str(audio)
+    session = meeting_skill.get_meeting_session("M1")
+    assert session["last_sequence"] == 2 and session["transcriber"].cursor == 5.0
+    meeting_skill.write_audio_chunks("M1", [b"c" * 20, b"d" * 20], last_sequence=4)
+
+    # 再次崩溃：日志包含恢复前后的全部内容
+    meeting_skill._close_file_handle(session)
+    session["journal"]._file.close()
+    meeting_skill._audio_sessions.pop("M1")
+    state = replay_journal(root / "2026" / "10" / "M1" / JOURNAL_NAME)
+    assert (state["last_sequence"], state["chunk_count"], state["audio_offset"]) == (4, 5, 340)
+    assert [p["text"] for p in state["transcript_parts"]] == ["第一段"]
+    assert audio.read_bytes() == b"a" * 300 + b"c" * 20 + b"d" * 20
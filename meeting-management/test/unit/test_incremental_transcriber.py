@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量实时转写引擎单元测试
+
+Test Cases:
+1. Cluster 扫描：识别 Cluster 偏移和时间码
+2. Cluster 扫描：头部被截断时返回重扫位置
+3. 片段拼接：重叠窗口内已确认的片段不重复
+4. 片段拼接：尾部半句话暂不确认，final 时全部确认
+5. 片段拼接：静音时游标推进
+6. 待转写窗口超过 PCM 缓冲容量时分轮转写，最早的音频不丢失（webm / wav）
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from services.incremental_transcriber import scan_webm_clusters, stitch_segments  # noqa: E402
+
+
+def _cluster(timecode_ms: int) -> bytes:
+    """构造未知大小的 Cluster 头 + 2 字节时间码"""
+    return b"\x1f\x43\xb6\x75" + b"\x01\xff\xff\xff\xff\xff\xff\xff" + b"\xe7\x82" + timecode_ms.to_bytes(2, "big")
+
+
+def test_scan_finds_clusters():
+    buf = b"HEADER" + _cluster(0) + b"x" * 100 + _cluster(5000) + b"y" * 100
+    clusters, next_pos = scan_webm_clusters(buf, base_offset=10)
+    assert clusters == [(16, 0), (10 + 6 + 16 + 100, 5000)]
+    assert next_pos == 10 + len(buf) - 32
+
+
+def test_scan_truncated_cluster_header():
+    full = b"HEADER" + _cluster(0) + b"x" * 100
+    partial = _cluster(5000)[:9]
+    clusters, next_pos = scan_webm_clusters(full + partial)
+    assert clusters == [(6, 0)]
+    assert next_pos == len(full)
+
+
+def test_stitch_skips_overlap():
+    segments = [
+        {"start": 8.0, "end": 10.0, "text": "已确认"},
+        {"start": 10.0, "end": 14.0, "text": "新内容"},
+    ]
+    committed, cursor = stitch_segments(segments, cursor=10.0, audio_end=20.0)
+    assert [s["text"] for s in committed] == ["新内容"]
+    assert cursor == 19.0
+
+
+def test_stitch_holds_back_tail():
+    segments = [
+        {"start": 10.0, "end": 14.0, "text": "完整"},
+        {"start": 14.0, "end": 19.8, "text": "半句"},
+    ]
+    committed, cursor = stitch_segments(segments, cursor=10.0, audio_end=20.0, tail_guard=1.0)
+    assert [s["text"] for s in committed] == ["完整"]
+    assert cursor == 14.0
+
+    committed, cursor = stitch_segments(segments, cursor=10.0, audio_end=20.0, final=True)
+    assert [s["text"] for s in committed] == ["完整", "半句"]
+    assert cursor == 20.0
+
+
+def test_stitch_advances_over_silence():
+    committed, cursor = stitch_segments([], cursor=10.0, audio_end=40.0, tail_guard=1.0)
+    assert committed == []
+    assert cursor == 39.0
+
+
+def test_stitch_trims_overlapping_start():
+    segments = [{"start": 9.0, "end": 13.0, "text": "跨界"}]
+    committed, _ = stitch_segments(segments, cursor=10.0, audio_end=30.0)
+    assert committed[0]["start"] == 10.0
+
+
+def _write_audio(path, seconds: float, container: str, codec: str, rate: int):
+    import av
+    import numpy as np
+
+    with av.open(str(path), mode="w", format=container) as out:
+        stream = out.add_stream(codec, rate=rate)
+        stream.layout = "mono"
+        samples = (np.sin(np.arange(int(seconds * rate)) / 10) * 10000).astype("<i2")
+        step = 960
+        for i in range(0, len(samples), step):
+            block = samples[i:i + step]
+            frame = av.AudioFrame.from_ndarray(block.reshape(1, -1), format="s16", layout="mono")
+            frame.sample_rate = rate
+            frame.pts = i
+            for packet in stream.encode(frame):
+                out.mux(packet)
+        for packet in stream.encode(None):
+            out.mux(packet)
+
+
+class _FakeModel:
+    """每 2 秒音频产出一个片段（相对窗口起点）"""
+
+    def __init__(self):
+        self.windows = []
+
+    def transcribe(self, pcm, **kwargs):
+        from types import SimpleNamespace
+
+        seconds = len(pcm) / 16000
+        self.windows.append(seconds)
+        segments = []
+        t = 0.0
+        while t < seconds:
+            end = min(seconds, t + 2.0)
+            segments.append(SimpleNamespace(start=t, end=end, text="x"))
+            t = end
+        return iter(segments), None
+
+
+def _assert_covers(segments, duration):
+    assert segments[0]["start"] < 2.0
+    assert segments[-1]["end"] > duration - 1.0
+    for prev, seg in zip(segments, segments[1:]):
+        assert seg["start"] - prev["end"] < 2.5  # 没有整段缺失的音频
+
+
+def test_window_longer_than_pcm_buffer_webm(tmp_path):
+    from services.audio_decoder import PcmRingBuffer
+    from services.incremental_transcriber import IncrementalTranscriber
+
+    path = tmp_path / "audio.webm"
+    _write_audio(path, 60.0, "webm", "libopus", 48000)
+    transcriber = IncrementalTranscriber(str(path))
+    transcriber.pcm = PcmRingBuffer(capacity_seconds=20)
+    model = _FakeModel()
+
+    segments = transcriber.step(model, final=True)
+    assert transcriber.is_webm
+    assert len(model.windows) > 1 and max(model.windows) <= 20.0
+    _assert_covers(segments, 60.0)
+
+
+def test_window_longer_than_pcm_buffer_wav(tmp_path):
+    from services.audio_decoder import PcmRingBuffer
+    from services.incremental_transcriber import IncrementalTranscriber
+
+    path = tmp_path / "audio.wav"
+    _write_audio(path, 60.0, "wav", "pcm_s16le", 16000)
+    transcriber = IncrementalTranscriber(str(path))
+    transcriber.pcm = PcmRingBuffer(capacity_seconds=20)
+    model = _FakeModel()
+
+    segments = transcriber.step(model, final=True)
+    assert len(model.windows) > 1 and max(model.windows) <= 20.0
+    _assert_covers(segments, 60.0)
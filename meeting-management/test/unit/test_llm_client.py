@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+大模型客户端单元测试（本地模拟 OpenAI 兼容服务）
+
+Test Cases:
+1. 流式响应拼接、增量回调，连接复用
+2. 429 按 Retry-After 重试，401 / 400 不重试
+3. 按提供商限制并发
+4. generate_minutes_with_ai_async 端到端
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from services.llm_client import LLMAuthError, LLMClient, LLMRequestError  # noqa: E402
+
+
+class _MockServer:
+    """OpenAI 兼容的 /chat/completions 模拟服务"""
+
+    def __init__(self):
+        self.responses = []          # 依次返回的 (status, headers, body)；为空时返回流式 content
+        self.content = '{"title": "周会", "topics": []}'
+        self.delay = 0.0
+        self.requests = []
+        self.ports = set()
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with server.lock:
+                    server.requests.append(body)
+                    server.ports.add(self.client_address[1])
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                    response = server.responses.pop(0) if server.responses else None
+                try:
+                    time.sleep(server.delay)
+                    if response:
+                        status, headers, payload = response
+                        data = payload.encode()
+                        self.send_response(status)
+                        for key, value in headers.items():
+                            self.send_header(key, value)
+                        self.send_header("Content-Length", str(len(data)))
+                        self.end_headers()
+                        self.wfile.write(data)
+                        return
+                    content = server.content
+                    events = [content[i:i + 5] for i in range(0, len(content), 5)]
+                    data = "".join(
+                        f"data: {json.dumps({'choices': [{'delta': {'content': piece}}]})}\n\n"
+                        for piece in events
+                    ) + "data: [DONE]\n\n"
+                    data = data.encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/event-stream")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                finally:
+                    with server.lock:
+                        server.active -= 1
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.config = {
+            "provider": "mock",
+            "api_key": "test-key",
+            "base_url": f"http://127.0.0.1:{self.httpd.server_address[1]}",
+            "model": "mock-chat",
+        }
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    mock = _MockServer()
+    yield mock
+    mock.close()
+
+
+def _run(coro_fn):
+    async def main():
+        client = LLMClient(max_concurrency=2, http2=False)
+        try:
+            return await coro_fn(client)
+        finally:
+            await client.stop()
+    return asyncio.run(main())
+
+
+def test_streaming_and_keepalive(server):
+    deltas = []
+
+    async def on_delta(piece):
+        deltas.append(piece)
+
+    async def check(client):
+        messages = [{"role": "user", "content": "hi"}]
+        first = await client.chat_completion(messages, config=server.config, on_delta=on_delta)
+        second = await client.chat_completion(messages, config=server.config)
+        return first, second
+
+    first, second = _run(check)
+    assert first == second == server.content
+    assert "".join(deltas) == server.content and len(deltas) > 1
+    assert server.requests[0]["stream"] is True and server.requests[0]["model"] == "mock-chat"
+    assert len(server.ports) == 1  # keep-alive 复用同一连接
+
+
+def test_retry_and_errors(server):
+    plain = json.dumps({"choices": [{"message": {"content": "ok"}}]})
+    server.responses = [
+        (429, {"Retry-After": "0"}, "slow down"),
+        (503, {"Retry-After": "0"}, "busy"),
+        (200, {"Content-Type": "application/json"}, plain),  # 非流式响应
+        (401, {}, "bad key"),
+        (400, {}, "bad request"),
+    ]
+    messages = [{"role": "user", "content": "hi"}]
+
+    async def check(client):
+        assert await client.chat_completion(messages, config=server.config, max_retries=3) == "ok"
+        with pytest.raises(LLMAuthError):
+            await client.chat_completion(messages, config=server.config)
+        with pytest.raises(LLMRequestError) as exc:
+            await client.chat_completion(messages, config=server.config)
+        assert exc.value.status_code == 400 and not exc.value.retryable
+        return client.get_status()["providers"]["mock"]
+
+    status = _run(check)
+    assert len(server.requests) == 5
+    assert status["retries"] == 2 and status["failures"] == 2
+
+
+def test_concurrency_limit(server):
+    server.delay = 0.1
+
+    async def check(client):
+        messages = [{"role": "user", "content": "hi"}]
+        return await asyncio.gather(*[
+            client.chat_completion(messages, config=server.config) for _ in range(6)
+        ])
+
+    assert len(_run(check)) == 6
+    assert server.max_active == 2
+
+
+def test_generate_minutes_async(server, monkeypatch):
+    import ai_minutes_generator
+
+    from services.minutes_cache import MinutesCache
+
+    monkeypatch.setattr(ai_minutes_generator, "get_ai_config", lambda: server.config)
+    monkeypatch.setattr(ai_minutes_generator, "minutes_cache", MinutesCache(enabled=False))
+    server.content = json.dumps({"title": "项目周会", "topics": [{"title": "进度", "action_items": [{"action": "提交代码"}]}]})
+    transcription = "[00:00:01] 张三: 大家早上好，今天我们讨论项目进度，周五前提交代码。"
+
+    minutes = _run(lambda client: ai_minutes_generator.generate_minutes_with_ai_async(
+        transcription, "项目周会", client=client
+    ))
+    assert minutes["title"] == "项目周会"
+    assert minutes["topics"][0]["action_items"][0]["owner"] == "待定"
+    assert minutes["_meta"]["provider"] == "mock"
+    assert "项目进度" in server.requests[0]["messages"][-1]["content"]
+
+    # 同步入口（未 start 时使用临时事件循环）
+    assert ai_minutes_generator.generate_minutes_with_ai(transcription, "项目周会")["title"] == "项目周会"
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日志系统单元测试
+
+Test Cases:
+1. 按模块抽样 DEBUG 日志（最长前缀匹配，0 表示全部丢弃）
+2. 队列满时入队不阻塞，丢弃数由写入线程补记警告
+3. 经队列写入文件 / JSON 日志，异常栈保留
+"""
+
+import json
+import logging
+import os
+import queue
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+import logger_config  # noqa: E402
+from logger_config import (  # noqa: E402
+    NonBlockingQueueHandler, SamplingFilter, parse_sample_rates, setup_logging, shutdown_logging,
+)
+
+
+@pytest.fixture
+def restore_root():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    shutdown_logging()
+    root.handlers = handlers
+    root.setLevel(level)
+
+
+def _record(name, level=logging.DEBUG, msg="m"):
+    return logging.LogRecord(name, level, __file__, 1, msg, None, None)
+
+
+def test_parse_sample_rates():
+    assert parse_sample_rates("a.b=0.1, c=2,bad,d=x,=1") == {"a.b": 0.1, "c": 1.0}
+
+
+def test_sampling_filter():
+    f = SamplingFilter({"services": 0.5, "services.audio_ingest": 0.1, "api.websocket": 0})
+    kept = sum(f.filter(_record("services.audio_ingest")) for _ in range(100))
+    assert kept == 10
+    assert sum(f.filter(_record("services.metrics")) for _ in range(10)) == 5
+    assert not f.filter(_record("api.websocket"))
+    assert f.filter(_record("api.websocket", logging.WARNING))  # 只抽样 DEBUG
+    assert f.filter(_record("servicesx"))  # 前缀按模块边界匹配
+
+
+def test_queue_full_drops_without_blocking():
+    log_queue = queue.Queue(2)
+    handler = NonBlockingQueueHandler(log_queue)
+    for _ in range(5):
+        handler.handle(_record("x", logging.INFO))
+    assert log_queue.qsize() == 2 and handler.dropped == 3
+
+    seen = []
+
+    class Collect(logging.Handler):
+        def emit(self, record):
+            seen.append(record.getMessage())
+
+    listener = logger_config._QueueListener(log_queue, [Collect()], handler)
+    listener.start()
+    listener.stop()
+    assert seen[0] == "日志队列已满，丢弃 3 条日志"
+    assert seen[1:] == ["m", "m"]
+
+
+def test_queued_file_and_json(tmp_path, restore_root):
+    setup_logging(log_dir=str(tmp_path), log_level="INFO", enable_console=False,
+                  enable_json=True, app_name="t")
+    logger = logging.getLogger("test.queued")
+    items = ["a"]
+    logger.info("value %s", items)
+    items.append("b")  # 入队时已代入参数
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.error("failed", exc_info=True)
+    shutdown_logging()
+
+    text = (tmp_path / "t.log").read_text(encoding="utf-8")
+    assert "value ['a']" in text and "ValueError: boom" in text
+    lines = [json.loads(line) for line in (tmp_path / "t.json.log").read_text(encoding="utf-8").splitlines()]
+    messages = {line["message"]: line for line in lines}
+    assert "value ['a']" in messages
+    assert "ValueError: boom" in messages["failed"]["exception"]
+    assert "ValueError" in (tmp_path / "t.error.log").read_text(encoding="utf-8")
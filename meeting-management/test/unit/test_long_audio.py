@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+长录音切块单元测试
+
+Test Cases:
+1. 达到最小块长后在自然停顿处切分
+2. 超过最大块长时在静音中点切分
+3. 单段语音超长时硬切
+4. 阈值判断
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from services.long_audio import plan_chunks, should_use_long_mode  # noqa: E402
+
+
+def test_cut_at_natural_pause():
+    speech = [(0.0, 20.0), (20.3, 35.0), (37.0, 50.0)]
+    assert plan_chunks(speech, min_seconds=30, max_seconds=60) == [(0.0, 36.0), (36.0, 50.0)]
+
+
+def test_cut_before_exceeding_max():
+    speech = [(0.0, 20.0), (20.5, 40.0), (40.2, 70.0)]
+    assert plan_chunks(speech, min_seconds=30, max_seconds=60) == [(0.0, 40.1), (40.1, 70.0)]
+
+
+def test_hard_split_long_speech():
+    chunks = plan_chunks([(5.0, 130.0)], min_seconds=30, max_seconds=60)
+    assert chunks == [(5.0, 65.0), (65.0, 125.0), (125.0, 130.0)]
+
+
+def test_empty_speech():
+    assert plan_chunks([]) == []
+
+
+def test_threshold():
+    assert not should_use_long_mode(0)
+    assert should_use_long_mode(2 * 3600)
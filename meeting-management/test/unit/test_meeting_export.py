@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+会议纪要导出单元测试
+
+Test Cases:
+1. 原子写入：失败时原文件不变、不留临时文件
+2. 录音备份优先硬链接，不支持时复制；已有文件原子替换
+3. 并行任务返回各自结果，失败时抛出异常
+4. save_meeting 输出 JSON / Word / latest / 录音备份
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from services import meeting_export  # noqa: E402
+from services.meeting_export import atomic_write, link_or_copy, run_parallel  # noqa: E402
+
+
+def test_atomic_write(tmp_path):
+    path = tmp_path / "a.json"
+    atomic_write(path, lambda f: f.write(b"old"))
+
+    def broken(f):
+        f.write(b"half")
+        raise RuntimeError("render failed")
+
+    with pytest.raises(RuntimeError):
+        atomic_write(path, broken)
+    assert path.read_bytes() == b"old"
+    assert [p.name for p in tmp_path.iterdir()] == ["a.json"]
+
+
+def test_link_or_copy_hardlink(tmp_path):
+    src = tmp_path / "audio.webm"
+    src.write_bytes(b"x" * 1024)
+    dst = tmp_path / "backup.webm"
+    dst.write_bytes(b"stale")
+
+    assert link_or_copy(src, dst) == "hardlink"
+    assert os.stat(src).st_ino == os.stat(dst).st_ino
+    assert link_or_copy(src, dst) == "same"
+
+
+def test_link_or_copy_falls_back_to_copy(tmp_path, monkeypatch):
+    def no_link(src, dst):
+        raise OSError(18, "Invalid cross-device link")
+
+    monkeypatch.setattr(meeting_export.os, "link", no_link)
+    monkeypatch.setattr(meeting_export, "_reflink", lambda src, dst: False)
+    src = tmp_path / "audio.webm"
+    src.write_bytes(b"data")
+    dst = tmp_path / "backup.webm"
+
+    assert link_or_copy(src, dst) == "copy"
+    assert dst.read_bytes() == b"data"
+    assert os.stat(src).st_ino != os.stat(dst).st_ino
+    assert not list(tmp_path.glob(".tmp_*"))
+
+
+def test_run_parallel():
+    assert run_parallel({"a": lambda: 1, "b": lambda: 2}) == {"a": 1, "b": 2}
+    with pytest.raises(ValueError):
+        run_parallel({"ok": lambda: 1, "bad": lambda: int("x")})
+
+
+def test_save_meeting_outputs(tmp_path, monkeypatch):
+    from meeting_skill import create_meeting_skeleton, save_meeting
+    from services import tracing
+
+    monkeypatch.setattr(tracing, "exporter", tracing.JsonlSpanExporter(tmp_path / "traces"))
+    audio = tmp_path / "rec.webm"
+    audio.write_bytes(b"\x1a\x45\xdf\xa3" * 256)
+    meeting = create_meeting_skeleton(
+        "[00:00:01] 张三: 开始", meeting_id="M20260105_1", title="项目周会",
+        date="2026-01-05", participants=["张三"]
+    )
+    meeting.audio_path = str(audio)
+
+    files = save_meeting(meeting, output_dir=str(tmp_path / "out"))
+    meeting_dir = tmp_path / "out" / "meetings" / "2026" / "01" / "M20260105_1"
+    assert json.loads((meeting_dir / "minutes_latest.json").read_text(encoding="utf-8"))["title"] == "项目周会"
+    assert (meeting_dir / "minutes_latest.docx").read_bytes()[:2] == b"PK"
+    assert os.path.samefile(files["audio_backup"], audio)
+    assert not list(meeting_dir.glob(".tmp_*"))
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+会议文件索引单元测试
+
+Test Cases:
+1. 按日期范围 / 参会人 / 关键词查询，按日期倒序
+2. 按会议 ID 查找目录
+3. 索引文件丢失时自动从目录重建
+4. save_meeting 写入索引，query_meetings / update_meeting 走索引
+5. 实时会议结束（create_version=False）同样写入索引
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from meeting_index import INDEX_FILENAME, MeetingIndex  # noqa: E402
+
+
+def _write_meeting(output_dir, meeting_id, date, participants, title="周会"):
+    meeting_dir = output_dir / "meetings" / date[:4] / date[5:7] / meeting_id
+    meeting_dir.mkdir(parents=True)
+    data = {"id": meeting_id, "date": date, "title": title, "version": 1, "participants": participants}
+    (meeting_dir / "minutes_latest.json").write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    return data, meeting_dir
+
+
+def test_query_filters(tmp_path):
+    index = MeetingIndex(str(tmp_path))
+    for args in [
+        ("M1", "2026-01-05", ["张三", "李四"]),
+        ("M2", "2026-02-10", ["王五"], "预算评审"),
+        ("M3", "2026-03-01", ["张三"]),
+    ]:
+        data, meeting_dir = _write_meeting(tmp_path, *args)
+        index.upsert(data, meeting_dir)
+
+    assert [m for m, _ in index.query()] == ["M3", "M2", "M1"]
+    assert [m for m, _ in index.query(date_range=("2026-01-01", "2026-02-28"))] == ["M2", "M1"]
+    assert [m for m, _ in index.query(participants=["张三"])] == ["M3", "M1"]
+    assert [m for m, _ in index.query(keywords=["预算"])] == ["M2"]
+    assert index.find_dir("M2") == tmp_path / "meetings" / "2026" / "02" / "M2"
+    assert index.find_dir("missing") is None
+
+
+def test_auto_rebuild_when_index_missing(tmp_path):
+    _write_meeting(tmp_path, "M1", "2026-01-05", ["张三"])
+    _write_meeting(tmp_path, "M2", "2026-01-06", ["李四"])
+    assert not (tmp_path / "meetings" / INDEX_FILENAME).exists()
+
+    index = MeetingIndex(str(tmp_path))
+    assert [m for m, _ in index.query(participants=["李四"])] == ["M2"]
+
+
+def test_save_and_query_meetings(tmp_path, monkeypatch):
+    from meeting_skill import create_meeting_skeleton, query_meetings, save_meeting, update_meeting
+    from services import tracing
+
+    # save_meeting 记录 span，导出到临时目录而不是 ./output/traces
+    monkeypatch.setattr(tracing, "exporter", tracing.JsonlSpanExporter(tmp_path / "traces"))
+
+    meeting = create_meeting_skeleton(
+        "[00:00:01] 张三: 开始", meeting_id="M20260105_1", title="项目周会",
+        date="2026-01-05", participants=["张三"]
+    )
+    save_meeting(meeting, output_dir=str(tmp_path))
+
+    results = query_meetings(output_dir=str(tmp_path), participants=["张三"])
+    assert [r["id"] for r in results] == ["M20260105_1"]
+
+    updated = update_meeting("M20260105_1", output_dir=str(tmp_path), title="项目周会（修订）")
+    assert updated.version == 2
+    results = query_meetings(output_dir=str(tmp_path), keywords=["修订"])
+    assert results[0]["version"] == 2
+
+
+def test_live_finalize_save_is_indexed(tmp_path, monkeypatch):
+    """finalize_meeting 直接写入实时会议目录（create_version=False），同样进入索引"""
+    from meeting_skill import create_meeting_skeleton, query_meetings, save_meeting
+    from services import tracing
+
+    monkeypatch.setattr(tracing, "exporter", tracing.JsonlSpanExporter(tmp_path / "traces"))
+    _write_meeting(tmp_path, "M1", "2026-01-05", ["张三"])
+    assert len(query_meetings(output_dir=str(tmp_path))) == 1  # 索引已建立，之后不会再整体重建
+    meeting_dir = tmp_path / "meetings" / "2026" / "01" / "M20260106_live"
+    meeting_dir.mkdir(parents=True)
+    meeting = create_meeting_skeleton(
+        "[00:00:01] 李四: 开始", meeting_id="M20260106_live", title="实时会议",
+        date="2026-01-06", participants=["李四"]
+    )
+    save_meeting(meeting, output_dir=str(meeting_dir), create_version=False)
+
+    results = query_meetings(output_dir=str(tmp_path), participants=["李四"])
+    assert [r["id"] for r in results] == ["M20260106_live"]
+    assert len(query_meetings(output_dir=str(tmp_path))) == 2
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+运行指标单元测试
+
+Test Cases:
+1. 计数按线程分片，多线程并发累加后汇总准确
+2. 直方图分桶累计、_sum / _count、超出最大桶计入 +Inf
+3. Gauge 采集时回调（带标签 / 不带标签），回调异常不影响其他指标
+4. 标签值转义；标签缺失时报错；同名重复注册返回同一对象
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from services.metrics import MetricsRegistry  # noqa: E402
+
+
+def test_counter_threads():
+    registry = MetricsRegistry()
+    counter = registry.counter("test_events_total", "事件数", ("kind",))
+
+    def work():
+        for _ in range(10000):
+            counter.inc(kind="a")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    counter.inc(5, kind="b")
+
+    assert counter.value(kind="a") == 80000
+    text = registry.render()
+    assert "# TYPE test_events_total counter" in text
+    assert 'test_events_total{kind="a"} 80000' in text
+    assert 'test_events_total{kind="b"} 5' in text
+
+
+def test_histogram_buckets():
+    registry = MetricsRegistry()
+    hist = registry.histogram("test_latency_seconds", "延迟", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        hist.observe(value)
+    with hist.time():
+        pass
+
+    lines = registry.render().splitlines()
+    assert 'test_latency_seconds_bucket{le="0.1"} 3' in lines  # 0.05, 0.1 与 time() 的极短耗时
+    assert 'test_latency_seconds_bucket{le="1.0"} 4' in lines
+    assert 'test_latency_seconds_bucket{le="+Inf"} 5' in lines
+    assert "test_latency_seconds_count 5" in lines
+    assert hist.count() == 5
+    total = next(line for line in lines if line.startswith("test_latency_seconds_sum"))
+    assert float(total.split()[1]) == pytest.approx(3.65, abs=0.01)
+
+
+def test_gauge_functions():
+    registry = MetricsRegistry()
+    plain = registry.gauge("test_sessions", "会话数")
+    plain.set_function(lambda: 3)
+    lanes = registry.gauge("test_saturation", "占用率", ("lane",))
+    lanes.set_function(lambda: {("process",): 0.5, ("thread",): 1.0})
+    broken = registry.gauge("test_broken", "异常")
+    broken.set_function(lambda: 1 / 0)
+
+    text = registry.render()
+    assert "test_sessions 3" in text
+    assert 'test_saturation{lane="process"} 0.5' in text
+    assert 'test_saturation{lane="thread"} 1.0' in text
+    assert "test_broken 采集失败" in text
+
+
+def test_labels_and_registry():
+    registry = MetricsRegistry()
+    counter = registry.counter("test_requests_total", "请求数", ("provider",))
+    assert registry.counter("test_requests_total", "请求数", ("provider",)) is counter
+    with pytest.raises(ValueError):
+        registry.gauge("test_requests_total", "冲突")
+    with pytest.raises(ValueError):
+        counter.inc()
+
+    counter.inc(provider='a"b\\c\nd')
+    assert 'test_requests_total{provider="a\\"b\\\\c\\nd"} 1' in registry.render()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI 纪要结果缓存单元测试
+
+Test Cases:
+1. 键随模型 / 系统提示词（模板版本）/ 转写文本变化
+2. 命中 / 未命中计数，过期条目不返回
+3. 超过大小上限时按最近访问时间淘汰
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from services.minutes_cache import MinutesCache  # noqa: E402
+
+CONFIG = {"provider": "deepseek", "model": "deepseek-chat"}
+
+
+def _messages(system="模板A", user="转写文本"):
+    return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+
+
+def test_key_covers_model_template_and_text():
+    key = MinutesCache.make_key(CONFIG, _messages())
+    assert key == MinutesCache.make_key(dict(CONFIG), _messages())
+    assert key != MinutesCache.make_key({**CONFIG, "model": "other"}, _messages())
+    assert key != MinutesCache.make_key(CONFIG, _messages(system="模板B"))
+    assert key != MinutesCache.make_key(CONFIG, _messages(user="转写文本。"))
+
+
+def test_get_put_and_ttl(tmp_path):
+    cache = MinutesCache(str(tmp_path / "cache.db"), ttl=60)
+    key = cache.make_key(CONFIG, _messages())
+
+    assert cache.get(key) is None
+    cache.put(key, {"title": "周会", "topics": []})
+    assert cache.get(key) == {"title": "周会", "topics": []}
+
+    # 另一个实例（另一个进程）读取同一文件
+    assert MinutesCache(str(tmp_path / "cache.db")).get(key)["title"] == "周会"
+
+    cache.ttl = 0.05
+    time.sleep(0.1)
+    assert cache.get(key) is None
+
+    status = cache.get_status()
+    assert (status["hits"], status["misses"], status["entries"]) == (1, 2, 0)
+
+    disabled = MinutesCache(str(tmp_path / "off.db"), enabled=False)
+    disabled.put(key, {"title": "x"})
+    assert disabled.get(key) is None
+    assert not (tmp_path / "off.db").exists()
+
+
+def test_lru_eviction(tmp_path):
+    value = {"text": "x" * 1000}
+    cache = MinutesCache(str(tmp_path / "cache.db"), max_bytes=3500)
+
+    for i in range(3):
+        cache.put(f"k{i}", value)
+        time.sleep(0.01)
+    assert cache.get("k0") is not None  # k0 最近访问，k1 最久未访问
+
+    cache.put("k3", value)
+    assert cache.get("k1") is None
+    assert all(cache.get(k) is not None for k in ("k0", "k3"))
+    status = cache.get_status()
+    assert status["size_bytes"] <= 3500 and status["evictions"] >= 1
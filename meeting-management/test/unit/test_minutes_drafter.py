@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+会议进行中纪要草稿单元测试
+
+Test Cases:
+1. 只发送游标之后的新增转写 + 上一版草稿，推送 minutes_draft 并保存游标
+2. 新增转写不足 / 更新失败时保留上一版草稿和游标
+3. 定时更新，close 取消进行中的更新
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from services.minutes_drafter import MinutesDrafter  # noqa: E402
+
+
+class _Live:
+    """模拟会话中的实时转写片段和草稿存储"""
+
+    def __init__(self):
+        self.parts = []
+        self.stored = None
+        self.messages = []
+        self.calls = []
+
+    def fetch(self, start):
+        return " ".join(self.parts[start:]), len(self.parts)
+
+    def store(self, draft, cursor):
+        self.stored = (draft, cursor)
+
+    async def send(self, message):
+        self.messages.append(message)
+
+    async def update(self, draft, text):
+        self.calls.append((draft, text))
+        topics = (draft or {}).get("topics", []) + [{"title": text[:4]}]
+        return {"topics": topics}
+
+
+def test_incremental_updates():
+    live = _Live()
+
+    async def main():
+        drafter = MinutesDrafter("m1", live.fetch, live.store, live.send, live.update, min_chars=5)
+        live.parts += ["第一段发言内容", "继续讨论"]
+        assert await drafter.update()
+        live.parts += ["第二段发言内容"]
+        assert await drafter.update()
+        return drafter
+
+    drafter = asyncio.run(main())
+    assert live.calls[0] == (None, "第一段发言内容 继续讨论")
+    # 第二次只发送新增片段 + 上一版草稿
+    assert live.calls[1] == ({"topics": [{"title": "第一段发"}]}, "第二段发言内容")
+    assert live.stored == ({"topics": [{"title": "第一段发"}, {"title": "第二段发"}]}, 3)
+    assert [m["revision"] for m in live.messages] == [1, 2]
+    assert live.messages[-1]["type"] == "minutes_draft"
+    assert drafter.get_status()["cursor"] == 3
+
+
+def test_skip_and_failure_keep_previous():
+    live = _Live()
+
+    async def failing(draft, text):
+        raise RuntimeError("timeout")
+
+    async def main():
+        drafter = MinutesDrafter("m1", live.fetch, live.store, live.send, live.update, min_chars=10)
+        live.parts.append("短")
+        assert not await drafter.update()          # 新增不足
+        assert await drafter.update(force=True)    # 强制更新
+        live.parts.append("后续的很长一段发言内容")
+        drafter._update_fn = failing
+        assert not await drafter.update()
+        return drafter
+
+    drafter = asyncio.run(main())
+    assert drafter.cursor == 1 and drafter.failures == 1
+    assert live.stored == ({"topics": [{"title": "短"}]}, 1)
+
+
+def test_periodic_and_close_cancels():
+    live = _Live()
+    started = []
+
+    async def slow(draft, text):
+        started.append(text)
+        await asyncio.sleep(10)
+        return {"topics": []}
+
+    async def main():
+        live.parts.append("一段足够长的发言内容")
+        drafter = MinutesDrafter("m1", live.fetch, live.store, live.send, slow, interval=0.01, min_chars=1)
+        drafter.start()
+        while not started:
+            await asyncio.sleep(0.005)
+        await asyncio.wait_for(drafter.close(), timeout=1)
+        return drafter
+
+    drafter = asyncio.run(main())
+    assert drafter.revision == 0 and live.stored is None
+
+    # interval=0 关闭定时更新
+    async def disabled():
+        drafter = MinutesDrafter("m1", live.fetch, live.store, live.send, live.update, interval=0)
+        drafter.start()
+        await asyncio.sleep(0.02)
+        await drafter.close()
+    asyncio.run(disabled())
+    assert not live.calls
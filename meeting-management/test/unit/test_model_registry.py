@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Whisper 模型共享池单元测试
+
+Test Cases:
+1. 同一 key 重复借出复用同一实例，不重复加载
+2. 实例满额时共享负载最低的实例（引用计数）
+3. 全局满额时回收其他池的空闲实例
+4. 空闲超时回收，预热实例常驻
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from services.model_registry import WhisperModelRegistry  # noqa: E402
+
+
+class FakeRegistry(WhisperModelRegistry):
+    """用计数器代替真实的 WhisperModel 加载"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.loads = 0
+
+    def _load(self, key):
+        self.loads += 1
+        return f"model-{key[0]}-{self.loads}"
+
+
+def test_checkout_reuses_instance():
+    registry = FakeRegistry(pool_size=2, max_instances=4)
+    with registry.checkout("small", "cpu", "int8") as m1:
+        pass
+    with registry.checkout("small", "cpu", "int8") as m2:
+        pass
+    assert m1 == m2
+    assert registry.loads == 1
+
+
+def test_checkout_shares_when_pool_full():
+    registry = FakeRegistry(pool_size=1, max_instances=4)
+    with registry.checkout("small", "cpu", "int8") as m1:
+        with registry.checkout("small", "cpu", "int8") as m2:
+            assert m1 == m2
+            assert registry.get_status()["in_use"] == 2
+    assert registry.get_status()["in_use"] == 0
+    assert registry.loads == 1
+
+
+def test_global_cap_evicts_other_pool():
+    registry = FakeRegistry(pool_size=1, max_instances=1)
+    with registry.checkout("small", "cpu", "int8"):
+        pass
+    with registry.checkout("tiny", "cpu", "int8"):
+        pass
+    status = registry.get_status()
+    assert status["loaded_instances"] == 1
+    assert status["models"][0]["model"] == "tiny"
+
+
+def test_evict_idle_keeps_pinned():
+    registry = FakeRegistry(pool_size=1, max_instances=4, idle_ttl=0)
+    registry.warm_up("small", "cpu", "int8")
+    with registry.checkout("tiny", "cpu", "int8"):
+        pass
+    assert registry.evict_idle() == 1
+    assert registry.is_loaded("small", "cpu", "int8")
+    assert not registry.is_loaded("tiny", "cpu", "int8")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+全文检索索引单元测试
+
+Test Cases:
+1. 中文二字切分 / 英文按词切分，检索表达式为短语 AND
+2. FTS5 索引写入、更新、删除，标题命中排在正文命中之前
+3. 高亮片段截取
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, select, text
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from services import search_index  # noqa: E402
+from services.search_index import _build_query, _delete, _document, _upsert, make_snippet, search_subquery, tokenize  # noqa: E402
+
+
+def _meeting(session_id, title, full_text="", summary=None, topics=None, action_items=None):
+    return SimpleNamespace(session_id=session_id, title=title, full_text=full_text,
+                           summary=summary, topics=topics, action_items=action_items)
+
+
+def test_tokenize_and_query(monkeypatch):
+    monkeypatch.setattr(search_index, "DB_TYPE", "sqlite")
+    assert tokenize("预算评审 Q3 Review") == ["预算", "算评", "评审", "q3", "review"]
+    assert tokenize("，。！") == []
+    assert _build_query("预算评审 q3") == '"预算 算评 评审" AND "q3"'
+    assert _build_query("预") == '"预"*'
+    assert _build_query("！！") is None
+
+    monkeypatch.setattr(search_index, "DB_TYPE", "highgo")
+    assert _build_query("预算 o'neil") == "('预算') & ('o' <-> 'neil')"
+
+
+def test_fts_index_roundtrip(monkeypatch):
+    monkeypatch.setattr(search_index, "DB_TYPE", "sqlite")
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        try:
+            for ddl in search_index._SQLITE_DDL:
+                conn.execute(text(ddl))
+        except Exception:
+            pytest.skip("SQLite 未编译 FTS5")
+
+        _upsert(conn, _document(_meeting("s1", "周会", "讨论了预算评审的安排")))
+        _upsert(conn, _document(_meeting("s2", "预算评审会", "各部门汇报")))
+        _upsert(conn, _document(_meeting("s3", "技术分享", topics='[{"title": "缓存设计"}]')))
+
+        def search(keyword):
+            sub = search_subquery(keyword)
+            return [r.session_id for r in conn.execute(select(sub.c.session_id).order_by(sub.c.rank))]
+
+        assert search("预算评审") == ["s2", "s1"]
+        assert search("缓存") == ["s3"]
+        assert search("预算 汇报") == ["s2"]
+        assert search("评预") == []
+
+        # 更新与删除
+        _upsert(conn, _document(_meeting("s1", "周会", "只讨论了人事")))
+        assert search("预算评审") == ["s2"]
+        _delete(conn, "s2")
+        assert search("预算评审") == []
+
+
+def test_make_snippet():
+    content = "甲" * 50 + "本次预算评审通过" + "乙" * 50
+    snippet = make_snippet("预算", [None, "无关标题", content])
+    assert snippet.startswith("...") and snippet.endswith("...")
+    assert "本次<mark>预算</mark>评审" in snippet
+    assert make_snippet("缺失", ["标题"]) == ""
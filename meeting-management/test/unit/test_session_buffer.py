@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebSocket 会话缓冲单元测试
+
+Test Cases:
+1. 按序号取出，合并时直接取回整段 bytes；取出后复用缓冲
+2. 首次写入时才分配，按需增长且不超过上限
+3. 超出容量 / 块数上限时拒绝写入，取出后可继续写入
+4. 转写片段按 id 修改，完整文本读取时才拼接
+"""
+
+import os
+import sys
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from services.session_buffer import AudioChunkBuffer, TranscriptLog, contiguous_bytes  # noqa: E402
+
+
+@dataclass
+class Segment:
+    id: str
+    text: str
+    start_time_ms: int
+
+
+def test_buffer_order_and_reuse():
+    buffer = AudioChunkBuffer(10)
+    assert buffer.append(0, 0, b"abcd", "audio/webm")
+    assert buffer.append(1, 100, b"efgh", "audio/webm")
+    assert contiguous_bytes(buffer.drain()) == b"abcdefgh"
+
+    # 取出后从头复用；乱序到达按序号取出
+    assert buffer.append(3, 300, b"1234567", "audio/webm")
+    assert buffer.append(2, 200, b"xyz", "audio/webm")
+    chunks = buffer.drain()
+    assert [c["seq"] for c in chunks] == [2, 3]
+    assert [bytes(c["data"]) for c in chunks] == [b"xyz", b"1234567"]
+    assert contiguous_bytes(chunks) == b"xyz1234567"
+    assert len(buffer) == 0 and buffer.nbytes == 0
+
+
+def test_buffer_allocates_lazily():
+    buffer = AudioChunkBuffer(8 * 1024 * 1024)
+    assert buffer.allocated == 0  # 未写入音频的会话不占内存
+    assert buffer.append(0, 0, b"a" * 100, "audio/webm")
+    assert 0 < buffer.allocated < 1024 * 1024
+    assert buffer.append(1, 0, b"b" * 200 * 1024, "audio/webm")
+    assert buffer.allocated >= buffer.nbytes
+    assert bytes(buffer.drain()[1]["data"]) == b"b" * 200 * 1024
+
+    small = AudioChunkBuffer(10)
+    assert small.append(0, 0, b"abc", "audio/webm")
+    assert small.allocated == 10  # 不超过上限
+
+
+def test_buffer_limits():
+    buffer = AudioChunkBuffer(8, max_chunks=2)
+    assert buffer.append(0, 0, b"aaaa", "audio/webm")
+    assert not buffer.append(1, 0, b"bbbbb", "audio/webm")  # 超出容量
+    assert buffer.append(1, 0, b"bb", "audio/webm")
+    assert not buffer.append(2, 0, b"c", "audio/webm")  # 块数上限
+    buffer.drain()
+    assert buffer.append(2, 0, b"c", "audio/webm")
+
+
+def test_contiguous_bytes_rejects_foreign_chunks():
+    assert contiguous_bytes([{"seq": 0, "data": b"raw"}]) is None
+    buffer = AudioChunkBuffer(8)
+    buffer.append(0, 0, b"ab", "audio/webm")
+    buffer.append(1, 0, b"cd", "audio/webm")
+    chunks = buffer.drain()
+    assert contiguous_bytes(chunks[::-1]) is None
+    assert contiguous_bytes(chunks[:1]) is None
+
+
+def test_transcript_log_lazy_text():
+    formatted = []
+
+    def fmt(seg):
+        formatted.append(seg.id)
+        return f"[{seg.start_time_ms}] {seg.text}"
+
+    log = TranscriptLog(fmt)
+    for i in range(3):
+        log.append(Segment(f"s{i}", f"text{i}", i * 1000))
+    assert log.text == "[0] text0\n[1000] text1\n[2000] text2"
+
+    formatted.clear()
+    assert log.update("s1", "edited")
+    assert formatted == ["s1"]  # 只重新格式化被修改的片段
+    assert log.get("s1").text == "edited"
+    assert log.text.splitlines()[1] == "[1000] edited"
+    assert not log.update("missing", "x")
+    assert len(log) == 3 and [s.id for s in log.segments()] == ["s0", "s1", "s2"]
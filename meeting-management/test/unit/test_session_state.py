@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+实时会话状态存储单元测试
+
+Test Cases:
+1. memory / sqlite 后端：会话快照读写，租约获取 / 续期 / 过期 / 释放
+2. sqlite 后端跨实例（模拟多 worker）共享快照和租约
+3. 生命周期锁：被其他 worker 持有时等待，超时抛 TimeoutError
+4. 会话归属与 redirect 信息；从快照恢复会话（resume）
+5. 后端接口是抽象基类：未实现全部方法的子类无法实例化
+6. 会话快照只含游标和元数据，resume 时转写片段和纪要草稿从音频块日志重放
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from services import session_state as ss  # noqa: E402
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return ss.SQLiteSessionStore(str(tmp_path / "state.db"))
+    return ss.MemorySessionStore()
+
+
+def test_state_and_leases(store):
+    store.save_state("M1", {"title": "周会", "transcript_parts": [{"start": 0.0, "text": "你好"}]})
+    assert store.load_state("M1")["transcript_parts"][0]["text"] == "你好"
+    assert store.list_states() == ["M1"]
+    store.delete_state("M1")
+    assert store.load_state("M1") is None
+
+    assert store.acquire("owner:M1", "w1", ttl=0.2)
+    assert store.acquire("owner:M1", "w1", ttl=0.2)  # 续期
+    assert not store.acquire("owner:M1", "w2", ttl=0.2)
+    assert store.holder("owner:M1") == "w1"
+    assert not store.release("owner:M1", "w2")
+
+    time.sleep(0.25)
+    assert store.holder("owner:M1") is None
+    assert store.acquire("owner:M1", "w2", ttl=10)
+    assert store.release("owner:M1", "w2")
+    assert store.holder("owner:M1") is None
+    assert store.get_status()["backend"] == store.backend
+
+
+def test_sqlite_shared_between_workers(tmp_path):
+    path = str(tmp_path / "state.db")
+    worker_a, worker_b = ss.SQLiteSessionStore(path), ss.SQLiteSessionStore(path)
+
+    worker_a.save_state("M1", {"chunk_count": 3})
+    assert worker_b.load_state("M1") == {"chunk_count": 3}
+    assert worker_a.acquire("lifecycle:M1", "a", ttl=10)
+    assert not worker_b.acquire("lifecycle:M1", "b", ttl=10)
+    worker_a.release("lifecycle:M1", "a")
+    assert worker_b.acquire("lifecycle:M1", "b", ttl=10)
+
+
+def test_lifecycle_lock():
+    store = ss.MemorySessionStore()
+
+    async def main():
+        order = []
+
+        async def hold(name):
+            async with ss.lifecycle_lock("M1", store=store):
+                order.append(f"{name}-in")
+                await asyncio.sleep(0.05)
+                order.append(f"{name}-out")
+
+        await asyncio.gather(hold("a"), hold("b"))
+        assert order == ["a-in", "a-out", "b-in", "b-out"]
+        assert store.holder(ss.lifecycle_key("M1")) is None
+
+        # 其他 worker 持有：等到租约过期
+        store.acquire(ss.lifecycle_key("M1"), "other", ttl=0.2)
+        start = time.monotonic()
+        async with ss.lifecycle_lock("M1", store=store):
+            assert time.monotonic() - start >= 0.15
+
+        store.acquire(ss.lifecycle_key("M1"), "other", ttl=10)
+        with pytest.raises(TimeoutError):
+            async with ss.lifecycle_lock("M1", store=store, timeout=0.1):
+                pass
+
+    asyncio.run(main())
+
+
+def test_ownership_and_resume(tmp_path, monkeypatch):
+    import meeting_skill
+
+    store = ss.MemorySessionStore()
+    monkeypatch.setattr(meeting_skill, "session_store", store)
+
+    async def main():
+        ownership = ss.SessionOwnership("M1", store=store)
+        assert await ownership.claim()
+        assert await ss.session_owner("M1", store=store) is None  # 本 worker
+
+        store.acquire(ss.owner_key("M2"), "node-2:1", ttl=10)
+        store.save_state("M2", {"node_url": "ws://10.0.0.2:8765"})
+        assert await ss.session_owner("M2", store=store) == {
+            "worker_id": "node-2:1", "node_url": "ws://10.0.0.2:8765"
+        }
+
+        await ownership.release()
+        assert store.holder(ss.owner_key("M1")) is None
+
+    asyncio.run(main())
+
+    # 其他 worker 留下的快照：恢复后继续累积片段和草稿
+    audio_path = tmp_path / "audio.webm"
+    audio_path.write_bytes(b"")
+    store.save_state("M3", {
+        "audio_path": str(audio_path),
+        "meeting_dir": str(tmp_path),
+        "title": "周会",
+        "user_id": "u1",
+        "start_time": "2026-10-16T09:00:00",
+        "chunk_count": 12,
+        "transcript_parts": [{"start": 0.0, "end": 2.0, "text": "你好"}],
+        "transcript_cursor": 2.0,
+        "minutes_draft": {"topics": []},
+        "draft_cursor": 1,
+    })
+    assert meeting_skill.restore_meeting_session("M3") == str(audio_path)
+    session = meeting_skill.get_meeting_session("M3")
+    assert session["transcriber"].cursor == 2.0 and session["chunk_count"] == 12
+    assert meeting_skill.read_live_transcript("M3", 0) == ("你好", 1)
+
+    meeting_skill.store_minutes_draft("M3", {"topics": [{"title": "进度"}]}, 1)
+    assert session["minutes_draft"]["topics"][0]["title"] == "进度"
+    snapshot = store.load_state("M3")
+    assert snapshot["draft_cursor"] == 1 and snapshot["transcript_count"] == 1
+    assert snapshot["worker_id"] == ss.WORKER_ID
+
+    meeting_skill.discard_meeting_session("M3")
+    assert meeting_skill.get_meeting_session("M3") is None and store.load_state("M3") is None
+    assert meeting_skill.restore_meeting_session("M3") is None
+
+
+def test_store_interface_is_abstract():
+    class Partial(ss.SessionStateStore):
+        def save_state(self, session_id, state):
+            pass
+
+    with pytest.raises(TypeError):
+        ss.SessionStateStore()
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_snapshot_excludes_transcript_and_resume_replays_journal(tmp_path, monkeypatch):
+    import meeting_skill
+    from services import tracing
+
+    store = ss.MemorySessionStore()
+    monkeypatch.setattr(meeting_skill, "session_store", store)
+    monkeypatch.setattr(tracing, "exporter", tracing.JsonlSpanExporter(tmp_path / "traces"))
+
+    def fake_segments(session, final=False):
+        session["transcriber"].cursor = 2.0
+        return [{"start": 0.0, "end": 2.0, "text": "你好"}]
+
+    monkeypatch.setattr(meeting_skill, "_transcribe_new_segments", fake_segments)
+
+    from services.chunk_journal import ChunkJournal, JOURNAL_NAME
+
+    audio_path = tmp_path / "audio.webm"
+    audio_path.write_bytes(b"")
+    meta = {
+        "meeting_id": "M4", "title": "周会", "user_id": "u1",
+        "start_time": "2026-10-16T09:00:00", "audio_path": str(audio_path),
+    }
+    journal = ChunkJournal(tmp_path / JOURNAL_NAME)
+    journal.open_session({**meta, "offset": 0})
+    journal.close()
+    store.save_state("M4", {**meta, "meeting_dir": str(tmp_path)})
+    meeting_skill.restore_meeting_session("M4")
+    assert meeting_skill.transcribe_audio_session("M4") == "你好"
+    meeting_skill.store_minutes_draft("M4", {"topics": [{"title": "进度"}]}, 1)
+
+    snapshot = store.load_state("M4")
+    assert "transcript_parts" not in snapshot and "minutes_draft" not in snapshot
+    assert snapshot["transcript_count"] == 1 and snapshot["transcript_cursor"] == 2.0
+
+    # worker 崩溃：进程内会话丢失，只剩共享快照和会议目录下的日志
+    crashed = meeting_skill._audio_sessions.pop("M4")
+    meeting_skill._close_journal(crashed["journal"])
+
+    meeting_skill.restore_meeting_session("M4")
+    session = meeting_skill.get_meeting_session("M4")
+    assert meeting_skill.read_live_transcript("M4", 0) == ("你好", 1)
+    assert session["transcriber"].cursor == 2.0
+    assert session["minutes_draft"] == {"topics": [{"title": "进度"}]} and session["draft_cursor"] == 1
+
+    meeting_skill.discard_meeting_session("M4")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+转写文本后处理单元测试
+
+Test Cases:
+1. 组合正则过滤与逐词替换结果一致（长词优先），计数正确
+2. 过滤器按词表缓存，繁简转换器只创建一次
+3. 批量繁简转换与逐段转换一致
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from services import text_postprocess as tp  # noqa: E402
+
+WORDS = ["字幕by索兰娅", "字幕", "索兰娅", "suolan", "a.b"]
+
+
+def _legacy(text, words):
+    for word in words:
+        text = text.replace(word, "")
+    return " ".join(text.split())
+
+
+@pytest.mark.parametrize("text", [
+    "字幕by索兰娅 大家好",
+    "今天  讨论 字幕 进度 索兰娅 suolan",
+    "a.b 不是 axb",
+    "",
+    "没有噪声词",
+])
+def test_filter_matches_legacy(text):
+    noise_filter = tp.NoiseFilter(WORDS)
+    assert noise_filter.filter(text) == _legacy(text, WORDS)
+
+
+def test_filter_count_and_cache():
+    filtered, removed = tp.NoiseFilter(WORDS).filter_count("字幕by索兰娅 好 字幕 字幕")
+    assert (filtered, removed) == ("好", 3)
+    assert tp.NoiseFilter([]).filter_count(" a  b ") == (" a  b ", 0)
+
+    assert tp.get_noise_filter(WORDS) is tp.get_noise_filter(list(WORDS))
+    assert tp.get_noise_filter().words == tuple(sorted(set(tp.NOISE_WORDS), key=len, reverse=True))
+
+
+def test_batch_simplified():
+    if tp.get_converter() is None:
+        pytest.skip("opencc 未安装")
+    assert tp.get_converter() is tp.get_converter()
+
+    texts = ["我們討論項目進度", "", "後端接口 字幕", "含\n換行"]
+    assert tp.to_simplified_batch(texts) == [tp.to_simplified(t) for t in texts]
+    assert tp.to_simplified_batch(texts[:3])[0] == "我们讨论项目进度"
+    assert tp.postprocess_segments(["字幕by索兰娅 後端"], tp.NoiseFilter(WORDS)) == ["后端"]
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+会议处理链路追踪单元测试
+
+Test Cases:
+1. 子 span 继承父 span 的 trace_id 和 meeting_id，导出到会议 JSONL 并组装成树
+2. 没有会议上下文的 span 不记录；异常记为 ERROR 并继续抛出
+3. traced 装饰器（同步 / 异步）从参数取 meeting_id
+4. 调度器线程通道和 attach() 跨线程传递父 span
+5. 结束 span 只入队由后台线程写入，队列满时丢弃计数；过期会议文件被清理
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from services import tracing  # noqa: E402
+from services.transcription_scheduler import TranscriptionScheduler  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def exporter(tmp_path, monkeypatch):
+    exporter = tracing.JsonlSpanExporter(tmp_path)
+    monkeypatch.setattr(tracing, "exporter", exporter)
+    yield exporter
+    exporter.close()
+
+
+def _names(nodes):
+    return [(n["name"], _names(n["children"])) for n in nodes]
+
+
+def test_nested_spans(exporter):
+    with tracing.span("finalize_meeting", meeting_id="M1") as root:
+        with tracing.span("file.read") as read:
+            read.set_attribute("bytes", 42)
+        with tracing.span("generate_minutes"):
+            with tracing.span("llm.request", attempt=1):
+                pass
+
+    spans = exporter.load("M1")
+    assert len(spans) == 4
+    assert {s["trace_id"] for s in spans} == {root.trace_id}
+    assert all(s["attributes"]["meeting.id"] == "M1" for s in spans)
+    assert all(s["end_time_unix_nano"] >= s["start_time_unix_nano"] for s in spans)
+
+    traces = tracing.load_trace("M1")
+    assert len(traces) == 1
+    assert _names(traces[0]["spans"]) == [
+        ("finalize_meeting", [("file.read", []), ("generate_minutes", [("llm.request", [])])])
+    ]
+    assert traces[0]["spans"][0]["children"][0]["attributes"]["bytes"] == 42
+    assert tracing.load_trace("M2") == []
+
+
+def test_noop_and_errors(exporter, tmp_path):
+    with tracing.span("orphan") as s:
+        s.set_attribute("ignored", True)
+    assert list(tmp_path.iterdir()) == []
+
+    with pytest.raises(ValueError):
+        with tracing.span("save_meeting", meeting_id="M1"):
+            raise ValueError("磁盘已满")
+    span = exporter.load("M1")[0]
+    assert span["status"] == {"code": "ERROR", "message": "ValueError: 磁盘已满"}
+    assert tracing.load_trace("M1")[0]["status"] == "ERROR"
+
+    # meeting_id 中的路径字符不会越出导出目录
+    with tracing.span("x", meeting_id="../evil"):
+        pass
+    assert all(p.parent == tmp_path for p in tmp_path.iterdir())
+
+
+def test_traced_decorator(exporter):
+    @tracing.traced("upload.process", meeting_arg="session_id")
+    async def process(session_id, title):
+        with tracing.span("db.commit"):
+            await asyncio.sleep(0)
+        return title
+
+    @tracing.traced("finalize_meeting")
+    def finalize(meeting_id):
+        with tracing.span("file.close"):
+            return meeting_id
+
+    assert asyncio.run(process("U1", title="周会")) == "周会"
+    assert finalize("M1") == "M1"
+    assert _names(tracing.load_trace("U1")[0]["spans"]) == [("upload.process", [("db.commit", [])])]
+    assert _names(tracing.load_trace("M1")[0]["spans"]) == [("finalize_meeting", [("file.close", [])])]
+
+
+def test_context_across_threads(exporter):
+    def work():
+        with tracing.span("transcribe.window"):
+            pass
+
+    async def main():
+        scheduler = TranscriptionScheduler(workers=1, thread_workers=1, queue_size=4)
+        scheduler.start()
+        try:
+            with tracing.span("meeting.end", meeting_id="M1"):
+                await scheduler.run(work, in_process=True)
+        finally:
+            await scheduler.stop()
+
+    asyncio.run(main())
+    tree = tracing.load_trace("M1")[0]["spans"]
+    assert _names(tree) == [("meeting.end", [("scheduler.work", [("transcribe.window", [])])])]
+    assert "queue_wait_ms" in tree[0]["children"][0]["attributes"]
+
+    # 不继承上下文的线程用 attach() 挂到父 span 下
+    with tracing.span("finalize_meeting", meeting_id="M3") as parent:
+        def other():
+            with tracing.attach(parent), tracing.span("llm.request"):
+                pass
+        thread = threading.Thread(target=other)
+        thread.start()
+        thread.join()
+    assert _names(tracing.load_trace("M3")[0]["spans"]) == [("finalize_meeting", [("llm.request", [])])]
+
+
+def test_background_writer_and_retention(tmp_path, monkeypatch):
+    exporter = tracing.JsonlSpanExporter(tmp_path, queue_size=1, retention_days=1)
+    monkeypatch.setattr(tracing, "exporter", exporter)
+    gate = threading.Event()
+    write = exporter._write
+    monkeypatch.setattr(exporter, "_write", lambda items: (gate.wait(), write(items)))
+    try:
+        with tracing.span("a", meeting_id="M1"):
+            pass
+        # 写入线程被卡住时结束 span 不阻塞；队列满后丢弃
+        for _ in range(3):
+            with tracing.span("b", meeting_id="M1"):
+                pass
+        assert not exporter.path_for("M1").exists()
+        assert exporter.dropped >= 1
+    finally:
+        gate.set()
+    assert [s["name"] for s in exporter.load("M1")][0] == "a"
+
+    old = exporter.path_for("OLD")
+    old.write_text("{}\n", encoding="utf-8")
+    stale = time.time() - 2 * 86400
+    os.utime(old, (stale, stale))
+    assert exporter.prune(time.time() - 86400) == 1
+    assert not old.exists() and exporter.path_for("M1").exists()
+    exporter.close()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+转写片段存储单元测试
+
+Test Cases:
+1. 各来源的片段格式统一
+2. 游标分页按时间顺序遍历全部片段
+3. 按片段 ID 单行更新，重建完整文本
+4. 编辑只标记完整文本过期，读取前按需重建一次；整体替换清除过期标记
+"""
+
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from services.transcript_store import (  # noqa: E402
+    build_full_text, count_segments, list_segments, mark_full_text_stale, metadata,
+    normalize_segments, refresh_full_text, replace_segments, update_segment_texts
+)
+
+
+def _run(test):
+    async def main():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+        async with AsyncSession(engine) as db:
+            await test(db)
+        await engine.dispose()
+    asyncio.run(main())
+
+
+def test_normalize_segments():
+    rows = normalize_segments([
+        {"id": "seg-0007", "text": "a", "start_time_ms": 1000, "end_time_ms": 2000, "speaker": "张三"},
+        {"start": 2.5, "end": 3.0, "text": "b", "speaker": "Speaker1", "timestamp": "00:00:02"},
+        {"timestamp": "01:02:03", "text": "c"},
+    ])
+    assert [r["segment_id"] for r in rows] == ["seg-0007", "seg-0001", "seg-0002"]
+    assert [(r["start_ms"], r["end_ms"]) for r in rows] == [(1000, 2000), (2500, 3000), (3723000, 3723000)]
+    assert rows[2]["speaker"] == ""
+
+
+def test_cursor_pagination():
+    async def check(db):
+        # 乱序写入，相同开始时间按写入顺序
+        segments = [{"start": (i * 7) % 25, "end": 0, "text": f"t{i}"} for i in range(25)]
+        segments.append({"start": 0, "end": 0, "text": "dup"})
+        await replace_segments(db, "m1", segments)
+        await replace_segments(db, "m2", [{"start": 0, "end": 1, "text": "other"}])
+        assert await count_segments(db, "m1") == 26
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = await list_segments(db, "m1", cursor=cursor, limit=10)
+            seen.extend(page)
+            if cursor is None:
+                break
+        assert len(page) == 6
+        assert [s["start_time_ms"] for s in seen] == sorted(s["start_time_ms"] for s in seen)
+        assert [s["text"] for s in seen[:2]] == ["t0", "dup"]
+        assert seen == (await list_segments(db, "m1"))[0]
+
+        # 重新转写整体替换
+        await replace_segments(db, "m1", [{"start": 1, "end": 2, "text": "new"}])
+        assert [s["text"] for s in (await list_segments(db, "m1"))[0]] == ["new"]
+    _run(check)
+
+
+def test_update_segment_texts():
+    async def check(db):
+        await replace_segments(db, "m1", [
+            {"id": "seg-0000", "start_time_ms": 0, "end_time_ms": 1000, "text": "你好"},
+            {"id": "seg-0001", "start_time_ms": 65000, "end_time_ms": 66000, "text": "世界"},
+        ])
+        assert await update_segment_texts(db, "m1", {"seg-0001": "大家"}) == 1
+        assert await update_segment_texts(db, "m1", {"seg-9999": "x", "seg-0000": "您好"}) == 1
+        assert await update_segment_texts(db, "m2", {"seg-0000": "x"}) == 0
+        assert await build_full_text(db, "m1") == "[00:00] 您好\n[01:05] 大家"
+    _run(check)
+
+
+def test_lazy_full_text():
+    async def check(db):
+        await replace_segments(db, "m1", [
+            {"id": "seg-0000", "start_time_ms": 0, "end_time_ms": 1000, "text": "你好"},
+            {"id": "seg-0001", "start_time_ms": 65000, "end_time_ms": 66000, "text": "世界"},
+        ])
+        meeting = SimpleNamespace(session_id="m1", full_text="[00:00] 你好\n[01:05] 世界")
+        assert not await refresh_full_text(db, meeting)
+
+        # 连续编辑只标记过期
+        for text in ("大家", "各位"):
+            await update_segment_texts(db, "m1", {"seg-0001": text})
+            await mark_full_text_stale(db, "m1")
+        assert meeting.full_text.endswith("世界")
+        assert await refresh_full_text(db, meeting)
+        assert meeting.full_text == "[00:00] 你好\n[01:05] 各位"
+        assert not await refresh_full_text(db, meeting)
+
+        # 重新转写整体替换后由调用方写入 full_text，不再重建
+        await mark_full_text_stale(db, "m1")
+        await replace_segments(db, "m1", [{"start": 0, "end": 1, "text": "new"}])
+        assert not await refresh_full_text(db, meeting)
+    _run(check)
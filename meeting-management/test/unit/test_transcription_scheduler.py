@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+转写任务调度器单元测试
+
+Test Cases:
+1. 高优先级任务先于低优先级执行
+2. 排队中的任务可按 job_id 取消
+3. 任务异常传递给调用方，计入失败数
+4. 状态中包含队列深度和等待时间
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from services.transcription_scheduler import (  # noqa: E402
+    JobCancelledError,
+    JobPriority,
+    TranscriptionScheduler,
+)
+
+
+def _make_scheduler() -> TranscriptionScheduler:
+    # 只用线程通道，避免测试中拉起工作进程
+    return TranscriptionScheduler(workers=1, thread_workers=1, queue_size=8)
+
+
+def test_priority_order():
+    async def main():
+        scheduler = _make_scheduler()
+        scheduler.start()
+        gate = threading.Event()
+        order = []
+
+        blocker = await scheduler.submit(gate.wait, in_process=True)
+        batch = await scheduler.submit(order.append, "batch", priority=JobPriority.BATCH, in_process=True)
+        live = await scheduler.submit(order.append, "live", priority=JobPriority.LIVE, in_process=True)
+        gate.set()
+        await asyncio.gather(blocker.future, batch.future, live.future)
+        await scheduler.stop()
+        return order
+
+    assert asyncio.run(main()) == ["live", "batch"]
+
+
+def test_cancel_pending_job():
+    async def main():
+        scheduler = _make_scheduler()
+        scheduler.start()
+        gate = threading.Event()
+
+        blocker = await scheduler.submit(gate.wait, in_process=True)
+        pending = asyncio.create_task(
+            scheduler.run(lambda: "done", in_process=True, job_id="M1")
+        )
+        await asyncio.sleep(0)
+        assert scheduler.cancel("M1") == 1
+        gate.set()
+        await blocker.future
+        try:
+            await pending
+        except JobCancelledError:
+            cancelled = True
+        else:
+            cancelled = False
+        await scheduler.stop()
+        return cancelled
+
+    assert asyncio.run(main()) is True
+
+
+def test_failure_propagates():
+    def boom():
+        raise ValueError("bad audio")
+
+    async def main():
+        scheduler = _make_scheduler()
+        scheduler.start()
+        try:
+            await scheduler.run(boom, in_process=True)
+        except ValueError as e:
+            error = str(e)
+        status = scheduler.get_status()
+        await scheduler.stop()
+        return error, status
+
+    error, status = asyncio.run(main())
+    assert error == "bad audio"
+    assert status["lanes"]["thread"]["failed"] == 1
+
+
+def test_status_metrics():
+    async def main():
+        scheduler = _make_scheduler()
+        scheduler.start()
+        result = await scheduler.run(lambda: 42, in_process=True)
+        status = scheduler.get_status()
+        await scheduler.stop()
+        return result, status
+
+    result, status = asyncio.run(main())
+    assert result == 42
+    assert status["status"] == "ok"
+    assert status["queue_depth"] == 0
+    lane = status["lanes"]["thread"]
+    assert lane["completed"] == 1
+    assert set(lane["wait_seconds"]) == {"last", "max", "avg"}
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+上传流式落盘 / 断点续传单元测试
+
+Test Cases:
+1. 分块写盘，sha256 与整体计算一致；超过上限立即中止并删除文件
+2. 断点续传：offset 校验、续传、complete 校验 sha256
+3. 重启后续传（新实例）complete 时重新计算 sha256；过期清理
+"""
+
+import asyncio
+import hashlib
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from services.upload_store import (  # noqa: E402
+    ResumableUploadStore, UploadOffsetError, UploadTooLargeError, save_stream
+)
+
+DATA = os.urandom(300_000)
+
+
+async def _chunks(data, size=64 * 1024):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def test_save_stream(tmp_path):
+    dest = tmp_path / "a.webm"
+    size, sha256 = asyncio.run(save_stream(_chunks(DATA), dest, max_bytes=len(DATA)))
+    assert size == len(DATA) and dest.read_bytes() == DATA
+    assert sha256 == hashlib.sha256(DATA).hexdigest()
+
+    consumed = []
+
+    async def counting():
+        async for chunk in _chunks(DATA):
+            consumed.append(chunk)
+            yield chunk
+
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(save_stream(counting(), dest, max_bytes=100_000))
+    assert not dest.exists()
+    assert len(consumed) == 2  # 超过上限后不再读取
+
+
+def test_resumable_flow(tmp_path):
+    store = ResumableUploadStore(tmp_path, max_bytes=1_000_000)
+
+    async def main():
+        upload = store.create("a.webm", "周会", "u1", total_size=len(DATA))
+        uid = upload.upload_id
+        assert await store.append(uid, 0, _chunks(DATA[:100_000])) == 100_000
+
+        # 客户端重发已确认的数据：offset 不匹配
+        with pytest.raises(UploadOffsetError) as exc:
+            await store.append(uid, 0, _chunks(DATA[:100_000]))
+        assert exc.value.expected == 100_000
+
+        # 未传完不能 complete
+        with pytest.raises(ValueError):
+            await store.complete(uid, tmp_path / "out.webm")
+
+        assert await store.append(uid, 100_000, _chunks(DATA[100_000:])) == len(DATA)
+        with pytest.raises(ValueError):
+            await store.complete(uid, tmp_path / "out.webm", expected_sha256="0" * 64)
+        return await store.complete(uid, tmp_path / "out.webm", hashlib.sha256(DATA).hexdigest())
+
+    size, sha256 = asyncio.run(main())
+    assert size == len(DATA) and sha256 == hashlib.sha256(DATA).hexdigest()
+    assert (tmp_path / "out.webm").read_bytes() == DATA
+    assert not list(store.dir.iterdir())
+
+
+def test_resume_after_restart_and_limits(tmp_path):
+    store = ResumableUploadStore(tmp_path, max_bytes=200_000)
+    with pytest.raises(UploadTooLargeError):
+        store.create("a.webm", "周会", "u1", total_size=300_000)
+
+    upload = store.create("a.webm", "周会", "u1")
+    uid = upload.upload_id
+    asyncio.run(store.append(uid, 0, _chunks(DATA[:150_000])))
+
+    # 进程重启：新实例从文件恢复 offset
+    restarted = ResumableUploadStore(tmp_path, max_bytes=200_000)
+    assert restarted.get(uid)[1] == 150_000
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(restarted.append(uid, 150_000, _chunks(DATA[150_000:])))
+    received = restarted.get(uid)[1]
+    assert received <= 200_000
+
+    size, sha256 = asyncio.run(restarted.complete(uid, tmp_path / "out.webm"))
+    assert sha256 == hashlib.sha256(DATA[:size]).hexdigest()
+
+    # 过期清理
+    stale = restarted.create("b.webm", "周会", "u1").upload_id
+    restarted.ttl = -1
+    assert restarted.cleanup_expired() == 1
+    assert restarted.get(stale) is None